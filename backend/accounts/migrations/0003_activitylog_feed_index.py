@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0002_activitylog_passwordresettoken_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="activitylog",
+            index=models.Index(
+                fields=["-timestamp", "-id"], name="accounts_ac_timesta_b6f0dc_idx"
+            ),
+        ),
+    ]
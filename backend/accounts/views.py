@@ -17,6 +17,7 @@ from .serializers import (
     CampusSerializer, DepartmentSerializer, ActivityLogSerializer
 )
 from .utils import send_email, get_client_ip
+from config.pagination import TimestampKeysetPagination
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
@@ -489,6 +490,7 @@ class ActivityLogListView(generics.ListAPIView):
     """
     serializer_class = ActivityLogSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = TimestampKeysetPagination
     
     def get_queryset(self):
         user = self.request.user
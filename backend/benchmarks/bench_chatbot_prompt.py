@@ -0,0 +1,124 @@
+"""
+Benchmark: chatbot system prompt with BM25-retrieved passages vs. the
+previous whole-knowledge-base prompt.
+
+For a set of typical questions, reports the system prompt size (characters
+and an approximate token count) and the time to build it. With --live and
+GROQ_API_KEY set, also times real Groq completions with both prompts.
+
+Run from the backend directory:
+    python benchmarks/bench_chatbot_prompt.py [--repeat 200] [--top-k 5] [--live]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import requests  # noqa: E402
+from complaints.chatbot_service import ChatbotService  # noqa: E402
+
+QUESTIONS = [
+    'What are the library hours?',
+    'How do I register for courses?',
+    'How do I get WiFi password?',
+    'What are cafeteria hours?',
+    'When is the exam schedule posted?',
+    'How much is tuition for undergraduate programs?',
+    'Which colleges offer computer science?',
+    'How do I apply for a dormitory room?',
+    'How can I submit a complaint about my grade?',
+    'Who do I contact at the registrar office?',
+]
+
+
+def legacy_context(knowledge_base):
+    """ChatbotService._build_uog_context before retrieval: every topic's answer"""
+    return "\n".join(
+        f"Topic: {topic}\n{data['response_en']}\n" for topic, data in knowledge_base.items() if data.get('response_en')
+    )
+
+
+def approx_tokens(text):
+    return len(text) // 4
+
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return result, (time.perf_counter() - start) / repeat
+
+
+def live_latency(api_key, system_prompt, message):
+    start = time.perf_counter()
+    response = requests.post(
+        'https://api.groq.com/openai/v1/chat/completions',
+        json={
+            'model': 'llama-3.3-70b-versatile',
+            'messages': [{'role': 'system', 'content': system_prompt}, {'role': 'user', 'content': message}],
+            'temperature': 0.7,
+            'max_tokens': 512,
+        },
+        headers={'Authorization': f'Bearer {api_key}'},
+        timeout=60,
+    )
+    response.raise_for_status()
+    return time.perf_counter() - start, response.json().get('usage', {}).get('prompt_tokens')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--top-k', type=int, default=5)
+    parser.add_argument('--live', action='store_true', help='Also time real Groq calls (needs GROQ_API_KEY)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    service = ChatbotService()
+    print(f"Service start-up incl. index build: {(time.perf_counter() - start) * 1000:.1f} ms, "
+          f"{len(service.knowledge_index.passages)} passages")
+    service.retrieval_top_k = args.top_k
+
+    # Same prompt template, with the whole knowledge base as context
+    legacy = ChatbotService()
+    context = legacy_context(legacy.knowledge_base)
+    legacy._build_uog_context = lambda message: context
+
+    rows = []
+    for question in QUESTIONS:
+        legacy_prompt, legacy_time = timed(lambda: legacy._build_system_prompt(question, 'en'), args.repeat)
+        new_prompt, new_time = timed(lambda: service._build_system_prompt(question, 'en'), args.repeat)
+        topics = sorted({p.topic for p in service.knowledge_index.search(question, args.top_k)})
+        rows.append((question, legacy_prompt, new_prompt, legacy_time, new_time))
+        print(f"{question[:45]:45}  {approx_tokens(legacy_prompt):6} -> {approx_tokens(new_prompt):5} tokens  "
+              f"build {legacy_time * 1e6:7.1f} -> {new_time * 1e6:7.1f} us  topics: {', '.join(topics)}")
+
+    legacy_sizes = [len(row[1]) for row in rows]
+    new_sizes = [len(row[2]) for row in rows]
+    print(f"\nmean prompt: {statistics.mean(legacy_sizes):8.0f} -> {statistics.mean(new_sizes):6.0f} chars "
+          f"({statistics.mean(legacy_sizes) / statistics.mean(new_sizes):.1f}x smaller)")
+
+    if args.live:
+        api_key = os.environ.get('GROQ_API_KEY') or service.groq_api_key
+        if not api_key:
+            print('--live needs GROQ_API_KEY')
+            return
+        legacy_latencies, new_latencies = [], []
+        for question, legacy_prompt, new_prompt, _, _ in rows:
+            legacy_latency, legacy_usage = live_latency(api_key, legacy_prompt, question)
+            new_latency, new_usage = live_latency(api_key, new_prompt, question)
+            legacy_latencies.append(legacy_latency)
+            new_latencies.append(new_latency)
+            print(f"{question[:45]:45}  {legacy_latency:6.2f}s ({legacy_usage} tok) -> "
+                  f"{new_latency:6.2f}s ({new_usage} tok)")
+        print(f"\nmedian end-to-end: {statistics.median(legacy_latencies):.2f}s -> "
+              f"{statistics.median(new_latencies):.2f}s")
+
+
+if __name__ == '__main__':
+    main()
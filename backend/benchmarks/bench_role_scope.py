@@ -0,0 +1,166 @@
+"""
+Benchmark: compiled role scopes vs. the previous per-view role branches.
+
+Seeds a scratch database with colleges, departments, campuses and
+complaints, then for one user of each role compares the queryset the
+views used to build with the compiled scope (complaints/scoping.py):
+queries issued to build and run it, the time for a first page plus a
+count, and the query plan.
+
+Run from the backend directory:
+    python benchmarks/bench_role_scope.py [--size 100000] [--repeat 50] [--database-url URL]
+
+Without --database-url a temporary SQLite file is used.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+ROLES = ['student', 'proctor', 'dept_head', 'dean', 'campus_director', 'admin', 'maintenance']
+
+
+def legacy_role_queryset(user, Complaint, Department):
+    """ComplaintListCreateView.get_role_queryset before the scope compiler"""
+    role = getattr(user, 'role', 'student')
+    if role == 'student':
+        return Complaint.objects.filter(submitter=user)
+    if role == 'proctor':
+        return Complaint.objects.filter(is_facility=True)
+    if role == 'dept_head':
+        if user.department:
+            return Complaint.objects.filter(is_academic=True, department=user.department)
+        return Complaint.objects.none()
+    if role == 'dean':
+        if user.department and user.department.college:
+            departments = Department.objects.filter(college=user.department.college)
+            return Complaint.objects.filter(department__in=departments).order_by('-created_at')
+        return Complaint.objects.none()
+    if role == 'campus_director':
+        if user.campus:
+            return Complaint.objects.filter(campus=user.campus).order_by('-created_at')
+        return Complaint.objects.none()
+    if role in ['admin', 'super_admin']:
+        return Complaint.objects.all().order_by('-created_at')
+    return Complaint.objects.filter(assigned_to=user).order_by('-created_at')
+
+
+def seed(size, seed_value):
+    from accounts.models import Campus, College, CustomUser, Department
+    from complaints.models import Complaint
+
+    rng = random.Random(seed_value)
+    campuses = [Campus.objects.create(name=f'Campus {i}') for i in range(4)]
+    colleges = [College.objects.create(name=f'College {i}', campus=campuses[i % 4]) for i in range(12)]
+    departments = [Department.objects.create(name=f'Department {i}', college=colleges[i % 12]) for i in range(80)]
+    students = [
+        CustomUser.objects.create(username=f'student{i}', email=f'student{i}@example.com', role='student')
+        for i in range(200)
+    ]
+    staff = [
+        CustomUser.objects.create(username=f'staff{i}', email=f'staff{i}@example.com', role='maintenance',
+                                  department=rng.choice(departments))
+        for i in range(40)
+    ]
+
+    batch = []
+    for i in range(size):
+        department = rng.choice(departments)
+        academic = rng.random() < 0.6
+        batch.append(Complaint(
+            title=f'Complaint {i}', description='Benchmark complaint', location='Campus',
+            submitter=rng.choice(students), department=department, campus=rng.choice(campuses),
+            assigned_to=rng.choice(staff) if rng.random() < 0.5 else None,
+            is_academic=academic, is_facility=not academic,
+        ))
+    Complaint.objects.bulk_create(batch, batch_size=2000)
+
+    department = departments[0]
+    return {
+        'student': students[0],
+        'proctor': CustomUser.objects.create(username='proctor', email='p@example.com', role='proctor'),
+        'dept_head': CustomUser.objects.create(username='head', email='h@example.com', role='dept_head',
+                                               department=department),
+        'dean': CustomUser.objects.create(username='dean', email='d@example.com', role='dean',
+                                          department=department),
+        'campus_director': CustomUser.objects.create(username='director', email='c@example.com',
+                                                     role='campus_director', campus=campuses[0]),
+        'admin': CustomUser.objects.create(username='admin', email='a@example.com', role='admin'),
+        'maintenance': staff[0],
+    }
+
+
+def run(build, user_id, repeat, User):
+    """Average time and query count to load the user, build the queryset, fetch a page and count"""
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as captured:
+        user = User.objects.get(pk=user_id)
+        queryset = build(user)
+        list(queryset.order_by('-created_at', '-id')[:20])
+        queryset.count()
+    queries = len(captured.captured_queries) - 1
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        # A fresh user per iteration, as each request loads its own
+        user = User.objects.get(pk=user_id)
+        queryset = build(user)
+        list(queryset.order_by('-created_at', '-id')[:20])
+        queryset.count()
+    return (time.perf_counter() - start) / repeat * 1000, queries, queryset
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--plans', action='store_true', help='Print the query plans')
+    parser.add_argument('--database-url', default=None)
+    args = parser.parse_args()
+
+    scratch = tempfile.TemporaryDirectory()
+    os.environ['DATABASE_URL'] = args.database_url or f'sqlite:///{scratch.name}/bench.sqlite3'
+
+    import django
+    django.setup()
+
+    from django.core.management import call_command
+    from accounts.models import CustomUser, Department
+    from complaints.models import Complaint
+    from complaints.scoping import scoped_complaints
+
+    call_command('migrate', verbosity=0)
+    start = time.perf_counter()
+    users = seed(args.size, args.seed)
+    print(f"Seeded {args.size} complaints in {time.perf_counter() - start:.1f}s")
+
+    print(f"{'role':<16}{'legacy ms':>10}{'queries':>8}{'scoped ms':>11}{'queries':>8}")
+    for role in ROLES:
+        user_id = users[role].pk
+        legacy_ms, legacy_queries, legacy_qs = run(
+            lambda user: legacy_role_queryset(user, Complaint, Department), user_id, args.repeat, CustomUser
+        )
+        scoped_ms, scoped_queries, scoped_qs = run(scoped_complaints, user_id, args.repeat, CustomUser)
+        assert set(legacy_qs.values_list('id', flat=True)) == set(scoped_qs.values_list('id', flat=True)), role
+        print(f"{role:<16}{legacy_ms:>10.2f}{legacy_queries:>8}{scoped_ms:>11.2f}{scoped_queries:>8}")
+
+        if args.plans:
+            for label, queryset in (('legacy', legacy_qs), ('scoped', scoped_qs)):
+                print(f"  {label} plan:")
+                for line in queryset.order_by('-created_at', '-id')[:20].explain().splitlines():
+                    print(f"    {line}")
+
+    scratch.cleanup()
+
+
+if __name__ == '__main__':
+    main()
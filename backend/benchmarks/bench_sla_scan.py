@@ -0,0 +1,173 @@
+"""
+Benchmark: set-based SLA breach scanner vs. the previous per-complaint loop.
+
+Seeds a scratch database with open complaints (a share of them past their
+response/resolution SLA), then times both implementations on identical data.
+
+Run from the backend directory:
+    python benchmarks/bench_sla_scan.py [--size 100000] [--breach-rate 0.3] [--database-url URL]
+
+Without --database-url a temporary SQLite file is used.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+
+def legacy_check_and_update_sla_breaches(Complaint, ComplaintEvent, apply_sla_to_complaint, timezone):
+    """The pre-batch implementation, kept verbatim for comparison"""
+    now = timezone.now()
+    breached_complaints = []
+
+    open_complaints = Complaint.objects.filter(
+        status__in=['new', 'assigned', 'in_progress', 'pending']
+    )
+
+    for complaint in open_complaints:
+        if not complaint.sla_response_hours or not complaint.sla_resolution_hours:
+            apply_sla_to_complaint(complaint)
+
+        breach_detected = False
+
+        if not complaint.first_response_at:
+            hours_since_creation = (now - complaint.created_at).total_seconds() / 3600
+            if hours_since_creation > complaint.sla_response_hours:
+                if not complaint.sla_response_breached:
+                    complaint.sla_response_breached = True
+                    breach_detected = True
+                    ComplaintEvent.objects.create(
+                        complaint=complaint,
+                        event_type='sla_breached',
+                        notes=f"Response SLA breached ({complaint.sla_response_hours}h)"
+                    )
+
+        if complaint.status not in ['resolved', 'closed']:
+            hours_since_creation = (now - complaint.created_at).total_seconds() / 3600
+            if hours_since_creation > complaint.sla_resolution_hours:
+                if not complaint.sla_resolution_breached:
+                    complaint.sla_resolution_breached = True
+                    breach_detected = True
+                    ComplaintEvent.objects.create(
+                        complaint=complaint,
+                        event_type='sla_breached',
+                        notes=f"Resolution SLA breached ({complaint.sla_resolution_hours}h)"
+                    )
+
+        if breach_detected:
+            complaint.sla_breach_notified_at = now
+            complaint.save()
+            breached_complaints.append(complaint)
+
+    return breached_complaints
+
+
+def seed(size, breach_rate, seed_value):
+    from django.utils import timezone
+    from accounts.models import CustomUser
+    from complaints.models import Complaint
+    from complaints.sla_service import DEFAULT_SLAS
+
+    rng = random.Random(seed_value)
+    submitter = CustomUser.objects.create(username='bench', email='bench@example.com')
+    priorities = list(DEFAULT_SLAS)
+    statuses = ['new', 'assigned', 'in_progress', 'pending']
+
+    ages = []
+    batch = []
+    for i in range(size):
+        priority = rng.choice(priorities)
+        sla = DEFAULT_SLAS[priority]
+        if rng.random() < breach_rate:
+            age = rng.uniform(sla['response'] + 1, sla['resolution'] * 1.5)
+        else:
+            age = rng.uniform(0, sla['response'] * 0.9)
+        ages.append(age)
+        batch.append(Complaint(
+            title=f'Complaint {i}', description='Benchmark complaint', location='Campus',
+            submitter=submitter, priority=priority, status=rng.choice(statuses),
+            sla_response_hours=sla['response'], sla_resolution_hours=sla['resolution'],
+        ))
+    Complaint.objects.bulk_create(batch, batch_size=2000)
+
+    # created_at is auto_now_add, so backdate rows afterwards in hourly buckets
+    now = timezone.now()
+    ids = list(Complaint.objects.order_by('id').values_list('id', flat=True))
+    buckets = {}
+    for complaint_id, age in zip(ids, ages):
+        buckets.setdefault(int(age), []).append(complaint_id)
+    for hours, bucket_ids in buckets.items():
+        for start in range(0, len(bucket_ids), 900):
+            Complaint.objects.filter(id__in=bucket_ids[start:start + 900]).update(
+                created_at=now - timedelta(hours=hours, minutes=30)
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=100000)
+    parser.add_argument('--breach-rate', type=float, default=0.3)
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--database-url', default=None)
+    args = parser.parse_args()
+
+    scratch = tempfile.TemporaryDirectory()
+    os.environ['DATABASE_URL'] = args.database_url or f'sqlite:///{scratch.name}/bench.sqlite3'
+
+    import django
+    django.setup()
+
+    from django.core.management import call_command
+    from django.db import transaction
+    from django.db.models.signals import pre_save, post_save
+    from django.utils import timezone
+    from complaints.models import Complaint, ComplaintEvent
+    from complaints import signals
+    from complaints.sla_service import check_and_update_sla_breaches, apply_sla_to_complaint
+
+    call_command('migrate', verbosity=0)
+    start = time.perf_counter()
+    seed(args.size, args.breach_rate, args.seed)
+    print(f"Seeded {args.size} open complaints in {time.perf_counter() - start:.1f}s")
+
+    # The legacy loop predates the statistics rollup and workload counters;
+    # run it without those signals so it is timed as it originally behaved
+    pre_save.disconnect(signals.remember_stored_state, sender=Complaint)
+    post_save.disconnect(signals.update_rollup_on_save, sender=Complaint)
+    post_save.disconnect(signals.update_workload_on_save, sender=Complaint)
+    with transaction.atomic():
+        start = time.perf_counter()
+        legacy = legacy_check_and_update_sla_breaches(Complaint, ComplaintEvent, apply_sla_to_complaint, timezone)
+        legacy_time = time.perf_counter() - start
+        legacy_events = ComplaintEvent.objects.count()
+        transaction.set_rollback(True)
+    pre_save.connect(signals.remember_stored_state, sender=Complaint)
+    post_save.connect(signals.update_rollup_on_save, sender=Complaint)
+    post_save.connect(signals.update_workload_on_save, sender=Complaint)
+
+    start = time.perf_counter()
+    batched = check_and_update_sla_breaches(chunk_size=args.chunk_size)
+    batched_time = time.perf_counter() - start
+    batched_events = ComplaintEvent.objects.count()
+
+    print(f"legacy  : {legacy_time:8.2f}s  {len(legacy)} breached, {legacy_events} events")
+    print(f"batched : {batched_time:8.2f}s  {len(batched)} breached, {batched_events} events")
+    print(f"speedup : {legacy_time / batched_time:8.1f}x")
+
+    start = time.perf_counter()
+    check_and_update_sla_breaches(chunk_size=args.chunk_size)
+    print(f"re-scan with nothing new: {time.perf_counter() - start:.2f}s")
+
+    scratch.cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+"""
+Micro-benchmark: analyze_urgency with the precompiled keyword matcher vs.
+the previous per-keyword `in` scans with eager TextBlob/VADER.
+
+Run from the backend directory:
+    python benchmarks/bench_urgency.py [--size 10000] [--seed 42]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+from textblob import TextBlob  # noqa: E402
+from complaints.ai_service import (  # noqa: E402
+    analyze_urgency, sentiment_analyzer,
+    CRITICAL_KEYWORDS, HIGH_KEYWORDS, MEDIUM_KEYWORDS, LOW_KEYWORDS,
+)
+
+
+def legacy_analyze_urgency(text, language='en'):
+    """The pre-matcher implementation, kept verbatim for comparison"""
+    if not text:
+        return 'low', 0.5, "No text provided"
+
+    text_lower = text.lower()
+    blob = TextBlob(text_lower)
+
+    confidence = 0.5
+    urgency = 'low'
+    reason_parts = []
+
+    for keyword in CRITICAL_KEYWORDS:
+        if keyword in text_lower:
+            reason_parts.append(f"Critical keyword: '{keyword}'")
+            return 'critical', 0.9, "; ".join(reason_parts)
+
+    high_keyword_count = 0
+    for keyword in HIGH_KEYWORDS:
+        if keyword in text_lower:
+            high_keyword_count += 1
+            reason_parts.append(f"High urgency keyword: '{keyword}'")
+
+    if high_keyword_count > 0:
+        return 'high', 0.85, "; ".join(reason_parts)
+
+    medium_keyword_count = 0
+    for keyword in MEDIUM_KEYWORDS:
+        if keyword in text_lower:
+            medium_keyword_count += 1
+            if not reason_parts:
+                reason_parts.append(f"Medium urgency keyword: '{keyword}'")
+
+    if medium_keyword_count > 0:
+        confidence = 0.7
+        urgency = 'medium'
+
+    low_keyword_count = 0
+    for keyword in LOW_KEYWORDS:
+        if keyword in text_lower:
+            low_keyword_count += 1
+            if not reason_parts:
+                reason_parts.append(f"Low urgency keyword: '{keyword}'")
+
+    if low_keyword_count > 0 and urgency == 'low':
+        confidence = 0.75
+        urgency = 'low'
+
+    sentiment_scores = sentiment_analyzer.polarity_scores(text)
+    compound_score = sentiment_scores['compound']
+
+    if compound_score < -0.6:
+        if not reason_parts:
+            urgency = 'high'
+            confidence = 0.75
+        reason_parts.append(f"Very negative sentiment (score: {compound_score:.2f})")
+    elif compound_score < -0.3:
+        if urgency == 'low':
+            urgency = 'medium'
+            confidence = 0.65
+        reason_parts.append(f"Negative sentiment (score: {compound_score:.2f})")
+
+    if blob.sentiment.polarity < -0.5:
+        if urgency == 'low':
+            urgency = 'medium'
+        reason_parts.append(f"TextBlob sentiment: {blob.sentiment.polarity:.2f}")
+
+    if len(text.split()) > 200:
+        if urgency == 'low':
+            urgency = 'medium'
+            confidence = 0.6
+
+    reason = "; ".join(reason_parts) if reason_parts else "Default priority assessment"
+    return urgency, confidence, reason
+
+
+ENGLISH_OPENERS = [
+    'The projector in room {room} is', 'Our dormitory block {room} has', 'The library computers are',
+    'The cafeteria on campus is', 'The toilet near lab {room} is', 'The lecturer for course {room} is',
+    'Students in hall {room} report that the door is', 'The water supply in block {room} is',
+]
+ENGLISH_DETAILS = [
+    'not working since monday', 'very dirty and there is a bad smell', 'completely broken',
+    'making noise all night', 'slow and the wifi keeps dropping', 'a fire hazard near the wiring',
+    'fine but a suggestion would be to add more seats', 'leaking onto the floor',
+    'blurry and unclear during lectures', 'always late and I am unhappy', 'terrible, awful and horrible',
+    'ok, just a request for better lighting', 'dangerous for students at night',
+    'in need of an improvement to the schedule', 'missing chairs for the exam',
+]
+AMHARIC_SENTENCES = [
+    'በክፍል {room} ውስጥ ያለው መብራት አይሰራም', 'የመኝታ ክፍሉ ቆሻሻ ነው', 'በቤተ-መጽሐፍቱ አካባቢ እሳት አለ',
+    'የውሃ አቅርቦት ችግር አለ', 'ኢንተርኔት ዝግተኛ ነው', 'ወንበሩ ተሰብሯል', 'አስቸኳይ እርዳታ ያስፈልጋል',
+    'የፈተና መርሃግብር ጥያቄ አለኝ', 'ካፌቴሪያው ጥሩ ነው',
+]
+
+
+def build_corpus(size, seed):
+    """Generate `size` synthetic English/Amharic complaint descriptions"""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        room = rng.randint(100, 499)
+        if rng.random() < 0.3:
+            parts = [rng.choice(AMHARIC_SENTENCES).format(room=room) for _ in range(rng.randint(1, 3))]
+            corpus.append('። '.join(parts))
+        else:
+            sentences = []
+            for _ in range(rng.randint(1, 4)):
+                sentences.append(f"{rng.choice(ENGLISH_OPENERS).format(room=room)} {rng.choice(ENGLISH_DETAILS)}.")
+            corpus.append(' '.join(sentences))
+    return corpus
+
+
+def run(func, corpus):
+    start = time.perf_counter()
+    results = [func(text) for text in corpus]
+    return results, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.size, args.seed)
+
+    # Warm up lazy imports/lexicons so neither side pays one-time costs
+    legacy_analyze_urgency(corpus[0])
+    analyze_urgency(corpus[0])
+
+    legacy_results, legacy_time = run(legacy_analyze_urgency, corpus)
+    new_results, new_time = run(analyze_urgency, corpus)
+
+    mismatches = sum(
+        1 for old, new in zip(legacy_results, new_results) if old[:2] != new[:2]
+    )
+    tiers = {}
+    for urgency, _, _ in new_results:
+        tiers[urgency] = tiers.get(urgency, 0) + 1
+
+    print(f"Corpus: {len(corpus)} complaints (seed {args.seed}), urgency mix: {tiers}")
+    print(f"legacy  : {legacy_time:8.3f}s  {len(corpus) / legacy_time:10.0f} complaints/s")
+    print(f"matcher : {new_time:8.3f}s  {len(corpus) / new_time:10.0f} complaints/s")
+    print(f"speedup : {legacy_time / new_time:8.1f}x")
+    print(f"urgency/confidence mismatches: {mismatches}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,7 @@
 from django.contrib import admin
 from .models import (
     Category, SubCategory, Complaint, ComplaintEvent, ComplaintComment,
-    ComplaintFile, RoutingRule, EmailTemplate
+    ComplaintFile, RoutingRule, EmailTemplate, EnrichmentJob, ReportJob, OutboundEmail
 )
 
 
@@ -87,3 +87,34 @@ class EmailTemplateAdmin(admin.ModelAdmin):
     list_filter = ['template_type', 'is_active']
     search_fields = ['name', 'subject']
     readonly_fields = ['created_at', 'updated_at']
+
+
+@admin.register(EnrichmentJob)
+class EnrichmentJobAdmin(admin.ModelAdmin):
+    list_display = ['complaint', 'status', 'attempts', 'run_after', 'finished_at']
+    list_filter = ['status']
+    search_fields = ['complaint__tracking_id', 'last_error']
+    readonly_fields = ['created_at', 'locked_at', 'finished_at']
+
+
+@admin.register(ReportJob)
+class ReportJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'requested_by', 'format', 'status', 'row_count', 'created_at', 'finished_at']
+    list_filter = ['status', 'format']
+    search_fields = ['requested_by__username', 'cache_key', 'last_error']
+    readonly_fields = ['cache_key', 'watermark', 'scope', 'created_at', 'locked_at', 'finished_at']
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'kind', 'status', 'attempts', 'run_after', 'sent_at']
+    list_filter = ['status', 'kind']
+    search_fields = ['subject', 'complaint__tracking_id', 'last_error']
+    readonly_fields = ['created_at', 'locked_at', 'sent_at']
+    actions = ['requeue']
+    
+    @admin.action(description='Requeue selected dead letters')
+    def requeue(self, request, queryset):
+        from .outbox import requeue_dead
+        count = requeue_dead(list(queryset.values_list('pk', flat=True)))
+        self.message_user(request, f'{count} email(s) requeued')
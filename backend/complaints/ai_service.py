@@ -1,8 +1,9 @@
 from textblob import TextBlob
-from difflib import SequenceMatcher
 import re
 import logging
 
+from .keyword_matcher import KeywordMatcher
+
 # Initialize sentiment analyzer (with fallback)
 try:
     from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
@@ -57,65 +58,51 @@ LOW_KEYWORDS = [
 ]
 
 
+# All urgency tiers compiled once into a single-pass matcher
+URGENCY_MATCHER = KeywordMatcher({
+    'critical': CRITICAL_KEYWORDS,
+    'high': HIGH_KEYWORDS,
+    'medium': MEDIUM_KEYWORDS,
+    'low': LOW_KEYWORDS,
+})
+
+
 def analyze_urgency(text, language='en'):
     """
     Analyzes the complaint description to determine urgency.
     Returns: ('critical', 'high', 'medium', 'low'), confidence_score, reason
+    
+    Keyword tiers are resolved in one pass by URGENCY_MATCHER. Sentiment
+    analysis (VADER, then TextBlob) only runs when the keywords leave the
+    result undecided, i.e. when no critical/high/medium keyword matched.
     """
     if not text:
         return 'low', 0.5, "No text provided"
     
-    text_lower = text.lower()
-    blob = TextBlob(text_lower)
+    tiers = URGENCY_MATCHER.match_tiers(text)
     
     confidence = 0.5
     urgency = 'low'  # Default urgency
     reason_parts = []
     
     # 1. Keyword Search (most reliable)
-    # Check for CRITICAL first
-    for keyword in CRITICAL_KEYWORDS:
-        if keyword in text_lower:
-            reason_parts.append(f"Critical keyword: '{keyword}'")
-            return 'critical', 0.9, "; ".join(reason_parts)
-    
-    # Check for HIGH urgency
-    high_keyword_count = 0
-    for keyword in HIGH_KEYWORDS:
-        if keyword in text_lower:
-            high_keyword_count += 1
-            reason_parts.append(f"High urgency keyword: '{keyword}'")
-    
-    if high_keyword_count > 0:
-        return 'high', 0.85, "; ".join(reason_parts)
-    
-    # Check for MEDIUM urgency
-    medium_keyword_count = 0
-    for keyword in MEDIUM_KEYWORDS:
-        if keyword in text_lower:
-            medium_keyword_count += 1
-            if not reason_parts:  # Only add first match
-                reason_parts.append(f"Medium urgency keyword: '{keyword}'")
-    
-    if medium_keyword_count > 0:
-        confidence = 0.7
-        urgency = 'medium'
+    if tiers['critical']:
+        return 'critical', 0.9, f"Critical keyword: '{tiers['critical'][0].term}'"
+    
+    if tiers['high']:
+        high_terms = URGENCY_MATCHER.distinct_terms(tiers['high'])
+        return 'high', 0.85, "; ".join(f"High urgency keyword: '{term}'" for term in high_terms)
     
-    # Check for LOW urgency indicators
-    low_keyword_count = 0
-    for keyword in LOW_KEYWORDS:
-        if keyword in text_lower:
-            low_keyword_count += 1
-            if not reason_parts:
-                reason_parts.append(f"Low urgency keyword: '{keyword}'")
+    if tiers['medium']:
+        # Sentiment can only ever raise a 'low' result, so medium is final
+        return 'medium', 0.7, f"Medium urgency keyword: '{tiers['medium'][0].term}'"
     
-    if low_keyword_count > 0 and urgency == 'low':
+    if tiers['low']:
         confidence = 0.75
-        urgency = 'low'
+        reason_parts.append(f"Low urgency keyword: '{tiers['low'][0].term}'")
     
     # 2. Sentiment Analysis
-    sentiment_scores = sentiment_analyzer.polarity_scores(text)
-    compound_score = sentiment_scores['compound']
+    compound_score = sentiment_analyzer.polarity_scores(text)['compound']
     
     if compound_score < -0.6:  # Very negative
         if not reason_parts:
@@ -123,22 +110,21 @@ def analyze_urgency(text, language='en'):
             confidence = 0.75
         reason_parts.append(f"Very negative sentiment (score: {compound_score:.2f})")
     elif compound_score < -0.3:  # Negative
-        if urgency == 'low':
-            urgency = 'medium'
-            confidence = 0.65
+        urgency = 'medium'
+        confidence = 0.65
         reason_parts.append(f"Negative sentiment (score: {compound_score:.2f})")
     
-    # 3. TextBlob sentiment as backup
-    if blob.sentiment.polarity < -0.5:
-        if urgency == 'low':
+    # 3. TextBlob sentiment as backup (only while still undecided)
+    if urgency == 'low':
+        polarity = TextBlob(text.lower()).sentiment.polarity
+        if polarity < -0.5:
             urgency = 'medium'
-        reason_parts.append(f"TextBlob sentiment: {blob.sentiment.polarity:.2f}")
+            reason_parts.append(f"TextBlob sentiment: {polarity:.2f}")
     
     # 4. Length and urgency indicators
-    if len(text.split()) > 200:  # Long complaint might indicate seriousness
-        if urgency == 'low':
-            urgency = 'medium'
-            confidence = 0.6
+    if urgency == 'low' and len(text.split()) > 200:  # Long complaint might indicate seriousness
+        urgency = 'medium'
+        confidence = 0.6
     
     reason = "; ".join(reason_parts) if reason_parts else "Default priority assessment"
     return urgency, confidence, reason
@@ -204,32 +190,24 @@ def detect_duplicate(new_complaint_text, existing_complaints, threshold=0.7):
     
     Returns:
         (is_duplicate: bool, similar_complaint_id: int or None, similarity_score: float)
+    
+    For stored complaints prefer duplicate_engine.find_similar, which uses
+    the LSH index instead of scanning a list.
     """
+    from .duplicate_engine import rank_candidates
+    
     if not new_complaint_text or not existing_complaints:
         return False, None, 0.0
     
-    new_text_normalized = normalize_text(new_complaint_text)
-    best_match = None
-    best_score = 0.0
+    # Skip closed/resolved complaints
+    open_complaints = [c for c in existing_complaints if c.get('status') not in ['closed', 'resolved']]
     
-    for complaint in existing_complaints:
-        # Skip closed/resolved complaints older than 30 days
-        if complaint.get('status') in ['closed', 'resolved']:
-            continue
-        
-        # Combine title and description for comparison
-        existing_text = f"{complaint.get('title', '')} {complaint.get('description', '')}"
-        existing_text_normalized = normalize_text(existing_text)
-        
-        # Calculate similarity
-        similarity = calculate_similarity(new_text_normalized, existing_text_normalized)
-        
-        if similarity > best_score:
-            best_score = similarity
-            best_match = complaint.get('id')
+    ranked = rank_candidates(new_complaint_text, open_complaints)
+    if not ranked:
+        return False, None, 0.0
     
-    is_duplicate = best_score >= threshold
-    return is_duplicate, best_match, best_score
+    best_match, best_score = ranked[0]
+    return best_score >= threshold, best_match.get('id'), best_score
 
 
 def normalize_text(text):
@@ -242,8 +220,9 @@ def normalize_text(text):
 
 
 def calculate_similarity(text1, text2):
-    """Calculate similarity between two texts using SequenceMatcher"""
-    return SequenceMatcher(None, text1, text2).ratio()
+    """Calculate shingle Jaccard similarity between two texts"""
+    from .duplicate_engine import jaccard_similarity
+    return jaccard_similarity(text1, text2)
 
 
 def translate_text(text, source_lang='am', target_lang='en'):
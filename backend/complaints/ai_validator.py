@@ -234,27 +234,19 @@ class ComplaintValidator:
         if not existing_complaints:
             return {'is_duplicate': False, 'confidence': 0.0, 'similar_complaints': []}
         
-        new_text = f"{title} {description}".lower()
-        new_words = set(new_text.split())
-        
-        similar_complaints = []
-        
-        for complaint in existing_complaints:
-            existing_text = f"{complaint.get('title', '')} {complaint.get('description', '')}".lower()
-            existing_words = set(existing_text.split())
-            
-            # Calculate similarity (Jaccard similarity)
-            intersection = len(new_words & existing_words)
-            union = len(new_words | existing_words)
-            similarity = intersection / union if union > 0 else 0
-            
-            if similarity > 0.6:
-                similar_complaints.append({
-                    'id': complaint.get('id'),
-                    'tracking_id': complaint.get('tracking_id'),
-                    'title': complaint.get('title'),
-                    'similarity': similarity
-                })
+        from .duplicate_engine import rank_candidates
+        
+        # Shingle Jaccard similarity, linear in total text length
+        ranked = rank_candidates(f"{title} {description}", existing_complaints, threshold=0.6)
+        similar_complaints = [
+            {
+                'id': complaint.get('id'),
+                'tracking_id': complaint.get('tracking_id'),
+                'title': complaint.get('title'),
+                'similarity': similarity
+            }
+            for complaint, similarity in ranked
+        ]
         
         is_duplicate = len(similar_complaints) > 0 and similar_complaints[0]['similarity'] > 0.8
         confidence = similar_complaints[0]['similarity'] if similar_complaints else 0.0
@@ -262,7 +254,7 @@ class ComplaintValidator:
         return {
             'is_duplicate': is_duplicate,
             'confidence': confidence,
-            'similar_complaints': sorted(similar_complaints, key=lambda x: x['similarity'], reverse=True)[:3]
+            'similar_complaints': similar_complaints[:3]
         }
 
 
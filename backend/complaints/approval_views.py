@@ -4,10 +4,12 @@ Approval workflow views for complaint approvals
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.db import transaction
 from django.utils import timezone
 from .models import Complaint, ComplaintEvent
-from .serializers import ComplaintSerializer
+from .serializers import ComplaintSerializer, ComplaintListItemSerializer
 from .notifications import send_complaint_notification
+from .scoping import APPROVE, scoped_complaints
 from accounts.models import CustomUser
 import logging
 
@@ -22,41 +24,18 @@ class ApprovalWorkflowViewSet(viewsets.ViewSet):
     
     def get_queryset(self):
         """Get complaints that need approval based on user role"""
-        user = self.request.user
-        role = user.role
-        
-        # Base queryset
-        queryset = Complaint.objects.filter(requires_approval=True, approved_by__isnull=True)
-        
-        # Filter based on role
-        if role == 'dept_head':
-            # Department Head can approve complaints from their department
-            if user.department:
-                queryset = queryset.filter(department=user.department)
-        elif role == 'dean':
-            # Dean can approve complaints from their college
-            if user.department and user.department.college:
-                from accounts.models import Department
-                departments = Department.objects.filter(college=user.department.college)
-                queryset = queryset.filter(department__in=departments)
-        elif role == 'campus_director':
-            # Campus Director can approve complaints from their campus
-            if user.campus:
-                queryset = queryset.filter(campus=user.campus)
-        elif role in ['admin', 'super_admin']:
-            # Admins can approve any complaint
-            pass
-        else:
-            # Other roles cannot approve
-            queryset = queryset.none()
-        
-        return queryset
+        # Department heads, deans and campus directors approve within their
+        # own department/college/campus, admins approve anything
+        return scoped_complaints(
+            self.request.user, APPROVE,
+            Complaint.objects.filter(requires_approval=True, approved_by__isnull=True)
+        )
     
     @action(detail=False, methods=['get'])
     def pending(self, request):
         """Get list of pending approvals"""
-        queryset = self.get_queryset()
-        serializer = ComplaintSerializer(queryset, many=True)
+        queryset = ComplaintListItemSerializer.eager_load_for(self.get_queryset(), request)
+        serializer = ComplaintListItemSerializer(queryset, many=True, context={'request': request})
         return Response(serializer.data)
     
     @action(detail=True, methods=['post'])
@@ -84,27 +63,28 @@ class ApprovalWorkflowViewSet(viewsets.ViewSet):
         # Get approval notes
         approval_notes = request.data.get('notes', '')
         
-        # Approve
-        complaint.approved_by = request.user
-        complaint.approved_at = timezone.now()
-        complaint.approval_notes = approval_notes
-        complaint.requires_approval = False
-        complaint.save()
-        
-        # Create event
-        ComplaintEvent.objects.create(
-            complaint=complaint,
-            event_type='status_changed',
-            actor=request.user,
-            old_value='Pending Approval',
-            new_value='Approved',
-            notes=f"Approved by {request.user.get_full_name() or request.user.username}: {approval_notes}"
-        )
-        
-        # Send notification
-        send_complaint_notification(complaint, 'reviewed', {
-            'additional_message': f'Your complaint has been approved. {approval_notes}'
-        })
+        with transaction.atomic():
+            # Approve
+            complaint.approved_by = request.user
+            complaint.approved_at = timezone.now()
+            complaint.approval_notes = approval_notes
+            complaint.requires_approval = False
+            complaint.save()
+            
+            # Create event
+            ComplaintEvent.objects.create(
+                complaint=complaint,
+                event_type='status_changed',
+                actor=request.user,
+                old_value='Pending Approval',
+                new_value='Approved',
+                notes=f"Approved by {request.user.get_full_name() or request.user.username}: {approval_notes}"
+            )
+            
+            # Queue notification
+            send_complaint_notification(complaint, 'reviewed', {
+                'additional_message': f'Your complaint has been approved. {approval_notes}'
+            })
         
         serializer = ComplaintSerializer(complaint)
         return Response(serializer.data)
@@ -132,22 +112,23 @@ class ApprovalWorkflowViewSet(viewsets.ViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Reject
-        complaint.status = 'rejected'
-        complaint.rejection_reason = rejection_reason
-        complaint.requires_approval = False
-        complaint.save()
-        
-        # Create event
-        ComplaintEvent.objects.create(
-            complaint=complaint,
-            event_type='rejected',
-            actor=request.user,
-            notes=f"Rejected by {request.user.get_full_name() or request.user.username}: {rejection_reason}"
-        )
-        
-        # Send notification
-        send_complaint_notification(complaint, 'rejected')
+        with transaction.atomic():
+            # Reject
+            complaint.status = 'rejected'
+            complaint.rejection_reason = rejection_reason
+            complaint.requires_approval = False
+            complaint.save()
+            
+            # Create event
+            ComplaintEvent.objects.create(
+                complaint=complaint,
+                event_type='rejected',
+                actor=request.user,
+                notes=f"Rejected by {request.user.get_full_name() or request.user.username}: {rejection_reason}"
+            )
+            
+            # Queue notification
+            send_complaint_notification(complaint, 'rejected')
         
         serializer = ComplaintSerializer(complaint)
         return Response(serializer.data)
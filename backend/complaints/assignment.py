@@ -0,0 +1,369 @@
+"""
+Workload-aware complaint assignment
+
+StaffWorkload holds, per assignee, how many unresolved complaints they have
+and the sum of those complaints' priority weights. Complaint save/delete
+signals move a complaint's weight between assignees as it is (re)assigned,
+re-prioritized or resolved, the same way rollup.py maintains the daily
+statistics; bulk updates report their changes through record_load_changes().
+
+A complaint is given to the eligible staff member of its department with
+the lowest weighted load. rebalance_backlog() distributes a whole queue,
+most urgent SLA deadline first, keeping the loads in memory and writing one
+UPDATE per assignee and chunk, so assigning thousands of complaints costs
+a few queries per chunk rather than several per complaint.
+"""
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Sum, Case, When, Value, Q, F, IntegerField
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+import heapq
+import logging
+
+from .models import Complaint, ComplaintEvent, StaffWorkload
+from .dashboard_stats import UNRESOLVED_STATUSES
+from . import rollup, dashboard_cache
+from accounts.models import CustomUser
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_WEIGHTS = {'critical': 8, 'high': 4, 'medium': 2, 'low': 1}
+
+# Roles that can be given complaints (see dashboard_stats.department_staff)
+STAFF_ROLES = ['academic', 'non_academic', 'maintenance']
+
+# Complaint fields a workload contribution depends on
+TRACKED_FIELDS = frozenset(['assigned_to', 'status', 'priority'])
+
+VALUE_FIELDS = ['assigned_to_id', 'status', 'priority']
+
+REBALANCE_CHUNK_SIZE = 500
+
+# Queued complaints: nobody assigned yet
+BACKLOG = Q(status='new', assigned_to__isnull=True)
+
+# Assigned complaints nobody has started on; rebalancing may move these
+NOT_STARTED = Q(status='assigned', in_progress_at__isnull=True)
+
+
+def current_values(complaint):
+    return {field: getattr(complaint, field) for field in VALUE_FIELDS}
+
+
+def load_contribution(values):
+    """(assignee_id, weight) a complaint adds to a workload, or None"""
+    if not values or not values.get('assigned_to_id') or values['status'] not in UNRESOLVED_STATUSES:
+        return None
+    return values['assigned_to_id'], PRIORITY_WEIGHTS.get(values['priority'], PRIORITY_WEIGHTS['medium'])
+
+
+def _apply(user_id, count, weight):
+    if not count and not weight:
+        return
+    changes = {
+        'open_count': F('open_count') + count,
+        'weighted_load': F('weighted_load') + weight,
+        'updated_at': timezone.now(),
+    }
+    if StaffWorkload.objects.filter(user_id=user_id).update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            StaffWorkload.objects.create(user_id=user_id, open_count=count, weighted_load=weight)
+    except IntegrityError:
+        # Created concurrently
+        StaffWorkload.objects.filter(user_id=user_id).update(**changes)
+
+
+def record_load_changes(changes):
+    """
+    Apply (old_values, new_values) moves of complaints between workloads,
+    merged into one UPDATE per affected assignee. Pass None as old_values
+    for a new complaint and as new_values for a deleted one.
+    """
+    deltas = {}
+    for old_values, new_values in changes:
+        for result, sign in ((load_contribution(old_values), -1), (load_contribution(new_values), 1)):
+            if result is None:
+                continue
+            user_id, weight = result
+            count_delta, weight_delta = deltas.get(user_id, (0, 0))
+            deltas[user_id] = (count_delta + sign, weight_delta + weight * sign)
+
+    with transaction.atomic():
+        for user_id, (count, weight) in deltas.items():
+            _apply(user_id, count, weight)
+
+
+def record_load_change(old_values, new_values):
+    if load_contribution(old_values) != load_contribution(new_values):
+        record_load_changes([(old_values, new_values)])
+
+
+def rebuild_workloads(complaint_model=Complaint, workload_model=StaffWorkload):
+    """
+    Recompute every StaffWorkload from the Complaint table.
+    Data migrations pass their historical models.
+    Returns the number of assignees with open complaints.
+    """
+    weight = Case(
+        *[When(priority=priority, then=Value(value)) for priority, value in PRIORITY_WEIGHTS.items()],
+        default=Value(PRIORITY_WEIGHTS['medium']),
+        output_field=IntegerField(),
+    )
+    rows = complaint_model.objects.filter(
+        assigned_to__isnull=False, status__in=UNRESOLVED_STATUSES
+    ).order_by().values('assigned_to_id').annotate(open_count=Count('id'), weighted_load=Sum(weight))
+
+    with transaction.atomic():
+        workload_model.objects.all().delete()
+        workload_model.objects.bulk_create([
+            workload_model(user_id=row['assigned_to_id'], open_count=row['open_count'],
+                           weighted_load=row['weighted_load'])
+            for row in rows
+        ])
+    return workload_model.objects.count()
+
+
+def eligible_staff(department_ids):
+    """Active staff members of the given departments"""
+    return CustomUser.objects.filter(department_id__in=department_ids, role__in=STAFF_ROLES, is_active=True)
+
+
+def current_loads(user_ids):
+    """{user_id: (weighted_load, open_count)} for the given users, one query"""
+    loads = {user_id: (0, 0) for user_id in user_ids}
+    for user_id, weighted_load, open_count in StaffWorkload.objects.filter(
+        user_id__in=loads
+    ).values_list('user_id', 'weighted_load', 'open_count'):
+        loads[user_id] = (weighted_load, open_count)
+    return loads
+
+
+def max_weighted_load():
+    """Load above which staff are not given more complaints (0: no limit)"""
+    return getattr(settings, 'AUTO_ASSIGN_MAX_WEIGHTED_LOAD', 0)
+
+
+def pick_assignee(department_id, exclude_ids=()):
+    """
+    The eligible staff member of a department with the lowest weighted
+    load (then fewest open complaints), or None if nobody is available.
+    """
+    staff = {user.pk: user for user in eligible_staff([department_id]).exclude(pk__in=exclude_ids)}
+    if not staff:
+        return None
+
+    loads = current_loads(staff)
+    user_id = min(staff, key=lambda pk: (loads[pk], pk))
+    limit = max_weighted_load()
+    if limit and loads[user_id][0] >= limit:
+        return None
+    return staff[user_id]
+
+
+def assign_complaint(complaint, assignee, actor=None, notes=None):
+    """Assign a complaint and log the event; workload counters follow via signals"""
+    old_assignee = complaint.assigned_to
+    complaint.assigned_to = assignee
+    complaint.status = 'assigned'
+
+    if not complaint.assigned_at:
+        complaint.assigned_at = timezone.now()
+
+    complaint.save()
+
+    ComplaintEvent.objects.create(
+        complaint=complaint,
+        event_type='assigned',
+        actor=actor,
+        old_value=old_assignee.username if old_assignee else 'None',
+        new_value=assignee.username,
+        notes=notes or f'Assigned to {assignee.get_full_name() or assignee.username}'
+    )
+    return complaint
+
+
+def auto_assign_complaint(complaint, actor=None):
+    """
+    Assign a complaint to the least loaded staff member of its department.
+    Returns: the assignee, or None if the complaint has no department or
+    nobody is available.
+    """
+    if not complaint.department_id:
+        return None
+
+    assignee = pick_assignee(complaint.department_id)
+    if assignee:
+        assign_complaint(
+            complaint, assignee, actor=actor,
+            notes=f'Auto-assigned to {assignee.get_full_name() or assignee.username} (least loaded)'
+        )
+    return assignee
+
+
+def _backlog(department_ids=None, include_assigned=False):
+    from .sla_service import _sla_deadline
+
+    pool = (BACKLOG | NOT_STARTED) if include_assigned else BACKLOG
+    queryset = Complaint.objects.filter(pool, department__isnull=False)
+    if department_ids:
+        queryset = queryset.filter(department_id__in=department_ids)
+    # Least SLA headroom first: the most urgent complaints get the least loaded staff
+    return queryset.annotate(response_deadline=_sla_deadline('sla_response_hours')).order_by(
+        F('response_deadline').asc(nulls_last=True), 'created_at', 'id'
+    )
+
+
+def plan_rebalance(department_ids=None, include_assigned=False, limit=None):
+    """
+    Decide assignees for the backlog without writing anything.
+
+    Returns: (plan, unassignable_ids) - plan is a list of
+    (complaint_id, old_assignee_id, new_assignee_id) for complaints whose
+    assignee changes.
+    """
+    backlog = _backlog(department_ids, include_assigned).values(
+        'id', 'department_id', 'priority', 'status', 'assigned_to_id'
+    )
+    rows = list(backlog[:limit] if limit else backlog)
+    if not rows:
+        return [], []
+
+    staff_by_department = {}
+    for user_id, department_id in eligible_staff({row['department_id'] for row in rows}).values_list(
+        'id', 'department_id'
+    ):
+        staff_by_department.setdefault(department_id, []).append(user_id)
+    loads = {
+        user_id: list(load)
+        for user_id, load in current_loads(
+            [user_id for members in staff_by_department.values() for user_id in members]
+        ).items()
+    }
+
+    # Complaints being redistributed no longer count towards their current assignee
+    for row in rows:
+        contribution = load_contribution(row)
+        if contribution and contribution[0] in loads:
+            loads[contribution[0]][0] -= contribution[1]
+            loads[contribution[0]][1] -= 1
+
+    heaps = {
+        department_id: [(loads[user_id][0], loads[user_id][1], user_id) for user_id in members]
+        for department_id, members in staff_by_department.items()
+    }
+    for heap in heaps.values():
+        heapq.heapify(heap)
+
+    limit_load = max_weighted_load()
+    plan = []
+    unassignable = []
+    for row in rows:
+        heap = heaps.get(row['department_id'])
+        if not heap or (limit_load and heap[0][0] >= limit_load):
+            unassignable.append(row['id'])
+            continue
+
+        weighted_load, open_count, user_id = heapq.heappop(heap)
+        weight = PRIORITY_WEIGHTS.get(row['priority'], PRIORITY_WEIGHTS['medium'])
+        heapq.heappush(heap, (weighted_load + weight, open_count + 1, user_id))
+        if row['assigned_to_id'] != user_id:
+            plan.append((row['id'], row['assigned_to_id'], user_id))
+
+    return plan, unassignable
+
+
+def _write_chunk(chunk, now, actor, include_assigned):
+    """Lock and reassign one chunk of planned complaints; returns the number written"""
+    planned = {complaint_id: new_assignee for complaint_id, _, new_assignee in chunk}
+    pool = (BACKLOG | NOT_STARTED) if include_assigned else BACKLOG
+
+    with transaction.atomic():
+        # Skip complaints locked or picked up by someone else since planning
+        complaints = list(
+            Complaint.objects.filter(pool, pk__in=planned).select_for_update(skip_locked=True)
+        )
+        if not complaints:
+            return 0
+
+        previous = {complaint.pk: complaint.assigned_to_id for complaint in complaints}
+        by_assignee = {}
+        rollup_changes = []
+        load_changes = []
+        for complaint in complaints:
+            by_assignee.setdefault(planned[complaint.pk], []).append(complaint.pk)
+            old_rollup, old_load = rollup.current_values(complaint), current_values(complaint)
+            complaint.assigned_to_id = planned[complaint.pk]
+            complaint.status = 'assigned'
+            rollup_changes.append((old_rollup, rollup.current_values(complaint)))
+            load_changes.append((old_load, current_values(complaint)))
+
+        for assignee_id, ids in by_assignee.items():
+            Complaint.objects.filter(pk__in=ids).update(
+                assigned_to_id=assignee_id,
+                status='assigned',
+                assigned_at=Coalesce('assigned_at', Value(now)),
+                updated_at=now,
+            )
+
+        usernames = dict(CustomUser.objects.filter(
+            pk__in={c.assigned_to_id for c in complaints} | set(previous.values())
+        ).values_list('id', 'username'))
+        ComplaintEvent.objects.bulk_create([
+            ComplaintEvent(
+                complaint=complaint,
+                event_type='assigned',
+                actor=actor,
+                old_value=usernames.get(previous[complaint.pk], 'None'),
+                new_value=usernames[complaint.assigned_to_id],
+                notes=f'Auto-assigned to {usernames[complaint.assigned_to_id]} (backlog rebalance)'
+            )
+            for complaint in complaints
+        ])
+        # update() skips the save signals that maintain the rollup and workloads
+        # and invalidate the dashboards
+        rollup.record_changes(rollup_changes)
+        record_load_changes(load_changes)
+        dashboard_cache.complaints_changed(
+            (dict(dashboard_cache.current_values(complaint), assigned_to_id=previous[complaint.pk]),
+             dashboard_cache.current_values(complaint))
+            for complaint in complaints
+        )
+
+    return len(complaints)
+
+
+def rebalance_backlog(department_ids=None, include_assigned=False, limit=None, dry_run=False,
+                      actor=None, chunk_size=REBALANCE_CHUNK_SIZE):
+    """
+    Assign queued complaints (status 'new', nobody assigned) to the least
+    loaded staff of their departments, most urgent SLA deadline first.
+    With include_assigned, assigned complaints nobody has started on are
+    redistributed as well, evening out the load between staff.
+
+    No notification emails are sent for bulk assignments.
+
+    Returns: dict with assigned, unassignable and per-assignee counts
+    """
+    plan, unassignable = plan_rebalance(department_ids, include_assigned, limit)
+
+    per_assignee = {}
+    for _, _, assignee_id in plan:
+        per_assignee[assignee_id] = per_assignee.get(assignee_id, 0) + 1
+
+    written = 0
+    if not dry_run:
+        now = timezone.now()
+        for start in range(0, len(plan), chunk_size):
+            written += _write_chunk(plan[start:start + chunk_size], now, actor, include_assigned)
+        logger.info(f"Backlog rebalance assigned {written} complaints ({len(unassignable)} unassignable)")
+
+    return {
+        'planned': len(plan),
+        'assigned': written,
+        'unassignable': len(unassignable),
+        'per_assignee': per_assignee,
+        'dry_run': dry_run,
+    }
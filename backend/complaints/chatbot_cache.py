@@ -0,0 +1,105 @@
+"""
+Response cache for the chatbot's AI answers
+
+Answers from the AI providers are cached in the 'chatbot' cache alias,
+keyed by the normalized message (its words with case, punctuation and
+plural/Amharic spelling variants normalized), the language
+and a version hash of the knowledge base, so editing UOG_KNOWLEDGE starts
+a fresh cache. Entries expire after the alias' TIMEOUT; the default
+LocMemCache evicts least recently used entries beyond MAX_ENTRIES.
+
+Only provider answers are cached: knowledge-base fallbacks are cheap, and
+caching them would keep serving them after a provider outage ends.
+
+Hit and miss counters live in the same cache. With the default
+LocMemCache both the answers and the counters are per worker process;
+configure a shared backend (CHATBOT_CACHE_BACKEND) to share them.
+"""
+from hashlib import md5
+from django.core.cache import caches
+from .knowledge_index import tokenize
+import logging
+
+logger = logging.getLogger(__name__)
+
+CACHE_ALIAS = 'chatbot'
+
+HITS_KEY = 'chatbot:stats:hits'
+MISSES_KEY = 'chatbot:stats:misses'
+
+# Response sources worth caching (each one is a provider call saved on a hit)
+CACHED_SOURCES = frozenset(['groq_ai', 'gemini_rest_api'])
+
+
+def get_cache():
+    return caches[CACHE_ALIAS]
+
+
+def knowledge_version(knowledge_base):
+    """Stable hash of the knowledge base content"""
+    return md5(repr(sorted(knowledge_base.items())).encode()).hexdigest()[:12]
+
+
+def normalize_message(message):
+    """
+    Case, punctuation, plural and Amharic spelling variants normalized away.
+    No words are dropped: 'where'/'who', 'how'/'why' or 'not' change the answer.
+    """
+    return ' '.join(tokenize(message, stop_words=()))
+
+
+def cache_key(message, language, version):
+    normalized = normalize_message(message)
+    return 'chatbot:response:' + md5(f'{version}|{language}|{normalized}'.encode()).hexdigest()
+
+
+def _count(key):
+    cache = get_cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Missing or evicted counter; add() loses no concurrent first count
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def get(message, language, version):
+    """Cached response dict, or None; counts a hit or a miss"""
+    try:
+        response = get_cache().get(cache_key(message, language, version))
+        _count(HITS_KEY if response is not None else MISSES_KEY)
+        return response
+    except Exception as e:
+        logger.warning(f"Chatbot cache unavailable: {e}")
+        return None
+
+
+def store(message, language, version, response):
+    """Cache a provider response; other sources are ignored"""
+    if response.get('source') not in CACHED_SOURCES:
+        return
+    try:
+        get_cache().set(cache_key(message, language, version), response)
+    except Exception as e:
+        logger.warning(f"Could not cache chatbot response: {e}")
+
+
+def contains(message, language, version):
+    try:
+        return get_cache().get(cache_key(message, language, version)) is not None
+    except Exception:
+        return False
+
+
+def stats():
+    """Hit/miss counters; every hit is a provider call saved"""
+    counts = get_cache().get_many([HITS_KEY, MISSES_KEY])
+    hits = counts.get(HITS_KEY, 0)
+    misses = counts.get(MISSES_KEY, 0)
+    lookups = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+        'provider_calls_saved': hits,
+    }
@@ -4,71 +4,95 @@ Powered by Google Gemini AI (FREE!) - Using REST API
 """
 import os
 import json
+import logging
 import re
-import requests
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 from django.conf import settings
 from decouple import config
+from .knowledge_index import KnowledgeIndex, TopicKeywordIndex
+from .llm_providers import GeminiClient, GroqClient, hedged_call
+from . import chatbot_cache
+
+logger = logging.getLogger(__name__)
+
+# Topics put in the prompt when no passage matches the question
+FALLBACK_TOPICS = ('about_uog', 'contacts')
 
 class ChatbotService:
     """The most powerful AI chatbot for university support - Powered by Google Gemini REST API"""
     
     def __init__(self):
-        # Try Groq first (faster and more generous limits!)
+        # Groq is asked first (faster and more generous limits!)
         self.groq_api_key = config('GROQ_API_KEY', default='')
         self.use_groq = bool(self.groq_api_key)
         
-        # Fallback to Gemini
+        # Gemini is the hedge when Groq is slow, failing or its circuit is open
         self.gemini_api_key = config('GEMINI_API_KEY', default='')
-        self.use_gemini = bool(self.gemini_api_key) and not self.use_groq
+        self.use_gemini = bool(self.gemini_api_key)
         
-        print(f"🔍 Groq API Key loaded: {'Yes' if self.groq_api_key else 'No'}")
-        print(f"🔍 Gemini API Key loaded: {'Yes' if self.gemini_api_key else 'No'}")
+        logger.info(f"Groq API key loaded: {'Yes' if self.groq_api_key else 'No'}")
+        logger.info(f"Gemini API key loaded: {'Yes' if self.gemini_api_key else 'No'}")
         
-        # Initialize Groq if available (PREFERRED - faster and better limits!)
-        if self.use_groq:
-            try:
-                # Using REST API - no package needed!
-                print("✅ Groq AI initialized successfully! (FAST & FREE - REST API)")
-            except Exception as e:
-                print(f"⚠️ Groq initialization failed: {e}")
-                self.use_groq = False
-                self.use_gemini = bool(self.gemini_api_key)
-        
-        # Initialize Gemini REST API if available (fallback)
-        if self.use_gemini and not self.use_groq:
-            try:
-                # Use the v1beta API with gemini-2.5-flash (free and fast model)
-                self.gemini_api_url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent?key={self.gemini_api_key}"
-                print("✅ Google Gemini AI initialized successfully (REST API)!")
-            except Exception as e:
-                print(f"⚠️ Gemini initialization failed: {e}")
-                self.use_gemini = False
+        # Provider clients: pooled connections, circuit breaker, adaptive timeout
+        self.groq_client = GroqClient(self.groq_api_key) if self.use_groq else None
+        self.gemini_client = GeminiClient(self.gemini_api_key) if self.use_gemini else None
         
         # Load comprehensive UoG knowledge base
         try:
             from .uog_knowledge_base import UOG_KNOWLEDGE
             base_knowledge = UOG_KNOWLEDGE.copy()
         except Exception as e:
-            print(f"Warning: Could not load UOG_KNOWLEDGE: {e}")
+            logger.warning(f"Could not load UOG_KNOWLEDGE: {e}")
             base_knowledge = {}
         
         # Use the comprehensive UoG knowledge base
         self.knowledge_base = base_knowledge
         
-        # Build context for Gemini from knowledge base
-        self.uog_context = self._build_uog_context()
-    
-    def _build_uog_context(self) -> str:
-        """Build comprehensive UoG context for Gemini"""
-        context_parts = []
+        # Retrieval index: only passages relevant to a message go into the AI prompt
+        self.knowledge_index = KnowledgeIndex(self.knowledge_base)
+        self.retrieval_top_k = config('CHATBOT_RETRIEVAL_TOP_K', default=5, cast=int)
         
-        for topic, data in self.knowledge_base.items():
-            response = data.get('response_en', '')
-            if response:
-                context_parts.append(f"Topic: {topic}\n{response}\n")
+        # Keyword -> topic index for the rule-based fallback
+        self.keyword_index = TopicKeywordIndex(self.knowledge_base)
+        
+        # Cached AI answers are tied to this version of the knowledge base
+        self.knowledge_version = chatbot_cache.knowledge_version(self.knowledge_base)
+    
+    def _build_uog_context(self, message: str) -> str:
+        """Build UoG context for the AI prompt from the passages most relevant to the message"""
+        passages = self.knowledge_index.search(message, self.retrieval_top_k)
+        if not passages:
+            passages = [p for p in self.knowledge_index.passages if p.topic in FALLBACK_TOPICS]
+            passages = passages[:self.retrieval_top_k]
         
-        return "\n".join(context_parts)
+        return "\n".join(f"Topic: {passage.topic}\n{passage.text}\n" for passage in passages)
+    
+    def _build_system_prompt(self, message: str, language: str) -> str:
+        """System prompt with the retrieved UoG context"""
+        system_prompt = f"""You are an intelligent AI assistant for University of Gondar (UoG) in Ethiopia.
+
+Your role is to help students, staff, and visitors with accurate information about the university.
+
+Here is the information about UoG most relevant to the question:
+
+{self._build_uog_context(message)}
+
+IMPORTANT INSTRUCTIONS:
+1. Answer questions accurately based on the information provided above
+2. Be conversational and natural (like ChatGPT)
+3. If asked about specific colleges, departments, or programs, provide detailed information
+4. Always include relevant contact information (phone numbers, emails, websites)
+5. If you don't know something, direct them to the appropriate office (usually Registrar)
+6. Be helpful, friendly, and professional
+7. Keep responses concise but informative
+8. Do NOT use markdown formatting like **bold** - use plain natural text
+9. Use bullet points with - instead of special characters"""
+
+        if language == 'am':
+            system_prompt += "\n10. Respond in Amharic language."
+        else:
+            system_prompt += "\n10. Respond in English language."
+        return system_prompt
     
     def get_response(self, message: str, language: str = 'en') -> Dict:
         """
@@ -87,226 +111,154 @@ class ChatbotService:
             if not message_lower:
                 return self._get_default_response(language)
             
-            # Use Groq AI if available (FASTEST & BEST!)
-            if self.use_groq:
-                try:
-                    return self._get_groq_response(message, language)
-                except Exception as e:
-                    print(f"Groq error: {e}")
-                    # Fall through to Gemini or keyword matching
+            # Same question answered by a provider before?
+            if self.use_groq or self.use_gemini:
+                cached = chatbot_cache.get(message, language, self.knowledge_version)
+                if cached is not None:
+                    return cached
             
-            # Use Gemini AI if available (fallback)
-            if self.use_gemini:
+            # Ask the AI providers (Groq first, Gemini hedged)
+            if self.use_groq or self.use_gemini:
                 try:
-                    return self._get_gemini_response(message, language)
+                    result = self._get_ai_response(message, language)
+                    chatbot_cache.store(message, language, self.knowledge_version, result)
+                    return result
                 except Exception as e:
-                    print(f"Gemini error: {e}")
+                    logger.warning(f"AI providers unavailable: {e}")
                     # Fall through to keyword matching
             
-            # Fallback: Check knowledge base (rule-based)
-            best_match = None
-            best_score = 0
-            
-            for topic, data in self.knowledge_base.items():
-                matches = sum(1 for keyword in data.get('keywords', []) if keyword in message_lower)
-                if matches > best_score:
-                    best_score = matches
-                    best_match = (topic, data)
-            
-            if best_match and best_score > 0:
-                topic, data = best_match
-                response_key = f'response_{language}'
-                return {
-                    'response': data.get(response_key, data.get('response_en', 'Information not available')),
-                    'source': 'knowledge_base',
-                    'topic': topic,
-                    'confidence': min(0.9, 0.5 + (best_score * 0.1))
-                }
-            
-            # Default helpful response
-            return self._get_default_response(language)
+            # Fallback: Check knowledge base (rule-based, TF-IDF ranked keyword index)
+            return self._get_knowledge_base_response(message, language)
             
         except Exception as e:
-            print(f"Chatbot error: {e}")
+            logger.error(f"Chatbot error: {e}")
             return self._get_error_response(language)
     
-    def _get_groq_response(self, message: str, language: str) -> Dict:
-        """Get intelligent response from Groq AI using REST API (FAST & FREE!)"""
+    def stream_response(self, message: str, language: str = 'en') -> Iterator[Tuple[str, Dict]]:
+        """
+        Chatbot response as (event, data) pairs for a server-sent event stream
+        
+        Provider answers arrive as 'token' events ({'text': ...}) while the
+        provider generates them. Cached, knowledge base and default answers
+        are a single 'message' event with the whole response dict; a
+        'message' after tokens (provider failed mid-answer) replaces them.
+        Always ends with 'done' ({'source', 'topic', 'confidence'}).
+        """
         try:
-            # Build prompt with UoG context
-            system_prompt = f"""You are an intelligent AI assistant for University of Gondar (UoG) in Ethiopia.
-
-Your role is to help students, staff, and visitors with accurate information about the university.
-
-Here is comprehensive information about UoG:
-
-{self.uog_context}
-
-IMPORTANT INSTRUCTIONS:
-1. Answer questions accurately based on the information provided above
-2. Be conversational and natural (like ChatGPT)
-3. If asked about specific colleges, departments, or programs, provide detailed information
-4. Always include relevant contact information (phone numbers, emails, websites)
-5. If you don't know something, direct them to the appropriate office (usually Registrar)
-6. Be helpful, friendly, and professional
-7. Keep responses concise but informative
-8. Do NOT use markdown formatting like **bold** - use plain natural text
-9. Use bullet points with - instead of special characters"""
-
-            if language == 'am':
-                system_prompt += "\n10. Respond in Amharic language."
-            else:
-                system_prompt += "\n10. Respond in English language."
-            
-            # Call Groq REST API
-            url = "https://api.groq.com/openai/v1/chat/completions"
-            
-            # Debug: Check API key
-            print(f"🔑 Using Groq API key: {self.groq_api_key[:20]}...")
-            
-            headers = {
-                "Authorization": f"Bearer {self.groq_api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            payload = {
-                "model": "llama-3.3-70b-versatile",
-                "messages": [
-                    {
-                        "role": "system",
-                        "content": system_prompt
-                    },
-                    {
-                        "role": "user",
-                        "content": message
-                    }
-                ],
-                "temperature": 0.7,
-                "max_tokens": 1024
-            }
-            
-            response = requests.post(url, json=payload, headers=headers, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            response_text = data['choices'][0]['message']['content']
+            result = None
+            if message.strip() and (self.use_groq or self.use_gemini):
+                result = chatbot_cache.get(message, language, self.knowledge_version)
+                if result is not None:
+                    yield 'message', result
+                else:
+                    result = yield from self._stream_ai_response(message, language)
             
-            print(f"✅ Groq AI responded successfully!")
+            if result is None:
+                result = self._get_knowledge_base_response(message, language)
+                yield 'message', result
+        except Exception as e:
+            logger.error(f"Chatbot error: {e}")
+            result = self._get_error_response(language)
+            yield 'message', result
+        
+        yield 'done', {key: result[key] for key in ('source', 'topic', 'confidence')}
+    
+    def _stream_ai_response(self, message: str, language: str):
+        """
+        Stream from the first provider that starts answering, Groq preferred.
+        Yields 'token' events; returns the response dict, or None when no
+        provider finished an answer.
+        """
+        system_prompt = self._build_system_prompt(message, language)
+        providers = [
+            ('groq_ai', self.groq_client if self.use_groq else None),
+            ('gemini_rest_api', self.gemini_client if self.use_gemini else None),
+        ]
+        for source, client in providers:
+            if client is None:
+                continue
+            chunks = []
+            try:
+                for text in client.stream(system_prompt, message):
+                    chunks.append(text)
+                    yield 'token', {'text': text}
+            except Exception as e:
+                logger.warning(f"{client.name} stream failed: {e}")
+                if chunks:
+                    # Part of this answer is shown already; don't splice another provider's onto it
+                    return None
+                continue
             
-            return {
-                'response': response_text,
-                'source': 'groq_ai',
+            logger.debug(f"{client.name} streamed a response")
+            result = {
+                'response': ''.join(chunks),
+                'source': source,
                 'topic': 'ai_generated',
                 'confidence': 0.95
             }
-            
-        except Exception as e:
-            print(f"Groq API error: {e}")
-            raise e
+            chatbot_cache.store(message, language, self.knowledge_version, result)
+            return result
+        return None
     
-    def _get_gemini_response(self, message: str, language: str) -> Dict:
-        """Get intelligent response from Google Gemini AI using REST API with retry logic"""
-        import time
+    def _get_knowledge_base_response(self, message: str, language: str) -> Dict:
+        """Rule-based answer: best TF-IDF ranked keyword topic, else the default response"""
+        best_match = self.keyword_index.best(message)
         
-        max_retries = 3
-        base_delay = 2  # seconds
+        if best_match:
+            data = self.knowledge_base[best_match.topic]
+            response_key = f'response_{language}'
+            return {
+                'response': data.get(response_key, data.get('response_en', 'Information not available')),
+                'source': 'knowledge_base',
+                'topic': best_match.topic,
+                'confidence': min(0.9, 0.5 + (best_match.keywords * 0.1))
+            }
         
-        for attempt in range(max_retries):
-            try:
-                # Build prompt with UoG context
-                system_prompt = f"""You are an intelligent AI assistant for University of Gondar (UoG) in Ethiopia.
-
-Your role is to help students, staff, and visitors with accurate information about the university.
-
-Here is comprehensive information about UoG:
-
-{self.uog_context}
-
-IMPORTANT INSTRUCTIONS:
-1. Answer questions accurately based on the information provided above
-2. Be conversational and natural (like ChatGPT)
-3. If asked about specific colleges, departments, or programs, provide detailed information
-4. Always include relevant contact information (phone numbers, emails, websites)
-5. If you don't know something, direct them to the appropriate office (usually Registrar)
-6. Be helpful, friendly, and professional
-7. Keep responses concise but informative
-8. Do NOT use markdown formatting like **bold** - use plain natural text
-9. Use bullet points with - instead of special characters"""
-
-                if language == 'am':
-                    system_prompt += "\n10. Respond in Amharic language."
-                else:
-                    system_prompt += "\n10. Respond in English language."
-                
-                # Create the full prompt
-                full_prompt = f"{system_prompt}\n\nUser Question: {message}\n\nYour Response:"
-                
-                # Create the request payload for Gemini REST API
-                payload = {
-                    "contents": [{
-                        "parts": [{
-                            "text": full_prompt
-                        }]
-                    }],
-                    "generationConfig": {
-                        "temperature": 0.7,
-                        "maxOutputTokens": 1024,
-                    }
-                }
-                
-                headers = {
-                    'Content-Type': 'application/json'
-                }
-                
-                # Make the API request
-                response = requests.post(
-                    self.gemini_api_url,
-                    json=payload,
-                    headers=headers,
-                    timeout=30
-                )
-                
-                # Check for rate limiting
-                if response.status_code == 429:
-                    if attempt < max_retries - 1:
-                        delay = base_delay * (2 ** attempt)  # Exponential backoff
-                        print(f"⏳ Rate limited. Retrying in {delay} seconds... (attempt {attempt + 1}/{max_retries})")
-                        time.sleep(delay)
-                        continue
-                    else:
-                        print(f"❌ Rate limit exceeded after {max_retries} attempts. Using knowledge base.")
-                        raise Exception("Rate limit exceeded")
-                
-                response.raise_for_status()
-                
-                # Parse the response
-                data = response.json()
-                
-                # Extract the response text
-                if 'candidates' in data and len(data['candidates']) > 0:
-                    candidate = data['candidates'][0]
-                    if 'content' in candidate and 'parts' in candidate['content']:
-                        response_text = candidate['content']['parts'][0]['text']
-                        print(f"✅ Gemini AI responded successfully!")
-                        return {
-                            'response': response_text,
-                            'source': 'gemini_rest_api',
-                            'topic': 'ai_generated',
-                            'confidence': 0.95
-                        }
-                
-                raise Exception("No valid response from Gemini API")
-                
-            except requests.exceptions.HTTPError as e:
-                if e.response.status_code == 429 and attempt < max_retries - 1:
-                    continue
-                print(f"Gemini REST API error: {e}")
-                raise e
-            except Exception as e:
-                print(f"Gemini REST API error: {e}")
-                raise e
+        # Default helpful response
+        return self._get_default_response(language)
+    
+    def _get_ai_response(self, message: str, language: str) -> Dict:
+        """First good answer from the enabled providers, Groq preferred"""
+        calls = []
+        if self.use_groq:
+            calls.append(lambda: self._get_groq_response(message, language))
+        if self.use_gemini:
+            calls.append(lambda: self._get_gemini_response(message, language))
+        return hedged_call(calls)
+    
+    def _get_groq_response(self, message: str, language: str) -> Dict:
+        """Get intelligent response from Groq AI using REST API (FAST & FREE!)"""
+        # Build prompt with the relevant UoG context
+        system_prompt = self._build_system_prompt(message, language)
+        response_text = self.groq_client.complete(system_prompt, message)
+        
+        logger.debug("Groq AI responded")
+        
+        return {
+            'response': response_text,
+            'source': 'groq_ai',
+            'topic': 'ai_generated',
+            'confidence': 0.95
+        }
+    
+    def _get_gemini_response(self, message: str, language: str) -> Dict:
+        """Get intelligent response from Google Gemini AI using REST API"""
+        # Build prompt with the relevant UoG context
+        system_prompt = self._build_system_prompt(message, language)
+        response_text = self.gemini_client.complete(system_prompt, message)
         
-        raise Exception("Failed after all retries")
+        logger.debug("Gemini AI responded")
+        
+        return {
+            'response': response_text,
+            'source': 'gemini_rest_api',
+            'topic': 'ai_generated',
+            'confidence': 0.95
+        }
+    
+    def provider_health(self) -> List[Dict]:
+        """Circuit breaker and timeout state of each configured provider"""
+        return [client.health() for client in (self.groq_client, self.gemini_client) if client]
     
     def _get_default_response(self, language: str) -> Dict:
         """Get default helpful response"""
@@ -371,6 +323,20 @@ Or ask in your own words - I'm here to help!""",
     
 
     
+    def warm_cache(self) -> int:
+        """Answer the suggested questions ahead of users; returns the number newly cached"""
+        if not (self.use_groq or self.use_gemini):
+            return 0
+        
+        warmed = 0
+        for language in ('en', 'am'):
+            for question in self.get_suggested_questions(language):
+                if chatbot_cache.contains(question, language, self.knowledge_version):
+                    continue
+                if self.get_response(question, language).get('source') in chatbot_cache.CACHED_SOURCES:
+                    warmed += 1
+        return warmed
+    
     def get_suggested_questions(self, language: str = 'en') -> List[str]:
         """Get suggested questions for users"""
         if language == 'am':
@@ -1,11 +1,15 @@
 """
 API views for chatbot functionality
 """
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny
+import json
+from django.http import StreamingHttpResponse
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.renderers import BaseRenderer, JSONRenderer
 from rest_framework.response import Response
 from rest_framework import status
 from .chatbot_service import chatbot_service
+from . import chatbot_cache
 
 
 @api_view(['POST'])
@@ -52,6 +56,62 @@ def chat_message(request):
         )
 
 
+def format_event(event, data):
+    """One server-sent event frame"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode('utf-8')
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Lets EventSource clients (Accept: text/event-stream) through content
+    negotiation; error responses reach them as an 'error' event
+    """
+    media_type = 'text/event-stream'
+    format = 'sse'
+    charset = 'utf-8'
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return format_event('error', data)
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([AllowAny])
+@renderer_classes([JSONRenderer, EventStreamRenderer])
+def chat_stream(request):
+    """
+    Stream a chat response as server-sent events
+    
+    POST /api/complaints/chatbot/stream/  (body as for chatbot/message/)
+    GET  /api/complaints/chatbot/stream/?message=...&language=en  (for EventSource)
+    
+    Events:
+        token    {"text": "..."}         provider text, as it is generated
+        message  {"response", "source", "topic", "confidence"}
+                                         a whole answer (cached, knowledge base);
+                                         replaces any tokens sent before it
+        done     {"source", "topic", "confidence"}
+    """
+    params = request.data if request.method == 'POST' else request.query_params
+    message = params.get('message', '').strip()
+    language = params.get('language', 'en')
+    
+    if not message:
+        return Response(
+            {'error': 'Message is required'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    if language not in ['en', 'am']:
+        language = 'en'
+    
+    events = (format_event(event, data) for event, data in chatbot_service.stream_response(message, language))
+    response = StreamingHttpResponse(events, content_type='text/event-stream; charset=utf-8')
+    response['Cache-Control'] = 'no-cache'
+    # Keep reverse proxies (nginx) from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def suggested_questions(request):
@@ -78,3 +138,47 @@ def suggested_questions(request):
             {'error': f'Error getting suggestions: {str(e)}'},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def provider_health(request):
+    """
+    AI provider circuit breaker state
+    
+    GET /api/complaints/chatbot/health/
+    'degraded' means every provider's circuit is open and answers come
+    from the knowledge base.
+    """
+    providers = chatbot_service.provider_health()
+    if not providers:
+        overall = 'knowledge_base_only'
+    elif all(provider['state'] == 'open' for provider in providers):
+        overall = 'degraded'
+    else:
+        overall = 'ok'
+    
+    return Response({
+        'status': overall,
+        'providers': providers,
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def cache_stats(request):
+    """
+    Chatbot response cache hit/miss counters (admins only)
+    
+    GET /api/complaints/chatbot/cache-stats/
+    """
+    if request.user.role not in ['admin', 'super_admin']:
+        return Response(
+            {'error': 'Permission denied'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    
+    return Response({
+        **chatbot_cache.stats(),
+        'knowledge_version': chatbot_service.knowledge_version,
+    })
@@ -0,0 +1,191 @@
+"""
+Response cache for the role dashboards
+
+Each dashboard response is cached in the Django cache under a key built
+from the view, action, role, query parameters, local date and the
+current *generation* of every scope the response reads, e.g.
+`submitter:12` for a student's dashboard or `college:3` for a dean's.
+
+Writes never delete entries. A complaint write instead replaces the
+generation of exactly the scopes it touches: the whole system (`all`),
+its campus, department, the department's college, its assignee and its
+submitter, before and after the change. The next request for an affected
+dashboard builds a different key and misses; entries under old
+generations are simply never read again and expire after
+DASHBOARD_CACHE_TIMEOUT seconds.
+
+Changes to reference data shown on dashboards (names of campuses,
+colleges, departments and categories, staff membership, roles) bump the
+`reference` generation, which every dashboard depends on.
+
+Generations are bumped right away and again once the transaction
+commits: a request that read the first bump while the write was still
+uncommitted may have cached the old data under it.
+
+Complaint updates that bypass the save signals (QuerySet.update) must
+call complaints_changed() themselves.
+
+Generations only reach other worker processes through a shared cache
+backend, so caching is off by default (DASHBOARD_CACHE_TIMEOUT=0) unless
+CACHE_BACKEND is shared.
+"""
+from functools import wraps
+from hashlib import md5
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.response import Response
+from accounts.models import Department
+from .index_cache import ProcessIndex
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+ALL = 'all'
+REFERENCE = 'reference'
+
+GENERATION_KEY = 'dashboard:generation:{}'
+
+# Nested lists are not tracked by the generations (comment, file and
+# event writes don't bump them), so responses including them aren't cached
+UNCACHED_EXPANSIONS = frozenset(['comments', 'events', 'files'])
+
+DEFAULT_TIMEOUT = 0
+
+# Complaint fields that decide which scopes a complaint is visible in
+VALUE_FIELDS = ['campus_id', 'department_id', 'assigned_to_id', 'submitter_id']
+
+# User fields shown on, or deciding membership in, dashboards
+USER_FIELDS = ['username', 'first_name', 'last_name', 'role', 'department_id', 'campus_id', 'is_active']
+
+
+def build_department_colleges():
+    return dict(Department.objects.values_list('id', 'college_id'))
+
+
+# Only picks which college dashboards a complaint change invalidates; who may
+# see what is decided by scoping.py from the database
+department_colleges = ProcessIndex(
+    'dashboard:department_college_version', build_department_colleges, 'SCOPE_INDEX_CHECK_INTERVAL'
+)
+
+
+def college_id_for(department_id):
+    if not department_id:
+        return None
+    return department_colleges.get().get(department_id)
+
+
+def scope(kind, value):
+    """Scope token for one campus/department/college/assignee/submitter, or None"""
+    return f'{kind}:{value}' if value else None
+
+
+def current_values(complaint):
+    """The scope-deciding fields of an in-memory complaint"""
+    return {field: getattr(complaint, field) for field in VALUE_FIELDS}
+
+
+def complaint_scopes(values):
+    """
+    Scopes a complaint with these field values is visible in.
+    `values` holds campus_id, department_id, assigned_to_id and submitter_id.
+    """
+    department_id = values.get('department_id')
+    tokens = {
+        ALL,
+        scope('campus', values.get('campus_id')),
+        scope('department', department_id),
+        scope('college', college_id_for(department_id)),
+        scope('assignee', values.get('assigned_to_id')),
+        scope('submitter', values.get('submitter_id')),
+    }
+    tokens.discard(None)
+    return tokens
+
+
+def _publish(tokens):
+    try:
+        cache.set_many({GENERATION_KEY.format(token): uuid.uuid4().hex for token in tokens}, None)
+    except Exception as e:
+        logger.warning(f"Could not bump dashboard generations: {e}")
+
+
+def bump(tokens):
+    """New generations for these scopes, now and once the transaction commits"""
+    tokens = set(tokens)
+    if not tokens:
+        return
+    _publish(tokens)
+    transaction.on_commit(lambda: _publish(tokens))
+
+
+def complaints_changed(changes):
+    """
+    Invalidate dashboards for complaint changes.
+    `changes` is an iterable of (old_values, new_values) dicts, either may be None.
+    """
+    tokens = set()
+    for old, new in changes:
+        for values in (old, new):
+            if values:
+                tokens |= complaint_scopes(values)
+    bump(tokens)
+
+
+def reference_changed():
+    bump([REFERENCE])
+
+
+def generations(tokens):
+    """Current generation of each scope, starting new ones where missing"""
+    keys = [GENERATION_KEY.format(token) for token in tokens]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            # A lost generation must not come back as one used before
+            cache.add(key, uuid.uuid4().hex, None)
+            found[key] = cache.get(key)
+    return [found[key] for key in keys]
+
+
+def cache_key(view, request, tokens):
+    params = sorted((name, request.query_params.getlist(name)) for name in request.query_params)
+    parts = [
+        type(view).__name__, view.action, getattr(request.user, 'role', ''),
+        str(timezone.localdate()), repr(params),
+    ] + [f'{token}={generation}' for token, generation in zip(tokens, generations(tokens))]
+    return 'dashboard:response:' + md5('|'.join(parts).encode()).hexdigest()
+
+
+def cached_dashboard(action_method):
+    """
+    Cache a dashboard action's successful responses; the view's
+    cache_scopes() names the scopes the response reads
+    """
+    @wraps(action_method)
+    def wrapper(view, request, *args, **kwargs):
+        timeout = getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', DEFAULT_TIMEOUT)
+        expand = set(request.query_params.get('expand', '').split(','))
+        if not timeout or expand & UNCACHED_EXPANSIONS:
+            return action_method(view, request, *args, **kwargs)
+
+        try:
+            key = cache_key(view, request, [REFERENCE] + sorted(token for token in view.cache_scopes() if token))
+            data = cache.get(key)
+        except Exception as e:
+            logger.warning(f"Dashboard cache unavailable: {e}")
+            return action_method(view, request, *args, **kwargs)
+        if data is not None:
+            return Response(data)
+
+        response = action_method(view, request, *args, **kwargs)
+        if response.status_code == 200:
+            try:
+                cache.set(key, response.data, timeout)
+            except Exception as e:
+                logger.warning(f"Could not cache dashboard response: {e}")
+        return response
+    return wrapper
@@ -0,0 +1,154 @@
+"""
+Aggregation layer for role dashboards
+
+Every dashboard statistic is computed with conditional aggregation
+(`Count(..., filter=Q(...))`) so a dashboard costs a fixed number of
+queries: one for the headline numbers of a complaint queryset and one per
+breakdown (campus, department, assignee, category), regardless of how many
+campuses, departments, staff members or complaints exist.
+"""
+from django.db.models import Q, Count, Avg, F, DurationField, ExpressionWrapper
+from django.db.models.functions import Coalesce
+
+from .models import Complaint, Category
+from accounts.models import Campus, Department, CustomUser
+
+OPEN_STATUSES = ['new', 'assigned', 'in_progress']
+UNRESOLVED_STATUSES = ['new', 'assigned', 'in_progress', 'pending']
+FINISHED_STATUSES = ['resolved', 'closed']
+
+SLA_BREACHED = Q(sla_response_breached=True) | Q(sla_resolution_breached=True)
+
+
+def _prefixed(q, prefix):
+    """Rewrite a Complaint-level Q so it can filter across a reverse relation"""
+    rewritten = Q()
+    rewritten.connector = q.connector
+    rewritten.negated = q.negated
+    for child in q.children:
+        if isinstance(child, Q):
+            rewritten.children.append(_prefixed(child, prefix))
+        else:
+            lookup, value = child
+            rewritten.children.append((f'{prefix}__{lookup}', value))
+    return rewritten
+
+
+def _hours(duration):
+    if duration is None:
+        return None
+    return duration.total_seconds() / 3600
+
+
+def summarize(queryset):
+    """
+    Headline numbers for a complaint queryset in a single aggregate query.
+
+    Returns a dict with total, per-status counts, open/unresolved counts,
+    priority counts, SLA breaches, pending approvals, rating average/count
+    and average response/resolution times in hours.
+    """
+    response_time = ExpressionWrapper(F('first_response_at') - F('created_at'), output_field=DurationField())
+    resolution_time = ExpressionWrapper(
+        Coalesce('resolved_at', 'closed_at') - F('created_at'), output_field=DurationField()
+    )
+
+    aggregates = {
+        'total': Count('id'),
+        'open': Count('id', filter=Q(status__in=OPEN_STATUSES)),
+        'unresolved': Count('id', filter=Q(status__in=UNRESOLVED_STATUSES)),
+        'critical': Count('id', filter=Q(priority='critical')),
+        'high': Count('id', filter=Q(priority='high')),
+        'sla_breaches': Count('id', filter=SLA_BREACHED),
+        'pending_approvals': Count('id', filter=Q(requires_approval=True, approved_by__isnull=True)),
+        'avg_rating': Avg('feedback_rating'),
+        'total_ratings': Count('feedback_rating'),
+        'avg_response_time': Avg(response_time),
+        'avg_resolution_time': Avg(resolution_time, filter=Q(status__in=FINISHED_STATUSES)),
+    }
+    for status, _ in Complaint.STATUS_CHOICES:
+        aggregates[f'status_{status}'] = Count('id', filter=Q(status=status))
+
+    summary = queryset.aggregate(**aggregates)
+    summary['avg_response_time_hours'] = _hours(summary.pop('avg_response_time'))
+    summary['avg_resolution_time_hours'] = _hours(summary.pop('avg_resolution_time'))
+    return summary
+
+
+def campus_breakdown(complaint_filter=Q()):
+    """Total/open complaints for every campus (including empty ones), one query"""
+    scope = _prefixed(complaint_filter, 'complaint')
+    campuses = Campus.objects.annotate(
+        total=Count('complaint', filter=scope),
+        open=Count('complaint', filter=scope & Q(complaint__status__in=OPEN_STATUSES)),
+    ).order_by('id')
+    return [
+        {'campus': campus.name, 'total': campus.total, 'open': campus.open}
+        for campus in campuses
+    ]
+
+
+def department_breakdown(departments, complaint_filter=Q()):
+    """Total/open/resolved complaints per department, one query"""
+    scope = _prefixed(complaint_filter, 'complaint')
+    departments = departments.annotate(
+        total=Count('complaint', filter=scope),
+        open=Count('complaint', filter=scope & Q(complaint__status__in=OPEN_STATUSES)),
+        resolved=Count('complaint', filter=scope & Q(complaint__status='resolved')),
+    ).order_by('id')
+    return [
+        {'department': dept.name, 'total': dept.total, 'open': dept.open, 'resolved': dept.resolved}
+        for dept in departments
+    ]
+
+
+def staff_workload(staff_members, complaint_filter=Q()):
+    """Total/open assigned complaints per staff member, one query"""
+    scope = _prefixed(complaint_filter, 'assigned_complaints')
+    staff_members = staff_members.annotate(
+        total_assigned=Count('assigned_complaints', filter=scope),
+        open_assigned=Count(
+            'assigned_complaints',
+            filter=scope & Q(assigned_complaints__status__in=['assigned', 'in_progress'])
+        ),
+    ).order_by('id')
+    return [
+        {
+            'staff_name': staff.get_full_name() or staff.username,
+            'total_assigned': staff.total_assigned,
+            'open_assigned': staff.open_assigned,
+        }
+        for staff in staff_members
+    ]
+
+
+def category_breakdown(queryset, limit=10):
+    """Most frequent categories of a complaint queryset, one GROUP BY query"""
+    return list(
+        queryset.values('category__name').annotate(count=Count('id')).order_by('-count')[:limit]
+    )
+
+
+def proctor_categories():
+    """First security and first exam category (by id), fetched in one query"""
+    security = exam = None
+    for category in Category.objects.filter(
+        Q(name__icontains='security') | Q(name__icontains='exam')
+    ).order_by('id'):
+        name = category.name.lower()
+        if security is None and 'security' in name:
+            security = category
+        if exam is None and 'exam' in name:
+            exam = category
+    return security, exam
+
+
+def department_staff(department):
+    return CustomUser.objects.filter(
+        department=department,
+        role__in=['academic', 'non_academic', 'maintenance']
+    )
+
+
+def college_departments(college):
+    return Department.objects.filter(college=college)
@@ -0,0 +1,254 @@
+"""
+Indexed near-duplicate detection for complaints
+
+Each complaint's normalized title + description is broken into character
+shingles and summarized by a fixed-size MinHash signature (ComplaintSignature).
+The signature is split into bands, and every band is hashed into an LSH bucket
+(ComplaintLSHBucket). Two complaints that share any bucket are candidates;
+candidates are then ranked by estimated Jaccard similarity of their shingles.
+
+Looking up near-duplicates therefore costs one indexed bucket query plus work
+proportional to the number of candidates, instead of comparing the new text
+against every existing complaint.
+"""
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from datetime import timedelta
+import hashlib
+import random
+import re
+import zlib
+import logging
+
+from .models import Complaint, ComplaintSignature, ComplaintLSHBucket
+
+logger = logging.getLogger(__name__)
+
+SHINGLE_SIZE = 5
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+
+# Estimated Jaccard similarity above which a complaint is flagged as a duplicate
+DUPLICATE_THRESHOLD = 0.8
+
+# Only open complaints from this window are considered duplicate targets
+DUPLICATE_WINDOW_DAYS = 30
+
+OPEN_STATUSES = ['new', 'assigned', 'in_progress', 'pending']
+
+# Complaint fields the signature is computed from
+TRACKED_FIELDS = frozenset(['title', 'description'])
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Fixed seed so signatures stay comparable across processes and deploys
+_rng = random.Random(20240601)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERM)
+]
+
+
+def normalize_text(text):
+    """Lowercase, drop punctuation and collapse whitespace (keeps Ethiopic script)"""
+    if not text:
+        return ""
+    text = text.lower()
+    text = re.sub(r'[^\w\s]', ' ', text)
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip()
+
+
+def shingle_hashes(text):
+    """Return the set of 32-bit hashes of the text's character shingles"""
+    text = normalize_text(text)
+    if not text:
+        return set()
+    if len(text) <= SHINGLE_SIZE:
+        return {zlib.crc32(text.encode('utf-8'))}
+    return {
+        zlib.crc32(text[i:i + SHINGLE_SIZE].encode('utf-8'))
+        for i in range(len(text) - SHINGLE_SIZE + 1)
+    }
+
+
+def compute_minhash(hashes):
+    """Compute the MinHash signature of a set of shingle hashes"""
+    if not hashes:
+        return [_MAX_HASH] * NUM_PERM
+    return [
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+        for a, b in _PERMUTATIONS
+    ]
+
+
+def band_buckets(signature):
+    """Hash each band of the signature into a signed 63-bit bucket id"""
+    buckets = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS:(band + 1) * ROWS]
+        digest = hashlib.blake2b(
+            ','.join(map(str, rows)).encode('ascii'), digest_size=8
+        ).digest()
+        buckets.append(int.from_bytes(digest, 'big') >> 1)
+    return buckets
+
+
+def estimate_similarity(sig_a, sig_b):
+    """Estimate Jaccard similarity from two MinHash signatures"""
+    if not sig_a or not sig_b:
+        return 0.0
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+def jaccard_similarity(text_a, text_b):
+    """Exact Jaccard similarity of two texts' shingle sets"""
+    a = shingle_hashes(text_a)
+    b = shingle_hashes(text_b)
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def complaint_text(title, description):
+    return f"{title or ''} {description or ''}"
+
+
+def index_complaint(complaint):
+    """
+    Store (or refresh) the MinHash signature and LSH buckets for a complaint.
+    Returns the signature.
+    """
+    hashes = shingle_hashes(complaint_text(complaint.title, complaint.description))
+    signature = compute_minhash(hashes)
+
+    with transaction.atomic():
+        ComplaintSignature.objects.update_or_create(
+            complaint=complaint,
+            defaults={'minhash': signature, 'shingle_count': len(hashes)},
+        )
+        ComplaintLSHBucket.objects.filter(complaint=complaint).delete()
+        ComplaintLSHBucket.objects.bulk_create([
+            ComplaintLSHBucket(complaint=complaint, band=band, bucket=bucket)
+            for band, bucket in enumerate(band_buckets(signature))
+        ])
+
+    return signature
+
+
+def find_similar(title, description, queryset=None, exclude_id=None, threshold=0.5, limit=5, signature=None):
+    """
+    Find indexed complaints similar to the given text.
+
+    Args:
+        title, description: Text to look up
+        queryset: Optional Complaint queryset restricting the search scope
+        exclude_id: Complaint id to leave out (e.g. the complaint itself)
+        threshold: Minimum estimated Jaccard similarity to report
+        limit: Maximum number of results
+        signature: Precomputed MinHash signature for the text
+
+    Returns:
+        List of (complaint, similarity) tuples, most similar first
+    """
+    if signature is None:
+        signature = compute_minhash(shingle_hashes(complaint_text(title, description)))
+
+    bucket_filter = Q()
+    for band, bucket in enumerate(band_buckets(signature)):
+        bucket_filter |= Q(band=band, bucket=bucket)
+
+    candidates = ComplaintLSHBucket.objects.filter(bucket_filter)
+    if queryset is not None:
+        candidates = candidates.filter(complaint__in=queryset.values('pk'))
+    if exclude_id is not None:
+        candidates = candidates.exclude(complaint_id=exclude_id)
+
+    candidate_ids = list(candidates.values_list('complaint_id', flat=True).distinct())
+    if not candidate_ids:
+        return []
+
+    scored = []
+    for complaint_id, minhash in ComplaintSignature.objects.filter(
+        complaint_id__in=candidate_ids
+    ).values_list('complaint_id', 'minhash'):
+        similarity = estimate_similarity(signature, minhash)
+        if similarity >= threshold:
+            scored.append((complaint_id, similarity))
+
+    scored.sort(key=lambda item: (-item[1], item[0]))
+    scored = scored[:limit]
+
+    complaints = Complaint.objects.in_bulk([complaint_id for complaint_id, _ in scored])
+    return [(complaints[complaint_id], similarity) for complaint_id, similarity in scored if complaint_id in complaints]
+
+
+def duplicate_scope(complaint=None):
+    """Open complaints from the duplicate window, on the complaint's campus when known"""
+    since = timezone.now() - timedelta(days=DUPLICATE_WINDOW_DAYS)
+    queryset = Complaint.objects.filter(status__in=OPEN_STATUSES, created_at__gte=since)
+    if complaint is not None:
+        if complaint.campus_id:
+            queryset = queryset.filter(campus_id=complaint.campus_id)
+        if complaint.created_at:
+            # A complaint can only duplicate something reported before it
+            queryset = queryset.filter(created_at__lte=complaint.created_at)
+    return queryset
+
+
+def mark_duplicate(complaint, threshold=DUPLICATE_THRESHOLD):
+    """
+    Index the complaint and flag it as a duplicate of the most similar
+    earlier open complaint, if any exceeds the threshold.
+    Returns the original complaint or None.
+    """
+    signature = index_complaint(complaint)
+    matches = find_similar(
+        complaint.title, complaint.description,
+        queryset=duplicate_scope(complaint),
+        exclude_id=complaint.pk,
+        threshold=threshold,
+        limit=1,
+        signature=signature,
+    )
+
+    original = matches[0][0] if matches else None
+    # Point at the root report so clusters don't form chains
+    if original is not None and original.duplicate_of_id:
+        original = original.duplicate_of
+
+    is_duplicate = original is not None
+    if complaint.is_duplicate != is_duplicate or complaint.duplicate_of_id != (original.pk if original else None):
+        complaint.is_duplicate = is_duplicate
+        complaint.duplicate_of = original
+        complaint.save(update_fields=['is_duplicate', 'duplicate_of', 'updated_at'])
+        if is_duplicate:
+            logger.info(f"Complaint {complaint.tracking_id} flagged as duplicate of {original.tracking_id}")
+
+    return original
+
+
+def rank_candidates(text, candidates, threshold=0.0):
+    """
+    Rank in-memory candidate dicts (with 'title' and 'description') by
+    exact shingle Jaccard similarity to text. Linear in total text length.
+    Returns: list of (candidate, similarity), most similar first
+    """
+    target = shingle_hashes(text)
+    if not target:
+        return []
+
+    ranked = []
+    for candidate in candidates:
+        other = shingle_hashes(complaint_text(candidate.get('title', ''), candidate.get('description', '')))
+        if not other:
+            continue
+        similarity = len(target & other) / len(target | other)
+        if similarity >= threshold:
+            ranked.append((candidate, similarity))
+
+    ranked.sort(key=lambda item: -item[1])
+    return ranked
@@ -0,0 +1,303 @@
+"""
+Compiled email template registry
+
+Every outgoing email is rendered from a template type: the active
+EmailTemplate row of that type if an administrator created one, else the
+built-in default below. Templates use Django template syntax and are
+compiled once per process; compiled templates are cached keyed by
+(template_type, updated_at), so editing a template recompiles only that
+one. The set of active rows is a ProcessIndex, invalidated by the
+EmailTemplate save/delete signals.
+
+The subject and plain-text body are rendered without HTML escaping, the
+HTML body with it.
+"""
+from django.template import Context, Template
+from .index_cache import ProcessIndex
+from .models import EmailTemplate
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+VERSION_CACHE_KEY = 'complaints:email_template_version'
+
+COMPLAINT_FOOTER = '''
+Best regards,
+UoG Complaint Management Team
+            '''
+
+# Defaults used when no active EmailTemplate row of the type exists
+BUILTIN_TEMPLATES = {
+    'welcome': {
+        'subject': 'Welcome to UoG Complaint Management System',
+        'html': '''
+                <html>
+                <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+                    <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+                        <h2 style="color: #003366;">Welcome to UoG Complaint Management System</h2>
+                        <p>Dear {{user_name}},</p>
+                        <p>Your account has been successfully created!</p>
+                        <p><strong>Username:</strong> {{username}}</p>
+                        <p>You can now login and submit complaints or track existing ones.</p>
+                        <p><a href="{{frontend_url}}" style="background-color: #003366; color: white; padding: 10px 20px; text-decoration: none; border-radius: 5px; display: inline-block;">Login Now</a></p>
+                        <p>Thank you,<br>University of Gondar<br>Complaint Management Team</p>
+                    </div>
+                </body>
+                </html>
+            ''',
+        'text': '''
+                Welcome to UoG Complaint Management System
+
+                Dear {{user_name}},
+
+                Your account has been successfully created!
+
+                Username: {{username}}
+
+                You can now login and submit complaints or track existing ones.
+
+                Login at: {{frontend_url}}
+
+                Thank you,
+                University of Gondar
+                Complaint Management Team
+            ''',
+    },
+    'password_reset': {
+        'subject': 'Password Reset Request - UoG Complaint System',
+        'html': '''
+                <html>
+                <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+                    <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+                        <h2 style="color: #003366;">Password Reset Request</h2>
+                        <p>Dear {{user_name}},</p>
+                        <p>We received a request to reset your password. Click the button below to reset it:</p>
+                        <p><a href="{{reset_url}}" style="background-color: #003366; color: white; padding: 10px 20px; text-decoration: none; border-radius: 5px; display: inline-block;">Reset Password</a></p>
+                        <p>Or copy and paste this link into your browser:</p>
+                        <p style="word-break: break-all; color: #666;">{{reset_url}}</p>
+                        <p><strong>This link will expire in {{expires_in}}.</strong></p>
+                        <p>If you didn't request this, please ignore this email.</p>
+                        <p>Thank you,<br>University of Gondar<br>Complaint Management Team</p>
+                    </div>
+                </body>
+                </html>
+            ''',
+        'text': '''
+                Password Reset Request - UoG Complaint System
+
+                Dear {{user_name}},
+
+                We received a request to reset your password.
+
+                Click this link to reset your password:
+                {{reset_url}}
+
+                This link will expire in {{expires_in}}.
+
+                If you didn't request this, please ignore this email.
+
+                Thank you,
+                University of Gondar
+                Complaint Management Team
+            ''',
+    },
+    'complaint_reviewed': {
+        'subject': 'Your Complaint Has Been Reviewed - {{tracking_id}}',
+        'text': '''
+Dear {{recipient_name}},
+
+Your complaint has been reviewed by our team.
+
+Complaint Details:
+- Tracking ID: {{tracking_id}}
+- Title: {{title}}
+- Status: {{status}}
+- Priority: {{priority}}
+
+{{additional_message}}
+
+You can track your complaint status at any time using your tracking ID.
+''' + COMPLAINT_FOOTER,
+    },
+    'complaint_assigned': {
+        'subject': 'Your Complaint Has Been Assigned - {{tracking_id}}',
+        'text': '''
+Dear {{recipient_name}},
+
+Your complaint has been assigned to a staff member for resolution.
+
+Complaint Details:
+- Tracking ID: {{tracking_id}}
+- Title: {{title}}
+- Assigned to: {{assigned_to}}
+- Status: Assigned
+
+We will keep you updated on the progress.
+''' + COMPLAINT_FOOTER,
+    },
+    'complaint_in_progress': {
+        'subject': 'Your Complaint is Being Processed - {{tracking_id}}',
+        'text': '''
+Dear {{recipient_name}},
+
+Your complaint is now being actively worked on.
+
+Complaint Details:
+- Tracking ID: {{tracking_id}}
+- Title: {{title}}
+- Status: In Progress
+- Assigned to: {{assigned_to}}
+
+We are working to resolve your issue as quickly as possible.
+''' + COMPLAINT_FOOTER,
+    },
+    'complaint_resolved': {
+        'subject': 'Your Complaint Has Been Resolved - {{tracking_id}}',
+        'text': '''
+Dear {{recipient_name}},
+
+Great news! Your complaint has been resolved.
+
+Complaint Details:
+- Tracking ID: {{tracking_id}}
+- Title: {{title}}
+- Status: Resolved
+- Resolution Notes: {{resolution_notes}}
+
+If you are satisfied with the resolution, no further action is needed.
+If you have any concerns, please contact us.
+''' + COMPLAINT_FOOTER,
+    },
+    'complaint_rejected': {
+        'subject': 'Complaint Status Update - {{tracking_id}}',
+        'text': '''
+Dear {{recipient_name}},
+
+We have reviewed your complaint and unfortunately cannot proceed with it at this time.
+
+Complaint Details:
+- Tracking ID: {{tracking_id}}
+- Title: {{title}}
+- Status: Rejected
+- Reason: {{rejection_reason}}
+
+If you have questions about this decision, please contact our support team.
+''' + COMPLAINT_FOOTER,
+    },
+    'complaint_closed': {
+        'subject': 'Your Complaint Has Been Closed - {{tracking_id}}',
+        'text': '''
+Dear {{recipient_name}},
+
+Your complaint has been closed.
+
+Complaint Details:
+- Tracking ID: {{tracking_id}}
+- Title: {{title}}
+- Status: Closed
+- Final Resolution: {{resolution_notes}}
+
+Thank you for using the UoG Complaint Management System.
+''' + COMPLAINT_FOOTER,
+    },
+    'sla_breach': {
+        'subject': 'SLA Breach Alert - {{tracking_id}}',
+        'text': '''
+Dear {{recipient_name}},
+
+We wanted to inform you that your complaint has exceeded the expected response/resolution time.
+
+Complaint Details:
+- Tracking ID: {{tracking_id}}
+- Title: {{title}}
+- Breach Type: {{breach_type}}
+- Expected Response Time: {{sla_response_hours}} hours
+- Expected Resolution Time: {{sla_resolution_hours}} hours
+
+We apologize for the delay and are working to resolve this issue as quickly as possible.
+''' + COMPLAINT_FOOTER,
+    },
+}
+
+
+class CompiledEmailTemplate:
+    """Subject, plain-text and optional HTML templates compiled once"""
+
+    def __init__(self, template_type, subject, text, html=''):
+        self.template_type = template_type
+        self.subject = Template(subject)
+        self.text = Template(text)
+        self.html = Template(html) if html else None
+
+    def render(self, context):
+        """
+        Render one email.
+        Returns: (subject, text_body, html_body); html_body is '' without an HTML template
+        """
+        plain = Context(context, autoescape=False)
+        subject = ' '.join(self.subject.render(plain).split())
+        text = self.text.render(plain)
+        html = self.html.render(Context(context)) if self.html else ''
+        return subject, text, html
+
+    def render_many(self, contexts):
+        """Render one email per context. Returns: list of (subject, text_body, html_body)"""
+        return [self.render(context) for context in contexts]
+
+
+# (template_type, updated_at) -> CompiledEmailTemplate; updated_at is None for built-ins
+_compiled = {}
+_compiled_lock = threading.Lock()
+
+
+def _compile(key, subject, text, html):
+    compiled = _compiled.get(key)
+    if compiled is None:
+        compiled = CompiledEmailTemplate(key[0], subject, text, html)
+        with _compiled_lock:
+            _compiled[key] = compiled
+    return compiled
+
+
+def build_active_templates():
+    """template_type -> compiled active EmailTemplate (the latest edited wins)"""
+    active = {}
+    rows = list(EmailTemplate.objects.filter(is_active=True).order_by('updated_at', 'id'))
+    for row in rows:
+        active[row.template_type] = _compile(
+            (row.template_type, row.updated_at), row.subject, row.text_content, row.html_content
+        )
+
+    # Drop compiled versions of edited or removed templates
+    live = {(row.template_type, row.updated_at) for row in rows}
+    with _compiled_lock:
+        for key in [key for key in _compiled if key[1] is not None and key not in live]:
+            del _compiled[key]
+    return active
+
+
+active_templates = ProcessIndex(VERSION_CACHE_KEY, build_active_templates, 'EMAIL_TEMPLATE_CHECK_INTERVAL')
+
+
+def get_template(template_type):
+    """
+    Compiled template for a type: the active EmailTemplate, else the built-in default.
+    Raises KeyError for a type with neither.
+    """
+    compiled = active_templates.get().get(template_type)
+    if compiled is not None:
+        return compiled
+
+    builtin = BUILTIN_TEMPLATES[template_type]
+    return _compile((template_type, None), builtin['subject'], builtin['text'], builtin.get('html', ''))
+
+
+def render(template_type, context):
+    """Returns: (subject, text_body, html_body)"""
+    return get_template(template_type).render(context)
+
+
+def render_batch(template_type, contexts):
+    """Render one email per context against a single compiled template"""
+    return get_template(template_type).render_many(contexts)
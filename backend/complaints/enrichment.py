@@ -0,0 +1,229 @@
+"""
+Background AI enrichment pipeline for newly submitted complaints.
+
+Complaint creation only persists the complaint and queues an EnrichmentJob.
+Language detection, urgency/sentiment analysis, summary generation, SLA
+assignment and duplicate flagging run later, either in the `run_enrichment_worker` management command
+(the default 'queue' executor) or in-process right after the request's
+transaction commits (the 'inline' executor, used by tests and local setups
+without a worker).
+"""
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from datetime import timedelta
+import logging
+
+from .models import Complaint, EnrichmentJob
+
+logger = logging.getLogger(__name__)
+
+# Seconds before a 'running' job is considered abandoned by a crashed worker
+DEFAULT_LOCK_TIMEOUT = 300
+
+# Base delay (seconds) for exponential retry backoff
+RETRY_BASE_DELAY = 30
+
+
+def get_executor():
+    """Return the configured executor name: 'queue' or 'inline'"""
+    executor = getattr(settings, 'COMPLAINT_ENRICHMENT_EXECUTOR', 'queue')
+    return executor if executor in ('queue', 'inline') else 'queue'
+
+
+def enqueue_enrichment(complaint):
+    """
+    Queue AI enrichment for a complaint and mark it as pending.
+    With the inline executor the job is run as soon as the current
+    transaction commits.
+    """
+    if complaint.enrichment_status != 'pending':
+        complaint.enrichment_status = 'pending'
+        complaint.save(update_fields=['enrichment_status'])
+
+    job = EnrichmentJob.objects.create(complaint=complaint)
+
+    if get_executor() == 'inline':
+        transaction.on_commit(lambda: run_job(job.pk))
+
+    return job
+
+
+def enrich_complaint(complaint):
+    """
+    Run every AI enrichment step for a complaint and save the results.
+    Individual steps degrade to the same defaults the synchronous
+    create path used, so a single failing analyzer never blocks the rest.
+    """
+    from .ai_service import analyze_urgency, analyze_sentiment, generate_summary, detect_language
+    from .sla_service import apply_sla_to_complaint
+    from .duplicate_engine import mark_duplicate
+
+    description = complaint.description
+
+    # Detect language
+    try:
+        detected_lang, lang_confidence = detect_language(description)
+        language = detected_lang if lang_confidence > 0.7 else 'en'
+    except Exception as e:
+        logger.warning(f"Language detection failed: {e}")
+        language = 'en'
+
+    # AI urgency analysis with confidence
+    try:
+        urgency_score, urgency_confidence, urgency_reason = analyze_urgency(description, language)
+    except Exception as e:
+        logger.error(f"Urgency analysis failed: {e}")
+        urgency_score = 'medium'
+        urgency_confidence = 0.5
+        urgency_reason = 'Default priority'
+
+    # Sentiment analysis
+    try:
+        sentiment_score, sentiment_label, sentiment_conf = analyze_sentiment(description)
+    except Exception as e:
+        logger.warning(f"Sentiment analysis failed: {e}")
+        sentiment_score = 0.0
+        sentiment_label = 'neutral'
+
+    # Generate summary
+    try:
+        ai_summary = generate_summary(description)
+    except Exception as e:
+        logger.warning(f"Summary generation failed: {e}")
+        ai_summary = description[:150]
+
+    complaint.language = language
+    complaint.urgency = urgency_score
+    complaint.priority = urgency_score
+    complaint.ai_urgency_confidence = urgency_confidence
+    complaint.ai_urgency_reason = urgency_reason
+    complaint.sentiment_score = sentiment_score
+    complaint.sentiment_label = sentiment_label
+    complaint.ai_summary = ai_summary
+    complaint.save(update_fields=[
+        'language', 'urgency', 'priority', 'ai_urgency_confidence', 'ai_urgency_reason',
+        'sentiment_score', 'sentiment_label', 'ai_summary', 'updated_at',
+    ])
+
+    # Apply SLA once the final priority is known (don't fail if this fails)
+    try:
+        apply_sla_to_complaint(complaint)
+    except Exception as e:
+        logger.warning(f"SLA application failed: {e}")
+    
+    # Flag near-duplicates of earlier open complaints (don't fail if this fails)
+    try:
+        mark_duplicate(complaint)
+    except Exception as e:
+        logger.warning(f"Duplicate detection failed: {e}")
+
+    logger.info(f"Complaint {complaint.tracking_id} enriched - Urgency: {urgency_score}, Language: {language}")
+    return complaint
+
+
+def _claim(job_id):
+    """
+    Atomically move a job from pending to running and count the attempt.
+    Returns True only for the single caller that won the claim, so several
+    workers can poll the same table without double-processing.
+    The attempt is counted up front so a job that kills or hangs its worker
+    still runs out of attempts (see release_stale_jobs).
+    """
+    now = timezone.now()
+    claimed = EnrichmentJob.objects.filter(
+        pk=job_id, status='pending', run_after__lte=now
+    ).update(status='running', locked_at=now, attempts=F('attempts') + 1)
+    return claimed == 1
+
+
+def run_job(job_id):
+    """
+    Claim and execute a single enrichment job.
+    Returns True on success, False on failure and None if the job was not
+    due or was already claimed by another worker.
+    """
+    if not _claim(job_id):
+        return None
+
+    job = EnrichmentJob.objects.select_related('complaint').get(pk=job_id)
+    complaint = job.complaint
+
+    Complaint.objects.filter(pk=complaint.pk).update(enrichment_status='processing')
+
+    try:
+        enrich_complaint(complaint)
+    except Exception as e:
+        logger.error(f"Enrichment job {job.pk} for {complaint.tracking_id} failed: {e}")
+        job.last_error = str(e)
+        job.locked_at = None
+        if job.attempts >= job.max_attempts:
+            job.status = 'failed'
+            job.finished_at = timezone.now()
+            Complaint.objects.filter(pk=complaint.pk).update(enrichment_status='failed')
+        else:
+            job.status = 'pending'
+            job.run_after = timezone.now() + timedelta(seconds=RETRY_BASE_DELAY * (2 ** (job.attempts - 1)))
+            Complaint.objects.filter(pk=complaint.pk).update(enrichment_status='pending')
+        job.save(update_fields=['status', 'last_error', 'locked_at', 'run_after', 'finished_at'])
+        return False
+
+    job.status = 'done'
+    job.finished_at = timezone.now()
+    job.locked_at = None
+    job.save(update_fields=['status', 'locked_at', 'finished_at'])
+    Complaint.objects.filter(pk=complaint.pk).update(
+        enrichment_status='completed', enriched_at=job.finished_at
+    )
+    return True
+
+
+def release_stale_jobs(lock_timeout=None):
+    """
+    Return jobs abandoned by a crashed worker to the queue.
+    Jobs that have used up their attempts are marked failed instead, so a
+    complaint that crashes the worker every time is not retried forever.
+    Returns the number of jobs released.
+    """
+    if lock_timeout is None:
+        lock_timeout = getattr(settings, 'COMPLAINT_ENRICHMENT_LOCK_TIMEOUT', DEFAULT_LOCK_TIMEOUT)
+    now = timezone.now()
+    stale = EnrichmentJob.objects.filter(status='running', locked_at__lt=now - timedelta(seconds=lock_timeout))
+
+    exhausted = stale.filter(attempts__gte=F('max_attempts'))
+    complaint_ids = list(exhausted.values_list('complaint_id', flat=True))
+    if complaint_ids:
+        exhausted.update(
+            status='failed', locked_at=None, finished_at=now,
+            last_error='Worker stopped before the job finished',
+        )
+        Complaint.objects.filter(pk__in=complaint_ids).update(enrichment_status='failed')
+        logger.error(f"Enrichment jobs for complaints {complaint_ids} abandoned after their last attempt")
+
+    return stale.update(status='pending', locked_at=None)
+
+
+def process_pending_jobs(batch_size=20):
+    """
+    Drain up to `batch_size` due jobs from the queue.
+    Returns: (succeeded_count, failed_count)
+    """
+    release_stale_jobs()
+
+    job_ids = list(
+        EnrichmentJob.objects.filter(status='pending', run_after__lte=timezone.now())
+        .order_by('run_after', 'id')
+        .values_list('id', flat=True)[:batch_size]
+    )
+
+    succeeded = 0
+    failed = 0
+    for job_id in job_ids:
+        result = run_job(job_id)
+        if result is True:
+            succeeded += 1
+        elif result is False:
+            failed += 1
+
+    return succeeded, failed
@@ -0,0 +1,114 @@
+"""
+Per-process caches of small, rarely changing tables
+
+A ProcessIndex builds an in-memory structure from the database once and
+keeps it until it is invalidated. Invalidating drops the local copy and
+writes a new version stamp to the shared Django cache; other worker
+processes compare their stamp with it at most every `check_interval`
+seconds and rebuild when it differs.
+
+The stamp only reaches other processes through a shared cache backend
+(CACHE_BACKEND=...RedisCache). With the per-process default (LocMemCache),
+or while the shared cache holds no stamp, a copy is rebuilt once it is
+PROCESS_INDEX_MAX_AGE seconds old, so edits made in another gunicorn or
+queue worker process still apply within that time.
+"""
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+import logging
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECK_INTERVAL = 5
+
+# Seconds a copy is kept when no shared version stamp can tell it is stale
+DEFAULT_MAX_AGE = 60
+
+
+def shared_cache_configured():
+    """True when the default cache is shared between processes"""
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
+
+
+class ProcessIndex:
+    """
+    Args:
+        version_key: Cache key of the shared version stamp
+        build: Callable returning the structure to cache
+        interval_setting: Name of the setting holding the check interval (seconds)
+    """
+
+    def __init__(self, version_key, build, interval_setting):
+        self.version_key = version_key
+        self._build = build
+        self._interval_setting = interval_setting
+        self._lock = threading.Lock()
+        self._value = None
+        self._loaded = False
+        self._version = None
+        self._checked_at = 0.0
+        self._loaded_at = 0.0
+
+    def _check_interval(self):
+        return getattr(settings, self._interval_setting, DEFAULT_CHECK_INTERVAL)
+
+    def _max_age(self):
+        return getattr(settings, 'PROCESS_INDEX_MAX_AGE', DEFAULT_MAX_AGE)
+
+    def _expired(self, version, now):
+        """Without a stamp other processes can update, the copy only lives for max age"""
+        if version is not None and shared_cache_configured():
+            return False
+        return now - self._loaded_at >= self._max_age()
+
+    def _shared_version(self):
+        try:
+            return cache.get(self.version_key)
+        except Exception as e:
+            logger.warning(f"Could not read {self.version_key}: {e}")
+            return self._version
+
+    def _load(self):
+        # Read the stamp before the rows: a change in between only causes
+        # one more rebuild later, never a stale structure under a new stamp
+        version = self._shared_version()
+        value = self._build()
+        self._value = value
+        self._version = version
+        self._loaded = True
+        self._checked_at = self._loaded_at = time.monotonic()
+        return value
+
+    def get(self):
+        """The cached structure, rebuilt if it was invalidated here or elsewhere"""
+        now = time.monotonic()
+        if self._loaded and now - self._checked_at < self._check_interval():
+            return self._value
+
+        with self._lock:
+            if not self._loaded:
+                return self._load()
+            version = self._shared_version()
+            if version != self._version or self._expired(version, now):
+                return self._load()
+            self._checked_at = now
+            return self._value
+
+    def clear(self):
+        """Drop this process's copy; the next get() rebuilds it"""
+        with self._lock:
+            self._loaded = False
+            self._value = None
+
+    def invalidate(self):
+        """Drop the copy here and tell other workers to rebuild theirs"""
+        self.clear()
+        try:
+            cache.set(self.version_key, uuid.uuid4().hex, None)
+        except Exception as e:
+            logger.warning(f"Could not publish {self.version_key}: {e}")
@@ -0,0 +1,128 @@
+"""
+Precompiled multi-pattern keyword matcher
+
+Finds every occurrence of every keyword from several tiers (e.g. the
+CRITICAL/HIGH/MEDIUM/LOW urgency lists) in a single pass over the text,
+instead of one `keyword in text` scan per keyword.
+
+All keywords are compiled once into a single regex whose alternation is
+factored as a trie (shared prefixes are matched once, longest match wins),
+so the regex engine can skip straight to candidate first characters. Each
+search resumes one character after the previous match start, which reports
+the longest keyword at every position where one starts. Shorter keywords
+that are prefixes of that match (e.g. 'broken' inside 'broken glass') are
+expanded from a table precomputed at build time, giving the same
+all-occurrences result as an Aho-Corasick automaton while the scanning
+itself stays in C.
+"""
+import re
+from collections import namedtuple
+
+KeywordMatch = namedtuple('KeywordMatch', ['term', 'tier', 'start', 'end'])
+
+
+def _trie_pattern(keywords):
+    """
+    Build a regex source matching any of `keywords`, factored as a trie.
+    Optional suffixes are greedy, so the longest keyword at a position wins.
+    """
+    root = {}
+    for keyword in keywords:
+        node = root
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def emit(node):
+        is_end = '' in node
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char != '']
+        if not branches:
+            return ''
+        if len(branches) == 1 and not is_end:
+            return branches[0]
+        group = '(?:' + '|'.join(branches) + ')'
+        return group + '?' if is_end else group
+
+    return emit(root)
+
+
+class KeywordMatcher:
+    """Match several tiers of keywords against text in one pass"""
+
+    def __init__(self, tiers):
+        """
+        Args:
+            tiers: Ordered mapping of tier name -> list of keywords.
+                   Keywords are matched case-insensitively as substrings.
+        """
+        self.tier_names = list(tiers.keys())
+
+        # keyword -> tiers it belongs to, and its position in each tier list
+        self._keyword_tiers = {}
+        self._keyword_rank = {}
+        for tier, keywords in tiers.items():
+            for rank, keyword in enumerate(keywords):
+                keyword = keyword.lower()
+                if not keyword:
+                    continue
+                self._keyword_tiers.setdefault(keyword, [])
+                if tier not in self._keyword_tiers[keyword]:
+                    self._keyword_tiers[keyword].append(tier)
+                self._keyword_rank.setdefault((tier, keyword), rank)
+
+        keywords = sorted(self._keyword_tiers, key=lambda k: (-len(k), k))
+
+        # For each keyword, every other keyword that is a prefix of it
+        self._prefixes = {
+            keyword: [other for other in keywords if other != keyword and keyword.startswith(other)]
+            for keyword in keywords
+        }
+
+        self._pattern = re.compile(_trie_pattern(keywords)) if keywords else None
+
+    def find_all(self, text):
+        """
+        Return every keyword occurrence in text as KeywordMatch tuples,
+        ordered by start position (longer terms first at the same position).
+        A keyword listed in several tiers yields one match per tier.
+        """
+        if not text or self._pattern is None:
+            return []
+
+        text_lower = text.lower()
+        search = self._pattern.search
+        matches = []
+        pos = 0
+        while True:
+            m = search(text_lower, pos)
+            if m is None:
+                break
+            start = m.start()
+            term = m.group()
+            pos = start + 1
+            for found in [term] + self._prefixes[term]:
+                end = start + len(found)
+                for tier in self._keyword_tiers[found]:
+                    matches.append(KeywordMatch(found, tier, start, end))
+        return matches
+
+    def match_tiers(self, text):
+        """
+        Group matches by tier.
+        Returns: dict of tier -> list of KeywordMatch, with each tier's
+        distinct terms ordered as in the original keyword list.
+        """
+        grouped = {tier: [] for tier in self.tier_names}
+        for match in self.find_all(text):
+            grouped[match.tier].append(match)
+        for tier, tier_matches in grouped.items():
+            tier_matches.sort(key=lambda m: (self._keyword_rank[(tier, m.term)], m.start))
+        return grouped
+
+    def distinct_terms(self, tier_matches):
+        """Return the distinct terms of a tier's matches, preserving order"""
+        seen = []
+        for match in tier_matches:
+            if match.term not in seen:
+                seen.append(match.term)
+        return seen
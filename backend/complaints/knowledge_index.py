@@ -0,0 +1,202 @@
+"""
+BM25 retrieval over the UoG chatbot knowledge base
+
+Each topic's English answer is split into passages (runs of paragraphs of
+at least MIN_PASSAGE_CHARS). Passages are indexed with their topic's
+keywords in an inverted index of term -> [(passage, term frequency)], and
+a query is scored with Okapi BM25 by walking only the postings of its
+terms. The chatbot puts the best few passages into the AI prompt instead
+of the whole knowledge base.
+
+TopicKeywordIndex serves the rule-based fallback used when no AI provider
+answers: it maps each topic's `keywords` (single words and phrases) to
+topics and ranks topics by the TF-IDF weight of the keywords found.
+
+Both indexes share one tokenizer: lowercase word tokens, simple English
+plural folding, and folding of Ethiopic letters that sound alike and are
+used interchangeably in Amharic spelling (ሐ/ኀ -> ሀ, ሠ -> ሰ, ዐ -> አ, ፀ -> ጸ).
+
+The chatbot builds its indexes once at startup from UOG_KNOWLEDGE; they
+need neither the network nor the database.
+"""
+from collections import Counter, defaultdict, namedtuple
+import math
+import re
+
+Passage = namedtuple('Passage', ['topic', 'text'])
+ScoredPassage = namedtuple('ScoredPassage', ['topic', 'text', 'score'])
+
+# Paragraphs shorter than this are merged with the following ones
+MIN_PASSAGE_CHARS = 200
+
+# Okapi BM25 parameters
+K1 = 1.5
+B = 0.75
+
+STOP_WORDS = frozenset("""
+a an and are as at be by can do does for from get has have how i in is it its me my of on or
+our please tell that the their there this to us was what when where which who why will with
+you your about
+""".split())
+
+TOKEN_RE = re.compile(r'\w+')
+
+# Each Ethiopic syllable series has seven vowel orders at consecutive code points
+ETHIOPIC_FOLDING = {
+    variant + order: base + order
+    for variant, base in ((0x1210, 0x1200), (0x1280, 0x1200), (0x1220, 0x1230), (0x12D0, 0x12A0), (0x1340, 0x1338))
+    for order in range(7)
+}
+
+
+def _normalize(token):
+    """Fold simple English plurals so 'hours' finds 'hour'"""
+    if len(token) > 4 and token.endswith('ies'):
+        return token[:-3] + 'y'
+    if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+        return token[:-1]
+    return token
+
+
+def tokenize(text, stop_words=STOP_WORDS):
+    """Normalized lowercase word tokens, without `stop_words`"""
+    tokens = TOKEN_RE.findall(text.lower().translate(ETHIOPIC_FOLDING))
+    return [_normalize(token) for token in tokens if token not in stop_words]
+
+
+def split_passages(text, min_chars=MIN_PASSAGE_CHARS):
+    """Split an answer on blank lines, merging short paragraphs (e.g. headings) forward"""
+    passages = []
+    current = []
+    for paragraph in re.split(r'\n\s*\n', text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        current.append(paragraph)
+        if sum(len(part) for part in current) >= min_chars:
+            passages.append('\n\n'.join(current))
+            current = []
+    if current:
+        if passages:
+            passages[-1] += '\n\n' + '\n\n'.join(current)
+        else:
+            passages.append('\n\n'.join(current))
+    return passages
+
+
+class KnowledgeIndex:
+    """Inverted index with BM25 scoring over knowledge base passages"""
+
+    def __init__(self, knowledge):
+        """
+        Args:
+            knowledge: Mapping of topic -> {'keywords': [...], 'response_en': str, ...}
+        """
+        self.passages = []
+        self.postings = defaultdict(list)
+        lengths = []
+
+        for topic, data in knowledge.items():
+            topic_terms = tokenize(' '.join([topic.replace('_', ' ')] + list(data.get('keywords', []))))
+            for text in split_passages(data.get('response_en', '')):
+                terms = tokenize(text) + topic_terms
+                passage_id = len(self.passages)
+                self.passages.append(Passage(topic, text))
+                lengths.append(len(terms))
+                for term, frequency in Counter(terms).items():
+                    self.postings[term].append((passage_id, frequency))
+
+        self.lengths = lengths
+        self.average_length = (sum(lengths) / len(lengths)) if lengths else 0.0
+        count = len(self.passages)
+        self.idf = {
+            term: math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self.postings.items()
+        }
+
+    def search(self, query, k=5):
+        """
+        Best `k` passages for a query, highest score first.
+        Returns: list of ScoredPassage (empty when no query term is indexed)
+        """
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for passage_id, frequency in self.postings[term]:
+                norm = K1 * (1 - B + B * self.lengths[passage_id] / self.average_length)
+                scores[passage_id] += idf * frequency * (K1 + 1) / (frequency + norm)
+
+        best = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+        return [ScoredPassage(*self.passages[passage_id], score) for passage_id, score in best]
+
+
+TopicMatch = namedtuple('TopicMatch', ['topic', 'score', 'keywords'])
+
+
+class TopicKeywordIndex:
+    """Inverted index of knowledge base keywords (words and phrases) -> topics"""
+
+    def __init__(self, knowledge):
+        """
+        Args:
+            knowledge: Mapping of topic -> {'keywords': [...], ...}
+        """
+        self.topic_order = {topic: position for position, topic in enumerate(knowledge)}
+
+        # Keyword token tuple -> topics listing it; stop words are kept so
+        # phrases like 'how much' and short keywords like 'it' still match
+        keyword_topics = defaultdict(set)
+        for topic, data in knowledge.items():
+            for keyword in data.get('keywords', []):
+                tokens = tuple(tokenize(keyword, stop_words=()))
+                if tokens:
+                    keyword_topics[tokens].add(topic)
+
+        count = len(knowledge)
+        self.idf = {
+            keyword: math.log(1 + count / len(topics)) for keyword, topics in keyword_topics.items()
+        }
+        self.keyword_topics = dict(keyword_topics)
+
+        # First token -> keywords starting with it, longest first
+        self.by_first_token = defaultdict(list)
+        for keyword in sorted(keyword_topics, key=len, reverse=True):
+            self.by_first_token[keyword[0]].append(keyword)
+
+    def match(self, message):
+        """
+        Topics whose keywords occur in the message, best first. Where
+        keywords overlap the longest one counts ('study room', not 'room').
+        Each distinct keyword adds (1 + log tf) * idf to its topics' scores.
+        Returns: list of TopicMatch(topic, score, number of distinct keywords)
+        """
+        tokens = tokenize(message, stop_words=())
+        frequencies = Counter()
+        position = 0
+        while position < len(tokens):
+            step = 1
+            # Longest keyword starting here wins; its tokens don't match again
+            for keyword in self.by_first_token.get(tokens[position], ()):
+                if tuple(tokens[position:position + len(keyword)]) == keyword:
+                    frequencies[keyword] += 1
+                    step = len(keyword)
+                    break
+            position += step
+
+        scores = defaultdict(float)
+        matched = Counter()
+        for keyword, frequency in frequencies.items():
+            weight = (1 + math.log(frequency)) * self.idf[keyword]
+            for topic in self.keyword_topics[keyword]:
+                scores[topic] += weight
+                matched[topic] += 1
+
+        ranked = sorted(scores, key=lambda topic: (-scores[topic], self.topic_order[topic]))
+        return [TopicMatch(topic, scores[topic], matched[topic]) for topic in ranked]
+
+    def best(self, message):
+        """Best matching topic, or None"""
+        matches = self.match(message)
+        return matches[0] if matches else None
@@ -0,0 +1,332 @@
+"""
+HTTP clients for the chatbot's AI providers (Groq, Gemini)
+
+Each provider client keeps:
+- a pooled requests.Session, so calls reuse keep-alive connections
+  instead of opening a new TLS connection per chat message;
+- a circuit breaker: after LLM_BREAKER_FAILURE_THRESHOLD consecutive
+  failures the provider is skipped without a network call for
+  LLM_BREAKER_RESET_TIMEOUT seconds, then one trial call decides whether
+  it closes again;
+- an adaptive read timeout derived from the observed latency (smoothed
+  latency + 4 x its mean deviation, as TCP does for retransmissions),
+  kept between LLM_TIMEOUT_MIN and LLM_TIMEOUT_MAX.
+
+stream() sends the same request in the provider's streaming mode and
+yields the text as it arrives (server-sent events from both providers).
+
+hedged_call() asks the first provider and, if it has not answered within
+LLM_HEDGE_DELAY seconds (or fails), the next one as well; the first good
+answer wins. A provider that is down therefore costs at most the hedge
+delay, not a full timeout.
+
+Breaker state is per process and shown by the chatbot health endpoint.
+"""
+from abc import ABC, abstractmethod
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+import json
+import logging
+import requests
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+GROQ_URL = 'https://api.groq.com/openai/v1/chat/completions'
+GEMINI_URL = 'https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent'
+
+# Seconds allowed to establish a connection (separate from the read timeout)
+CONNECT_TIMEOUT = 3.05
+
+MAX_WORKERS = 16
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='llm-provider')
+
+
+class ProviderUnavailable(Exception):
+    """The provider's circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open trial call"""
+
+    def __init__(self, name, failure_threshold=None, reset_timeout=None):
+        self.name = name
+        self.failure_threshold = failure_threshold or getattr(settings, 'LLM_BREAKER_FAILURE_THRESHOLD', 3)
+        self.reset_timeout = reset_timeout or getattr(settings, 'LLM_BREAKER_RESET_TIMEOUT', 30)
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+
+    def allow(self):
+        """Whether a call may go out now (claims the trial call when half-open)"""
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = HALF_OPEN
+                self._trial_running = False
+            if self.state == HALF_OPEN:
+                if self._trial_running:
+                    return False
+                self._trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                logger.info(f"{self.name} circuit closed")
+            self.state = CLOSED
+            self.failures = 0
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    logger.warning(f"{self.name} circuit opened after {self.failures} failure(s)")
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def snapshot(self):
+        with self._lock:
+            retry_in = None
+            if self.state == OPEN:
+                retry_in = max(0.0, round(self.reset_timeout - (time.monotonic() - self.opened_at), 1))
+            return {'state': self.state, 'consecutive_failures': self.failures, 'retry_in': retry_in}
+
+
+class AdaptiveTimeout:
+    """Read timeout following the provider's observed latency"""
+
+    def __init__(self, minimum=None, maximum=None):
+        self.minimum = minimum or getattr(settings, 'LLM_TIMEOUT_MIN', 5)
+        self.maximum = maximum or getattr(settings, 'LLM_TIMEOUT_MAX', 30)
+        self._lock = threading.Lock()
+        self.smoothed = None
+        self.deviation = None
+
+    def observe(self, latency):
+        with self._lock:
+            if self.smoothed is None:
+                self.smoothed, self.deviation = latency, latency / 2
+            else:
+                self.deviation = 0.75 * self.deviation + 0.25 * abs(self.smoothed - latency)
+                self.smoothed = 0.875 * self.smoothed + 0.125 * latency
+
+    @property
+    def value(self):
+        with self._lock:
+            if self.smoothed is None:
+                return self.maximum
+            return min(self.maximum, max(self.minimum, self.smoothed + 4 * self.deviation))
+
+
+class ProviderClient(ABC):
+    """Base client: pooled session, circuit breaker and adaptive timeout"""
+
+    name = ''
+
+    def __init__(self, api_key, url):
+        self.api_key = api_key
+        self.url = url
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=MAX_WORKERS)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.breaker = CircuitBreaker(self.name)
+        self.timeout = AdaptiveTimeout()
+
+    @abstractmethod
+    def build_request(self, system_prompt, message, max_tokens):
+        """Returns: (url, params, headers, json payload)"""
+
+    @abstractmethod
+    def parse(self, data):
+        """Completion text from the provider's JSON response"""
+
+    @abstractmethod
+    def build_stream_request(self, system_prompt, message, max_tokens):
+        """Same as build_request(), asking for a server-sent event stream"""
+
+    @abstractmethod
+    def parse_chunk(self, data):
+        """Text carried by one streamed event's JSON ('' when none)"""
+
+    def complete(self, system_prompt, message, max_tokens=1024):
+        """
+        One completion through the breaker.
+        Raises ProviderUnavailable when the breaker is open, or the request/parse error.
+        """
+        if not self.breaker.allow():
+            raise ProviderUnavailable(f"{self.name} circuit is open")
+
+        url, params, headers, payload = self.build_request(system_prompt, message, max_tokens)
+        started = time.monotonic()
+        try:
+            response = self.session.post(
+                url, params=params, json=payload, headers=headers,
+                timeout=(CONNECT_TIMEOUT, self.timeout.value),
+            )
+            response.raise_for_status()
+            text = self.parse(response.json())
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.timeout.observe(time.monotonic() - started)
+        self.breaker.record_success()
+        return text
+
+    def stream(self, system_prompt, message, max_tokens=1024):
+        """
+        Yields the completion text in chunks as the provider streams it.
+        The read timeout applies to the gap between chunks. A stream counts as
+        a success once its first event arrives, and as a failure if it breaks
+        before or after that; streamed calls are not timed, as only the full
+        completion latency is comparable with complete().
+        """
+        if not self.breaker.allow():
+            raise ProviderUnavailable(f"{self.name} circuit is open")
+
+        url, params, headers, payload = self.build_stream_request(system_prompt, message, max_tokens)
+        response = None
+        succeeded = False
+        try:
+            response = self.session.post(
+                url, params=params, json=payload, headers=headers,
+                timeout=(CONNECT_TIMEOUT, self.timeout.value), stream=True,
+            )
+            response.raise_for_status()
+            # chunk_size=None reads each chunk as soon as it arrives
+            for line in response.iter_lines(chunk_size=None):
+                if not line.startswith(b'data:'):
+                    continue
+                data = line[len(b'data:'):].strip().decode('utf-8')
+                if data == '[DONE]':
+                    break
+                text = self.parse_chunk(json.loads(data))
+                if not succeeded:
+                    succeeded = True
+                    self.breaker.record_success()
+                if text:
+                    yield text
+            if not succeeded:
+                raise ValueError(f"Empty stream from {self.name}")
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        finally:
+            if response is not None:
+                response.close()
+
+    def health(self):
+        return {
+            'provider': self.name,
+            **self.breaker.snapshot(),
+            'timeout': round(self.timeout.value, 2),
+            'smoothed_latency': round(self.timeout.smoothed, 3) if self.timeout.smoothed is not None else None,
+        }
+
+
+class GroqClient(ProviderClient):
+    name = 'groq'
+    model = 'llama-3.3-70b-versatile'
+
+    def __init__(self, api_key, url=None):
+        super().__init__(api_key, url or getattr(settings, 'GROQ_API_URL', GROQ_URL))
+
+    def build_request(self, system_prompt, message, max_tokens):
+        headers = {'Authorization': f'Bearer {self.api_key}'}
+        payload = {
+            'model': self.model,
+            'messages': [
+                {'role': 'system', 'content': system_prompt},
+                {'role': 'user', 'content': message},
+            ],
+            'temperature': 0.7,
+            'max_tokens': max_tokens,
+        }
+        return self.url, None, headers, payload
+
+    def build_stream_request(self, system_prompt, message, max_tokens):
+        url, params, headers, payload = self.build_request(system_prompt, message, max_tokens)
+        return url, params, headers, {**payload, 'stream': True}
+
+    def parse(self, data):
+        return data['choices'][0]['message']['content']
+
+    def parse_chunk(self, data):
+        if 'error' in data:
+            raise ValueError(f"Groq stream error: {data['error']}")
+        return data['choices'][0]['delta'].get('content') or ''
+
+
+class GeminiClient(ProviderClient):
+    name = 'gemini'
+
+    def __init__(self, api_key, url=None):
+        super().__init__(api_key, url or getattr(settings, 'GEMINI_API_URL', GEMINI_URL))
+
+    def build_request(self, system_prompt, message, max_tokens):
+        full_prompt = f"{system_prompt}\n\nUser Question: {message}\n\nYour Response:"
+        payload = {
+            'contents': [{'parts': [{'text': full_prompt}]}],
+            'generationConfig': {'temperature': 0.7, 'maxOutputTokens': max_tokens},
+        }
+        return self.url, {'key': self.api_key}, {}, payload
+
+    def build_stream_request(self, system_prompt, message, max_tokens):
+        _, params, headers, payload = self.build_request(system_prompt, message, max_tokens)
+        url = self.url.replace(':generateContent', ':streamGenerateContent')
+        return url, {**params, 'alt': 'sse'}, headers, payload
+
+    def parse(self, data):
+        try:
+            return data['candidates'][0]['content']['parts'][0]['text']
+        except (KeyError, IndexError):
+            raise ValueError('No valid response from Gemini API')
+
+    def parse_chunk(self, data):
+        if 'error' in data:
+            raise ValueError(f"Gemini stream error: {data['error']}")
+        # The last event may carry only finishReason/usage metadata
+        parts = (data.get('candidates') or [{}])[0].get('content', {}).get('parts', [])
+        return ''.join(part.get('text', '') for part in parts)
+
+
+def hedged_call(calls, hedge_delay=None):
+    """
+    Run `calls` (callables, preferred first), starting the next one when the
+    running ones have not succeeded within `hedge_delay` seconds or have all
+    failed. Returns the first successful result; raises the last error if
+    every call fails.
+    """
+    if not calls:
+        raise ProviderUnavailable('No AI provider configured')
+    if hedge_delay is None:
+        hedge_delay = getattr(settings, 'LLM_HEDGE_DELAY', 2.0)
+
+    pending = set()
+    waiting = list(calls)
+    last_error = None
+    while waiting or pending:
+        if waiting:
+            pending.add(_executor.submit(waiting.pop(0)))
+        # Wait for a result, but only up to the hedge delay while another call could still start
+        done, pending = wait(pending, timeout=hedge_delay if waiting else None, return_when=FIRST_COMPLETED)
+        for future in done:
+            try:
+                return future.result()
+            except Exception as e:
+                last_error = e
+    raise last_error
@@ -4,7 +4,7 @@ Run this periodically (e.g., every hour via cron)
 """
 from django.core.management.base import BaseCommand
 from complaints.sla_service import check_and_update_sla_breaches, auto_escalate_breached_complaints
-from complaints.notifications import send_sla_breach_notification
+from complaints.notifications import send_sla_breach_notifications
 import logging
 
 logger = logging.getLogger(__name__)
@@ -24,12 +24,24 @@ class Command(BaseCommand):
             action='store_true',
             help='Send notifications for SLA breaches',
         )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Complaints updated per transaction (default: 1000)',
+        )
 
     def handle(self, *args, **options):
         self.stdout.write('Checking SLA breaches...')
         
+        def report_progress(processed, total):
+            self.stdout.write(f'Processed {processed}/{total} breach candidates')
+        
         # Check for breaches
-        breached = check_and_update_sla_breaches()
+        breached = check_and_update_sla_breaches(
+            chunk_size=options['chunk_size'],
+            progress=report_progress
+        )
         
         if breached:
             self.stdout.write(
@@ -38,16 +50,15 @@ class Command(BaseCommand):
             
             # Send notifications if requested
             if options['notify']:
-                for complaint in breached:
-                    try:
-                        send_sla_breach_notification(complaint)
-                        self.stdout.write(f'Sent notification for {complaint.tracking_id}')
-                    except Exception as e:
-                        logger.error(f'Failed to send notification for {complaint.tracking_id}: {e}')
+                try:
+                    queued = send_sla_breach_notifications(breached)
+                    self.stdout.write(f'Queued {queued} breach notification(s)')
+                except Exception as e:
+                    logger.error(f'Failed to queue breach notifications: {e}')
             
             # Auto-escalate if requested
             if options['escalate']:
-                escalated_count = auto_escalate_breached_complaints()
+                escalated_count = auto_escalate_breached_complaints(breached)
                 self.stdout.write(
                     self.style.SUCCESS(f'Auto-escalated {escalated_count} complaints')
                 )
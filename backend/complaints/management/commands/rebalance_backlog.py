@@ -0,0 +1,61 @@
+"""
+Management command to assign queued complaints to the least loaded staff
+Useful after an outage or when routing was paused: the whole backlog is
+planned in memory and written in chunks.
+"""
+from django.core.management.base import BaseCommand
+from complaints.assignment import rebalance_backlog, REBALANCE_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Assign unassigned complaints to the least loaded staff of their department'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--department',
+            type=int,
+            action='append',
+            help='Only this department id (repeatable; default: all departments)',
+        )
+        parser.add_argument(
+            '--include-assigned',
+            action='store_true',
+            help='Also redistribute assigned complaints nobody has started on',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=None,
+            help='Assign at most this many complaints, most urgent first',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=REBALANCE_CHUNK_SIZE,
+            help=f'Complaints locked and updated per transaction (default: {REBALANCE_CHUNK_SIZE})',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only print the planned assignments',
+        )
+
+    def handle(self, *args, **options):
+        result = rebalance_backlog(
+            department_ids=options['department'],
+            include_assigned=options['include_assigned'],
+            limit=options['limit'],
+            dry_run=options['dry_run'],
+            chunk_size=options['chunk_size'],
+        )
+
+        if options['dry_run']:
+            self.stdout.write(f"Would assign {result['planned']} complaints")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Assigned {result['assigned']} complaints"))
+        for assignee_id, count in sorted(result['per_assignee'].items(), key=lambda item: -item[1]):
+            self.stdout.write(f"  staff {assignee_id}: {count}")
+        if result['unassignable']:
+            self.stdout.write(self.style.WARNING(
+                f"{result['unassignable']} complaints have no available staff in their department"
+            ))
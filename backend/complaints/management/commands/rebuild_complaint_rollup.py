@@ -0,0 +1,24 @@
+"""
+Management command to rebuild the daily complaint statistics rollup
+Run after bulk edits made with QuerySet.update() or raw SQL, which bypass
+the incremental maintenance signals
+"""
+from django.core.management.base import BaseCommand
+from complaints.rollup import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Rebuild ComplaintDailyRollup from the Complaint table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Rows fetched and inserted per batch (default: 2000)',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('Rebuilding complaint statistics rollup...')
+        count = rebuild(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rollup rebuilt from {count} complaints'))
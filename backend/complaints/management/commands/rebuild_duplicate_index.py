@@ -0,0 +1,34 @@
+"""
+Management command to (re)build the near-duplicate detection index
+Run once after deploying, or after changing shingle/MinHash parameters
+"""
+from django.core.management.base import BaseCommand
+from complaints.models import Complaint
+from complaints.duplicate_engine import index_complaint, mark_duplicate
+
+
+class Command(BaseCommand):
+    help = 'Rebuild MinHash signatures and LSH buckets for complaints'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--mark',
+            action='store_true',
+            help='Also re-evaluate is_duplicate/duplicate_of for open complaints',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('Rebuilding duplicate detection index...')
+
+        count = 0
+        # Oldest first so earlier reports are indexed before their duplicates
+        for complaint in Complaint.objects.order_by('created_at', 'id').iterator(chunk_size=500):
+            if options['mark'] and complaint.status in ['new', 'assigned', 'in_progress', 'pending']:
+                mark_duplicate(complaint)
+            else:
+                index_complaint(complaint)
+            count += 1
+            if count % 1000 == 0:
+                self.stdout.write(f'Indexed {count} complaints...')
+
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} complaints'))
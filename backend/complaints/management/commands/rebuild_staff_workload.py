@@ -0,0 +1,16 @@
+"""
+Management command to rebuild the live assignee workload counters
+Run after bulk edits made with QuerySet.update() or raw SQL, which bypass
+the incremental maintenance signals
+"""
+from django.core.management.base import BaseCommand
+from complaints.assignment import rebuild_workloads
+
+
+class Command(BaseCommand):
+    help = 'Rebuild StaffWorkload counters from the Complaint table'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Rebuilding assignee workloads...')
+        count = rebuild_workloads()
+        self.stdout.write(self.style.SUCCESS(f'Workloads rebuilt for {count} assignees'))
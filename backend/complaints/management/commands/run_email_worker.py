@@ -0,0 +1,56 @@
+"""
+Management command to drain the outgoing email outbox
+Run this as a long-lived worker process alongside the web server
+"""
+from django.core.management.base import BaseCommand
+from complaints.outbox import process_outbox
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued outgoing emails over a reused mail connection'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Deliver the currently due emails and exit',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50,
+            help='Maximum number of emails sent per connection (default: 50)',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=2.0,
+            help='Seconds to wait between polls when the outbox is empty (default: 2)',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        self.stdout.write('Starting email worker...')
+
+        while True:
+            try:
+                sent, failed = process_outbox(batch_size=batch_size)
+            except Exception as e:
+                logger.error(f'Email worker poll failed: {e}')
+                sent, failed = 0, 0
+
+            if sent or failed:
+                self.stdout.write(f'Sent {sent} email(s), {failed} failure(s)')
+
+            if options['once']:
+                break
+
+            # Keep draining while there is backlog, otherwise back off
+            if sent + failed < batch_size:
+                time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS('Email worker finished'))
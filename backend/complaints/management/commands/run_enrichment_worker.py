@@ -0,0 +1,56 @@
+"""
+Management command to drain the complaint AI enrichment queue
+Run this as a long-lived worker process alongside the web server
+"""
+from django.core.management.base import BaseCommand
+from complaints.enrichment import process_pending_jobs
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Process queued AI enrichment jobs for newly submitted complaints'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Process the currently due jobs and exit',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=20,
+            help='Maximum number of jobs to claim per poll (default: 20)',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=2.0,
+            help='Seconds to wait between polls when the queue is empty (default: 2)',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        self.stdout.write('Starting enrichment worker...')
+
+        while True:
+            try:
+                succeeded, failed = process_pending_jobs(batch_size=batch_size)
+            except Exception as e:
+                logger.error(f'Enrichment worker poll failed: {e}')
+                succeeded, failed = 0, 0
+
+            if succeeded or failed:
+                self.stdout.write(f'Enriched {succeeded} complaint(s), {failed} failure(s)')
+
+            if options['once']:
+                break
+
+            # Keep draining while there is backlog, otherwise back off
+            if succeeded + failed < batch_size:
+                time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS('Enrichment worker finished'))
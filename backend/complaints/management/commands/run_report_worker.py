@@ -0,0 +1,72 @@
+"""
+Management command to drain the report generation queue
+Run this as a long-lived worker process alongside the web server
+"""
+from django.core.management.base import BaseCommand
+from complaints.report_jobs import delete_expired_artifacts, process_pending_jobs
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Generate queued complaint report exports'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Process the currently queued jobs and exit',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5,
+            help='Maximum number of jobs to claim per poll (default: 5)',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=5.0,
+            help='Seconds to wait between polls when the queue is empty (default: 5)',
+        )
+        parser.add_argument(
+            '--cleanup-interval',
+            type=float,
+            default=3600.0,
+            help='Seconds between deletions of expired report files (default: 3600)',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        self.stdout.write('Starting report worker...')
+        next_cleanup = 0.0
+
+        while True:
+            if time.monotonic() >= next_cleanup:
+                try:
+                    deleted = delete_expired_artifacts()
+                    if deleted:
+                        self.stdout.write(f'Deleted {deleted} expired report file(s)')
+                except Exception as e:
+                    logger.error(f'Report file cleanup failed: {e}')
+                next_cleanup = time.monotonic() + options['cleanup_interval']
+
+            try:
+                succeeded, failed = process_pending_jobs(batch_size=batch_size)
+            except Exception as e:
+                logger.error(f'Report worker poll failed: {e}')
+                succeeded, failed = 0, 0
+
+            if succeeded or failed:
+                self.stdout.write(f'Generated {succeeded} report(s), {failed} failure(s)')
+
+            if options['once']:
+                break
+
+            # Keep draining while there is backlog, otherwise back off
+            if succeeded + failed < batch_size:
+                time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS('Report worker finished'))
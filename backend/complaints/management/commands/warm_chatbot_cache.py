@@ -0,0 +1,22 @@
+"""
+Management command to answer the chatbot's suggested questions ahead of users
+Run once after a deploy or knowledge base change. Only useful with a shared
+'chatbot' cache backend (CHATBOT_CACHE_BACKEND): the default LocMemCache
+belongs to this command's own process.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from complaints.chatbot_service import chatbot_service
+
+
+class Command(BaseCommand):
+    help = 'Cache AI answers to the chatbot suggested questions'
+
+    def handle(self, *args, **options):
+        if 'LocMemCache' in settings.CACHES['chatbot']['BACKEND']:
+            self.stdout.write(self.style.WARNING(
+                'The chatbot cache is LocMemCache; answers cached here are not seen by the web workers'
+            ))
+        self.stdout.write('Warming the chatbot cache...')
+        count = chatbot_service.warm_cache()
+        self.stdout.write(self.style.SUCCESS(f'{count} answers cached'))
@@ -0,0 +1,92 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:12
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("complaints", "0005_complainttranslation_slaconfiguration_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="complaint",
+            name="enriched_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="complaint",
+            name="enrichment_status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pending"),
+                    ("processing", "Processing"),
+                    ("completed", "Completed"),
+                    ("failed", "Failed"),
+                ],
+                default="completed",
+                help_text="State of background AI enrichment (language, urgency, sentiment, SLA)",
+                max_length=20,
+            ),
+        ),
+        migrations.CreateModel(
+            name="EnrichmentJob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("running", "Running"),
+                            ("done", "Done"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=20,
+                    ),
+                ),
+                ("attempts", models.IntegerField(default=0)),
+                ("max_attempts", models.IntegerField(default=3)),
+                ("last_error", models.TextField(blank=True)),
+                (
+                    "run_after",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now,
+                        help_text="Earliest time the job may be picked up",
+                    ),
+                ),
+                ("locked_at", models.DateTimeField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "complaint",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="enrichment_jobs",
+                        to="complaints.complaint",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["run_after", "id"],
+                "indexes": [
+                    models.Index(
+                        fields=["status", "run_after"],
+                        name="complaints__status_22fac7_idx",
+                    )
+                ],
+            },
+        ),
+    ]
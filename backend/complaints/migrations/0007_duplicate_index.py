@@ -0,0 +1,77 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("complaints", "0006_enrichment_pipeline"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ComplaintSignature",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "minhash",
+                    models.JSONField(
+                        default=list,
+                        help_text="MinHash values, one per hash permutation",
+                    ),
+                ),
+                ("shingle_count", models.IntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "complaint",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="signature",
+                        to="complaints.complaint",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ComplaintLSHBucket",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("band", models.PositiveSmallIntegerField()),
+                ("bucket", models.BigIntegerField()),
+                (
+                    "complaint",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="lsh_buckets",
+                        to="complaints.complaint",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["band", "bucket"], name="complaints__band_54df74_idx"
+                    )
+                ],
+                "unique_together": {("complaint", "band")},
+            },
+        ),
+    ]
@@ -0,0 +1,118 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0002_activitylog_passwordresettoken_and_more"),
+        ("complaints", "0007_duplicate_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ComplaintDailyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "date",
+                    models.DateField(help_text="Complaint creation date (local time)"),
+                ),
+                (
+                    "priority",
+                    models.CharField(
+                        choices=[
+                            ("low", "Low"),
+                            ("medium", "Medium"),
+                            ("high", "High"),
+                            ("critical", "Critical"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("new", "New"),
+                            ("assigned", "Assigned"),
+                            ("in_progress", "In Progress"),
+                            ("pending", "Pending"),
+                            ("resolved", "Resolved"),
+                            ("closed", "Closed"),
+                            ("rejected", "Rejected"),
+                        ],
+                        max_length=30,
+                    ),
+                ),
+                ("complaint_count", models.IntegerField(default=0)),
+                ("sla_breached_count", models.IntegerField(default=0)),
+                ("rating_count", models.IntegerField(default=0)),
+                ("rating_sum", models.IntegerField(default=0)),
+                (
+                    "resolved_count",
+                    models.IntegerField(
+                        default=0,
+                        help_text="Resolved/closed complaints with a resolved_at time",
+                    ),
+                ),
+                ("resolution_hours_sum", models.FloatField(default=0)),
+                (
+                    "campus",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="accounts.campus",
+                    ),
+                ),
+                (
+                    "category",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="complaints.category",
+                    ),
+                ),
+                (
+                    "department",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="accounts.department",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-date"],
+                "indexes": [
+                    models.Index(
+                        fields=[
+                            "date",
+                            "campus",
+                            "department",
+                            "category",
+                            "priority",
+                            "status",
+                        ],
+                        name="complaints__date_09dfd2_idx",
+                    )
+                ],
+            },
+        ),
+    ]
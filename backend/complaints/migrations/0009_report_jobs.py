@@ -0,0 +1,110 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:32
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("complaints", "0008_daily_rollup"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReportJob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "format",
+                    models.CharField(
+                        choices=[
+                            ("excel", "Excel"),
+                            ("pdf", "PDF"),
+                            ("csv", "CSV"),
+                            ("ndjson", "NDJSON"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "filters",
+                    models.JSONField(
+                        blank=True, default=dict, help_text="Export query parameters"
+                    ),
+                ),
+                (
+                    "columns",
+                    models.JSONField(
+                        blank=True,
+                        default=list,
+                        help_text="Selected columns (CSV/NDJSON)",
+                    ),
+                ),
+                (
+                    "scope",
+                    models.CharField(
+                        help_text="Role scope the report was generated for",
+                        max_length=100,
+                    ),
+                ),
+                (
+                    "watermark",
+                    models.CharField(
+                        blank=True,
+                        help_text="Data fingerprint at generation time",
+                        max_length=100,
+                    ),
+                ),
+                ("cache_key", models.CharField(db_index=True, max_length=64)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("running", "Running"),
+                            ("done", "Done"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=20,
+                    ),
+                ),
+                ("attempts", models.IntegerField(default=0)),
+                ("max_attempts", models.IntegerField(default=2)),
+                ("last_error", models.TextField(blank=True)),
+                ("file", models.FileField(blank=True, upload_to="reports/")),
+                ("row_count", models.IntegerField(blank=True, null=True)),
+                ("locked_at", models.DateTimeField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "requested_by",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="report_jobs",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["status", "created_at"],
+                        name="complaints__status_859a0c_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:51
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0002_activitylog_passwordresettoken_and_more"),
+        ("complaints", "0009_report_jobs"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StaffWorkload",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="workload",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("open_count", models.IntegerField(default=0)),
+                (
+                    "weighted_load",
+                    models.IntegerField(
+                        default=0,
+                        help_text="Sum of priority weights of open complaints",
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "ordering": ["weighted_load", "open_count"],
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0003_activitylog_feed_index"),
+        ("complaints", "0010_staff_workload"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="complaint",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="complaints__created_b56ad1_idx"
+            ),
+        ),
+    ]
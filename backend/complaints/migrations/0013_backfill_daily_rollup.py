@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+def build_rollup(apps, schema_editor):
+    from complaints.rollup import rebuild
+
+    rebuild(
+        complaint_model=apps.get_model('complaints', 'Complaint'),
+        rollup_model=apps.get_model('complaints', 'ComplaintDailyRollup'),
+    )
+
+
+class Migration(migrations.Migration):
+    """Fill the daily rollup from the existing complaints"""
+
+    dependencies = [
+        ("complaints", "0012_outbound_email"),
+    ]
+
+    operations = [
+        migrations.RunPython(build_rollup, migrations.RunPython.noop),
+    ]
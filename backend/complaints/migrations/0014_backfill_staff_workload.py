@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+def build_workloads(apps, schema_editor):
+    from complaints.assignment import rebuild_workloads
+
+    rebuild_workloads(
+        complaint_model=apps.get_model('complaints', 'Complaint'),
+        workload_model=apps.get_model('complaints', 'StaffWorkload'),
+    )
+
+
+class Migration(migrations.Migration):
+    """Compute the assignee workload counters from the existing complaints"""
+
+    dependencies = [
+        ("complaints", "0013_backfill_daily_rollup"),
+    ]
+
+    operations = [
+        migrations.RunPython(build_workloads, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:20
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("complaints", "0014_backfill_staff_workload"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="reportjob",
+            name="complaints__status_859a0c_idx",
+        ),
+        migrations.AddField(
+            model_name="reportjob",
+            name="run_after",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now,
+                help_text="Earliest time the job may be picked up",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="reportjob",
+            index=models.Index(
+                fields=["status", "run_after"], name="complaints__status_5cd69e_idx"
+            ),
+        ),
+    ]
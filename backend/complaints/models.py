@@ -146,6 +146,17 @@ class Complaint(models.Model):
     reopened = models.BooleanField(default=False)
     reopened_at = models.DateTimeField(null=True, blank=True)
     reopened_count = models.IntegerField(default=0)
+    
+    # Background AI enrichment
+    ENRICHMENT_STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    enrichment_status = models.CharField(max_length=20, choices=ENRICHMENT_STATUS_CHOICES, default='completed',
+                                         help_text="State of background AI enrichment (language, urgency, sentiment, SLA)")
+    enriched_at = models.DateTimeField(null=True, blank=True)
 
     def __str__(self):
         return f"{self.tracking_id} - {self.title}"
@@ -207,6 +218,7 @@ class Complaint(models.Model):
     class Meta:
         ordering = ['-created_at']
         indexes = [
+            models.Index(fields=['-created_at', '-id']),
             models.Index(fields=['status', '-created_at']),
             models.Index(fields=['assigned_to', 'status']),
             models.Index(fields=['campus', 'status']),
@@ -218,6 +230,163 @@ class Complaint(models.Model):
 
 
 
+# Enrichment Job Model (DB-backed job queue)
+class EnrichmentJob(models.Model):
+    """Queued AI enrichment work for a complaint, drained by the enrichment worker"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    
+    complaint = models.ForeignKey(Complaint, on_delete=models.CASCADE, related_name='enrichment_jobs')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=3)
+    last_error = models.TextField(blank=True)
+    
+    run_after = models.DateTimeField(default=timezone.now, help_text="Earliest time the job may be picked up")
+    locked_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"Enrichment for {self.complaint.tracking_id} ({self.status})"
+    
+    class Meta:
+        ordering = ['run_after', 'id']
+        indexes = [
+            models.Index(fields=['status', 'run_after']),
+        ]
+
+
+# Report Job Model (background report generation with cached artifacts)
+class ReportJob(models.Model):
+    """Queued report export, drained by the report worker"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    
+    FORMAT_CHOICES = [
+        ('excel', 'Excel'),
+        ('pdf', 'PDF'),
+        ('csv', 'CSV'),
+        ('ndjson', 'NDJSON'),
+    ]
+    
+    requested_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='report_jobs')
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+    filters = models.JSONField(default=dict, blank=True, help_text="Export query parameters")
+    columns = models.JSONField(default=list, blank=True, help_text="Selected columns (CSV/NDJSON)")
+    scope = models.CharField(max_length=100, help_text="Role scope the report was generated for")
+    watermark = models.CharField(max_length=100, blank=True, help_text="Data fingerprint at generation time")
+    cache_key = models.CharField(max_length=64, db_index=True)
+    
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=2)
+    last_error = models.TextField(blank=True)
+    
+    file = models.FileField(upload_to='reports/', blank=True)
+    row_count = models.IntegerField(null=True, blank=True)
+    
+    run_after = models.DateTimeField(default=timezone.now, help_text="Earliest time the job may be picked up")
+    locked_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"{self.get_format_display()} report #{self.pk} ({self.status})"
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'run_after']),
+        ]
+
+
+# Duplicate Detection Index (MinHash signatures + LSH buckets)
+class ComplaintSignature(models.Model):
+    """MinHash signature of a complaint's normalized title + description shingles"""
+    complaint = models.OneToOneField(Complaint, on_delete=models.CASCADE, related_name='signature')
+    minhash = models.JSONField(default=list, help_text="MinHash values, one per hash permutation")
+    shingle_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Signature for {self.complaint.tracking_id}"
+
+
+class ComplaintLSHBucket(models.Model):
+    """Locality-sensitive hashing bucket membership used for candidate lookup"""
+    complaint = models.ForeignKey(Complaint, on_delete=models.CASCADE, related_name='lsh_buckets')
+    band = models.PositiveSmallIntegerField()
+    bucket = models.BigIntegerField()
+    
+    def __str__(self):
+        return f"{self.complaint_id} band {self.band}: {self.bucket}"
+    
+    class Meta:
+        unique_together = [['complaint', 'band']]
+        indexes = [
+            models.Index(fields=['band', 'bucket']),
+        ]
+
+
+# Daily Statistics Rollup (maintained incrementally, see complaints/rollup.py)
+class ComplaintDailyRollup(models.Model):
+    """
+    Pre-aggregated complaint counts per creation day and dimension combination.
+    Rows are only ever read through SUM(), so a key may span several rows.
+    """
+    date = models.DateField(help_text="Complaint creation date (local time)")
+    campus = models.ForeignKey('accounts.Campus', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    department = models.ForeignKey('accounts.Department', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    priority = models.CharField(max_length=10, choices=Complaint.PRIORITY_CHOICES)
+    status = models.CharField(max_length=30, choices=Complaint.STATUS_CHOICES)
+    
+    # Measures
+    complaint_count = models.IntegerField(default=0)
+    sla_breached_count = models.IntegerField(default=0)
+    rating_count = models.IntegerField(default=0)
+    rating_sum = models.IntegerField(default=0)
+    resolved_count = models.IntegerField(default=0, help_text="Resolved/closed complaints with a resolved_at time")
+    resolution_hours_sum = models.FloatField(default=0)
+    
+    def __str__(self):
+        return f"{self.date} {self.status}/{self.priority}: {self.complaint_count}"
+    
+    class Meta:
+        ordering = ['-date']
+        indexes = [
+            models.Index(fields=['date', 'campus', 'department', 'category', 'priority', 'status']),
+        ]
+
+
+class StaffWorkload(models.Model):
+    """
+    Live open-complaint load of an assignee: unresolved complaints assigned
+    to them and the sum of their priority weights. Maintained incrementally
+    by complaint signals (see assignment.py).
+    """
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
+                                primary_key=True, related_name='workload')
+    open_count = models.IntegerField(default=0)
+    weighted_load = models.IntegerField(default=0, help_text="Sum of priority weights of open complaints")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.user_id}: {self.open_count} open (load {self.weighted_load})"
+    
+    class Meta:
+        ordering = ['weighted_load', 'open_count']
+
+
 # Complaint Event Model (Audit Trail)
 class ComplaintEvent(models.Model):
     EVENT_TYPES = [
@@ -366,6 +535,45 @@ class EmailTemplate(models.Model):
         ordering = ['template_type', 'name']
 
 
+# Email Outbox Model (written with the change that triggers the email)
+class OutboundEmail(models.Model):
+    """Email queued in the same transaction as its cause, delivered by the email worker"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('dead', 'Dead Letter'),
+    ]
+    
+    kind = models.CharField(max_length=50, blank=True, help_text="What the email is for, e.g. 'status_change'")
+    complaint = models.ForeignKey(Complaint, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    
+    from_email = models.CharField(max_length=255)
+    to = models.JSONField(default=list)
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=5)
+    last_error = models.TextField(blank=True)
+    
+    run_after = models.DateTimeField(default=timezone.now, help_text="Earliest time delivery may be attempted")
+    locked_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"{self.subject} to {', '.join(self.to)} ({self.status})"
+    
+    class Meta:
+        ordering = ['run_after', 'id']
+        indexes = [
+            models.Index(fields=['status', 'run_after']),
+        ]
+
+
 # SLA Configuration Model
 class SLAConfiguration(models.Model):
     """Configurable SLA settings per priority level and category"""
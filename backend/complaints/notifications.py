@@ -1,10 +1,8 @@
 """
 Notification system for complaint status changes
 """
-from django.core.mail import send_mail
-from django.conf import settings
-from django.template import Template, Context
-from .models import EmailTemplate
+from .email_templates import BUILTIN_TEMPLATES, render, render_batch
+from .outbox import enqueue_email
 import logging
 
 logger = logging.getLogger(__name__)
@@ -29,133 +27,11 @@ def send_complaint_notification(complaint, event_type, additional_context=None):
     recipient_email = complaint.anonymous_email if complaint.is_anonymous else complaint.submitter.email
     recipient_name = 'User' if complaint.is_anonymous else (complaint.submitter.get_full_name() or complaint.submitter.username)
     
-    # Email templates for different events
-    templates = {
-        'reviewed': {
-            'subject': 'Your Complaint Has Been Reviewed - {tracking_id}',
-            'message': '''
-Dear {recipient_name},
-
-Your complaint has been reviewed by our team.
-
-Complaint Details:
-- Tracking ID: {tracking_id}
-- Title: {title}
-- Status: {status}
-- Priority: {priority}
-
-{additional_message}
-
-You can track your complaint status at any time using your tracking ID.
-
-Best regards,
-UoG Complaint Management Team
-            '''
-        },
-        'assigned': {
-            'subject': 'Your Complaint Has Been Assigned - {tracking_id}',
-            'message': '''
-Dear {recipient_name},
-
-Your complaint has been assigned to a staff member for resolution.
-
-Complaint Details:
-- Tracking ID: {tracking_id}
-- Title: {title}
-- Assigned to: {assigned_to}
-- Status: Assigned
-
-We will keep you updated on the progress.
-
-Best regards,
-UoG Complaint Management Team
-            '''
-        },
-        'in_progress': {
-            'subject': 'Your Complaint is Being Processed - {tracking_id}',
-            'message': '''
-Dear {recipient_name},
-
-Your complaint is now being actively worked on.
-
-Complaint Details:
-- Tracking ID: {tracking_id}
-- Title: {title}
-- Status: In Progress
-- Assigned to: {assigned_to}
-
-We are working to resolve your issue as quickly as possible.
-
-Best regards,
-UoG Complaint Management Team
-            '''
-        },
-        'resolved': {
-            'subject': 'Your Complaint Has Been Resolved - {tracking_id}',
-            'message': '''
-Dear {recipient_name},
-
-Great news! Your complaint has been resolved.
-
-Complaint Details:
-- Tracking ID: {tracking_id}
-- Title: {title}
-- Status: Resolved
-- Resolution Notes: {resolution_notes}
-
-If you are satisfied with the resolution, no further action is needed.
-If you have any concerns, please contact us.
-
-Best regards,
-UoG Complaint Management Team
-            '''
-        },
-        'rejected': {
-            'subject': 'Complaint Status Update - {tracking_id}',
-            'message': '''
-Dear {recipient_name},
-
-We have reviewed your complaint and unfortunately cannot proceed with it at this time.
-
-Complaint Details:
-- Tracking ID: {tracking_id}
-- Title: {title}
-- Status: Rejected
-- Reason: {rejection_reason}
-
-If you have questions about this decision, please contact our support team.
-
-Best regards,
-UoG Complaint Management Team
-            '''
-        },
-        'closed': {
-            'subject': 'Your Complaint Has Been Closed - {tracking_id}',
-            'message': '''
-Dear {recipient_name},
-
-Your complaint has been closed.
-
-Complaint Details:
-- Tracking ID: {tracking_id}
-- Title: {title}
-- Status: Closed
-- Final Resolution: {resolution_notes}
-
-Thank you for using the UoG Complaint Management System.
-
-Best regards,
-UoG Complaint Management Team
-            '''
-        }
-    }
-    
-    if event_type not in templates:
+    template_type = f'complaint_{event_type}'
+    if template_type not in BUILTIN_TEMPLATES:
         logger.warning(f"Unknown notification event type: {event_type}")
         return
     
-    template = templates[event_type]
-    
     # Build context
     context = {
         'recipient_name': recipient_name,
@@ -173,21 +49,11 @@ UoG Complaint Management Team
     if additional_context:
         context.update(additional_context)
     
-    # Format subject and message
-    subject = template['subject'].format(**context)
-    message = template['message'].format(**context)
+    subject, message, html_message = render(template_type, context)
     
-    try:
-        send_mail(
-            subject=subject,
-            message=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[recipient_email],
-            fail_silently=False,
-        )
-        logger.info(f"Notification sent to {recipient_email} for complaint {complaint.tracking_id}")
-    except Exception as e:
-        logger.error(f"Failed to send notification: {str(e)}")
+    # Queued with the status change; the email worker delivers it after commit
+    enqueue_email(subject, message, recipient_email, html_body=html_message, kind=event_type, complaint=complaint)
+    logger.info(f"Notification queued for {recipient_email} for complaint {complaint.tracking_id}")
 
 
 def notify_complaint_reviewed(complaint):
@@ -224,10 +90,12 @@ def notify_complaint_closed(complaint):
     send_complaint_notification(complaint, 'closed')
 
 
-def send_sla_breach_notification(complaint):
-    """Send notification when SLA is breached"""
+def _sla_breach_context(complaint):
+    """Recipient email and template context for an SLA breach alert, or None"""
     if not complaint.submitter or not complaint.submitter.email:
-        return
+        return None
+    if complaint.is_anonymous and not complaint.anonymous_email:
+        return None
     
     recipient_email = complaint.anonymous_email if complaint.is_anonymous else complaint.submitter.email
     recipient_name = 'User' if complaint.is_anonymous else (complaint.submitter.get_full_name() or complaint.submitter.username)
@@ -238,33 +106,38 @@ def send_sla_breach_notification(complaint):
     if complaint.sla_resolution_breached:
         breach_type.append('Resolution')
     
-    subject = f'SLA Breach Alert - {complaint.tracking_id}'
-    message = f'''
-Dear {recipient_name},
+    return recipient_email, {
+        'recipient_name': recipient_name,
+        'tracking_id': complaint.tracking_id,
+        'title': complaint.title,
+        'breach_type': ', '.join(breach_type),
+        'sla_response_hours': complaint.sla_response_hours,
+        'sla_resolution_hours': complaint.sla_resolution_hours,
+    }
 
-We wanted to inform you that your complaint has exceeded the expected response/resolution time.
 
-Complaint Details:
-- Tracking ID: {complaint.tracking_id}
-- Title: {complaint.title}
-- Breach Type: {', '.join(breach_type)}
-- Expected Response Time: {complaint.sla_response_hours} hours
-- Expected Resolution Time: {complaint.sla_resolution_hours} hours
+def send_sla_breach_notifications(complaints):
+    """
+    Queue SLA breach alerts for many complaints, all rendered against one
+    compiled template.
+    Returns the number of alerts queued.
+    """
+    recipients = []
+    for complaint in complaints:
+        found = _sla_breach_context(complaint)
+        if found:
+            recipients.append((complaint, *found))
+    if not recipients:
+        return 0
+    
+    rendered = render_batch('sla_breach', [context for _, _, context in recipients])
+    for (complaint, recipient_email, _), (subject, message, html_message) in zip(recipients, rendered):
+        enqueue_email(subject, message, recipient_email, html_body=html_message, kind='sla_breach',
+                      complaint=complaint)
+    logger.info(f"SLA breach notifications queued for {len(recipients)} complaint(s)")
+    return len(recipients)
 
-We apologize for the delay and are working to resolve this issue as quickly as possible.
 
-Best regards,
-UoG Complaint Management Team
-    '''
-    
-    try:
-        send_mail(
-            subject=subject,
-            message=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[recipient_email],
-            fail_silently=False,
-        )
-        logger.info(f"SLA breach notification sent to {recipient_email} for complaint {complaint.tracking_id}")
-    except Exception as e:
-        logger.error(f"Failed to send SLA breach notification: {str(e)}")
\ No newline at end of file
+def send_sla_breach_notification(complaint):
+    """Send notification when SLA is breached"""
+    send_sla_breach_notifications([complaint])
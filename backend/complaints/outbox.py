@@ -0,0 +1,191 @@
+"""
+Transactional outbox for outgoing email
+
+Code that wants to send an email calls enqueue_email(), which only
+inserts an OutboundEmail row. The row is part of the caller's
+transaction: it is committed together with the complaint change that
+caused it, and disappears with it on rollback. No request ever waits on
+the mail server.
+
+Delivery happens in the `run_email_worker` management command (the
+default 'queue' executor), or in-process right after the transaction
+commits (the 'inline' executor, for setups without a worker). A worker
+claims a batch of due rows, opens one mail connection for the whole
+batch and hands each message to it. Failed messages are retried with
+exponential backoff; after `max_attempts` they are kept as dead letters
+for inspection and requeue_dead().
+"""
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from datetime import timedelta
+import logging
+
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+# Seconds before a 'sending' row is considered abandoned by a crashed worker
+DEFAULT_LOCK_TIMEOUT = 300
+
+# Base delay (seconds) for exponential retry backoff
+RETRY_BASE_DELAY = 60
+
+DEFAULT_BATCH_SIZE = 50
+
+
+def get_executor():
+    """Return the configured executor name: 'queue' or 'inline'"""
+    executor = getattr(settings, 'EMAIL_OUTBOX_EXECUTOR', 'queue')
+    return executor if executor in ('queue', 'inline') else 'queue'
+
+
+def enqueue_email(subject, body, to, html_body='', from_email=None, kind='', complaint=None):
+    """
+    Queue an email for delivery once the current transaction commits.
+    `to` is an address or a list of addresses.
+    Returns: OutboundEmail
+    """
+    email = OutboundEmail.objects.create(
+        kind=kind,
+        complaint=complaint,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=[to] if isinstance(to, str) else list(to),
+        subject=subject[:255],
+        body=body,
+        html_body=html_body,
+    )
+
+    if get_executor() == 'inline':
+        transaction.on_commit(lambda: deliver_emails([email.pk]))
+
+    return email
+
+
+def build_message(email, connection):
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email,
+        to=email.to,
+        connection=connection,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, 'text/html')
+    return message
+
+
+def _claim(email_ids=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Move due pending emails to 'sending' and return them.
+    Rows locked by another worker are skipped, so several workers can
+    drain the same table without sending anything twice.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        due = OutboundEmail.objects.filter(status='pending', run_after__lte=now)
+        if email_ids is not None:
+            due = due.filter(pk__in=email_ids)
+        emails = list(due.order_by('run_after', 'id').select_for_update(skip_locked=True)[:batch_size])
+        if emails:
+            OutboundEmail.objects.filter(pk__in=[email.pk for email in emails]).update(
+                status='sending', locked_at=now
+            )
+    return emails
+
+
+def _record_failure(email, error, now):
+    email.attempts += 1
+    email.last_error = str(error)
+    email.locked_at = None
+    if email.attempts >= email.max_attempts:
+        email.status = 'dead'
+        logger.error(f"Email {email.pk} ({email.kind}) to {email.to} dead-lettered after "
+                     f"{email.attempts} attempts: {error}")
+    else:
+        email.status = 'pending'
+        email.run_after = now + timedelta(seconds=RETRY_BASE_DELAY * (2 ** (email.attempts - 1)))
+        logger.warning(f"Email {email.pk} ({email.kind}) to {email.to} failed, retrying at "
+                       f"{email.run_after}: {error}")
+    email.save(update_fields=['attempts', 'last_error', 'locked_at', 'status', 'run_after'])
+
+
+def deliver_emails(email_ids=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Claim and deliver up to `batch_size` due emails (only `email_ids` if
+    given) over a single mail connection.
+    Returns: (sent_count, failed_count)
+    """
+    emails = _claim(email_ids, batch_size)
+    if not emails:
+        return 0, 0
+
+    now = timezone.now()
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as e:
+        # Nothing can go out; every claimed email counts a failed attempt
+        for email in emails:
+            _record_failure(email, e, now)
+        return 0, len(emails)
+
+    sent_ids = []
+    failed = 0
+    try:
+        for email in emails:
+            # One message per call, so a rejected message is attributed to
+            # its own row and the ones already accepted aren't sent again
+            try:
+                connection.send_messages([build_message(email, connection)])
+            except Exception as e:
+                _record_failure(email, e, now)
+                failed += 1
+            else:
+                sent_ids.append(email.pk)
+    finally:
+        try:
+            connection.close()
+        except Exception as e:
+            logger.warning(f"Closing the mail connection failed: {e}")
+
+    if sent_ids:
+        OutboundEmail.objects.filter(pk__in=sent_ids).update(
+            status='sent', sent_at=timezone.now(), locked_at=None, attempts=F('attempts') + 1
+        )
+    return len(sent_ids), failed
+
+
+def release_stale_emails(lock_timeout=None):
+    """
+    Return emails abandoned mid-delivery by a crashed worker to the queue.
+    Returns the number of emails released.
+    """
+    if lock_timeout is None:
+        lock_timeout = getattr(settings, 'EMAIL_OUTBOX_LOCK_TIMEOUT', DEFAULT_LOCK_TIMEOUT)
+    cutoff = timezone.now() - timedelta(seconds=lock_timeout)
+    return OutboundEmail.objects.filter(status='sending', locked_at__lt=cutoff).update(
+        status='pending', locked_at=None
+    )
+
+
+def requeue_dead(email_ids=None):
+    """
+    Give dead-lettered emails a fresh set of attempts.
+    Returns the number of emails requeued.
+    """
+    dead = OutboundEmail.objects.filter(status='dead')
+    if email_ids is not None:
+        dead = dead.filter(pk__in=email_ids)
+    return dead.update(status='pending', attempts=0, run_after=timezone.now(), locked_at=None)
+
+
+def process_outbox(batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Drain one batch of due emails.
+    Returns: (sent_count, failed_count)
+    """
+    release_stale_emails()
+    return deliver_emails(batch_size=batch_size)
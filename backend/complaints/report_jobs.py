@@ -0,0 +1,299 @@
+"""
+Background report generation with cached artifacts.
+
+Submitting a report only records a ReportJob. The file is generated later,
+either by the `run_report_worker` management command (the default 'queue'
+executor) or in-process right after the request's transaction commits (the
+'inline' executor).
+
+Generated files are stored under MEDIA_ROOT/reports/, named by a hash of
+(role scope, filters, format, columns, data watermark). The watermark is the
+row count and latest updated_at of the complaints in the report, so an
+identical request is answered from the existing file until one of those
+complaints changes.
+
+Files not produced or reused for REPORT_ARTIFACT_MAX_AGE seconds are
+deleted by delete_expired_artifacts(), which the report worker runs
+periodically; their jobs keep their metadata but can no longer be
+downloaded.
+"""
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from datetime import timedelta
+import hashlib
+import json
+import logging
+import tempfile
+
+from .models import ReportJob
+from .reporting import (
+    REPORT_FORMATS, REPORT_FILTER_PARAMS, STREAMING_FORMATS,
+    apply_report_filters, data_watermark, get_report_queryset, report_scope_key,
+    generate_pdf_report, write_excel_report,
+)
+
+logger = logging.getLogger(__name__)
+
+# Seconds before a 'running' job is considered abandoned by a crashed worker
+DEFAULT_LOCK_TIMEOUT = 900
+
+# Base delay (seconds) for exponential retry backoff
+RETRY_BASE_DELAY = 60
+
+# Seconds a report file is kept after it was last produced or reused
+DEFAULT_ARTIFACT_MAX_AGE = 86400
+
+ARTIFACT_DIR = 'reports'
+
+
+def get_executor():
+    """Return the configured executor name: 'queue' or 'inline'"""
+    executor = getattr(settings, 'REPORT_JOB_EXECUTOR', 'queue')
+    return executor if executor in ('queue', 'inline') else 'queue'
+
+
+def report_cache_key(scope, filters, format, columns, watermark):
+    payload = json.dumps({
+        'scope': scope,
+        'filters': filters,
+        'format': format,
+        'columns': columns,
+        'watermark': watermark,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def artifact_name(cache_key, format):
+    return f'{ARTIFACT_DIR}/{cache_key}.{REPORT_FORMATS[format][1]}'
+
+
+def artifact_cutoff(max_age=None):
+    """Files last produced or reused before this time are expired"""
+    if max_age is None:
+        max_age = getattr(settings, 'REPORT_ARTIFACT_MAX_AGE', DEFAULT_ARTIFACT_MAX_AGE)
+    return timezone.now() - timedelta(seconds=max_age)
+
+
+def _report_complaints(user, filters):
+    complaints, report_filters = apply_report_filters(get_report_queryset(user), filters)
+    return complaints.order_by('created_at', 'id'), report_filters
+
+
+def find_cached_report(cache_key):
+    """Latest finished job whose artifact for this key still exists, or None"""
+    job = ReportJob.objects.filter(
+        cache_key=cache_key, status='done', finished_at__gte=artifact_cutoff()
+    ).exclude(file='').order_by('-finished_at').first()
+    if job and default_storage.exists(job.file.name):
+        return job
+    return None
+
+
+def submit_report(user, format, params, columns=None):
+    """
+    Request a report for a user.
+
+    Returns: (job, cached) - cached is True when the report was answered
+    from an existing artifact without generating anything.
+    """
+    if format not in REPORT_FORMATS:
+        raise ValueError(f"Unsupported format: {format}")
+
+    filters = {name: str(params[name]) for name in REPORT_FILTER_PARAMS if params.get(name)}
+    columns = list(columns or []) if format in STREAMING_FORMATS else []
+    scope = report_scope_key(user)
+
+    complaints, _ = _report_complaints(user, filters)
+    _, watermark = data_watermark(complaints)
+    cache_key = report_cache_key(scope, filters, format, columns, watermark)
+
+    job_fields = {
+        'requested_by': user, 'format': format, 'filters': filters, 'columns': columns,
+        'scope': scope, 'watermark': watermark, 'cache_key': cache_key,
+    }
+
+    cached = find_cached_report(cache_key)
+    if cached:
+        job = ReportJob.objects.create(
+            status='done', file=cached.file.name, row_count=cached.row_count,
+            finished_at=timezone.now(), **job_fields
+        )
+        return job, True
+
+    # The same report is already being generated for this user
+    in_flight = ReportJob.objects.filter(
+        requested_by=user, cache_key=cache_key, status__in=['pending', 'running']
+    ).first()
+    if in_flight:
+        return in_flight, False
+
+    job = ReportJob.objects.create(**job_fields)
+    if get_executor() == 'inline':
+        transaction.on_commit(lambda: run_job(job.pk))
+    return job, False
+
+
+def _write_report(complaints, format, output, filters, columns):
+    if format == 'excel':
+        write_excel_report(complaints, output, filters)
+    elif format == 'pdf':
+        output.write(generate_pdf_report(complaints, filters).getvalue())
+    else:
+        stream = STREAMING_FORMATS[format][0]
+        for block in stream(complaints, columns or None):
+            output.write(block)
+
+
+def generate_report(job):
+    """
+    Produce (or reuse) the artifact for a job and record it on the job.
+    The watermark is taken again at generation time, so the file is keyed
+    by the data it actually contains.
+    """
+    user = job.requested_by
+    complaints, report_filters = _report_complaints(user, job.filters)
+
+    job.scope = report_scope_key(user)
+    job.row_count, job.watermark = data_watermark(complaints)
+    job.cache_key = report_cache_key(job.scope, job.filters, job.format, job.columns, job.watermark)
+
+    name = artifact_name(job.cache_key, job.format)
+    if not default_storage.exists(name):
+        with tempfile.TemporaryFile() as output:
+            _write_report(complaints, job.format, output, report_filters, job.columns)
+            output.seek(0)
+            name = default_storage.save(name, File(output))
+    job.file.name = name
+    return job
+
+
+def _claim(job_id):
+    """Atomically move a due job from pending to running and count the attempt (see enrichment._claim)"""
+    now = timezone.now()
+    claimed = ReportJob.objects.filter(pk=job_id, status='pending', run_after__lte=now).update(
+        status='running', locked_at=now, attempts=F('attempts') + 1
+    )
+    return claimed == 1
+
+
+def run_job(job_id):
+    """
+    Claim and execute a single report job.
+    Returns True on success, False on failure and None if the job was not
+    due or was already claimed by another worker.
+    """
+    if not _claim(job_id):
+        return None
+
+    job = ReportJob.objects.select_related('requested_by').get(pk=job_id)
+
+    try:
+        generate_report(job)
+    except Exception as e:
+        logger.error(f"Report job {job.pk} ({job.format}) failed: {e}")
+        job.last_error = str(e)
+        job.locked_at = None
+        if job.attempts >= job.max_attempts:
+            job.status = 'failed'
+            job.finished_at = timezone.now()
+        else:
+            job.status = 'pending'
+            job.run_after = timezone.now() + timedelta(seconds=RETRY_BASE_DELAY * (2 ** (job.attempts - 1)))
+        job.save(update_fields=['status', 'last_error', 'locked_at', 'run_after', 'finished_at'])
+        return False
+
+    job.status = 'done'
+    job.finished_at = timezone.now()
+    job.locked_at = None
+    job.save(update_fields=[
+        'status', 'locked_at', 'finished_at',
+        'scope', 'watermark', 'cache_key', 'row_count', 'file',
+    ])
+    logger.info(f"Report job {job.pk} ({job.format}, {job.row_count} rows) stored as {job.file.name}")
+    return True
+
+
+def release_stale_jobs(lock_timeout=None):
+    """
+    Return jobs abandoned by a crashed worker to the queue.
+    Jobs that have used up their attempts are marked failed instead, so a
+    report that kills the worker (out of memory on a large export) is not
+    retried forever.
+    Returns the number of jobs released.
+    """
+    if lock_timeout is None:
+        lock_timeout = getattr(settings, 'REPORT_JOB_LOCK_TIMEOUT', DEFAULT_LOCK_TIMEOUT)
+    now = timezone.now()
+    stale = ReportJob.objects.filter(status='running', locked_at__lt=now - timedelta(seconds=lock_timeout))
+
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status='failed', locked_at=None, finished_at=now,
+        last_error='Worker stopped before the report was finished',
+    )
+    if failed:
+        logger.error(f"{failed} report job(s) abandoned after their last attempt")
+
+    return stale.update(status='pending', locked_at=None)
+
+
+def delete_expired_artifacts(max_age=None):
+    """
+    Delete report files that no job produced or reused within `max_age`
+    seconds (default REPORT_ARTIFACT_MAX_AGE), including files left behind
+    by deleted jobs, and clear them from their jobs.
+    Returns the number of files deleted.
+    """
+    cutoff = artifact_cutoff(max_age)
+    recent = set(
+        ReportJob.objects.filter(finished_at__gte=cutoff).exclude(file='').values_list('file', flat=True)
+    )
+    try:
+        _, filenames = default_storage.listdir(ARTIFACT_DIR)
+    except FileNotFoundError:
+        filenames = []
+
+    deleted = 0
+    for filename in filenames:
+        name = f'{ARTIFACT_DIR}/{filename}'
+        try:
+            # The modification time spares files a running job is writing
+            if name in recent or default_storage.get_modified_time(name) >= cutoff:
+                continue
+            default_storage.delete(name)
+            deleted += 1
+        except Exception as e:
+            logger.warning(f"Could not delete expired report file {name}: {e}")
+
+    ReportJob.objects.filter(finished_at__lt=cutoff).exclude(file='').exclude(file__in=recent).update(file='')
+    if deleted:
+        logger.info(f"Deleted {deleted} expired report file(s)")
+    return deleted
+
+
+def process_pending_jobs(batch_size=5):
+    """
+    Generate up to `batch_size` queued reports, oldest first.
+    Returns: (succeeded_count, failed_count)
+    """
+    release_stale_jobs()
+
+    job_ids = list(
+        ReportJob.objects.filter(status='pending', run_after__lte=timezone.now())
+        .order_by('run_after', 'id')
+        .values_list('id', flat=True)[:batch_size]
+    )
+
+    succeeded = 0
+    failed = 0
+    for job_id in job_ids:
+        result = run_job(job_id)
+        if result is True:
+            succeeded += 1
+        elif result is False:
+            failed += 1
+
+    return succeeded, failed
@@ -1,16 +1,23 @@
 """
 Reporting and export functionality for complaints
-Supports PDF and Excel export
+Supports PDF, Excel, CSV and NDJSON export
 """
 from .models import Complaint, ComplaintEvent, Category
-from accounts.models import CustomUser, Department, College, Campus
-from django.db.models import Q, Count, Avg, F, Sum
+from .rollup import rollup_statistics
+from .scoping import REPORT, complaint_scope, scoped_complaints, user_organisation_filter
+from accounts.models import CustomUser, College, Campus
+from django.db import connections
+from django.db.models import Q, Count, Avg, F, Max, Sum, Aggregate, DurationField, ExpressionWrapper
 from django.utils import timezone
 from datetime import timedelta
 import csv
 import json
+import logging
+import tempfile
 from io import BytesIO
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import get_column_letter
 from openpyxl.styles import Font, Alignment, PatternFill
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, A4
@@ -18,14 +25,16 @@ from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph,
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 
+logger = logging.getLogger(__name__)
+
 
 def generate_complaints_report(complaints_queryset, format='excel', filters=None):
     """
-    Generate a report of complaints in Excel or PDF format.
+    Generate a report of complaints in Excel, PDF, CSV or NDJSON format.
     
     Args:
         complaints_queryset: QuerySet of complaints
-        format: 'excel' or 'pdf'
+        format: 'excel', 'pdf', 'csv' or 'ndjson'
         filters: Dict of applied filters
     
     Returns:
@@ -35,73 +44,261 @@ def generate_complaints_report(complaints_queryset, format='excel', filters=None
         return generate_excel_report(complaints_queryset, filters)
     elif format == 'pdf':
         return generate_pdf_report(complaints_queryset, filters)
+    elif format in STREAMING_FORMATS:
+        stream = STREAMING_FORMATS[format][0]
+        return BytesIO(b''.join(stream(complaints_queryset)))
     else:
         raise ValueError(f"Unsupported format: {format}")
 
 
-def generate_excel_report(complaints_queryset, filters=None):
-    """Generate Excel report"""
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Complaints Report"
+# Rows fetched per database round trip when exporting
+EXPORT_CHUNK_SIZE = 2000
+
+# Rows buffered to estimate column widths (write-only sheets need them up front)
+WIDTH_SAMPLE_ROWS = 500
+
+EXCEL_HEADERS = [
+    'Tracking ID', 'Title', 'Status', 'Priority', 'Category', 
+    'Submitter', 'Assigned To', 'Location', 'Created At', 
+    'Resolved At', 'Resolution Time (hours)', 'Rating'
+]
+
+
+def _excel_row(complaint):
+    resolution_time = complaint.time_to_resolution()
+    return [
+        complaint.tracking_id,
+        complaint.title[:50],  # Truncate long titles
+        complaint.get_status_display(),
+        complaint.get_priority_display(),
+        complaint.category.name if complaint.category else 'N/A',
+        complaint.submitter.get_full_name() if complaint.submitter else 'Anonymous',
+        complaint.assigned_to.get_full_name() if complaint.assigned_to else 'Unassigned',
+        complaint.location,
+        complaint.created_at.strftime('%Y-%m-%d %H:%M'),
+        complaint.resolved_at.strftime('%Y-%m-%d %H:%M') if complaint.resolved_at else 'N/A',
+        f"{resolution_time:.1f}" if resolution_time else 'N/A',
+        complaint.feedback_rating if complaint.feedback_rating else 'N/A'
+    ]
+
+
+def write_excel_report(complaints_queryset, output, filters=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Write an Excel report to a binary file object in a single pass.
+    
+    Uses a write-only workbook, so rows are flushed to disk as they are
+    appended instead of being kept in memory. Related objects are joined in
+    the same query and rows are read from a server-side cursor in chunks.
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Complaints Report")
+    
+    rows = (
+        _excel_row(complaint)
+        for complaint in complaints_queryset.select_related(
+            'category', 'submitter', 'assigned_to'
+        ).iterator(chunk_size=chunk_size)
+    )
+    
+    # Estimate column widths from the header and the first rows
+    sample = []
+    widths = [len(header) for header in EXCEL_HEADERS]
+    for row in rows:
+        sample.append(row)
+        for i, value in enumerate(row):
+            widths[i] = max(widths[i], len(str(value)))
+        if len(sample) >= WIDTH_SAMPLE_ROWS:
+            break
+    for i, width in enumerate(widths):
+        ws.column_dimensions[get_column_letter(i + 1)].width = min(width + 2, 50)
     
     # Header style
     header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
     header_font = Font(bold=True, color="FFFFFF")
-    
-    # Headers
-    headers = [
-        'Tracking ID', 'Title', 'Status', 'Priority', 'Category', 
-        'Submitter', 'Assigned To', 'Location', 'Created At', 
-        'Resolved At', 'Resolution Time (hours)', 'Rating'
-    ]
-    ws.append(headers)
-    
-    # Style header row
-    for cell in ws[1]:
+    header_alignment = Alignment(horizontal='center', vertical='center')
+    header_row = []
+    for header in EXCEL_HEADERS:
+        cell = WriteOnlyCell(ws, value=header)
         cell.fill = header_fill
         cell.font = header_font
-        cell.alignment = Alignment(horizontal='center', vertical='center')
+        cell.alignment = header_alignment
+        header_row.append(cell)
+    ws.append(header_row)
     
     # Data rows
-    for complaint in complaints_queryset:
-        resolution_time = complaint.time_to_resolution()
-        row = [
-            complaint.tracking_id,
-            complaint.title[:50],  # Truncate long titles
-            complaint.get_status_display(),
-            complaint.get_priority_display(),
-            complaint.category.name if complaint.category else 'N/A',
-            complaint.submitter.get_full_name() if complaint.submitter else 'Anonymous',
-            complaint.assigned_to.get_full_name() if complaint.assigned_to else 'Unassigned',
-            complaint.location,
-            complaint.created_at.strftime('%Y-%m-%d %H:%M'),
-            complaint.resolved_at.strftime('%Y-%m-%d %H:%M') if complaint.resolved_at else 'N/A',
-            f"{resolution_time:.1f}" if resolution_time else 'N/A',
-            complaint.feedback_rating if complaint.feedback_rating else 'N/A'
-        ]
+    for row in sample:
+        ws.append(row)
+    for row in rows:
         ws.append(row)
     
-    # Auto-adjust column widths
-    for column in ws.columns:
-        max_length = 0
-        column_letter = column[0].column_letter
-        for cell in column:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
-        adjusted_width = min(max_length + 2, 50)
-        ws.column_dimensions[column_letter].width = adjusted_width
-    
-    # Save to BytesIO
-    output = BytesIO()
     wb.save(output)
+    return output
+
+
+def generate_excel_report(complaints_queryset, filters=None):
+    """Generate Excel report"""
+    output = write_excel_report(complaints_queryset, BytesIO(), filters)
     output.seek(0)
     return output
 
 
+def stream_excel_report(complaints_queryset, filters=None, block_size=64 * 1024):
+    """
+    Generate an Excel report and yield it in blocks, for StreamingHttpResponse.
+    The workbook is assembled in a temporary file, so memory use does not grow
+    with the number of rows.
+    """
+    with tempfile.TemporaryFile() as output:
+        try:
+            write_excel_report(complaints_queryset, output, filters)
+        except Exception as e:
+            logger.error(f"Failed to generate Excel report: {e}")
+            raise
+        output.seek(0)
+        while True:
+            block = output.read(block_size)
+            if not block:
+                break
+            yield block
+
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+
+def _person(prefix):
+    def format_person(row):
+        name = f"{row[f'{prefix}__first_name'] or ''} {row[f'{prefix}__last_name'] or ''}".strip()
+        return name or row[f'{prefix}__username']
+    return format_person
+
+
+def _submitter(row):
+    if row['is_anonymous']:
+        return 'Anonymous'
+    return _person('submitter')(row)
+
+
+def _resolution_hours(row):
+    if not row['resolved_at']:
+        return None
+    return round((row['resolved_at'] - row['created_at']).total_seconds() / 3600, 2)
+
+
+# Columns available to the row-streaming (CSV/NDJSON) exports:
+# name -> (database fields to fetch, function turning a values() row into the cell)
+EXPORT_COLUMNS = {
+    'tracking_id': (['tracking_id'], lambda row: row['tracking_id']),
+    'title': (['title'], lambda row: row['title']),
+    'description': (['description'], lambda row: row['description']),
+    'status': (['status'], lambda row: row['status']),
+    'priority': (['priority'], lambda row: row['priority']),
+    'urgency': (['urgency'], lambda row: row['urgency']),
+    'category': (['category__name'], lambda row: row['category__name']),
+    'sub_category': (['sub_category__name'], lambda row: row['sub_category__name']),
+    'campus': (['campus__name'], lambda row: row['campus__name']),
+    'department': (['department__name'], lambda row: row['department__name']),
+    'location': (['location'], lambda row: row['location']),
+    'submitter': (
+        ['is_anonymous', 'submitter__username', 'submitter__first_name', 'submitter__last_name'],
+        _submitter
+    ),
+    'assigned_to': (
+        ['assigned_to__username', 'assigned_to__first_name', 'assigned_to__last_name'],
+        _person('assigned_to')
+    ),
+    'created_at': (['created_at'], lambda row: _iso(row['created_at'])),
+    'assigned_at': (['assigned_at'], lambda row: _iso(row['assigned_at'])),
+    'first_response_at': (['first_response_at'], lambda row: _iso(row['first_response_at'])),
+    'resolved_at': (['resolved_at'], lambda row: _iso(row['resolved_at'])),
+    'closed_at': (['closed_at'], lambda row: _iso(row['closed_at'])),
+    'resolution_time_hours': (['resolved_at', 'created_at'], _resolution_hours),
+    'feedback_rating': (['feedback_rating'], lambda row: row['feedback_rating']),
+    'sla_response_breached': (['sla_response_breached'], lambda row: row['sla_response_breached']),
+    'sla_resolution_breached': (['sla_resolution_breached'], lambda row: row['sla_resolution_breached']),
+}
+
+DEFAULT_EXPORT_COLUMNS = [
+    'tracking_id', 'title', 'status', 'priority', 'category', 'submitter', 'assigned_to',
+    'location', 'created_at', 'resolved_at', 'resolution_time_hours', 'feedback_rating',
+]
+
+
+def parse_export_columns(value):
+    """
+    Parse a comma-separated column list (None/empty -> defaults).
+    Raises ValueError naming any unknown columns.
+    """
+    if not value:
+        return list(DEFAULT_EXPORT_COLUMNS)
+    columns = [column.strip() for column in value.split(',') if column.strip()]
+    unknown = [column for column in columns if column not in EXPORT_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+    return columns
+
+
+def iter_export_rows(complaints_queryset, columns, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield one list of cell values per complaint, straight from the database cursor"""
+    fields = []
+    for column in columns:
+        for field in EXPORT_COLUMNS[column][0]:
+            if field not in fields:
+                fields.append(field)
+    formatters = [EXPORT_COLUMNS[column][1] for column in columns]
+    
+    for row in complaints_queryset.values(*fields).iterator(chunk_size=chunk_size):
+        yield [format_cell(row) for format_cell in formatters]
+
+
+class _Echo:
+    """File-like object whose write() returns the value, for csv.writer"""
+    def write(self, value):
+        return value
+
+
+def stream_csv_report(complaints_queryset, columns=None, batch_rows=500):
+    """Yield a CSV export (header + one line per complaint) in encoded batches"""
+    columns = columns or list(DEFAULT_EXPORT_COLUMNS)
+    writer = csv.writer(_Echo())
+    batch = [writer.writerow(columns)]
+    for row in iter_export_rows(complaints_queryset, columns):
+        batch.append(writer.writerow(row))
+        if len(batch) >= batch_rows:
+            yield ''.join(batch).encode('utf-8')
+            batch = []
+    if batch:
+        yield ''.join(batch).encode('utf-8')
+
+
+def stream_ndjson_report(complaints_queryset, columns=None, batch_rows=500):
+    """Yield a newline-delimited JSON export (one object per complaint) in encoded batches"""
+    columns = columns or list(DEFAULT_EXPORT_COLUMNS)
+    batch = []
+    for row in iter_export_rows(complaints_queryset, columns):
+        batch.append(json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=str))
+        if len(batch) >= batch_rows:
+            yield ('\n'.join(batch) + '\n').encode('utf-8')
+            batch = []
+    if batch:
+        yield ('\n'.join(batch) + '\n').encode('utf-8')
+
+
+REPORT_FORMATS = {
+    # format -> (content type, file extension)
+    'excel': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+    'pdf': ('application/pdf', 'pdf'),
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+STREAMING_FORMATS = {
+    # format -> (generator, content type, file extension)
+    'csv': (stream_csv_report, 'text/csv; charset=utf-8', 'csv'),
+    'ndjson': (stream_ndjson_report, 'application/x-ndjson', 'ndjson'),
+}
+
+
 def generate_pdf_report(complaints_queryset, filters=None):
     """Generate PDF report"""
     buffer = BytesIO()
@@ -168,39 +365,114 @@ def generate_pdf_report(complaints_queryset, filters=None):
     return buffer
 
 
+def get_report_queryset(user):
+    """Complaints a user may report on, based on their role"""
+    return scoped_complaints(user, REPORT)
+
+
+def report_scope_key(user):
+    """
+    Identify the set of complaints get_report_queryset returns for a user.
+    Users with the same key see exactly the same complaints.
+    """
+    role = user.role
+    
+    if role == 'student':
+        return f'submitter:{user.pk}'
+    elif role == 'dept_head':
+        return f'department:{user.department_id or "-"}'
+    elif role == 'dean':
+        college_id = user.department.college_id if user.department else None
+        return f'college:{college_id or "-"}'
+    elif role == 'campus_director':
+        return f'campus:{user.campus_id or "-"}'
+    elif role in ['admin', 'super_admin']:
+        return 'all'
+    else:
+        return f'assignee:{user.pk}'
+
+
+REPORT_FILTER_PARAMS = ['status', 'priority', 'category', 'date_from', 'date_to']
+
+
+def apply_report_filters(complaints, params):
+    """
+    Apply the export query parameters (status, priority, category,
+    date_from, date_to) to a complaint queryset.
+    Returns: (filtered queryset, filters dict for the report header)
+    """
+    status_filter = params.get('status')
+    priority_filter = params.get('priority')
+    category_filter = params.get('category')
+    date_from = params.get('date_from')
+    date_to = params.get('date_to')
+    
+    if status_filter:
+        complaints = complaints.filter(status=status_filter)
+    if priority_filter:
+        complaints = complaints.filter(priority=priority_filter)
+    if category_filter:
+        complaints = complaints.filter(category_id=category_filter)
+    if date_from:
+        complaints = complaints.filter(created_at__gte=date_from)
+    if date_to:
+        complaints = complaints.filter(created_at__lte=date_to)
+    
+    # Build filters dict for report
+    filters = {}
+    if status_filter:
+        filters['Status'] = status_filter
+    if priority_filter:
+        filters['Priority'] = priority_filter
+    
+    return complaints, filters
+
+
+def data_watermark(complaints):
+    """
+    Cheap fingerprint of a complaint queryset's current data: row count plus
+    the latest updated_at. Changes whenever a complaint in the set is
+    created, edited or deleted (or moves in or out of the set).
+    Returns: (row count, watermark string)
+    """
+    result = complaints.aggregate(count=Count('id'), last_update=Max('updated_at'))
+    last_update = result['last_update'].isoformat() if result['last_update'] else '-'
+    return result['count'], f"{result['count']}:{last_update}"
+
+
+def rollup_scope(user, role):
+    """
+    Filter on ComplaintDailyRollup rows visible to a role, or None when the
+    role is scoped by something the rollup doesn't record (submitter/assignee).
+    """
+    return user_organisation_filter(user, role)
+
+
 def get_dashboard_statistics(user, role, date_range=None):
     """
     Get comprehensive statistics for dashboard based on user role.
     Returns dict with various metrics.
+    
+    Campus, college, department and system-wide statistics come from the
+    daily rollup (whole days, local time); per-user statistics are computed
+    from the complaints themselves.
     """
     if date_range is None:
         date_range = (timezone.now() - timedelta(days=30), timezone.now())
     
     start_date, end_date = date_range
     
+    # Roles scoped by campus/department/college read the daily rollup
+    scope = rollup_scope(user, role)
+    if scope is not None:
+        return rollup_statistics(
+            scope,
+            timezone.localdate(start_date),
+            timezone.localdate(end_date)
+        )
+    
     # Base queryset based on role
-    if role == 'student':
-        complaints = Complaint.objects.filter(submitter=user)
-    elif role == 'dept_head':
-        if user.department:
-            complaints = Complaint.objects.filter(department=user.department)
-        else:
-            complaints = Complaint.objects.none()
-    elif role == 'dean':
-        if user.department and user.department.college:
-            departments = Department.objects.filter(college=user.department.college)
-            complaints = Complaint.objects.filter(department__in=departments)
-        else:
-            complaints = Complaint.objects.none()
-    elif role == 'campus_director':
-        if user.campus:
-            complaints = Complaint.objects.filter(campus=user.campus)
-        else:
-            complaints = Complaint.objects.none()
-    elif role in ['admin', 'super_admin']:
-        complaints = Complaint.objects.all()
-    else:
-        complaints = Complaint.objects.filter(assigned_to=user)
+    complaints = Complaint.objects.filter(complaint_scope(user, REPORT, role))
     
     # Filter by date range
     complaints = complaints.filter(created_at__range=date_range)
@@ -235,14 +507,11 @@ def get_dashboard_statistics(user, role, date_range=None):
                            for item in category_stats}
     
     # Average resolution time
-    resolved_complaints = complaints.filter(status__in=['resolved', 'closed'])
-    if resolved_complaints.exists():
-        resolution_times = [
-            c.time_to_resolution() for c in resolved_complaints 
-            if c.time_to_resolution() is not None
-        ]
-        if resolution_times:
-            stats['average_resolution_time'] = sum(resolution_times) / len(resolution_times)
+    stats['average_resolution_time'] = _hours(
+        complaints.filter(
+            status__in=['resolved', 'closed'], resolved_at__isnull=False
+        ).aggregate(avg=Avg(duration_expression('resolved_at')))['avg']
+    )
     
     # Average rating
     rated = complaints.exclude(feedback_rating__isnull=True)
@@ -251,3 +520,154 @@ def get_dashboard_statistics(user, role, date_range=None):
     
     return stats
 
+
+
+# Time-to-first-response / time-to-resolution metrics
+#
+# PostgreSQL computes percentiles in the same aggregate query with
+# PERCENTILE_CONT. Other backends (SQLite) have no percentile aggregate, so
+# each percentile is read with an ORDER BY ... LIMIT 2 OFFSET k query and
+# interpolated the same way PERCENTILE_CONT does.
+
+PERCENTILES = {'median': 0.5, 'p90': 0.9, 'p95': 0.95}
+
+DURATION_METRICS = {
+    'response_time': ('first_response_at', Q()),
+    'resolution_time': ('resolved_at', Q(status__in=['resolved', 'closed'])),
+}
+
+BREAKDOWN_FIELDS = {
+    # group_by -> (grouping field, label field)
+    'priority': ('priority', 'priority'),
+    'category': ('category_id', 'category__name'),
+    'campus': ('campus_id', 'campus__name'),
+    'department': ('department_id', 'department__name'),
+}
+
+
+class PercentileCont(Aggregate):
+    """PERCENTILE_CONT(p) WITHIN GROUP (ORDER BY expr) - PostgreSQL only"""
+    function = 'PERCENTILE_CONT'
+    name = 'PercentileCont'
+    template = '%(function)s(%(percentile)s) WITHIN GROUP (ORDER BY %(expressions)s)'
+    
+    def __init__(self, expression, percentile, **extra):
+        percentile = float(percentile)
+        if not 0 <= percentile <= 1:
+            raise ValueError(f"Percentile must be between 0 and 1, got {percentile}")
+        super().__init__(expression, percentile=percentile, **extra)
+
+
+def duration_expression(end_field, start_field='created_at'):
+    return ExpressionWrapper(F(end_field) - F(start_field), output_field=DurationField())
+
+
+def _hours(duration):
+    if duration is None:
+        return None
+    return duration.total_seconds() / 3600
+
+
+def _ordered_percentile(queryset, percentile, count):
+    """Interpolated percentile of the annotated `duration` from ordered rows"""
+    if not count:
+        return None
+    position = percentile * (count - 1)
+    lower = int(position)
+    fraction = position - lower
+    values = list(
+        queryset.order_by('duration').values_list('duration', flat=True)[lower:lower + 2]
+    )
+    if fraction == 0 or len(values) == 1:
+        return values[0]
+    return values[0] + (values[1] - values[0]) * fraction
+
+
+def _duration_rows(queryset, metric):
+    """Complaints a metric applies to, annotated with their `duration`"""
+    end_field, metric_filter = DURATION_METRICS[metric]
+    return queryset.filter(metric_filter, **{f'{end_field}__isnull': False}).annotate(
+        duration=duration_expression(end_field)
+    )
+
+
+def time_metric_aggregates(native):
+    """
+    Count, mean and (with `native` PERCENTILE_CONT) percentiles of every
+    duration metric, each filtered to the complaints the metric applies to,
+    so all metrics - and all groups of a breakdown - come from one query.
+    """
+    aggregates = {}
+    for metric, (end_field, metric_filter) in DURATION_METRICS.items():
+        condition = metric_filter & Q(**{f'{end_field}__isnull': False})
+        duration = duration_expression(end_field)
+        aggregates[f'{metric}_count'] = Count('id', filter=condition)
+        aggregates[f'{metric}_mean'] = Avg(duration, filter=condition)
+        if native:
+            for name, percentile in PERCENTILES.items():
+                aggregates[f'{metric}_{name}'] = PercentileCont(
+                    duration, percentile, filter=condition, output_field=DurationField()
+                )
+    return aggregates
+
+
+def _metric_stats(result, queryset, metric, native):
+    """
+    Stats (in hours) of one metric from a time_metric_aggregates() row;
+    without native percentiles they are read from `queryset` instead.
+    """
+    count = result[f'{metric}_count']
+    values = {'mean': result[f'{metric}_mean']}
+    for name, percentile in PERCENTILES.items():
+        if native:
+            values[name] = result[f'{metric}_{name}']
+        else:
+            values[name] = _ordered_percentile(_duration_rows(queryset, metric), percentile, count)
+    
+    stats = {'count': count}
+    for name in ['mean', *PERCENTILES]:
+        value = _hours(values[name])
+        stats[f'{name}_hours'] = round(value, 2) if value is not None else None
+    return stats
+
+
+def _native_percentiles(queryset):
+    return connections[queryset.db].vendor == 'postgresql'
+
+
+def duration_stats(queryset, metric):
+    """
+    Count, mean, median, p90 and p95 (in hours) of a duration metric
+    ('response_time' or 'resolution_time') over a complaint queryset.
+    """
+    native = _native_percentiles(queryset)
+    result = queryset.aggregate(**time_metric_aggregates(native))
+    return _metric_stats(result, queryset, metric, native)
+
+
+def get_time_metrics(complaints, group_by=None):
+    """
+    Response/resolution time distribution for a complaint queryset,
+    optionally broken down by priority, category, campus or department.
+    The breakdown is one grouped query; only the percentile fallback
+    still queries each group.
+    """
+    native = _native_percentiles(complaints)
+    aggregates = time_metric_aggregates(native)
+    
+    overall = complaints.aggregate(**aggregates)
+    metrics = {metric: _metric_stats(overall, complaints, metric, native) for metric in DURATION_METRICS}
+    
+    if group_by:
+        group_field, label_field = BREAKDOWN_FIELDS[group_by]
+        rows = complaints.order_by().values(*dict.fromkeys([group_field, label_field])).annotate(**aggregates)
+        breakdown = []
+        for row in sorted(rows, key=lambda row: (row[label_field] is None, str(row[label_field]))):
+            group_complaints = complaints.filter(**{group_field: row[group_field]})
+            entry = {'group': row[label_field] if row[label_field] is not None else 'Unspecified'}
+            for metric in DURATION_METRICS:
+                entry[metric] = _metric_stats(row, group_complaints, metric, native)
+            breakdown.append(entry)
+        metrics['breakdown'] = breakdown
+    
+    return metrics
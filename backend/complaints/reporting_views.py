@@ -4,12 +4,17 @@ Reporting and export views
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse, FileResponse
 from django.utils import timezone
 from datetime import timedelta
-from .models import Complaint
-from .reporting import generate_complaints_report, get_dashboard_statistics
-from .serializers import ComplaintSerializer
+from .models import ReportJob
+from .reporting import (
+    generate_complaints_report, stream_excel_report, get_dashboard_statistics, get_time_metrics,
+    parse_export_columns, apply_report_filters, get_report_queryset,
+    BREAKDOWN_FIELDS, EXPORT_COLUMNS, REPORT_FORMATS, STREAMING_FORMATS
+)
+from .report_jobs import submit_report
+from .serializers import ComplaintSerializer, ReportJobSerializer
 import logging
 
 logger = logging.getLogger(__name__)
@@ -21,50 +26,61 @@ class ReportingViewSet(viewsets.ViewSet):
     """
     permission_classes = [permissions.IsAuthenticated]
     
+    def perform_content_negotiation(self, request, force=False):
+        # ?format= picks the export file type here, not a DRF renderer;
+        # fall back to the default renderer instead of answering 404
+        return super().perform_content_negotiation(request, force=True)
+    
     @action(detail=False, methods=['get'])
     def export(self, request):
-        """Export complaints as Excel or PDF"""
-        format_type = request.query_params.get('format', 'excel')  # 'excel' or 'pdf'
+        """
+        Export complaints as Excel, PDF, CSV or NDJSON
+        CSV/NDJSON accept ?columns=tracking_id,status,... (see EXPORT_COLUMNS)
+        """
+        format_type = request.query_params.get('format', 'excel')  # 'excel', 'pdf', 'csv' or 'ndjson'
         
         # Get complaints based on user role
         complaints = self.get_complaints_queryset(request.user)
         
         # Apply filters
-        status_filter = request.query_params.get('status')
-        priority_filter = request.query_params.get('priority')
-        category_filter = request.query_params.get('category')
-        date_from = request.query_params.get('date_from')
-        date_to = request.query_params.get('date_to')
-        
-        if status_filter:
-            complaints = complaints.filter(status=status_filter)
-        if priority_filter:
-            complaints = complaints.filter(priority=priority_filter)
-        if category_filter:
-            complaints = complaints.filter(category_id=category_filter)
-        if date_from:
-            complaints = complaints.filter(created_at__gte=date_from)
-        if date_to:
-            complaints = complaints.filter(created_at__lte=date_to)
-        
-        # Build filters dict for report
-        filters = {}
-        if status_filter:
-            filters['Status'] = status_filter
-        if priority_filter:
-            filters['Priority'] = priority_filter
+        complaints, filters = apply_report_filters(complaints, request.query_params)
+        
+        if format_type in STREAMING_FORMATS:
+            try:
+                columns = parse_export_columns(request.query_params.get('columns'))
+            except ValueError as e:
+                return Response(
+                    {'error': str(e), 'available_columns': list(EXPORT_COLUMNS)},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            # Rows go out as the database cursor yields them
+            stream, content_type, extension = STREAMING_FORMATS[format_type]
+            filename = f'complaints_report_{timezone.now().strftime("%Y%m%d_%H%M%S")}.{extension}'
+            response = StreamingHttpResponse(
+                stream(complaints.order_by('created_at', 'id'), columns),
+                content_type=content_type
+            )
+            response['Content-Disposition'] = f'attachment; filename="{filename}"'
+            return response
         
         try:
+            if format_type == 'excel':
+                # Stream the workbook; rows are never all held in memory
+                filename = f'complaints_report_{timezone.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
+                response = StreamingHttpResponse(
+                    stream_excel_report(complaints, filters=filters),
+                    content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+                )
+                response['Content-Disposition'] = f'attachment; filename="{filename}"'
+                return response
+            
             # Generate report
             report_buffer = generate_complaints_report(complaints, format=format_type, filters=filters)
             
-            # Determine content type and file extension
-            if format_type == 'excel':
-                content_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-                filename = f'complaints_report_{timezone.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
-            else:  # PDF
-                content_type = 'application/pdf'
-                filename = f'complaints_report_{timezone.now().strftime("%Y%m%d_%H%M%S")}.pdf'
+            # PDF
+            content_type = 'application/pdf'
+            filename = f'complaints_report_{timezone.now().strftime("%Y%m%d_%H%M%S")}.pdf'
             
             # Create response
             response = HttpResponse(
@@ -99,28 +115,105 @@ class ReportingViewSet(viewsets.ViewSet):
         
         return Response(stats)
     
+    @action(detail=False, methods=['get'])
+    def percentiles(self, request):
+        """
+        Mean/median/p90/p95 of time-to-first-response and time-to-resolution
+        GET /api/complaints/reports/percentiles/?days=90&group_by=priority
+        """
+        try:
+            days = int(request.query_params.get('days', 30))
+        except ValueError:
+            return Response({'error': 'days must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        group_by = request.query_params.get('group_by')
+        if group_by and group_by not in BREAKDOWN_FIELDS:
+            return Response(
+                {'error': f"group_by must be one of: {', '.join(BREAKDOWN_FIELDS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        complaints = self.get_complaints_queryset(request.user).filter(
+            created_at__gte=timezone.now() - timedelta(days=days)
+        )
+        
+        metrics = get_time_metrics(complaints, group_by=group_by)
+        metrics['days'] = days
+        return Response(metrics)
+    
+    @action(detail=False, methods=['get', 'post'], url_path='jobs')
+    def jobs(self, request):
+        """
+        GET: the user's recent report jobs
+        POST: queue a report {format, columns?, status?, priority?, category?, date_from?, date_to?}
+        Identical reports over unchanged data are answered from the cached file.
+        """
+        if request.method == 'GET':
+            jobs = ReportJob.objects.filter(requested_by=request.user)[:20]
+            return Response(ReportJobSerializer(jobs, many=True, context={'request': request}).data)
+        
+        format_type = request.data.get('format', 'excel')
+        if format_type not in REPORT_FORMATS:
+            return Response(
+                {'error': f"format must be one of: {', '.join(REPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        columns = []
+        if format_type in STREAMING_FORMATS:
+            try:
+                columns = parse_export_columns(request.data.get('columns'))
+            except ValueError as e:
+                return Response(
+                    {'error': str(e), 'available_columns': list(EXPORT_COLUMNS)},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        
+        job, cached = submit_report(request.user, format_type, request.data, columns)
+        
+        data = ReportJobSerializer(job, context={'request': request}).data
+        data['cached'] = cached
+        return Response(data, status=status.HTTP_200_OK if job.status == 'done' else status.HTTP_202_ACCEPTED)
+    
+    @action(detail=False, methods=['get'], url_path=r'jobs/(?P<job_id>[0-9]+)')
+    def job_status(self, request, job_id=None):
+        """Poll a report job"""
+        try:
+            job = ReportJob.objects.get(pk=job_id, requested_by=request.user)
+        except ReportJob.DoesNotExist:
+            return Response({'error': 'Report job not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        return Response(ReportJobSerializer(job, context={'request': request}).data)
+    
+    @action(detail=False, methods=['get'], url_path=r'jobs/(?P<job_id>[0-9]+)/download')
+    def job_download(self, request, job_id=None):
+        """Download a finished report"""
+        try:
+            job = ReportJob.objects.get(pk=job_id, requested_by=request.user)
+        except ReportJob.DoesNotExist:
+            return Response({'error': 'Report job not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        if job.status != 'done':
+            return Response(
+                {'error': 'Report is not ready', 'status': job.status},
+                status=status.HTTP_409_CONFLICT
+            )
+        if not job.file:
+            return Response({'error': 'Report file has expired'}, status=status.HTTP_410_GONE)
+        
+        content_type, extension = REPORT_FORMATS[job.format]
+        try:
+            report_file = job.file.open('rb')
+        except FileNotFoundError:
+            return Response({'error': 'Report file is no longer available'}, status=status.HTTP_410_GONE)
+        
+        return FileResponse(
+            report_file,
+            as_attachment=True,
+            filename=f'complaints_report_{job.pk}.{extension}',
+            content_type=content_type
+        )
+    
     def get_complaints_queryset(self, user):
         """Get complaints queryset based on user role"""
-        role = user.role
-        
-        if role == 'student':
-            return Complaint.objects.filter(submitter=user)
-        elif role == 'dept_head':
-            if user.department:
-                return Complaint.objects.filter(department=user.department)
-            return Complaint.objects.none()
-        elif role == 'dean':
-            if user.department and user.department.college:
-                from accounts.models import Department
-                departments = Department.objects.filter(college=user.department.college)
-                return Complaint.objects.filter(department__in=departments)
-            return Complaint.objects.none()
-        elif role == 'campus_director':
-            if user.campus:
-                return Complaint.objects.filter(campus=user.campus)
-            return Complaint.objects.none()
-        elif role in ['admin', 'super_admin']:
-            return Complaint.objects.all()
-        else:
-            return Complaint.objects.filter(assigned_to=user)
-
+        return get_report_queryset(user)
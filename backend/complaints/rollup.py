@@ -0,0 +1,231 @@
+"""
+Materialized daily complaint statistics
+
+ComplaintDailyRollup holds, per (creation date, campus, department, category,
+priority, status), how many complaints there are plus the sums needed for
+SLA, rating and resolution-time statistics. Complaint save/delete signals
+move a complaint's contribution between rollup keys as it changes, so
+statistics over any date range read a few rows per day instead of scanning
+every complaint.
+
+Rows are always read through SUM(), which keeps incremental maintenance
+simple: a delta is applied with an UPDATE ... SET x = x + delta, and a
+concurrent insert of the same key merely produces a second row.
+
+Changes made with QuerySet.update()/bulk_update() bypass the signals;
+callers either report them through record_changes() or the
+`rebuild_complaint_rollup` management command is run after the edit.
+"""
+from django.db import transaction
+from django.db.models import F, Q, Sum, Subquery
+from django.utils import timezone
+
+from .models import Complaint, ComplaintDailyRollup
+
+KEY_FIELDS = ['date', 'campus_id', 'department_id', 'category_id', 'priority', 'status']
+
+MEASURES = [
+    'complaint_count', 'sla_breached_count', 'rating_count', 'rating_sum',
+    'resolved_count', 'resolution_hours_sum',
+]
+
+# Complaint fields a rollup contribution depends on
+TRACKED_FIELDS = frozenset([
+    'created_at', 'campus', 'department', 'category', 'priority', 'status',
+    'sla_response_breached', 'sla_resolution_breached', 'feedback_rating', 'resolved_at',
+])
+
+_VALUE_FIELDS = [
+    'created_at', 'campus_id', 'department_id', 'category_id', 'priority', 'status',
+    'sla_response_breached', 'sla_resolution_breached', 'feedback_rating', 'resolved_at',
+]
+
+
+def stored_values(pk, extra_fields=()):
+    """
+    The tracked fields of a complaint as currently stored in the database,
+    plus any extra_fields other counters need from the same row
+    """
+    fields = _VALUE_FIELDS + [field for field in extra_fields if field not in _VALUE_FIELDS]
+    return Complaint.objects.filter(pk=pk).values(*fields).first()
+
+
+def current_values(complaint):
+    """The tracked fields of an in-memory complaint"""
+    return {field: getattr(complaint, field) for field in _VALUE_FIELDS}
+
+
+def contribution(values):
+    """
+    Return (key, measures) that a complaint with these field values adds
+    to the rollup, or None if it cannot be counted yet.
+    """
+    if not values or values.get('created_at') is None:
+        return None
+
+    key = {
+        'date': timezone.localdate(values['created_at']),
+        'campus_id': values['campus_id'],
+        'department_id': values['department_id'],
+        'category_id': values['category_id'],
+        'priority': values['priority'],
+        'status': values['status'],
+    }
+
+    rating = values['feedback_rating']
+    resolved = values['status'] in ['resolved', 'closed'] and values['resolved_at'] is not None
+    measures = {
+        'complaint_count': 1,
+        'sla_breached_count': int(bool(values['sla_response_breached'] or values['sla_resolution_breached'])),
+        'rating_count': int(rating is not None),
+        'rating_sum': rating or 0,
+        'resolved_count': int(resolved),
+        'resolution_hours_sum': (
+            (values['resolved_at'] - values['created_at']).total_seconds() / 3600 if resolved else 0.0
+        ),
+    }
+    return key, measures
+
+
+def _apply(key, measures, sign):
+    delta = {name: value * sign for name, value in measures.items() if value}
+    if not delta:
+        return
+    # Update a single row of the key: other rows with the same key must not be touched
+    one_row = ComplaintDailyRollup.objects.filter(**key).values('pk')[:1]
+    updated = ComplaintDailyRollup.objects.filter(pk=Subquery(one_row)).update(
+        **{name: F(name) + value for name, value in delta.items()}
+    )
+    if not updated:
+        ComplaintDailyRollup.objects.create(**key, **delta)
+
+
+def record_change(old_values, new_values):
+    """
+    Move a complaint's contribution from its old values to its new values.
+    Pass None as old_values for a new complaint and as new_values for a
+    deleted one.
+    """
+    old = contribution(old_values)
+    new = contribution(new_values)
+    if old == new:
+        return
+
+    with transaction.atomic():
+        if old is not None and new is not None and old[0] == new[0]:
+            # Same key: apply the difference of the measures only
+            _apply(new[0], {name: new[1][name] - old[1][name] for name in MEASURES}, 1)
+            return
+        if old is not None:
+            _apply(old[0], old[1], -1)
+        if new is not None:
+            _apply(new[0], new[1], 1)
+
+
+def record_changes(changes):
+    """
+    Apply many (old_values, new_values) moves at once, for bulk updates that
+    bypass the save signals. Deltas are merged per key, so this costs one
+    UPDATE per affected rollup key rather than per complaint.
+    """
+    deltas = {}
+    for old_values, new_values in changes:
+        for result, sign in ((contribution(old_values), -1), (contribution(new_values), 1)):
+            if result is None:
+                continue
+            key, measures = result
+            row = deltas.setdefault(tuple(key[field] for field in KEY_FIELDS), dict.fromkeys(MEASURES, 0))
+            for name in MEASURES:
+                row[name] += measures[name] * sign
+
+    with transaction.atomic():
+        for row_key, measures in deltas.items():
+            _apply(dict(zip(KEY_FIELDS, row_key)), measures, 1)
+
+
+def rebuild(chunk_size=2000, complaint_model=Complaint, rollup_model=ComplaintDailyRollup):
+    """
+    Recompute the whole rollup from the Complaint table.
+    Complaints saved while the rebuild runs may be missed; run it again
+    (or during a quiet period) if exact numbers matter.
+    Data migrations pass their historical models.
+    Returns the number of complaints counted.
+    """
+    totals = {}
+    count = 0
+    for values in complaint_model.objects.values(*_VALUE_FIELDS).iterator(chunk_size=chunk_size):
+        result = contribution(values)
+        if result is None:
+            continue
+        key, measures = result
+        row_key = tuple(key[field] for field in KEY_FIELDS)
+        row = totals.setdefault(row_key, dict.fromkeys(MEASURES, 0))
+        for name in MEASURES:
+            row[name] += measures[name]
+        count += 1
+
+    with transaction.atomic():
+        rollup_model.objects.all().delete()
+        rollup_model.objects.bulk_create(
+            [
+                rollup_model(**dict(zip(KEY_FIELDS, row_key)), **measures)
+                for row_key, measures in totals.items()
+            ],
+            batch_size=chunk_size,
+        )
+    return count
+
+
+def rollup_statistics(scope=Q(), start_date=None, end_date=None):
+    """
+    Statistics for complaints created between start_date and end_date
+    (inclusive dates), read from the rollup. `scope` filters rollup rows,
+    e.g. Q(campus_id=1) or Q(department__college_id=2).
+
+    Returns the same structure as reporting.get_dashboard_statistics.
+    """
+    rows = ComplaintDailyRollup.objects.filter(scope)
+    if start_date is not None:
+        rows = rows.filter(date__gte=start_date)
+    if end_date is not None:
+        rows = rows.filter(date__lte=end_date)
+
+    aggregates = {
+        'total': Sum('complaint_count'),
+        'sla_breaches': Sum('sla_breached_count'),
+        'rating_count': Sum('rating_count'),
+        'rating_sum': Sum('rating_sum'),
+        'resolved_count': Sum('resolved_count'),
+        'resolution_hours_sum': Sum('resolution_hours_sum'),
+    }
+    for status in ['new', 'assigned', 'in_progress', 'resolved', 'closed', 'rejected']:
+        aggregates[status] = Sum('complaint_count', filter=Q(status=status))
+    for priority in ['critical', 'high', 'medium', 'low']:
+        aggregates[f'priority_{priority}'] = Sum('complaint_count', filter=Q(priority=priority))
+    totals = {name: value or 0 for name, value in rows.aggregate(**aggregates).items()}
+
+    category_stats = rows.values('category__name').annotate(
+        count=Sum('complaint_count')
+    ).filter(count__gt=0).order_by('-count')[:10]
+
+    stats = {
+        'total': totals['total'],
+        'new': totals['new'],
+        'assigned': totals['assigned'],
+        'in_progress': totals['in_progress'],
+        'resolved': totals['resolved'],
+        'closed': totals['closed'],
+        'rejected': totals['rejected'],
+        'by_priority': {
+            priority: totals[f'priority_{priority}'] for priority in ['critical', 'high', 'medium', 'low']
+        },
+        'by_category': {
+            item['category__name'] or 'Uncategorized': item['count'] for item in category_stats
+        },
+        'sla_breaches': totals['sla_breaches'],
+        'average_resolution_time': (
+            totals['resolution_hours_sum'] / totals['resolved_count'] if totals['resolved_count'] else None
+        ),
+        'average_rating': totals['rating_sum'] / totals['rating_count'] if totals['rating_count'] else None,
+    }
+    return stats
@@ -1,138 +1,219 @@
 """
 Routing engine for automatic complaint assignment based on rules
+
+Active routing rules and the category -> department fallback mapping are
+compiled into a RoutingTable, cached per process (see index_cache.py) and
+rebuilt when rules, categories, campuses or departments change. Routing a
+complaint is then a handful of dict lookups and no queries.
 """
 from .models import RoutingRule, Complaint, Category, SubCategory
+from .index_cache import ProcessIndex
 from accounts.models import Department, Campus, CustomUser
 from django.db.models import Q
+from itertools import product
 
+VERSION_CACHE_KEY = 'complaints:routing_table_version'
 
-def auto_route_complaint(complaint):
+# Category name keyword -> department name, in matching order
+CATEGORY_DEPARTMENT_NAMES = {
+    'academic': 'Academic Affairs',
+    'facilities': 'Maintenance',
+    'facility': 'Maintenance',
+    'infrastructure': 'Maintenance',
+    'it': 'IT Services',
+    'network': 'IT Services',
+    'security': 'Security',
+    'safety': 'Security',
+    'administrative': 'Administration',
+    'finance': 'Finance',
+    'bursar': 'Finance',
+    'housing': 'Housing',
+    'accommodation': 'Housing',
+    'health': 'Health Services',
+    'medical': 'Health Services',
+    'library': 'Library',
+    'transport': 'Transportation',
+    'transportation': 'Transportation',
+    'hr': 'Human Resources',
+}
+
+
+def rule_order(rule):
+    """Evaluation order of rules: highest priority first, then by name"""
+    return (-rule.priority, rule.name, rule.pk or 0)
+
+
+class RoutingTable:
     """
-    Automatically route a complaint based on routing rules and category.
-    Returns: (assigned_department, assigned_user, priority, routing_notes)
+    Routing rules indexed by (category_id, sub_category_id, campus_id), with
+    None standing for "any". A complaint can only match rules under the 8
+    keys formed from its own values and None; the best rule of each key is
+    kept, so matching is at most 8 dict lookups.
     """
-    if not complaint:
-        return None, None, None, "No complaint provided"
-    
+
+    def __init__(self, rules, departments, categories=()):
+        self.rules = sorted(rules, key=rule_order)
+        self._rules_by_key = {}
+        for rank, rule in enumerate(self.rules):
+            key = (rule.category_id, rule.sub_category_id, rule.campus_id)
+            self._rules_by_key.setdefault(key, (rank, rule))
+
+        self.departments = {department.pk: department for department in departments}
+
+        # Same result as Department.objects.filter(name__icontains=name).first()
+        self.department_by_name = {}
+        for name in set(CATEGORY_DEPARTMENT_NAMES.values()):
+            needle = name.lower()
+            self.department_by_name[name] = next(
+                (
+                    department for pk, department in sorted(self.departments.items())
+                    if needle in department.name.lower()
+                ),
+                None
+            )
+
+        self._category_departments = {
+            category.pk: self.department_for_category_name(category.name) for category in categories
+        }
+
+    def match(self, category_id=None, sub_category_id=None, campus_id=None):
+        """The first rule (in evaluation order) whose conditions all hold, or None"""
+        best = None
+        for key in product(
+            {category_id, None}, {sub_category_id, None}, {campus_id, None}
+        ):
+            found = self._rules_by_key.get(key)
+            if found is not None and (best is None or found[0] < best[0]):
+                best = found
+        return best[1] if best else None
+
+    def department_for_category_name(self, category_name):
+        """Fallback department for a category name: exact keyword, then partial"""
+        category_name = category_name.lower()
+
+        if category_name in CATEGORY_DEPARTMENT_NAMES:
+            department = self.department_by_name[CATEGORY_DEPARTMENT_NAMES[category_name]]
+            if department:
+                return department
+
+        for key, name in CATEGORY_DEPARTMENT_NAMES.items():
+            if key in category_name:
+                department = self.department_by_name[name]
+                if department:
+                    return department
+
+        return None
+
+    def category_department(self, category):
+        """Fallback department for a Category (or category id)"""
+        category_id = category.pk if isinstance(category, Category) else category
+        if category_id in self._category_departments:
+            return self._category_departments[category_id]
+        if isinstance(category, Category):
+            return self.department_for_category_name(category.name)
+        return None
+
+
+def build_routing_table():
+    rules = RoutingRule.objects.filter(is_active=True).select_related(
+        'category', 'sub_category', 'campus', 'assign_to_department', 'assign_to_user'
+    )
+    return RoutingTable(rules, Department.objects.all(), Category.objects.only('id', 'name'))
+
+
+routing_table = ProcessIndex(VERSION_CACHE_KEY, build_routing_table, 'ROUTING_TABLE_CHECK_INTERVAL')
+
+
+def get_routing_table():
+    return routing_table.get()
+
+
+def find_matching_rule(complaint, table=None):
+    """The routing rule that applies to a complaint, or None"""
+    table = table or get_routing_table()
+    return table.match(complaint.category_id, complaint.sub_category_id, complaint.campus_id)
+
+
+def route_complaint(complaint, table=None):
+    """
+    Route a complaint with a routing table (the cached one by default).
+    Returns: (matched_rule, assigned_department, assigned_user, priority, routing_notes)
+    """
+    table = table or get_routing_table()
     routing_notes = []
     assigned_department = None
     assigned_user = None
     priority = complaint.priority
     
-    # Get active routing rules, ordered by priority (highest first)
-    rules = RoutingRule.objects.filter(is_active=True).order_by('-priority')
-    
-    # Try to match rules
-    for rule in rules:
-        match = True
+    rule = find_matching_rule(complaint, table)
+    if rule:
         match_notes = []
-        
-        # Check category match
         if rule.category:
-            if complaint.category != rule.category:
-                match = False
-            else:
-                match_notes.append(f"Category: {rule.category.name}")
+            match_notes.append(f"Category: {rule.category.name}")
+        if rule.sub_category:
+            match_notes.append(f"Subcategory: {rule.sub_category.name}")
+        if rule.campus:
+            match_notes.append(f"Campus: {rule.campus.name}")
+        routing_notes.append(f"Matched rule: {rule.name} ({', '.join(match_notes)})")
         
-        # Check subcategory match
-        if rule.sub_category and match:
-            if complaint.sub_category != rule.sub_category:
-                match = False
-            else:
-                match_notes.append(f"Subcategory: {rule.sub_category.name}")
+        # Assign to department if specified
+        if rule.assign_to_department:
+            assigned_department = rule.assign_to_department
+            routing_notes.append(f"Assigned to department: {assigned_department.name}")
         
-        # Check campus match
-        if rule.campus and match:
-            if complaint.campus != rule.campus:
-                match = False
-            else:
-                match_notes.append(f"Campus: {rule.campus.name}")
+        # Assign to user if specified
+        if rule.assign_to_user:
+            assigned_user = rule.assign_to_user
+            routing_notes.append(f"Assigned to user: {assigned_user.username}")
         
-        # If rule matches, apply it
-        if match:
-            routing_notes.append(f"Matched rule: {rule.name} ({', '.join(match_notes)})")
-            
-            # Assign to department if specified
-            if rule.assign_to_department:
-                assigned_department = rule.assign_to_department
-                routing_notes.append(f"Assigned to department: {assigned_department.name}")
-            
-            # Assign to user if specified
-            if rule.assign_to_user:
-                assigned_user = rule.assign_to_user
-                routing_notes.append(f"Assigned to user: {assigned_user.username}")
-            
-            # Set priority if specified
-            if rule.set_priority:
-                priority = rule.set_priority
-                routing_notes.append(f"Priority set to: {priority}")
-            
-            # First matching rule wins (due to priority ordering)
-            break
+        # Set priority if specified
+        if rule.set_priority:
+            priority = rule.set_priority
+            routing_notes.append(f"Priority set to: {priority}")
     
     # Fallback: Route based on category if no rule matched
     if not assigned_department and not assigned_user:
-        assigned_department = route_by_category(complaint)
+        assigned_department = route_by_category(complaint, table)
         if assigned_department:
             routing_notes.append(f"Fallback routing by category to: {assigned_department.name}")
     
     # Final fallback: Route to complaint's department if available
-    if not assigned_department and not assigned_user and complaint.department:
-        assigned_department = complaint.department
-        routing_notes.append(f"Fallback routing to complaint's department: {assigned_department.name}")
+    if not assigned_department and not assigned_user and complaint.department_id:
+        assigned_department = (
+            table.departments.get(complaint.department_id)
+            or Department.objects.filter(pk=complaint.department_id).first()
+        )
+        if assigned_department:
+            routing_notes.append(f"Fallback routing to complaint's department: {assigned_department.name}")
     
     notes = "; ".join(routing_notes) if routing_notes else "No routing rules matched"
     
-    return assigned_department, assigned_user, priority, notes
+    return rule, assigned_department, assigned_user, priority, notes
+
+
+def auto_route_complaint(complaint):
+    """
+    Automatically route a complaint based on routing rules and category.
+    Returns: (assigned_department, assigned_user, priority, routing_notes)
+    """
+    if not complaint:
+        return None, None, None, "No complaint provided"
+    
+    return route_complaint(complaint)[1:]
 
 
-def route_by_category(complaint):
+def route_by_category(complaint, table=None):
     """
     Route complaint based on category mapping.
     Returns: Department or None
     """
-    if not complaint.category:
+    if not complaint.category_id:
         return None
     
-    category_name = complaint.category.name.lower()
-    
-    # Category to department mapping
-    category_mapping = {
-        'academic': lambda: get_department_by_name('Academic Affairs'),
-        'facilities': lambda: get_department_by_name('Maintenance'),
-        'facility': lambda: get_department_by_name('Maintenance'),
-        'infrastructure': lambda: get_department_by_name('Maintenance'),
-        'it': lambda: get_department_by_name('IT Services'),
-        'network': lambda: get_department_by_name('IT Services'),
-        'security': lambda: get_department_by_name('Security'),
-        'safety': lambda: get_department_by_name('Security'),
-        'administrative': lambda: get_department_by_name('Administration'),
-        'finance': lambda: get_department_by_name('Finance'),
-        'bursar': lambda: get_department_by_name('Finance'),
-        'housing': lambda: get_department_by_name('Housing'),
-        'accommodation': lambda: get_department_by_name('Housing'),
-        'health': lambda: get_department_by_name('Health Services'),
-        'medical': lambda: get_department_by_name('Health Services'),
-        'library': lambda: get_department_by_name('Library'),
-        'transport': lambda: get_department_by_name('Transportation'),
-        'transportation': lambda: get_department_by_name('Transportation'),
-        'hr': lambda: get_department_by_name('Human Resources'),
-    }
-    
-    # Try exact match
-    if category_name in category_mapping:
-        dept = category_mapping[category_name]()
-        if dept:
-            return dept
-    
-    # Try partial match
-    for key, getter in category_mapping.items():
-        if key in category_name:
-            dept = getter()
-            if dept:
-                return dept
-    
-    return None
+    table = table or get_routing_table()
+    # Prefer the loaded category so unsaved/new categories are still mapped by name
+    category = complaint.category if Complaint.category.is_cached(complaint) else complaint.category_id
+    return table.category_department(category)
 
 
 def get_department_by_name(name):
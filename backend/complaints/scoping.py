@@ -0,0 +1,99 @@
+"""
+Which complaints a user may see, compiled to one Q predicate
+
+Every role's visibility is expressed on columns of the complaint row
+itself or one join away (`department__college_id`), so list views,
+reports, dashboards and the approval queue all filter through the same
+indexed access path. A dean's scope no longer needs a query for the
+college's departments first: the college id is read from the user's own
+department row, which token authentication loads with the user. It is
+never taken from a cache, so moving a department to another college
+changes its dean's scope on the next request in every worker.
+
+Compiled predicates are memoized on everything they depend on (purpose,
+role, user, department, campus and college ids), so a user whose role or
+placement changes gets a fresh predicate on the next request.
+
+Purposes:
+    VIEW     complaint listings (ComplaintListCreateView)
+    REPORT   reports and statistics
+    APPROVE  the approval queue
+"""
+from functools import lru_cache
+from django.db.models import Q
+from .models import Complaint
+
+VIEW = 'view'
+REPORT = 'report'
+APPROVE = 'approve'
+
+ADMIN_ROLES = ('admin', 'super_admin')
+
+# Matches no rows without touching the table
+NOTHING = Q(pk__in=[])
+
+def user_college_id(user):
+    """College of the user's department (no query when the department was loaded with the user)"""
+    if not user.department_id:
+        return None
+    return user.department.college_id
+
+
+def organisation_filter(role, department_id, campus_id, college_id):
+    """
+    Scope of roles that see a whole department, college, campus or
+    everything, as a filter on `department_id`/`department__college_id`/
+    `campus_id` (shared by Complaint and ComplaintDailyRollup).
+    Returns: Q, or None for roles scoped by submitter/assignee
+    """
+    if role == 'dept_head':
+        return Q(department_id=department_id) if department_id else NOTHING
+    if role == 'dean':
+        return Q(department__college_id=college_id) if college_id else NOTHING
+    if role == 'campus_director':
+        return Q(campus_id=campus_id) if campus_id else NOTHING
+    if role in ADMIN_ROLES:
+        return Q()
+    return None
+
+
+@lru_cache(maxsize=4096)
+def compile_scope(purpose, role, user_id, department_id, campus_id, college_id):
+    if purpose == VIEW:
+        if role == 'student':
+            return Q(submitter_id=user_id)
+        if role == 'proctor':
+            return Q(is_facility=True)
+        if role == 'dept_head':
+            # Department heads only list academic complaints
+            return Q(is_academic=True, department_id=department_id) if department_id else NOTHING
+
+    scope = organisation_filter(role, department_id, campus_id, college_id)
+    if scope is not None:
+        return scope
+    if purpose == APPROVE:
+        return NOTHING
+    if role == 'student':
+        return Q(submitter_id=user_id)
+    return Q(assigned_to_id=user_id)
+
+
+def complaint_scope(user, purpose=VIEW, role=None):
+    """Q selecting the complaints `user` may see for `purpose` (as `role` if given)"""
+    return compile_scope(
+        purpose, role or user.role, user.pk, user.department_id, user.campus_id, user_college_id(user)
+    )
+
+
+def scoped_complaints(user, purpose=VIEW, queryset=None):
+    """`queryset` (default: all complaints) limited to the user's scope"""
+    if queryset is None:
+        queryset = Complaint.objects.all()
+    return queryset.filter(complaint_scope(user, purpose))
+
+
+def user_organisation_filter(user, role=None):
+    """organisation_filter() for a user, optionally under another role"""
+    return organisation_filter(
+        role or user.role, user.department_id, user.campus_id, user_college_id(user)
+    )
@@ -1,10 +1,39 @@
 from rest_framework import serializers
-from .models import Complaint, Category, SubCategory, ComplaintFile, ComplaintComment, ComplaintEvent
+from django.db.models import Prefetch
+from .models import Complaint, Category, SubCategory, ComplaintFile, ComplaintComment, ComplaintEvent, ReportJob, RoutingRule
 from django.contrib.auth import get_user_model
 from .validators import validate_file_size, validate_file_extension
 
 User = get_user_model()
 
+# Events shown with a complaint
+RECENT_EVENTS = 10
+
+# Related lists that need their own query; only loaded when serialized
+NESTED_FIELDS = ('files', 'comments', 'events')
+
+# What a listing shows unless the request asks otherwise
+LIST_FIELDS = (
+    'id', 'tracking_id', 'title', 'status', 'priority', 'urgency',
+    'category', 'category_name', 'campus', 'campus_name', 'department', 'department_name',
+    'location', 'assigned_to', 'assigned_to_name', 'is_academic', 'is_facility',
+    'feedback_rating', 'created_at', 'updated_at',
+)
+
+
+def build_comment_tree(comments):
+    """
+    Link a flat list of a complaint's comments into threads in memory:
+    every comment gets its direct replies as `prefetched_replies`.
+    Returns the top-level comments.
+    """
+    children = {}
+    for comment in comments:
+        children.setdefault(comment.parent_id, []).append(comment)
+    for comment in comments:
+        comment.prefetched_replies = children.get(comment.pk, [])
+    return children.get(None, [])
+
 
 class ComplaintFileSerializer(serializers.ModelSerializer):
     uploaded_by_username = serializers.CharField(source='uploaded_by.username', read_only=True)
@@ -45,9 +74,11 @@ class ComplaintCommentSerializer(serializers.ModelSerializer):
         return 'Unknown'
     
     def get_replies(self, obj):
-        if obj.replies.exists():
-            return ComplaintCommentSerializer(obj.replies.all(), many=True, context=self.context).data
-        return []
+        # Threads built by build_comment_tree need no further queries
+        replies = getattr(obj, 'prefetched_replies', None)
+        if replies is None:
+            replies = obj.replies.select_related('author')
+        return ComplaintCommentSerializer(replies, many=True, context=self.context).data
 
 
 class ComplaintEventSerializer(serializers.ModelSerializer):
@@ -110,11 +141,13 @@ class ComplaintSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at', 'assigned_at', 'resolved_at', 'closed_at',
             'feedback_rating', 'feedback_comment', 'feedback_submitted_at',
             'resolution_notes', 'rejection_reason',
+            'enrichment_status', 'enriched_at',
             'files', 'comments', 'events', 'uploaded_files'
         ]
         read_only_fields = [
             'id', 'tracking_id', 'urgency', 'created_at', 'updated_at',
-            'assigned_at', 'resolved_at', 'closed_at', 'feedback_submitted_at'
+            'assigned_at', 'resolved_at', 'closed_at', 'feedback_submitted_at',
+            'enrichment_status', 'enriched_at'
         ]
     
     def get_submitter_name(self, obj):
@@ -129,17 +162,121 @@ class ComplaintSerializer(serializers.ModelSerializer):
             return obj.assigned_to.get_full_name() or obj.assigned_to.username
         return None
     
+    @staticmethod
+    def eager_load(queryset, nested=NESTED_FIELDS):
+        """
+        Load everything the serializer reads for a page of complaints in a
+        fixed number of queries: one for the complaints with their foreign
+        keys, plus one for each of the `nested` lists (files, comments,
+        recent events) that will be serialized.
+        """
+        prefetches = []
+        if 'files' in nested:
+            prefetches.append(Prefetch('files', queryset=ComplaintFile.objects.select_related('uploaded_by')))
+        if 'comments' in nested:
+            prefetches.append(Prefetch(
+                'comments',
+                queryset=ComplaintComment.objects.select_related('author').order_by('created_at', 'id'),
+                to_attr='prefetched_comments'
+            ))
+        if 'events' in nested:
+            prefetches.append(Prefetch(
+                'events',
+                queryset=ComplaintEvent.objects.select_related('actor')[:RECENT_EVENTS],
+                to_attr='recent_events'
+            ))
+        return queryset.select_related(
+            'submitter', 'assigned_to', 'category', 'sub_category', 'campus', 'department'
+        ).prefetch_related(*prefetches)
+    
     def get_comments(self, obj):
         # Only return top-level comments (replies are nested)
-        comments = obj.comments.filter(parent__isnull=True)
-        return ComplaintCommentSerializer(comments, many=True, context=self.context).data
+        comments = getattr(obj, 'prefetched_comments', None)
+        if comments is None:
+            comments = list(obj.comments.select_related('author').order_by('created_at', 'id'))
+        return ComplaintCommentSerializer(build_comment_tree(comments), many=True, context=self.context).data
     
     def get_events(self, obj):
         # Return recent events (last 10)
-        events = obj.events.all()[:10]
+        events = getattr(obj, 'recent_events', None)
+        if events is None:
+            events = obj.events.select_related('actor')[:RECENT_EVENTS]
         return ComplaintEventSerializer(events, many=True).data
     
     def create(self, validated_data):
         # Remove uploaded_files from validated_data as it's handled in the view
         validated_data.pop('uploaded_files', None)
-        return super().create(validated_data)
\ No newline at end of file
+        return super().create(validated_data)
+
+
+class ComplaintListItemSerializer(ComplaintSerializer):
+    """
+    Compact complaint for listings: LIST_FIELDS unless the request asks
+    otherwise. `?fields=a,b` replaces that set and `?expand=a,b` adds to
+    it, e.g. `?expand=description,comments,events,files`. Both take field
+    names of ComplaintSerializer; unknown names are ignored.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        selected = self.requested_fields(self.context.get('request'))
+        for name in list(self.fields):
+            if name not in selected:
+                self.fields.pop(name)
+    
+    @staticmethod
+    def requested_fields(request):
+        """Field names to serialize for a request (or None)"""
+        params = getattr(request, 'query_params', None) or {}
+        readable = set(ComplaintSerializer.Meta.fields) - {'uploaded_files'}
+        
+        def names(param):
+            return {name.strip() for name in params.get(param, '').split(',')} & readable
+        
+        selected = names('fields') if params.get('fields') else set(LIST_FIELDS)
+        return selected | names('expand')
+    
+    @classmethod
+    def eager_load_for(cls, queryset, request):
+        """eager_load limited to the nested lists the request will serialize"""
+        nested = cls.requested_fields(request).intersection(NESTED_FIELDS)
+        return cls.eager_load(queryset, nested=nested)
+
+
+class ReportJobSerializer(serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = ReportJob
+        fields = [
+            'id', 'format', 'filters', 'columns', 'status', 'row_count',
+            'attempts', 'last_error', 'created_at', 'finished_at', 'download_url'
+        ]
+        read_only_fields = fields
+    
+    def get_download_url(self, obj):
+        if obj.status != 'done':
+            return None
+        url = f'/api/complaints/reports/jobs/{obj.pk}/download/'
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+
+class RoutingRuleSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = RoutingRule
+        fields = [
+            'id', 'name', 'description', 'is_active', 'priority',
+            'category', 'sub_category', 'campus',
+            'assign_to_department', 'assign_to_user', 'set_priority',
+        ]
+        read_only_fields = ['id']
+
+
+class RoutingDryRunComplaintSerializer(serializers.Serializer):
+    """A hypothetical complaint for dry-run routing (ids are not checked)"""
+    category = serializers.IntegerField(required=False, allow_null=True)
+    sub_category = serializers.IntegerField(required=False, allow_null=True)
+    campus = serializers.IntegerField(required=False, allow_null=True)
+    department = serializers.IntegerField(required=False, allow_null=True)
+    priority = serializers.ChoiceField(choices=Complaint.PRIORITY_CHOICES, default='medium')
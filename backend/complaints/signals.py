@@ -0,0 +1,195 @@
+"""
+Model signal handlers for the complaints app
+"""
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from .models import Complaint, SLAConfiguration, RoutingRule, Category, SubCategory, EmailTemplate
+from accounts.models import Campus, College, Department
+from . import rollup, sla_resolver, routing_engine, assignment, dashboard_cache, duplicate_engine, email_templates
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(pre_save, sender=Complaint)
+def remember_stored_state(sender, instance, raw=False, update_fields=None, **kwargs):
+    """
+    Capture the stored values the statistics rollup and the assignee
+    workloads counted this complaint under, and the text its duplicate
+    signature was computed from (one query for all three)
+    """
+    instance._rollup_previous = None
+    instance._workload_previous = None
+    instance._text_previous = None
+    if raw or instance.pk is None:
+        return
+    track_rollup = update_fields is None or bool(rollup.TRACKED_FIELDS.intersection(update_fields))
+    track_workload = update_fields is None or bool(assignment.TRACKED_FIELDS.intersection(update_fields))
+    track_text = update_fields is None or bool(duplicate_engine.TRACKED_FIELDS.intersection(update_fields))
+    if not track_rollup and not track_workload and not track_text:
+        return
+    stored = rollup.stored_values(
+        instance.pk, extra_fields=assignment.VALUE_FIELDS + sorted(duplicate_engine.TRACKED_FIELDS)
+    )
+    if track_rollup:
+        instance._rollup_previous = stored
+    if track_workload:
+        instance._workload_previous = stored
+    if track_text:
+        instance._text_previous = stored
+
+
+@receiver(post_save, sender=Complaint)
+def update_rollup_on_save(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if not created and update_fields is not None and not rollup.TRACKED_FIELDS.intersection(update_fields):
+        return
+    
+    try:
+        previous = None if created else getattr(instance, '_rollup_previous', None)
+        rollup.record_change(previous, rollup.current_values(instance))
+    except Exception as e:
+        # Statistics can be rebuilt with `rebuild_complaint_rollup`; never block the save
+        logger.error(f"Failed to update statistics rollup for complaint {instance.pk}: {e}")
+
+
+@receiver(post_save, sender=Complaint)
+def update_workload_on_save(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if not created and update_fields is not None and not assignment.TRACKED_FIELDS.intersection(update_fields):
+        return
+    
+    try:
+        previous = None if created else getattr(instance, '_workload_previous', None)
+        assignment.record_load_change(previous, assignment.current_values(instance))
+    except Exception as e:
+        # Workloads can be rebuilt with `rebuild_staff_workload`; never block the save
+        logger.error(f"Failed to update assignee workload for complaint {instance.pk}: {e}")
+
+
+@receiver(post_save, sender=Complaint)
+def reindex_duplicates_on_save(sender, instance, created, raw=False, **kwargs):
+    """Edited text gets a fresh signature; new complaints are indexed on submission/enrichment"""
+    previous = getattr(instance, '_text_previous', None)
+    if raw or created or not previous:
+        return
+    if all(previous[field] == getattr(instance, field) for field in duplicate_engine.TRACKED_FIELDS):
+        return
+    
+    try:
+        duplicate_engine.index_complaint(instance)
+    except Exception as e:
+        # The index can be rebuilt with `rebuild_duplicate_index`; never block the save
+        logger.error(f"Failed to re-index complaint {instance.pk} for duplicate detection: {e}")
+
+
+@receiver(post_delete, sender=Complaint)
+def update_rollup_on_delete(sender, instance, **kwargs):
+    try:
+        rollup.record_change(rollup.current_values(instance), None)
+    except Exception as e:
+        logger.error(f"Failed to update statistics rollup for deleted complaint {instance.pk}: {e}")
+    try:
+        assignment.record_load_change(assignment.current_values(instance), None)
+    except Exception as e:
+        logger.error(f"Failed to update assignee workload for deleted complaint {instance.pk}: {e}")
+
+
+@receiver(post_save, sender=Complaint)
+def invalidate_dashboards_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    # Scopes the complaint was visible in before, if it moved
+    previous = None if created else getattr(instance, '_rollup_previous', None) or getattr(
+        instance, '_workload_previous', None
+    )
+    dashboard_cache.complaints_changed([(previous, dashboard_cache.current_values(instance))])
+
+
+@receiver(post_delete, sender=Complaint)
+def invalidate_dashboards_on_delete(sender, instance, **kwargs):
+    dashboard_cache.complaints_changed([(dashboard_cache.current_values(instance), None)])
+
+
+@receiver(pre_save, sender=settings.AUTH_USER_MODEL)
+def remember_user_dashboard_fields(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Logins save the whole user; only changes dashboards show invalidate them"""
+    instance._dashboard_previous = None
+    if raw or instance.pk is None:
+        return
+    tracked = {field.removesuffix('_id') for field in dashboard_cache.USER_FIELDS}
+    if update_fields is not None and not tracked.intersection(field.removesuffix('_id') for field in update_fields):
+        return
+    instance._dashboard_previous = sender.objects.filter(pk=instance.pk).values(*dashboard_cache.USER_FIELDS).first()
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_dashboards_on_user_save(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_dashboard_previous', None)
+    if not created and previous is None:
+        return
+    current = {field: getattr(instance, field) for field in dashboard_cache.USER_FIELDS}
+    if created or current != previous:
+        dashboard_cache.reference_changed()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=SubCategory)
+@receiver(post_delete, sender=SubCategory)
+@receiver(post_save, sender=Campus)
+@receiver(post_delete, sender=Campus)
+@receiver(post_save, sender=College)
+@receiver(post_delete, sender=College)
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_dashboard_reference_data(sender, instance, **kwargs):
+    dashboard_cache.reference_changed()
+
+
+@receiver(post_save, sender=SLAConfiguration)
+@receiver(post_delete, sender=SLAConfiguration)
+def invalidate_sla_resolver(sender, instance, **kwargs):
+    sla_resolver.invalidate()
+    # Publish again once committed, so workers that reloaded in between
+    # (and still saw the old rows) pick up the change
+    transaction.on_commit(sla_resolver.invalidate)
+
+
+@receiver(post_save, sender=RoutingRule)
+@receiver(post_delete, sender=RoutingRule)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=SubCategory)
+@receiver(post_delete, sender=SubCategory)
+@receiver(post_save, sender=Campus)
+@receiver(post_delete, sender=Campus)
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_routing_table(sender, instance, **kwargs):
+    # Rules hold their related objects, and deleting a department or user
+    # nulls rule references without saving the rules
+    routing_engine.routing_table.invalidate()
+    transaction.on_commit(routing_engine.routing_table.invalidate)
+
+
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+def invalidate_department_colleges(sender, instance, **kwargs):
+    dashboard_cache.department_colleges.invalidate()
+    transaction.on_commit(dashboard_cache.department_colleges.invalidate)
+
+
+@receiver(post_save, sender=EmailTemplate)
+@receiver(post_delete, sender=EmailTemplate)
+def invalidate_email_templates(sender, instance, **kwargs):
+    email_templates.active_templates.invalidate()
+    transaction.on_commit(email_templates.active_templates.invalidate)
@@ -0,0 +1,71 @@
+"""
+In-process index of active SLA configurations
+
+All active SLAConfiguration rows are loaded once into a dict keyed by
+(priority, category_id, campus_id), so finding the most specific
+configuration for a complaint is at most four dict lookups instead of a
+database query.
+
+The index is dropped whenever an SLAConfiguration is saved or deleted (see
+signals.py). Each change also writes a new version stamp to the shared
+Django cache; other worker processes compare their stamp with it at most
+every SLA_RESOLVER_CHECK_INTERVAL seconds and reload when it differs.
+Changes made with QuerySet.update() bypass the signals, so callers must
+call invalidate() themselves afterwards.
+"""
+from .index_cache import ProcessIndex
+from .models import SLAConfiguration
+
+VERSION_CACHE_KEY = 'complaints:sla_configuration_version'
+
+
+def build_index():
+    return {
+        (sla.priority, sla.category_id, sla.campus_id): sla
+        for sla in SLAConfiguration.objects.filter(is_active=True)
+    }
+
+
+class SLAResolver:
+    """Most-specific-wins SLAConfiguration lookup backed by an in-memory index"""
+
+    def __init__(self):
+        self._index = ProcessIndex(VERSION_CACHE_KEY, build_index, 'SLA_RESOLVER_CHECK_INTERVAL')
+
+    def resolve(self, priority, category_id=None, campus_id=None):
+        """
+        Most specific active configuration for a priority/category/campus
+        combination (category match beats campus match beats generic).
+        The returned instance is shared; treat it as read-only.
+        Returns: SLAConfiguration or None
+        """
+        index = self._index.get()
+        for key in (
+            (priority, category_id, campus_id),
+            (priority, category_id, None),
+            (priority, None, campus_id),
+            (priority, None, None),
+        ):
+            sla = index.get(key)
+            if sla is not None:
+                return sla
+        return None
+
+    def clear(self):
+        """Drop this process's index; the next lookup reloads it"""
+        self._index.clear()
+
+    def invalidate(self):
+        """Drop the index here and tell other workers to reload theirs"""
+        self._index.invalidate()
+
+
+resolver = SLAResolver()
+
+
+def resolve(priority, category_id=None, campus_id=None):
+    return resolver.resolve(priority, category_id, campus_id)
+
+
+def invalidate():
+    resolver.invalidate()
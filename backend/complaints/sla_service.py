@@ -1,13 +1,42 @@
 """
 SLA tracking and automatic escalation service
 """
-from .models import Complaint, SLAConfiguration, ComplaintEvent
+from .models import Complaint, ComplaintEvent
+from . import rollup, sla_resolver, dashboard_cache
 from accounts.models import CustomUser
+from django.db import transaction
 from django.utils import timezone
-from django.db.models import Q
+from django.db.models import (
+    Q, F, Value, Case, When, BooleanField, DateTimeField, DurationField, ExpressionWrapper
+)
 from datetime import timedelta
 
 
+# Complaints whose SLA clock is still running
+OPEN_STATUSES = ['new', 'assigned', 'in_progress', 'pending']
+
+# Default SLA if no configuration found
+DEFAULT_SLAS = {
+    'critical': {'response': 2, 'resolution': 24},
+    'high': {'response': 8, 'resolution': 72},
+    'medium': {'response': 24, 'resolution': 168},  # 7 days
+    'low': {'response': 72, 'resolution': 720},  # 30 days
+}
+
+# Complaints locked and updated per transaction by the breach scanner
+SLA_SCAN_CHUNK_SIZE = 1000
+
+
+def find_sla_configuration(priority, category_id=None, campus_id=None):
+    """
+    Most specific active SLAConfiguration for a priority/category/campus
+    combination (category match beats campus match beats generic).
+    Served from the in-process index in sla_resolver, not the database.
+    Returns: SLAConfiguration or None
+    """
+    return sla_resolver.resolve(priority, category_id, campus_id)
+
+
 def get_sla_for_complaint(complaint):
     """
     Get SLA configuration for a complaint based on priority, category, and campus.
@@ -16,134 +45,199 @@ def get_sla_for_complaint(complaint):
     if not complaint:
         return None
     
-    # Try to find specific SLA config
-    sla = SLAConfiguration.objects.filter(
-        priority=complaint.priority,
-        is_active=True
-    )
-    
-    # Filter by category if available
-    if complaint.category:
-        sla = sla.filter(
-            Q(category=complaint.category) | Q(category__isnull=True)
-        )
-    
-    # Filter by campus if available
-    if complaint.campus:
-        sla = sla.filter(
-            Q(campus=complaint.campus) | Q(campus__isnull=True)
-        )
-    
-    # Order by specificity (category/campus specific first)
-    # Use Case/When for ordering by null fields
-    from django.db.models import Case, When, Value, IntegerField
-    
-    sla = sla.annotate(
-        category_priority=Case(
-            When(category__isnull=False, then=Value(1)),
-            default=Value(0),
-            output_field=IntegerField()
-        ),
-        campus_priority=Case(
-            When(campus__isnull=False, then=Value(1)),
-            default=Value(0),
-            output_field=IntegerField()
-        )
-    ).order_by('-category_priority', '-campus_priority').first()
+    return find_sla_configuration(complaint.priority, complaint.category_id, complaint.campus_id)
+
+
+def resolve_sla_hours(priority, category_id=None, campus_id=None):
+    """
+    SLA response/resolution hours for a priority/category/campus combination,
+    falling back to DEFAULT_SLAS.
+    Returns: (response_hours, resolution_hours, SLAConfiguration or None)
+    """
+    sla = find_sla_configuration(priority, category_id, campus_id)
+    if sla:
+        return sla.response_time_hours, sla.resolution_time_hours, sla
     
-    return sla
+    defaults = DEFAULT_SLAS.get(priority or 'medium', DEFAULT_SLAS['medium'])
+    return defaults['response'], defaults['resolution'], None
 
 
 def apply_sla_to_complaint(complaint):
     """
     Apply SLA configuration to a complaint.
     Updates complaint with SLA times.
+    Returns: the matching SLAConfiguration, or None if defaults were used
     """
     if not complaint:
         return
     
-    sla = get_sla_for_complaint(complaint)
-    
-    if sla:
-        complaint.sla_response_hours = sla.response_time_hours
-        complaint.sla_resolution_hours = sla.resolution_time_hours
-        complaint.save()
-        
-        return sla
+    response_hours, resolution_hours, sla = resolve_sla_hours(
+        complaint.priority, complaint.category_id, complaint.campus_id
+    )
+    complaint.sla_response_hours = response_hours
+    complaint.sla_resolution_hours = resolution_hours
+    complaint.save(update_fields=['sla_response_hours', 'sla_resolution_hours', 'updated_at'])
     
-    # Default SLA if no configuration found
-    default_slas = {
-        'critical': {'response': 2, 'resolution': 24},
-        'high': {'response': 8, 'resolution': 72},
-        'medium': {'response': 24, 'resolution': 168},  # 7 days
-        'low': {'response': 72, 'resolution': 720},  # 30 days
-    }
+    return sla
+
+
+def fill_missing_slas():
+    """
+    Set SLA hours on open complaints that have none, one UPDATE per
+    distinct (priority, category, campus) combination.
+    Returns: number of complaints updated
+    """
+    missing = Complaint.objects.filter(status__in=OPEN_STATUSES).filter(
+        Q(sla_response_hours__isnull=True) | Q(sla_response_hours=0) |
+        Q(sla_resolution_hours__isnull=True) | Q(sla_resolution_hours=0)
+    )
     
-    priority = complaint.priority or 'medium'
-    defaults = default_slas.get(priority, default_slas['medium'])
+    updated = 0
+    groups = missing.order_by().values_list('priority', 'category_id', 'campus_id').distinct()
+    for priority, category_id, campus_id in list(groups):
+        response_hours, resolution_hours, _ = resolve_sla_hours(priority, category_id, campus_id)
+        updated += missing.filter(
+            priority=priority, category_id=category_id, campus_id=campus_id
+        ).update(
+            sla_response_hours=response_hours,
+            sla_resolution_hours=resolution_hours,
+            updated_at=timezone.now()
+        )
+    return updated
+
+
+def _sla_deadline(hours_field):
+    window = ExpressionWrapper(F(hours_field) * Value(timedelta(hours=1)), output_field=DurationField())
+    return ExpressionWrapper(F('created_at') + window, output_field=DateTimeField())
+
+
+def breach_conditions(now):
+    """
+    Q objects matching open complaints whose response / resolution SLA
+    deadline (created_at + SLA hours) passed without the breach being recorded.
+    Needs the queryset annotated with response_deadline/resolution_deadline.
+    """
+    response = Q(
+        first_response_at__isnull=True,
+        sla_response_breached=False,
+        sla_response_hours__isnull=False,
+        response_deadline__lt=now,
+    )
+    resolution = Q(
+        sla_resolution_breached=False,
+        sla_resolution_hours__isnull=False,
+        resolution_deadline__lt=now,
+    )
+    return response, resolution
+
+
+def find_new_breaches(now=None):
+    """Open complaints with an SLA breach that hasn't been recorded yet"""
+    now = now or timezone.now()
+    response, resolution = breach_conditions(now)
+    return Complaint.objects.filter(status__in=OPEN_STATUSES).annotate(
+        response_deadline=_sla_deadline('sla_response_hours'),
+        resolution_deadline=_sla_deadline('sla_resolution_hours'),
+    ).filter(response | resolution)
+
+
+def _record_breach_chunk(complaint_ids, now):
+    """
+    Flag the breaches of one chunk of complaints and create their events.
+    Rows are locked (and rows locked by a concurrent scanner skipped), then
+    re-checked, so a breach is only ever recorded once.
+    """
+    response, resolution = breach_conditions(now)
     
-    complaint.sla_response_hours = defaults['response']
-    complaint.sla_resolution_hours = defaults['resolution']
-    complaint.save()
+    with transaction.atomic():
+        complaints = list(
+            find_new_breaches(now)
+            .filter(pk__in=complaint_ids)
+            .select_for_update(skip_locked=True)
+            .annotate(
+                response_due=Case(When(response, then=Value(True)), default=Value(False),
+                                  output_field=BooleanField()),
+                resolution_due=Case(When(resolution, then=Value(True)), default=Value(False),
+                                    output_field=BooleanField()),
+            )
+        )
+        if not complaints:
+            return []
+        
+        events = []
+        rollup_changes = []
+        # Complaints grouped by which flags they get, so each group is one UPDATE
+        flag_groups = {}
+        for complaint in complaints:
+            previous = rollup.current_values(complaint)
+            if complaint.response_due:
+                complaint.sla_response_breached = True
+                events.append(ComplaintEvent(
+                    complaint=complaint,
+                    event_type='sla_breached',
+                    notes=f"Response SLA breached ({complaint.sla_response_hours}h)"
+                ))
+            if complaint.resolution_due:
+                complaint.sla_resolution_breached = True
+                events.append(ComplaintEvent(
+                    complaint=complaint,
+                    event_type='sla_breached',
+                    notes=f"Resolution SLA breached ({complaint.sla_resolution_hours}h)"
+                ))
+            complaint.sla_breach_notified_at = now
+            complaint.updated_at = now
+            flags = (complaint.response_due, complaint.resolution_due)
+            flag_groups.setdefault(flags, []).append(complaint.pk)
+            rollup_changes.append((previous, rollup.current_values(complaint)))
+        
+        for (response_due, resolution_due), ids in flag_groups.items():
+            fields = {'sla_breach_notified_at': now, 'updated_at': now}
+            if response_due:
+                fields['sla_response_breached'] = True
+            if resolution_due:
+                fields['sla_resolution_breached'] = True
+            Complaint.objects.filter(pk__in=ids).update(**fields)
+        ComplaintEvent.objects.bulk_create(events)
+        # update() skips the save signals that maintain the statistics rollup
+        # and invalidate the dashboards
+        rollup.record_changes(rollup_changes)
+        dashboard_cache.complaints_changed(
+            (None, dashboard_cache.current_values(complaint)) for complaint in complaints
+        )
     
-    return None
+    return complaints
 
 
-def check_and_update_sla_breaches():
+def check_and_update_sla_breaches(chunk_size=SLA_SCAN_CHUNK_SIZE, progress=None):
     """
     Check all open complaints for SLA breaches and update flags.
     This should be called periodically (e.g., via cron job).
-    Returns: list of breached complaints
+    
+    Newly breached complaints are found with a single query comparing
+    created_at + SLA hours to the current time in the database, then
+    flagged with one UPDATE per flag combination and logged with bulk_create, chunk by chunk.
+    Safe to run from several processes at once.
+    
+    Args:
+        chunk_size: Complaints locked and updated per transaction
+        progress: Optional callable(processed, total) called after each chunk
+    
+    Returns: list of newly breached complaints
     """
     now = timezone.now()
-    breached_complaints = []
     
-    # Get all open complaints
-    open_complaints = Complaint.objects.filter(
-        status__in=['new', 'assigned', 'in_progress', 'pending']
-    )
+    # Ensure SLA is set
+    fill_missing_slas()
     
-    for complaint in open_complaints:
-        # Ensure SLA is set
-        if not complaint.sla_response_hours or not complaint.sla_resolution_hours:
-            apply_sla_to_complaint(complaint)
-        
-        breach_detected = False
-        
-        # Check response SLA
-        if not complaint.first_response_at:
-            hours_since_creation = (now - complaint.created_at).total_seconds() / 3600
-            if hours_since_creation > complaint.sla_response_hours:
-                if not complaint.sla_response_breached:
-                    complaint.sla_response_breached = True
-                    breach_detected = True
-                    
-                    # Create event
-                    ComplaintEvent.objects.create(
-                        complaint=complaint,
-                        event_type='sla_breached',
-                        notes=f"Response SLA breached ({complaint.sla_response_hours}h)"
-                    )
-        
-        # Check resolution SLA
-        if complaint.status not in ['resolved', 'closed']:
-            hours_since_creation = (now - complaint.created_at).total_seconds() / 3600
-            if hours_since_creation > complaint.sla_resolution_hours:
-                if not complaint.sla_resolution_breached:
-                    complaint.sla_resolution_breached = True
-                    breach_detected = True
-                    
-                    # Create event
-                    ComplaintEvent.objects.create(
-                        complaint=complaint,
-                        event_type='sla_breached',
-                        notes=f"Resolution SLA breached ({complaint.sla_resolution_hours}h)"
-                    )
-        
-        if breach_detected:
-            complaint.sla_breach_notified_at = now
-            complaint.save()
-            breached_complaints.append(complaint)
+    candidate_ids = list(find_new_breaches(now).order_by('id').values_list('id', flat=True))
+    total = len(candidate_ids)
+    
+    breached_complaints = []
+    for start in range(0, total, chunk_size):
+        chunk = candidate_ids[start:start + chunk_size]
+        breached_complaints.extend(_record_breach_chunk(chunk, now))
+        if progress:
+            progress(min(start + chunk_size, total), total)
     
     return breached_complaints
 
@@ -207,12 +301,17 @@ def escalate_complaint(complaint, escalated_by, reason='', target_level=None):
     return None
 
 
-def auto_escalate_breached_complaints():
+def auto_escalate_breached_complaints(breached=None):
     """
     Automatically escalate complaints that have breached SLA.
     This should be called periodically.
+    
+    Args:
+        breached: Complaints returned by check_and_update_sla_breaches;
+                  runs a new check when omitted
     """
-    breached = check_and_update_sla_breaches()
+    if breached is None:
+        breached = check_and_update_sla_breaches()
     escalated_count = 0
     
     for complaint in breached:
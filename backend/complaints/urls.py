@@ -8,7 +8,7 @@ from .dashboard_views import (
 )
 from .approval_views import ApprovalWorkflowViewSet
 from .reporting_views import ReportingViewSet
-from .chatbot_views import chat_message, suggested_questions
+from .chatbot_views import chat_message, chat_stream, suggested_questions, cache_stats, provider_health
 from rest_framework.routers import DefaultRouter
 
 router = DefaultRouter()
@@ -39,8 +39,18 @@ urlpatterns = [
     
     # Complaint Actions
     path('<int:complaint_id>/assign/', views.ComplaintAssignView.as_view(), name='complaint-assign'),
+    path('<int:complaint_id>/auto-assign/', views.ComplaintAutoAssignView.as_view(), name='complaint-auto-assign'),
     path('<int:complaint_id>/status/', views.ComplaintStatusUpdateView.as_view(), name='complaint-status'),
     path('<int:pk>/feedback/', views.ComplaintFeedbackView.as_view(), name='complaint-feedback'),
+    path('<int:pk>/enrichment/', views.ComplaintEnrichmentStatusView.as_view(), name='complaint-enrichment'),
+    path('<int:pk>/duplicates/', views.ComplaintDuplicatesView.as_view(), name='complaint-duplicates'),
+    
+    # Assignment
+    path('assignment/workload/', views.StaffWorkloadView.as_view(), name='assignment-workload'),
+    path('assignment/rebalance/', views.BacklogRebalanceView.as_view(), name='assignment-rebalance'),
+    
+    # Routing
+    path('routing/dry-run/', views.RoutingDryRunView.as_view(), name='routing-dry-run'),
     
     # File Management
     path('<int:complaint_id>/files/', views.ComplaintFileUploadView.as_view(), name='complaint-file-upload'),
@@ -48,6 +58,7 @@ urlpatterns = [
     path('files/<int:file_id>/', views.ComplaintFileDeleteView.as_view(), name='complaint-file-delete'),
     
     # Comments
+    path('<int:complaint_id>/events/', views.ComplaintEventListView.as_view(), name='complaint-events'),
     path('<int:complaint_id>/comments/', views.ComplaintCommentListCreateView.as_view(), name='complaint-comments'),
     
     # Staff List
@@ -55,7 +66,10 @@ urlpatterns = [
     
     # Chatbot
     path('chatbot/message/', chat_message, name='chatbot-message'),
+    path('chatbot/stream/', chat_stream, name='chatbot-stream'),
     path('chatbot/suggestions/', suggested_questions, name='chatbot-suggestions'),
+    path('chatbot/cache-stats/', cache_stats, name='chatbot-cache-stats'),
+    path('chatbot/health/', provider_health, name='chatbot-health'),
 ]
 
 urlpatterns += router.urls
\ No newline at end of file
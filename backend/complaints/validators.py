@@ -3,7 +3,6 @@ Smart AI-powered complaint validation
 Detects and blocks invalid, spam, or inappropriate complaints
 """
 import re
-from difflib import SequenceMatcher
 from textblob import TextBlob
 
 
@@ -29,6 +28,7 @@ class ComplaintValidator:
     MIN_DESCRIPTION_LENGTH = 10
     MIN_WORDS = 3
     MAX_REPEATED_CHARS = 4  # e.g., "aaaa" is suspicious
+    DUPLICATE_SIMILARITY = 0.7  # Estimated shingle Jaccard similarity
     
     @staticmethod
     def validate_complaint(title, description, user=None):
@@ -147,6 +147,7 @@ class ComplaintValidator:
     def _check_duplicate(title, description, user):
         """Check if user has submitted similar complaint recently"""
         from .models import Complaint
+        from .duplicate_engine import find_similar, OPEN_STATUSES
         from datetime import timedelta
         from django.utils import timezone
         
@@ -155,18 +156,18 @@ class ComplaintValidator:
         recent_complaints = Complaint.objects.filter(
             submitter=user,
             created_at__gte=recent_date,
-            status__in=['new', 'assigned', 'in_progress', 'pending']  # Only check open complaints
+            status__in=OPEN_STATUSES  # Only check open complaints
         )
         
-        # Check similarity
-        for complaint in recent_complaints:
-            # Compare titles
-            title_similarity = SequenceMatcher(None, title.lower(), complaint.title.lower()).ratio()
-            desc_similarity = SequenceMatcher(None, description.lower(), complaint.description.lower()).ratio()
-            
-            # If very similar (>80% match), consider duplicate
-            if title_similarity > 0.8 or desc_similarity > 0.8:
-                return True, complaint
+        # Indexed near-duplicate lookup instead of comparing every complaint
+        matches = find_similar(
+            title, description,
+            queryset=recent_complaints,
+            threshold=ComplaintValidator.DUPLICATE_SIMILARITY,
+            limit=1
+        )
+        if matches:
+            return True, matches[0][0]
         
         return False, None
 
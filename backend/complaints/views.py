@@ -4,16 +4,19 @@ from rest_framework.views import APIView
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from django.conf import settings
+from django.db import transaction
 import uuid
 import logging
 
 from .models import Complaint, ComplaintFile, ComplaintComment, ComplaintEvent
 from .serializers import (
-    ComplaintSerializer, ComplaintFileSerializer, 
-    ComplaintCommentSerializer, ComplaintEventSerializer
+    ComplaintSerializer, ComplaintListItemSerializer, ComplaintFileSerializer, 
+    ComplaintCommentSerializer, ComplaintEventSerializer, build_comment_tree
 )
 from .ai_service import analyze_urgency
+from .assignment import assign_complaint, auto_assign_complaint
 from accounts.serializers import UserSerializer
+from config.pagination import KeysetPagination, TimestampKeysetPagination
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
@@ -77,55 +80,22 @@ class TrackComplaintView(APIView):
 class ComplaintListCreateView(generics.ListCreateAPIView):
     serializer_class = ComplaintSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+
+    def get_serializer_class(self):
+        if self.request.method == 'GET':
+            return ComplaintListItemSerializer
+        return ComplaintSerializer
 
     def get_queryset(self):
-        user = self.request.user
-        role = getattr(user, 'role', 'student')
-        
-        # 1. Student: See ONLY their own
-        if role == 'student':
-            return Complaint.objects.filter(submitter=user)
-            
-        # 2. Proctor: See ONLY "Facility" issues
-        if role == 'proctor':
-            return Complaint.objects.filter(is_facility=True)
-            
-        # 3. Dept Head: See ONLY "Academic" issues from THEIR department
-        if role == 'dept_head':
-            if user.department:
-                # Find complaints from their department
-                return Complaint.objects.filter(
-                    is_academic=True, 
-                    department=user.department
-                )
-            return Complaint.objects.none()
-        
-        # 4. Dean: See ALL complaints from their college (all departments in college)
-        if role == 'dean':
-            if user.department and user.department.college:
-                from accounts.models import Department
-                # Get all departments in dean's college
-                college = user.department.college
-                departments = Department.objects.filter(college=college)
-                return Complaint.objects.filter(department__in=departments).order_by('-created_at')
-            return Complaint.objects.none()
-        
-        # 5. Campus Director: See ALL complaints in their campus
-        if role == 'campus_director':
-            if user.campus:
-                return Complaint.objects.filter(campus=user.campus).order_by('-created_at')
-            return Complaint.objects.none()
-
-        # 6. Admin & Super Admin: See Everything
-        if role in ['admin', 'super_admin']:
-            return Complaint.objects.all().order_by('-created_at')
-        
-        # 7. Other staff: See assigned complaints
-        return Complaint.objects.filter(assigned_to=user).order_by('-created_at')
+        return ComplaintListItemSerializer.eager_load_for(self.get_role_queryset(), self.request)
+
+    def get_role_queryset(self):
+        from .scoping import scoped_complaints
+        return scoped_complaints(self.request.user)
 
     def perform_create(self, serializer):
-        from .ai_service import analyze_urgency, analyze_sentiment, generate_summary, detect_language
-        from .sla_service import apply_sla_to_complaint
+        from .enrichment import enqueue_enrichment
         from .validators import validate_complaint_content
         from rest_framework.exceptions import ValidationError
         
@@ -137,64 +107,33 @@ class ComplaintListCreateView(generics.ListCreateAPIView):
         if not is_valid:
             raise ValidationError({'error': error_message})
         
-        # Detect language
-        try:
-            detected_lang, lang_confidence = detect_language(description)
-            language = detected_lang if lang_confidence > 0.7 else 'en'
-        except Exception as e:
-            logger.warning(f"Language detection failed: {e}")
-            language = 'en'
-        
-        # AI urgency analysis with confidence
-        try:
-            urgency_score, urgency_confidence, urgency_reason = analyze_urgency(description, language)
-        except Exception as e:
-            logger.error(f"Urgency analysis failed: {e}")
-            urgency_score = 'medium'
-            urgency_confidence = 0.5
-            urgency_reason = 'Default priority'
-        
-        # Sentiment analysis
-        try:
-            sentiment_score, sentiment_label, sentiment_conf = analyze_sentiment(description)
-        except Exception as e:
-            logger.warning(f"Sentiment analysis failed: {e}")
-            sentiment_score = 0.0
-            sentiment_label = 'neutral'
-        
-        # Generate summary
-        try:
-            ai_summary = generate_summary(description)
-        except Exception as e:
-            logger.warning(f"Summary generation failed: {e}")
-            ai_summary = description[:150]
-        
         # Generate tracking ID
         track_id = f"CMP-{str(uuid.uuid4())[:8].upper()}"
         
-        # Create complaint with AI metadata
+        # Persist right away; language, urgency, sentiment, summary and SLA
+        # are filled in by the background enrichment pipeline
         complaint = serializer.save(
-            submitter=self.request.user, 
-            urgency=urgency_score,
-            priority=urgency_score,
-            language=language,
-            ai_urgency_confidence=urgency_confidence,
-            ai_urgency_reason=urgency_reason,
-            sentiment_score=sentiment_score,
-            sentiment_label=sentiment_label,
-            ai_summary=ai_summary,
+            submitter=self.request.user,
             tracking_id=track_id,
-            status='new'
+            status='new',
+            enrichment_status='pending'
         )
         
-        # Apply SLA (don't fail if this fails)
+        # Index for near-duplicate lookup (cheap; duplicate flagging runs in enrichment)
         try:
-            apply_sla_to_complaint(complaint)
+            from .duplicate_engine import index_complaint
+            index_complaint(complaint)
         except Exception as e:
-            logger.warning(f"SLA application failed: {e}")
+            logger.warning(f"Failed to index complaint {track_id} for duplicate detection: {e}")
+        
+        # Queue AI enrichment (don't fail if this fails)
+        try:
+            enqueue_enrichment(complaint)
+        except Exception as e:
+            logger.error(f"Failed to queue enrichment for {track_id}: {e}")
         
         # Log creation
-        logger.info(f"Complaint {track_id} created - Urgency: {urgency_score}, Language: {language}")
+        logger.info(f"Complaint {track_id} created - enrichment queued")
         
         # Handle file uploads (don't fail if this fails)
         try:
@@ -258,8 +197,15 @@ class ComplaintDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = ComplaintSerializer
     permission_classes = [permissions.IsAuthenticated]
     
+    def get_queryset(self):
+        # Updates serialize the saved instance, so prefetched lists would be stale
+        if self.request.method == 'GET':
+            return ComplaintSerializer.eager_load(self.queryset)
+        return self.queryset
+    
+    @transaction.atomic
     def perform_update(self, serializer):
-        """Send notifications when complaint status changes"""
+        """Send notifications when complaint status changes (queued with the update)"""
         from .notifications import (
             notify_complaint_reviewed,
             notify_complaint_assigned,
@@ -314,6 +260,167 @@ class ComplaintDetailView(generics.RetrieveUpdateDestroyAPIView):
             new_value=new_status
         )
 
+class ComplaintEnrichmentStatusView(APIView):
+    """
+    Poll background AI enrichment progress for a complaint
+    GET /api/complaints/{pk}/enrichment/
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get(self, request, pk):
+        from .scoping import scoped_complaints
+        try:
+            # Complaints outside the user's scope are reported as missing, as in the list
+            complaint = scoped_complaints(request.user).only(
+                'id', 'tracking_id', 'enrichment_status', 'enriched_at',
+                'language', 'urgency', 'priority', 'ai_urgency_confidence', 'ai_urgency_reason',
+                'sentiment_score', 'sentiment_label', 'ai_summary',
+                'sla_response_hours', 'sla_resolution_hours'
+            ).get(pk=pk)
+        except Complaint.DoesNotExist:
+            return Response({'error': 'Complaint not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        data = {
+            'id': complaint.id,
+            'tracking_id': complaint.tracking_id,
+            'enrichment_status': complaint.enrichment_status,
+            'enriched_at': complaint.enriched_at,
+        }
+        if complaint.enrichment_status == 'completed':
+            data.update({
+                'language': complaint.language,
+                'urgency': complaint.urgency,
+                'priority': complaint.priority,
+                'ai_urgency_confidence': complaint.ai_urgency_confidence,
+                'ai_urgency_reason': complaint.ai_urgency_reason,
+                'sentiment_score': complaint.sentiment_score,
+                'sentiment_label': complaint.sentiment_label,
+                'ai_summary': complaint.ai_summary,
+                'sla_response_hours': complaint.sla_response_hours,
+                'sla_resolution_hours': complaint.sla_resolution_hours,
+            })
+        return Response(data)
+
+class ComplaintDuplicatesView(APIView):
+    """
+    Ranked near-duplicates of a complaint from the LSH index
+    GET /api/complaints/{pk}/duplicates/
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get(self, request, pk):
+        from .duplicate_engine import find_similar, duplicate_scope
+        
+        try:
+            complaint = Complaint.objects.get(pk=pk)
+        except Complaint.DoesNotExist:
+            return Response({'error': 'Complaint not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        if request.user.role == 'student':
+            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+        
+        try:
+            threshold = float(request.query_params.get('threshold', 0.5))
+        except ValueError:
+            threshold = 0.5
+        
+        matches = find_similar(
+            complaint.title, complaint.description,
+            queryset=duplicate_scope(),
+            exclude_id=complaint.pk,
+            threshold=threshold,
+            limit=20
+        )
+        
+        return Response({
+            'complaint': complaint.tracking_id,
+            'duplicate_of': complaint.duplicate_of.tracking_id if complaint.duplicate_of else None,
+            'similar_complaints': [
+                {
+                    'id': match.id,
+                    'tracking_id': match.tracking_id,
+                    'title': match.title,
+                    'status': match.status,
+                    'similarity': round(similarity, 3),
+                }
+                for match, similarity in matches
+            ]
+        })
+
+class RoutingDryRunView(APIView):
+    """
+    Route a batch of hypothetical complaints without saving anything
+    POST /api/complaints/routing/dry-run/
+    {
+        "complaints": [{"category": 1, "sub_category": null, "campus": 2, "priority": "medium"}],
+        "rules": [...]   (optional: route with these rules instead of the active ones)
+    }
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def post(self, request):
+        from .routing_engine import RoutingTable, get_routing_table, route_complaint
+        from .serializers import RoutingRuleSerializer, RoutingDryRunComplaintSerializer
+        from .models import RoutingRule, Category
+        from accounts.models import Department
+        
+        if request.user.role not in ['admin', 'super_admin']:
+            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+        
+        items = request.data.get('complaints')
+        if not isinstance(items, list) or not items:
+            return Response({'error': 'complaints must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+        max_items = getattr(settings, 'ROUTING_DRY_RUN_MAX_ITEMS', 500)
+        if len(items) > max_items:
+            return Response({'error': f'At most {max_items} complaints per request'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        complaints = RoutingDryRunComplaintSerializer(data=items, many=True)
+        if not complaints.is_valid():
+            return Response({'error': 'Invalid complaints', 'details': complaints.errors}, status=status.HTTP_400_BAD_REQUEST)
+        
+        rules = request.data.get('rules')
+        if rules is None:
+            table = get_routing_table()
+            rules_source = 'active'
+        else:
+            rule_serializer = RoutingRuleSerializer(data=rules, many=True)
+            if not rule_serializer.is_valid():
+                return Response({'error': 'Invalid rules', 'details': rule_serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+            hypothetical = [
+                RoutingRule(**data) for data in rule_serializer.validated_data if data.get('is_active', True)
+            ]
+            table = RoutingTable(hypothetical, Department.objects.all(), Category.objects.only('id', 'name'))
+            rules_source = 'request'
+        
+        results = []
+        summary = {'rule': 0, 'fallback': 0, 'unrouted': 0}
+        for index, item in enumerate(complaints.validated_data):
+            complaint = Complaint(
+                category_id=item.get('category'),
+                sub_category_id=item.get('sub_category'),
+                campus_id=item.get('campus'),
+                department_id=item.get('department'),
+                priority=item['priority'],
+            )
+            rule, department, user, priority, notes = route_complaint(complaint, table)
+            if rule:
+                summary['rule'] += 1
+            elif department or user:
+                summary['fallback'] += 1
+            else:
+                summary['unrouted'] += 1
+            
+            results.append({
+                'index': index,
+                'matched_rule': {'id': rule.pk, 'name': rule.name} if rule else None,
+                'department': {'id': department.id, 'name': department.name} if department else None,
+                'user': {'id': user.id, 'username': user.username} if user else None,
+                'priority': priority,
+                'notes': notes,
+            })
+        
+        return Response({'rules_source': rules_source, 'summary': summary, 'results': results})
+
 # --- NEW VIEW FOR FEEDBACK ---
 class ComplaintFeedbackView(APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -517,6 +624,20 @@ class ComplaintFileDeleteView(APIView):
         }, status=status.HTTP_200_OK)
 
 
+class ComplaintEventListView(generics.ListAPIView):
+    """
+    Full event timeline of a complaint, newest first
+    GET /api/complaints/{complaint_id}/events/
+    """
+    serializer_class = ComplaintEventSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = TimestampKeysetPagination
+    
+    def get_queryset(self):
+        complaint = generics.get_object_or_404(Complaint, pk=self.kwargs['complaint_id'])
+        return ComplaintEvent.objects.filter(complaint=complaint).select_related('actor')
+
+
 # Comment Management Views
 class ComplaintCommentListCreateView(generics.ListCreateAPIView):
     """
@@ -529,7 +650,21 @@ class ComplaintCommentListCreateView(generics.ListCreateAPIView):
     def get_queryset(self):
         complaint_id = self.kwargs['complaint_id']
         # Only return top-level comments (replies are nested in serializer)
-        return ComplaintComment.objects.filter(complaint_id=complaint_id, parent__isnull=True)
+        return ComplaintComment.objects.filter(
+            complaint_id=complaint_id, parent__isnull=True
+        ).select_related('author')
+    
+    def get_serializer(self, *args, **kwargs):
+        if kwargs.get('many') and args:
+            # Thread the page from one query over all of the complaint's comments
+            comments = list(
+                ComplaintComment.objects.filter(complaint_id=self.kwargs['complaint_id'])
+                .select_related('author').order_by('created_at', 'id')
+            )
+            build_comment_tree(comments)
+            threaded = {comment.pk: comment for comment in comments}
+            args = ([threaded.get(comment.pk, comment) for comment in args[0]],) + args[1:]
+        return super().get_serializer(*args, **kwargs)
     
     def perform_create(self, serializer):
         complaint_id = self.kwargs['complaint_id']
@@ -557,6 +692,7 @@ class ComplaintAssignView(APIView):
     """
     permission_classes = [permissions.IsAuthenticated]
     
+    @transaction.atomic
     def post(self, request, complaint_id):
         try:
             complaint = Complaint.objects.get(pk=complaint_id)
@@ -577,39 +713,65 @@ class ComplaintAssignView(APIView):
         except User.DoesNotExist:
             return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
         
-        # Update complaint
-        old_assignee = complaint.assigned_to
-        complaint.assigned_to = assigned_user
-        complaint.status = 'assigned'
+        # Update complaint and log event (workload counters follow via signals)
+        assign_complaint(complaint, assigned_user, actor=user)
+        notify_assignee(complaint, assigned_user)
         
-        if not complaint.assigned_at:
-            complaint.assigned_at = timezone.now()
+        return Response({
+            'message': 'Complaint assigned successfully',
+            'complaint': ComplaintSerializer(complaint, context={'request': request}).data
+        }, status=status.HTTP_200_OK)
+
+
+def notify_assignee(complaint, assigned_user):
+    """Send the assignment notification email"""
+    from accounts.utils import send_email
+    send_email(
+        template_type='assignment_notification',
+        recipient=assigned_user.email,
+        context={
+            'assignee_name': assigned_user.get_full_name() or assigned_user.username,
+            'tracking_id': complaint.tracking_id,
+            'title': complaint.title,
+            'priority': complaint.get_priority_display(),
+            'complaint_url': f"{settings.FRONTEND_URL}/complaints/{complaint.id}",
+        }
+    )
+
+
+def can_manage_department(user, department_id):
+    """Admins manage every department, department heads only their own"""
+    if user.role in ['admin', 'super_admin']:
+        return True
+    return user.role == 'dept_head' and department_id is not None and user.department_id == department_id
+
+
+class ComplaintAutoAssignView(APIView):
+    """
+    Assign a complaint to the least loaded staff member of its department
+    POST /api/complaints/{complaint_id}/auto-assign/
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    
+    @transaction.atomic
+    def post(self, request, complaint_id):
+        try:
+            complaint = Complaint.objects.select_related('assigned_to').get(pk=complaint_id)
+        except Complaint.DoesNotExist:
+            return Response({'error': 'Complaint not found'}, status=status.HTTP_404_NOT_FOUND)
         
-        complaint.save()
+        if not can_manage_department(request.user, complaint.department_id):
+            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
         
-        # Log event
-        ComplaintEvent.objects.create(
-            complaint=complaint,
-            event_type='assigned',
-            actor=user,
-            old_value=old_assignee.username if old_assignee else 'None',
-            new_value=assigned_user.username,
-            notes=f'Assigned to {assigned_user.get_full_name() or assigned_user.username}'
-        )
+        if not complaint.department_id:
+            return Response({'error': 'Complaint has no department'}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Send notification email
-        from accounts.utils import send_email
-        send_email(
-            template_type='assignment_notification',
-            recipient=assigned_user.email,
-            context={
-                'assignee_name': assigned_user.get_full_name() or assigned_user.username,
-                'tracking_id': complaint.tracking_id,
-                'title': complaint.title,
-                'priority': complaint.get_priority_display(),
-                'complaint_url': f"{settings.FRONTEND_URL}/complaints/{complaint.id}",
-            }
-        )
+        assignee = auto_assign_complaint(complaint, actor=request.user)
+        if not assignee:
+            return Response({'error': 'No staff member available in this department'},
+                            status=status.HTTP_409_CONFLICT)
+        
+        notify_assignee(complaint, assignee)
         
         return Response({
             'message': 'Complaint assigned successfully',
@@ -617,6 +779,82 @@ class ComplaintAssignView(APIView):
         }, status=status.HTTP_200_OK)
 
 
+class StaffWorkloadView(APIView):
+    """
+    Live open-complaint load of a department's staff, least loaded first
+    GET /api/complaints/assignment/workload/?department={id}
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get(self, request):
+        from .assignment import eligible_staff, current_loads
+        
+        user = request.user
+        try:
+            department_id = int(request.query_params.get('department') or user.department_id or 0)
+        except ValueError:
+            return Response({'error': 'department must be an id'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if not can_manage_department(user, department_id):
+            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+        
+        staff = list(eligible_staff([department_id]))
+        loads = current_loads([member.pk for member in staff])
+        workload = sorted(
+            (
+                {
+                    'staff_id': member.pk,
+                    'staff_name': member.get_full_name() or member.username,
+                    'weighted_load': loads[member.pk][0],
+                    'open_count': loads[member.pk][1],
+                }
+                for member in staff
+            ),
+            key=lambda row: (row['weighted_load'], row['open_count'], row['staff_id'])
+        )
+        return Response({'department': department_id, 'workload': workload})
+
+
+class BacklogRebalanceView(APIView):
+    """
+    Assign queued complaints to the least loaded staff, most urgent first
+    POST /api/complaints/assignment/rebalance/
+    {"department": 3, "include_assigned": false, "limit": 1000, "dry_run": true}
+    Department heads may only rebalance their own department; admins may
+    omit "department" to rebalance every department.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def post(self, request):
+        from .assignment import rebalance_backlog
+        
+        user = request.user
+        department_id = request.data.get('department')
+        if user.role == 'dept_head' and department_id is None:
+            department_id = user.department_id
+        
+        try:
+            department_id = int(department_id) if department_id is not None else None
+            limit = int(request.data['limit']) if request.data.get('limit') else None
+        except (TypeError, ValueError):
+            return Response({'error': 'department and limit must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if department_id is None:
+            if user.role not in ['admin', 'super_admin']:
+                return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+        elif not can_manage_department(user, department_id):
+            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+        
+        result = rebalance_backlog(
+            department_ids=[department_id] if department_id is not None else None,
+            include_assigned=str(request.data.get('include_assigned', '')).lower() in ['1', 'true', 'yes'],
+            limit=limit,
+            dry_run=str(request.data.get('dry_run', '')).lower() in ['1', 'true', 'yes'],
+            actor=user,
+        )
+        return Response(result)
+
+
 class ComplaintStatusUpdateView(APIView):
     """
     Update complaint status
@@ -624,6 +862,7 @@ class ComplaintStatusUpdateView(APIView):
     """
     permission_classes = [permissions.IsAuthenticated]
     
+    @transaction.atomic
     def post(self, request, complaint_id):
         try:
             complaint = Complaint.objects.get(pk=complaint_id)
@@ -704,47 +943,34 @@ def apply_routing_rules(complaint):
     """
     Apply routing rules to automatically assign complaint
     """
-    from .models import RoutingRule
+    from .routing_engine import find_matching_rule
     
-    # Get applicable rules
-    rules = RoutingRule.objects.filter(
-        is_active=True
-    ).order_by('-priority')
+    # First matching rule from the compiled routing table
+    rule = find_matching_rule(complaint)
     
-    for rule in rules:
-        # Check if rule matches
-        matches = True
-        
-        if rule.category and complaint.category != rule.category:
-            matches = False
-        if rule.sub_category and complaint.sub_category != rule.sub_category:
-            matches = False
-        if rule.campus and complaint.campus != rule.campus:
-            matches = False
-        
-        if matches:
-            # Apply rule
-            if rule.assign_to_user:
-                complaint.assigned_to = rule.assign_to_user
-                complaint.status = 'assigned'
-                complaint.assigned_at = timezone.now()
-            
-            if rule.assign_to_department:
-                complaint.department = rule.assign_to_department
-            
-            if rule.set_priority:
-                complaint.priority = rule.set_priority
-            
-            complaint.save()
-            
-            # Log event
-            ComplaintEvent.objects.create(
-                complaint=complaint,
-                event_type='assigned',
-                actor=None,
-                notes=f'Auto-assigned by rule: {rule.name}'
-            )
-            
-            return True
+    if rule:
+        # Apply rule
+        if rule.assign_to_user:
+            complaint.assigned_to = rule.assign_to_user
+            complaint.status = 'assigned'
+            complaint.assigned_at = timezone.now()
+        
+        if rule.assign_to_department:
+            complaint.department = rule.assign_to_department
+        
+        if rule.set_priority:
+            complaint.priority = rule.set_priority
+        
+        complaint.save()
+        
+        # Log event
+        ComplaintEvent.objects.create(
+            complaint=complaint,
+            event_type='assigned',
+            actor=None,
+            notes=f'Auto-assigned by rule: {rule.name}'
+        )
+        
+        return True
     
     return False
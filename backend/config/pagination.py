@@ -0,0 +1,190 @@
+"""
+Keyset (seek) pagination for append-mostly feeds
+
+Pages are ordered newest first on (ordering_field, id) and each page
+starts where the previous one ended:
+
+    WHERE created_at < :last_created_at
+       OR (created_at = :last_created_at AND id < :last_id)
+    ORDER BY created_at DESC, id DESC LIMIT :page_size
+
+so page 500 costs the same index range scan as page 1, unlike OFFSET.
+The position is carried in an opaque `?cursor=` token; rows inserted
+while a client pages through never cause skips or duplicates.
+
+`?count=exact` (the default, see FEED_COUNT_MODE) adds a COUNT(*) of the
+whole feed, `?count=approximate` counts at most
+FEED_APPROXIMATE_COUNT_THRESHOLD rows and falls back to the query
+planner's estimate (PostgreSQL) beyond that, and `?count=none` skips it.
+"""
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from django.conf import settings
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+COUNT_MODES = ('exact', 'approximate', 'none')
+
+
+def approximate_count(queryset, threshold):
+    """
+    Row count that stops being exact past `threshold` rows.
+    Returns: (count, is_exact)
+    """
+    queryset = queryset.order_by()
+    capped = queryset[:threshold + 1].count()
+    if capped <= threshold:
+        return capped, True
+
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        try:
+            sql, params = queryset.values('pk').query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+                plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return max(int(plan[0]['Plan']['Plan Rows']), capped), False
+        except Exception as e:
+            logger.warning(f"Could not estimate row count: {e}")
+    return capped, False
+
+
+class KeysetPagination(BasePagination):
+    """Newest-first pagination on (ordering_field, id)"""
+
+    ordering_field = 'created_at'
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+        self.count, self.count_is_exact = self.get_count(queryset, request)
+
+        field = self.ordering_field
+        reverse = position is not None and position[2]
+        if position is not None:
+            value, pk = position[0], position[1]
+            if reverse:
+                queryset = queryset.filter(Q(**{f'{field}__gt': value}) | Q(**{field: value, 'pk__gt': pk}))
+            else:
+                queryset = queryset.filter(Q(**{f'{field}__lt': value}) | Q(**{field: value, 'pk__lt': pk}))
+        ordering = (field, 'pk') if reverse else (f'-{field}', '-pk')
+
+        # One extra row tells whether there is anything beyond this page
+        rows = list(queryset.order_by(*ordering)[:page_size + 1])
+        has_more = len(rows) > page_size
+        page = rows[:page_size]
+        if reverse:
+            page.reverse()
+
+        self.next_position = self.previous_position = None
+        if page:
+            if has_more or reverse:
+                self.next_position = (getattr(page[-1], field), page[-1].pk, False)
+            if position is not None and (has_more or not reverse):
+                self.previous_position = (getattr(page[0], field), page[0].pk, True)
+        return page
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param], strict=True, cutoff=self.max_page_size
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def get_count(self, queryset, request):
+        mode = request.query_params.get(self.count_query_param) or getattr(settings, 'FEED_COUNT_MODE', 'exact')
+        if mode not in COUNT_MODES:
+            mode = 'exact'
+        if mode == 'none':
+            return None, None
+        if mode == 'approximate':
+            return approximate_count(queryset, getattr(settings, 'FEED_APPROXIMATE_COUNT_THRESHOLD', 1000))
+        return queryset.order_by().count(), True
+
+    def encode_cursor(self, position):
+        if position is None:
+            return None
+        value, pk, reverse = position
+        token = json.dumps([value.isoformat(), pk, int(reverse)], separators=(',', ':'))
+        token = urlsafe_b64encode(token.encode('ascii')).decode('ascii').rstrip('=')
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            raw = urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode('ascii')
+            value, pk, reverse = json.loads(raw)
+            value = parse_datetime(value)
+            if value is None or not isinstance(pk, int):
+                raise ValueError(token)
+        except (TypeError, ValueError):
+            raise NotFound('Invalid cursor')
+        return value, pk, bool(reverse)
+
+    def get_paginated_response(self, data):
+        payload = OrderedDict()
+        if self.count is not None:
+            payload['count'] = self.count
+            payload['count_is_exact'] = self.count_is_exact
+        payload['next'] = self.encode_cursor(self.next_position)
+        payload['previous'] = self.encode_cursor(self.previous_position)
+        payload['results'] = data
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'count': {'type': 'integer', 'example': 123},
+                'count_is_exact': {'type': 'boolean'},
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param, 'required': False, 'in': 'query',
+                'description': 'Position token from the previous response', 'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param, 'required': False, 'in': 'query',
+                'description': f'Results per page (max {self.max_page_size})', 'schema': {'type': 'integer'},
+            },
+            {
+                'name': self.count_query_param, 'required': False, 'in': 'query',
+                'description': 'Total count: exact, approximate or none',
+                'schema': {'type': 'string', 'enum': list(COUNT_MODES)},
+            },
+        ]
+
+
+class TimestampKeysetPagination(KeysetPagination):
+    """Keyset pagination for models ordered by `timestamp`"""
+
+    ordering_field = 'timestamp'
@@ -39,7 +39,7 @@ MIDDLEWARE = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'accounts.authentication.TokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -84,6 +84,28 @@ DATABASES = {
     )
 }
 
+# Cache Configuration
+# Local memory in development; use a shared backend in production (e.g.
+# CACHE_BACKEND=django.core.cache.backends.redis.RedisCache with
+# CACHE_LOCATION=redis://...) so cache invalidation reaches every worker
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default=''),
+    },
+    # Chatbot AI answers; LocMemCache evicts least recently used beyond MAX_ENTRIES.
+    # It is per process: use a shared backend (Redis, Memcached) to share answers between workers
+    'chatbot': {
+        'BACKEND': config('CHATBOT_CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CHATBOT_CACHE_LOCATION', default='chatbot'),
+        'TIMEOUT': config('CHATBOT_CACHE_TIMEOUT', default=3600, cast=int),
+        'OPTIONS': {'MAX_ENTRIES': config('CHATBOT_CACHE_MAX_ENTRIES', default=2000, cast=int)},
+    },
+}
+
+# Whether the default cache is shared between processes (see complaints.index_cache)
+SHARED_CACHE = not CACHES['default']['BACKEND'].endswith(('.LocMemCache', '.DummyCache'))
+
 AUTH_PASSWORD_VALIDATORS = [
     { 'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator', },
 ]
@@ -171,6 +193,70 @@ TOTP_ISSUER_NAME = config('TOTP_ISSUER_NAME', default='UoG Complaint System')
 TOTP_DIGITS = config('TOTP_DIGITS', default=6, cast=int)
 TOTP_PERIOD = config('TOTP_PERIOD', default=30, cast=int)
 
+# Background AI enrichment
+# 'queue': jobs are drained by `python manage.py run_enrichment_worker` (started by start.sh)
+# 'inline': jobs run in-process after the request commits (tests / no worker)
+COMPLAINT_ENRICHMENT_EXECUTOR = config('COMPLAINT_ENRICHMENT_EXECUTOR', default='queue')
+COMPLAINT_ENRICHMENT_LOCK_TIMEOUT = config('COMPLAINT_ENRICHMENT_LOCK_TIMEOUT', default=300, cast=int)
+
+# Report generation jobs (same executors as enrichment; `run_report_worker` is started by start.sh)
+REPORT_JOB_EXECUTOR = config('REPORT_JOB_EXECUTOR', default='queue')
+REPORT_JOB_LOCK_TIMEOUT = config('REPORT_JOB_LOCK_TIMEOUT', default=900, cast=int)
+# Seconds a generated report file is kept after it was last produced or reused
+REPORT_ARTIFACT_MAX_AGE = config('REPORT_ARTIFACT_MAX_AGE', default=86400, cast=int)
+
+# Seconds between checks of the shared SLA configuration version stamp
+SLA_RESOLVER_CHECK_INTERVAL = config('SLA_RESOLVER_CHECK_INTERVAL', default=5, cast=int)
+
+# Seconds between checks of the shared routing table version stamp
+ROUTING_TABLE_CHECK_INTERVAL = config('ROUTING_TABLE_CHECK_INTERVAL', default=5, cast=int)
+# Seconds between checks of the shared department -> college index version stamp (dashboard cache invalidation)
+SCOPE_INDEX_CHECK_INTERVAL = config('SCOPE_INDEX_CHECK_INTERVAL', default=5, cast=int)
+# Seconds between checks of the shared email template version stamp
+EMAIL_TEMPLATE_CHECK_INTERVAL = config('EMAIL_TEMPLATE_CHECK_INTERVAL', default=5, cast=int)
+# Seconds a process keeps those in-memory indexes (SLA, routing, email
+# templates) when the cache is per process and can't carry the version stamps
+PROCESS_INDEX_MAX_AGE = config('PROCESS_INDEX_MAX_AGE', default=60, cast=int)
+
+# Weighted open load at which staff stop receiving auto-assigned complaints (0: no limit)
+AUTO_ASSIGN_MAX_WEIGHTED_LOAD = config('AUTO_ASSIGN_MAX_WEIGHTED_LOAD', default=0, cast=int)
+
+# Maximum hypothetical complaints per dry-run routing request
+ROUTING_DRY_RUN_MAX_ITEMS = config('ROUTING_DRY_RUN_MAX_ITEMS', default=500, cast=int)
+
+# Seconds a cached dashboard response may be served; writes invalidate
+# entries earlier (0 disables the cache). Off unless the cache is shared:
+# with a per-process cache a write in one worker leaves the other workers'
+# entries valid, so they would serve stale dashboards
+DASHBOARD_CACHE_TIMEOUT = config('DASHBOARD_CACHE_TIMEOUT', default=300 if SHARED_CACHE else 0, cast=int)
+
+# Totals on keyset-paginated feeds (complaints, events, activity logs):
+# exact, approximate or none; clients can override with ?count=
+FEED_COUNT_MODE = config('FEED_COUNT_MODE', default='exact')
+# Rows counted exactly before ?count=approximate switches to an estimate
+FEED_APPROXIMATE_COUNT_THRESHOLD = config('FEED_APPROXIMATE_COUNT_THRESHOLD', default=1000, cast=int)
+
+# Outgoing email is queued in the database with the change that causes it
+# 'queue': delivered by `python manage.py run_email_worker` (started by start.sh)
+# 'inline': delivered in-process after the request commits (no worker)
+EMAIL_OUTBOX_EXECUTOR = config('EMAIL_OUTBOX_EXECUTOR', default='queue')
+EMAIL_OUTBOX_LOCK_TIMEOUT = config('EMAIL_OUTBOX_LOCK_TIMEOUT', default=300, cast=int)
+
+# Chatbot AI providers: a provider is skipped for LLM_BREAKER_RESET_TIMEOUT seconds
+# after LLM_BREAKER_FAILURE_THRESHOLD consecutive failures; read timeouts adapt to
+# observed latency within [LLM_TIMEOUT_MIN, LLM_TIMEOUT_MAX]; the next provider is
+# asked too when the first has not answered after LLM_HEDGE_DELAY seconds
+LLM_BREAKER_FAILURE_THRESHOLD = config('LLM_BREAKER_FAILURE_THRESHOLD', default=3, cast=int)
+LLM_BREAKER_RESET_TIMEOUT = config('LLM_BREAKER_RESET_TIMEOUT', default=30, cast=float)
+LLM_TIMEOUT_MIN = config('LLM_TIMEOUT_MIN', default=5, cast=float)
+LLM_TIMEOUT_MAX = config('LLM_TIMEOUT_MAX', default=30, cast=float)
+LLM_HEDGE_DELAY = config('LLM_HEDGE_DELAY', default=2.0, cast=float)
+GROQ_API_URL = config('GROQ_API_URL', default='https://api.groq.com/openai/v1/chat/completions')
+GEMINI_API_URL = config(
+    'GEMINI_API_URL',
+    default='https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent',
+)
+
 # Frontend URL
 FRONTEND_URL = config('FRONTEND_URL', default='http://localhost:5173')
 
@@ -12,6 +12,26 @@ python --version
 echo "📦 Installed packages:"
 pip list | grep gunicorn
 
+# Background workers: queued work (see DEPLOYMENT_GUIDE.md) is only processed
+# while these run. Each one is restarted if it exits. Set START_WORKERS=0 when
+# the workers run as separate services instead.
+run_worker() {
+    while true; do
+        python manage.py "$@"
+        echo "⚠️ $1 exited, restarting in 5s..."
+        sleep 5
+    done
+}
+
+if [ "${START_WORKERS:-1}" != "0" ]; then
+    echo "📬 Starting email worker..."
+    run_worker run_email_worker &
+    echo "🤖 Starting enrichment worker..."
+    run_worker run_enrichment_worker &
+    echo "📊 Starting report worker..."
+    run_worker run_report_worker &
+fi
+
 # Start the server
 echo "🚀 Starting gunicorn..."
 gunicorn config.wsgi:application --bind 0.0.0.0:${PORT:-8000} --workers 2 --timeout 120
@@ -1,15 +1,37 @@
 """
 Pytest configuration and fixtures
 """
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 import pytest
 from django.contrib.auth import get_user_model
+from django.core.cache import caches
 from rest_framework.test import APIClient
 from accounts.models import Campus, College, Department
-from complaints.models import Category, SubCategory
+from complaints.models import Category, Complaint, SubCategory
+from complaints import sla_resolver, routing_engine, dashboard_cache, email_templates
 
 User = get_user_model()
 
 
+@pytest.fixture(autouse=True)
+def reset_process_indexes():
+    """Rolled-back test transactions don't send delete signals; start every test with fresh indexes"""
+    sla_resolver.resolver.clear()
+    routing_engine.routing_table.clear()
+    dashboard_cache.department_colleges.clear()
+    email_templates.active_templates.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Cached responses and version stamps outlive the rolled-back test data"""
+    for cache in caches.all():
+        cache.clear()
+
+
 @pytest.fixture
 def api_client():
     """Return API client"""
@@ -121,6 +143,32 @@ def sub_category(db, category):
     )
 
 
+@pytest.fixture
+def make_complaint(db, student_user):
+    """
+    Factory fixture for creating complaints
+    Test modules override it to add their own defaults (department, campus...);
+    created_at backdates the complaint.
+    """
+    def make(**kwargs):
+        created_at = kwargs.pop('created_at', None)
+        defaults = {
+            'title': 'Leaking roof',
+            'description': 'Water comes through the roof',
+            'location': 'Block B',
+            'submitter': student_user,
+        }
+        defaults.update(kwargs)
+        complaint = Complaint.objects.create(**defaults)
+        if created_at is not None:
+            # created_at is auto_now_add; update() also leaves the rollup on the creation day
+            Complaint.objects.filter(pk=complaint.pk).update(created_at=created_at)
+            complaint.created_at = created_at
+        return complaint
+
+    return make
+
+
 @pytest.fixture
 def authenticated_client(api_client, student_user):
     """Return authenticated API client"""
@@ -129,3 +177,94 @@ def authenticated_client(api_client, student_user):
     api_client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
     api_client.user = student_user
     return api_client
+
+
+class StubProviderServer:
+    """Local HTTP server standing in for the AI providers"""
+
+    def __init__(self):
+        self.routes = {}
+        self.streams = {}
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive, like the real providers
+
+            def do_POST(self):
+                path, _, query = self.path.partition('?')
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                stub.requests.append({
+                    'path': path, 'query': query, 'json': json.loads(body or b'{}'),
+                    'client_port': self.client_address[1],
+                })
+                if path in stub.streams:
+                    return self.send_stream(*stub.streams[path])
+                status, payload, delay = stub.routes.get(path, (404, {'error': 'no route'}, 0))
+                time.sleep(delay)
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def send_stream(self, events, delay, close_after):
+                """Server-sent events in chunked encoding, one chunk per event"""
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                for i, event in enumerate(events):
+                    if i == close_after:
+                        # Drop the connection mid-stream
+                        self.close_connection = True
+                        return
+                    data = f'data: {event if isinstance(event, str) else json.dumps(event)}\n\n'.encode()
+                    self.wfile.write(f'{len(data):x}\r\n'.encode() + data + b'\r\n')
+                    self.wfile.flush()
+                    time.sleep(delay)
+                self.wfile.write(b'0\r\n\r\n')
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def url(self, path):
+        return f'http://127.0.0.1:{self.server.server_port}{path}'
+
+    def respond(self, path, payload, status=200, delay=0):
+        self.routes[path] = (status, payload, delay)
+
+    def respond_stream(self, path, events, delay=0, close_after=None):
+        """Stream `events` (JSON payloads or raw strings) as server-sent events"""
+        self.streams[path] = (events, delay, close_after)
+
+    def groq_stream(self, path, chunks, **kwargs):
+        events = [{'choices': [{'delta': {'content': text}}]} for text in chunks]
+        self.respond_stream(path, events + ['[DONE]'], **kwargs)
+
+    def gemini_stream(self, path, chunks, **kwargs):
+        events = [{'candidates': [{'content': {'parts': [{'text': text}]}}]} for text in chunks]
+        self.respond_stream(path, events, **kwargs)
+
+    def groq_reply(self, path, text, **kwargs):
+        self.respond(path, {'choices': [{'message': {'content': text}}]}, **kwargs)
+
+    def gemini_reply(self, path, text, **kwargs):
+        self.respond(path, {'candidates': [{'content': {'parts': [{'text': text}]}}]}, **kwargs)
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def llm_stub():
+    """Stub AI provider server; point clients at llm_stub.url('/groq') etc."""
+    server = StubProviderServer()
+    yield server
+    server.close()
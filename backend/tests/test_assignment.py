@@ -0,0 +1,216 @@
+"""
+Tests for workload counters and workload-aware assignment
+"""
+import importlib
+import pytest
+from functools import partial
+from datetime import timedelta
+from django.core.management import call_command
+from django.db.models import Sum
+from django.utils import timezone
+from accounts.models import Department
+from complaints.models import Complaint, ComplaintEvent, ComplaintDailyRollup, StaffWorkload
+from complaints.assignment import (
+    assign_complaint, auto_assign_complaint, pick_assignee, rebalance_backlog, rebuild_workloads,
+)
+
+
+def workload(user):
+    row = StaffWorkload.objects.filter(user=user).first()
+    return (row.weighted_load, row.open_count) if row else (0, 0)
+
+
+@pytest.fixture
+def staff(create_user, department):
+    return [
+        create_user(username=f'staff{i}', email=f'staff{i}@example.com', role='maintenance', department=department)
+        for i in range(3)
+    ]
+
+
+@pytest.fixture
+def make_complaint(make_complaint, department):
+    return partial(make_complaint, department=department)
+
+
+@pytest.mark.django_db
+class TestWorkloadCounters:
+    """Incremental maintenance through complaint signals"""
+
+    def test_assign_status_priority_and_delete(self, staff, make_complaint):
+        complaint = make_complaint(priority='high')
+        assign_complaint(complaint, staff[0])
+        assert workload(staff[0]) == (4, 1)
+
+        complaint.priority = 'critical'
+        complaint.save()
+        assert workload(staff[0]) == (8, 1)
+
+        assign_complaint(complaint, staff[1])
+        assert workload(staff[0]) == (0, 0)
+        assert workload(staff[1]) == (8, 1)
+
+        complaint.status = 'resolved'
+        complaint.save(update_fields=['status'])
+        assert workload(staff[1]) == (0, 0)
+
+        complaint.status = 'in_progress'
+        complaint.save()
+        complaint.delete()
+        assert workload(staff[1]) == (0, 0)
+
+    def test_untracked_updates_skip_the_lookup(self, staff, make_complaint, django_assert_num_queries):
+        complaint = make_complaint()
+        assign_complaint(complaint, staff[0])
+        with django_assert_num_queries(1):
+            complaint.ai_summary = 'Pipe leak'
+            complaint.save(update_fields=['ai_summary'])
+
+    def test_rebuild_matches_incremental(self, staff, make_complaint):
+        for i, priority in enumerate(['low', 'medium', 'high', 'critical', 'high']):
+            assign_complaint(make_complaint(priority=priority), staff[i % 2])
+        Complaint.objects.filter(priority='low').update(status='closed')
+        expected = {member.pk: workload(member) for member in staff}
+        expected[staff[0].pk] = (expected[staff[0].pk][0] - 1, expected[staff[0].pk][1] - 1)
+
+        rebuild_workloads()
+        assert {member.pk: workload(member) for member in staff} == expected
+
+        call_command('rebuild_staff_workload', verbosity=0)
+        assert {member.pk: workload(member) for member in staff} == expected
+
+    def test_migration_backfills_existing_assignments(self, staff, make_complaint):
+        from django.apps import apps
+        backfill = importlib.import_module('complaints.migrations.0014_backfill_staff_workload')
+        assign_complaint(make_complaint(priority='high'), staff[0])
+        assign_complaint(make_complaint(priority='low'), staff[0])
+        # Assignments made before the counters existed
+        StaffWorkload.objects.all().delete()
+
+        backfill.build_workloads(apps, None)
+
+        assert workload(staff[0]) == (5, 2)
+
+
+@pytest.mark.django_db
+class TestScheduler:
+    """Least-loaded selection and backlog rebalancing"""
+
+    def test_pick_least_loaded(self, staff, make_complaint, department, settings):
+        assign_complaint(make_complaint(priority='critical'), staff[0])
+        assign_complaint(make_complaint(priority='low'), staff[1])
+        assign_complaint(make_complaint(priority='low'), staff[2])
+        assign_complaint(make_complaint(priority='low'), staff[2])
+        assert pick_assignee(department.id) == staff[1]
+
+        settings.AUTO_ASSIGN_MAX_WEIGHTED_LOAD = 1
+        assert pick_assignee(department.id) is None
+
+    def test_auto_assign_ignores_other_roles_and_departments(self, create_user, make_complaint, college):
+        other = Department.objects.create(name='Other', college=college)
+        create_user(username='elsewhere', email='e@example.com', role='maintenance', department=other)
+        head = create_user(username='head', email='h@example.com', role='dept_head')
+        complaint = make_complaint(department=other)
+        assert auto_assign_complaint(complaint).username == 'elsewhere'
+        assert auto_assign_complaint(make_complaint(department=head.department)) is None
+
+    def test_rebalance_spreads_by_weight_most_urgent_first(self, staff, make_complaint):
+        urgent = make_complaint(priority='critical', sla_response_hours=2)
+        backlog = [make_complaint(priority='low', sla_response_hours=72) for _ in range(8)]
+        Complaint.objects.filter(pk=urgent.pk).update(created_at=timezone.now() - timedelta(hours=1))
+
+        result = rebalance_backlog()
+        assert result['assigned'] == 9 and result['unassignable'] == 0
+
+        urgent.refresh_from_db()
+        assert urgent.status == 'assigned' and urgent.assigned_at is not None
+        loads = sorted(workload(member) for member in staff)
+        assert sum(count for _, count in loads) == 9
+        assert max(w for w, _ in loads) - min(w for w, _ in loads) <= 8
+        # The critical complaint went first, to a member who then got fewer low ones
+        assert workload(urgent.assigned_to) == (8, 1)
+        assert ComplaintEvent.objects.filter(event_type='assigned').count() == 9
+        assert Complaint.objects.filter(pk__in=[c.pk for c in backlog], assigned_to__isnull=True).count() == 0
+
+    def test_rebalance_query_count_does_not_grow(self, staff, make_complaint, django_assert_max_num_queries):
+        for _ in range(5):
+            make_complaint()
+        with django_assert_max_num_queries(30) as small:
+            rebalance_backlog()
+        for _ in range(60):
+            make_complaint()
+        with django_assert_max_num_queries(len(small.captured_queries)):
+            rebalance_backlog()
+
+    def test_rebalance_keeps_rollup_consistent(self, staff, make_complaint):
+        for _ in range(4):
+            make_complaint()
+        rebalance_backlog()
+        counts = ComplaintDailyRollup.objects.values('status').annotate(n=Sum('complaint_count'))
+        assert {row['status']: row['n'] for row in counts if row['n']} == {'assigned': 4}
+
+    def test_dry_run_writes_nothing(self, staff, make_complaint):
+        make_complaint()
+        result = rebalance_backlog(dry_run=True)
+        assert result['planned'] == 1 and result['assigned'] == 0
+        assert not Complaint.objects.filter(assigned_to__isnull=False).exists()
+
+    def test_include_assigned_evens_out(self, staff, make_complaint):
+        for _ in range(6):
+            assign_complaint(make_complaint(), staff[0])
+        rebalance_backlog()
+        assert workload(staff[0]) == (12, 6)
+
+        result = rebalance_backlog(include_assigned=True)
+        assert result['assigned'] == 4
+        assert sorted(workload(member) for member in staff) == [(4, 2), (4, 2), (4, 2)]
+
+    def test_started_work_is_not_moved(self, staff, make_complaint):
+        for _ in range(2):
+            complaint = assign_complaint(make_complaint(), staff[0])
+            complaint.status = 'in_progress'
+            complaint.in_progress_at = timezone.now()
+            complaint.save()
+        assert rebalance_backlog(include_assigned=True)['assigned'] == 0
+
+    def test_command(self, staff, make_complaint):
+        make_complaint()
+        call_command('rebalance_backlog', '--dry-run', verbosity=0)
+        assert not Complaint.objects.filter(assigned_to__isnull=False).exists()
+        call_command('rebalance_backlog', verbosity=0)
+        assert Complaint.objects.filter(assigned_to__isnull=False).count() == 1
+
+
+@pytest.mark.django_db
+class TestAssignmentAPI:
+    """Auto-assign, workload and rebalance endpoints"""
+
+    def test_auto_assign_endpoint(self, api_client, dept_head_user, staff, make_complaint):
+        complaint = make_complaint()
+        api_client.force_authenticate(user=dept_head_user)
+        response = api_client.post(f'/api/complaints/{complaint.id}/auto-assign/')
+        assert response.status_code == 200
+        complaint.refresh_from_db()
+        assert complaint.assigned_to in staff
+
+    def test_workload_endpoint(self, api_client, dept_head_user, staff, make_complaint):
+        assign_complaint(make_complaint(priority='high'), staff[1])
+        api_client.force_authenticate(user=dept_head_user)
+        response = api_client.get('/api/complaints/assignment/workload/')
+        assert response.status_code == 200
+        assert response.data['workload'][-1] == {
+            'staff_id': staff[1].id, 'staff_name': 'Test User', 'weighted_load': 4, 'open_count': 1,
+        }
+
+    def test_rebalance_permissions(self, api_client, dept_head_user, admin_user, staff, make_complaint, college):
+        other = Department.objects.create(name='Other', college=college)
+        make_complaint()
+        api_client.force_authenticate(user=dept_head_user)
+        assert api_client.post('/api/complaints/assignment/rebalance/', {'department': other.id},
+                               format='json').status_code == 403
+        response = api_client.post('/api/complaints/assignment/rebalance/', {'dry_run': True}, format='json')
+        assert response.status_code == 200 and response.data['planned'] == 1
+
+        api_client.force_authenticate(user=admin_user)
+        response = api_client.post('/api/complaints/assignment/rebalance/', {}, format='json')
+        assert response.status_code == 200 and response.data['assigned'] == 1
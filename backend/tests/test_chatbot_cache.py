@@ -0,0 +1,89 @@
+"""
+Tests for the chatbot response cache
+"""
+import pytest
+from complaints import chatbot_cache
+from complaints.chatbot_service import ChatbotService
+
+
+@pytest.fixture
+def service(monkeypatch):
+    """Service with a fake Groq provider counting its calls"""
+    service = ChatbotService()
+    service.use_groq, service.use_gemini = True, False
+    service.provider_calls = []
+
+    def fake_groq(message, language):
+        service.provider_calls.append((message, language))
+        return {'response': f'answer to {message}', 'source': 'groq_ai', 'topic': 'ai_generated', 'confidence': 0.95}
+
+    monkeypatch.setattr(service, '_get_groq_response', fake_groq)
+    return service
+
+
+class TestNormalization:
+    def test_equivalent_questions_share_a_key(self):
+        key = chatbot_cache.cache_key('What are the library hours?', 'en', 'v1')
+        assert chatbot_cache.cache_key('  what are the Library HOUR ', 'en', 'v1') == key
+        assert chatbot_cache.cache_key('What are the library hours?', 'am', 'v1') != key
+        assert chatbot_cache.cache_key('What are the library hours?', 'en', 'v2') != key
+        assert chatbot_cache.cache_key('What are the library rules?', 'en', 'v1') != key
+
+    @pytest.mark.parametrize('first, second', [
+        ('Where is the registrar?', 'Who is the registrar?'),
+        ('How do I pay fees?', 'Why do I pay fees?'),
+        ('Can I use the library?', 'Can I not use the library?'),
+    ])
+    def test_question_words_keep_keys_apart(self, first, second):
+        assert chatbot_cache.cache_key(first, 'en', 'v1') != chatbot_cache.cache_key(second, 'en', 'v1')
+
+    def test_stop_word_only_messages_keep_their_words(self):
+        assert chatbot_cache.normalize_message('How are you?') == 'how are you'
+
+
+class TestResponseCache:
+    """Provider answers are reused until the TTL or a knowledge base change"""
+
+    def test_repeat_question_skips_the_provider(self, service):
+        first = service.get_response('What are the library hours?')
+        again = service.get_response('what are the library hours')
+
+        assert again == first
+        assert len(service.provider_calls) == 1
+        assert chatbot_cache.stats() == {'hits': 1, 'misses': 1, 'hit_rate': 0.5, 'provider_calls_saved': 1}
+
+    def test_knowledge_base_change_starts_fresh(self, service):
+        service.get_response('library hours')
+        service.knowledge_version = 'edited'
+        service.get_response('library hours')
+        assert len(service.provider_calls) == 2
+
+    def test_fallback_answers_are_not_cached(self, service, monkeypatch):
+        def provider_down(message, language):
+            raise ConnectionError('down')
+
+        monkeypatch.setattr(service, '_get_groq_response', provider_down)
+        assert service.get_response('How much is tuition?')['source'] == 'knowledge_base'
+        assert not chatbot_cache.contains('How much is tuition?', 'en', service.knowledge_version)
+
+    def test_warm_cache_answers_suggested_questions_once(self, service):
+        suggested = len(service.get_suggested_questions('en')) + len(service.get_suggested_questions('am'))
+        assert service.warm_cache() == suggested
+        assert service.warm_cache() == 0
+        service.get_response(service.get_suggested_questions('en')[0])
+        assert len(service.provider_calls) == suggested
+
+    def test_warm_cache_without_providers(self, service):
+        service.use_groq = False
+        assert service.warm_cache() == 0
+
+
+@pytest.mark.django_db
+def test_stats_endpoint(api_client, admin_user, student_user):
+    api_client.force_authenticate(user=student_user)
+    assert api_client.get('/api/complaints/chatbot/cache-stats/').status_code == 403
+
+    api_client.force_authenticate(user=admin_user)
+    response = api_client.get('/api/complaints/chatbot/cache-stats/')
+    assert response.status_code == 200
+    assert response.data['hits'] == 0 and 'knowledge_version' in response.data
@@ -0,0 +1,118 @@
+"""
+Tests for the chatbot knowledge base retrieval index
+"""
+import pytest
+from complaints.chatbot_service import ChatbotService
+from complaints.knowledge_index import KnowledgeIndex, TopicKeywordIndex, split_passages, tokenize
+from complaints.llm_providers import GroqClient
+from complaints.uog_knowledge_base import UOG_KNOWLEDGE
+
+
+@pytest.fixture(scope='module')
+def index():
+    return KnowledgeIndex(UOG_KNOWLEDGE)
+
+
+@pytest.fixture(scope='module')
+def keywords():
+    return TopicKeywordIndex(UOG_KNOWLEDGE)
+
+
+@pytest.fixture
+def service():
+    return ChatbotService()
+
+
+class TestKnowledgeIndex:
+    """BM25 search over knowledge base passages"""
+
+    def test_tokenize(self):
+        assert tokenize('What are the Library HOURS?') == ['library', 'hour']
+        assert tokenize('የቤተ-መጽሐፍት ሰዓት') == ['የቤተ', 'መጽሀፍት', 'ሰኣት']
+        # Interchangeable Amharic letters fold to one spelling
+        assert tokenize('ሠላም') == tokenize('ሰላም')
+
+    def test_split_passages_merges_short_paragraphs(self):
+        text = 'Heading\n\n' + 'a' * 250 + '\n\nShort tail'
+        assert split_passages(text) == ['Heading\n\n' + 'a' * 250 + '\n\nShort tail']
+        assert split_passages('x' * 300 + '\n\n' + 'y' * 300) == ['x' * 300, 'y' * 300]
+
+    @pytest.mark.parametrize('question, topic', [
+        ('What are the library hours?', 'library'),
+        ('How do I get WiFi password?', 'wifi'),
+        ('How much is tuition?', 'fees'),
+        ('When is the exam schedule posted?', 'exam'),
+        ('How do I file a complaint?', 'complaint_help'),
+    ])
+    def test_top_passage_topic(self, index, question, topic):
+        results = index.search(question, k=3)
+        assert results[0].topic == topic
+        assert results == sorted(results, key=lambda r: -r.score)
+
+    def test_no_match(self, index):
+        assert index.search('zzqx blorf') == []
+        assert index.search('') == []
+
+
+class TestTopicKeywordIndex:
+    """Keyword fallback ranking"""
+
+    @pytest.mark.parametrize('message, topic', [
+        ('How much is tuition?', 'fees'),
+        ('Where can I borrow books?', 'library'),
+        ('ሰላም', 'greeting'),
+        ('Tell me about the university history', 'about_uog'),
+    ])
+    def test_best_topic(self, keywords, message, topic):
+        assert keywords.best(message).topic == topic
+
+    def test_words_match_whole_tokens_only(self, keywords):
+        # Substring matching used to find 'hi' in 'this' and 'it' in 'submit'
+        assert [m.topic for m in keywords.match('submit this')] == ['complaint_help']
+
+    def test_phrase_beats_its_last_word(self, keywords):
+        assert [m.topic for m in keywords.match('I need a study room')] == ['library']
+        assert {m.topic for m in keywords.match('I need a dorm room')} == {'dormitory'}
+        assert keywords.match('I need a dorm room')[0].keywords == 2
+
+    def test_no_match(self, keywords):
+        assert keywords.best('zzqx') is None
+
+
+class TestPrompt:
+    """Only the relevant passages go into the AI prompt"""
+
+    def test_prompt_is_a_fraction_of_the_knowledge_base(self, service):
+        whole = sum(len(data.get('response_en', '')) for data in UOG_KNOWLEDGE.values())
+        prompt = service._build_system_prompt('What are the library hours?', 'en')
+
+        assert 'Topic: library' in prompt
+        assert 'Topic: wifi' not in prompt
+        assert len(prompt) < whole / 3
+        assert prompt.endswith('Respond in English language.')
+
+    def test_unmatched_question_falls_back_to_overview(self, service):
+        context = service._build_uog_context('zzqx blorf')
+        assert 'Topic: about_uog' in context
+
+    def test_groq_request_carries_retrieved_context(self, service, llm_stub):
+        llm_stub.groq_reply('/groq', 'Open 8-5')
+        service.groq_client = GroqClient('test-key', url=llm_stub.url('/groq'))
+
+        result = service._get_groq_response('How do I get WiFi password?', 'en')
+
+        assert result['response'] == 'Open 8-5'
+        system_prompt = llm_stub.requests[0]['json']['messages'][0]['content']
+        assert 'Topic: wifi' in system_prompt and 'Topic: library' not in system_prompt
+
+
+class TestKnowledgeBaseFallback:
+    """Answers without an AI provider"""
+
+    def test_fallback_answer(self, service):
+        service.use_groq = service.use_gemini = False
+        result = service.get_response('How much is tuition?')
+        assert result['source'] == 'knowledge_base'
+        assert result['topic'] == 'fees'
+        assert result['confidence'] == pytest.approx(0.7)
+        assert service.get_response('zzqx blorf')['source'] == 'default'
@@ -0,0 +1,158 @@
+"""
+Tests for streamed chatbot responses (server-sent events)
+"""
+import json
+import time
+import pytest
+from complaints import chatbot_cache
+from complaints.chatbot_service import ChatbotService, chatbot_service
+from complaints.llm_providers import OPEN, GeminiClient, GroqClient
+
+
+@pytest.fixture
+def service(llm_stub):
+    """Service streaming from the stub Groq and Gemini servers"""
+    service = ChatbotService()
+    service.use_groq = service.use_gemini = True
+    service.groq_client = GroqClient('groq-key', url=llm_stub.url('/groq'))
+    service.gemini_client = GeminiClient('gemini-key', url=llm_stub.url('/gemini:generateContent'))
+    return service
+
+
+def parse_events(body):
+    """(event, data) pairs from a text/event-stream body"""
+    events = []
+    for frame in body.decode('utf-8').strip().split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in frame.split('\n'))
+        events.append((lines['event'], json.loads(lines['data'])))
+    return events
+
+
+class TestProviderStream:
+    """ProviderClient.stream() yields text as the provider sends it"""
+
+    def test_groq_chunks(self, llm_stub):
+        llm_stub.groq_stream('/groq', ['Open ', '', '8-5'])
+        client = GroqClient('key', url=llm_stub.url('/groq'))
+
+        assert list(client.stream('system', 'library hours?')) == ['Open ', '8-5']
+        assert llm_stub.requests[0]['json']['stream'] is True
+
+    def test_gemini_uses_the_sse_endpoint(self, llm_stub):
+        llm_stub.gemini_stream('/gemini:streamGenerateContent', ['ሰላም', ' ነው'])
+        client = GeminiClient('key', url=llm_stub.url('/gemini:generateContent'))
+
+        assert ''.join(client.stream('system', 'hi')) == 'ሰላም ነው'
+        assert 'alt=sse' in llm_stub.requests[0]['query']
+
+    def test_first_chunk_arrives_before_the_answer_ends(self, llm_stub):
+        llm_stub.groq_stream('/groq', ['a', 'b', 'c'], delay=0.3)
+        stream = GroqClient('key', url=llm_stub.url('/groq')).stream('system', 'q')
+
+        started = time.monotonic()
+        assert next(stream) == 'a'
+        assert time.monotonic() - started < 0.3
+        assert list(stream) == ['b', 'c']
+
+    def test_broken_stream_counts_as_failure(self, llm_stub):
+        llm_stub.groq_stream('/groq', ['a', 'b', 'c'], close_after=1)
+        client = GroqClient('key', url=llm_stub.url('/groq'))
+        client.breaker.failure_threshold = 1
+
+        chunks = []
+        with pytest.raises(Exception):
+            for text in client.stream('system', 'q'):
+                chunks.append(text)
+        assert chunks == ['a']
+        assert client.breaker.state == OPEN
+
+
+class TestStreamResponse:
+    """ChatbotService.stream_response() events"""
+
+    def test_provider_tokens_then_done(self, service, llm_stub):
+        llm_stub.groq_stream('/groq', ['Open ', '8-5'])
+
+        events = list(service.stream_response('What are the library hours?'))
+
+        assert events == [
+            ('token', {'text': 'Open '}),
+            ('token', {'text': '8-5'}),
+            ('done', {'source': 'groq_ai', 'topic': 'ai_generated', 'confidence': 0.95}),
+        ]
+
+    def test_streamed_answer_is_cached(self, service, llm_stub):
+        llm_stub.groq_stream('/groq', ['Open ', '8-5'])
+        list(service.stream_response('What are the library hours?'))
+
+        events = list(service.stream_response('what are the library hours'))
+
+        assert events[0] == ('message', {
+            'response': 'Open 8-5', 'source': 'groq_ai', 'topic': 'ai_generated', 'confidence': 0.95,
+        })
+        assert len(llm_stub.requests) == 1
+        assert chatbot_cache.stats()['hits'] == 1
+
+    def test_next_provider_when_the_first_fails_to_start(self, service, llm_stub):
+        llm_stub.respond('/groq', {'error': 'overloaded'}, status=503)
+        llm_stub.gemini_stream('/gemini:streamGenerateContent', ['From Gemini'])
+
+        events = list(service.stream_response('What are the library hours?'))
+
+        assert events[0] == ('token', {'text': 'From Gemini'})
+        assert events[-1][1]['source'] == 'gemini_rest_api'
+
+    def test_failure_mid_answer_is_replaced_by_knowledge_base(self, service, llm_stub):
+        llm_stub.groq_stream('/groq', ['Tuition is', ' about'], close_after=1)
+
+        events = list(service.stream_response('How much is tuition?'))
+
+        assert [event for event, _ in events] == ['token', 'message', 'done']
+        assert events[1][1]['source'] == 'knowledge_base' and events[1][1]['topic'] == 'fees'
+        # Gemini was not asked to finish Groq's answer
+        assert [request['path'] for request in llm_stub.requests] == ['/groq']
+        assert not chatbot_cache.contains('How much is tuition?', 'en', service.knowledge_version)
+
+    def test_knowledge_base_answer_is_one_event(self):
+        service = ChatbotService()
+        service.use_groq = service.use_gemini = False
+
+        events = list(service.stream_response('How much is tuition?'))
+
+        assert [event for event, _ in events] == ['message', 'done']
+        assert events[0][1] == service.get_response('How much is tuition?')
+        assert events[1][1]['topic'] == 'fees'
+
+
+class TestStreamEndpoint:
+    url = '/api/complaints/chatbot/stream/'
+
+    def test_post_streams_events(self, api_client, llm_stub, monkeypatch):
+        llm_stub.groq_stream('/groq', ['Open ', '8-5'])
+        monkeypatch.setattr(chatbot_service, 'use_groq', True)
+        monkeypatch.setattr(chatbot_service, 'use_gemini', False)
+        monkeypatch.setattr(chatbot_service, 'groq_client', GroqClient('key', url=llm_stub.url('/groq')))
+
+        response = api_client.post(self.url, {'message': 'library hours?'}, format='json')
+
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/event-stream')
+        assert response['Cache-Control'] == 'no-cache'
+        events = parse_events(b''.join(response.streaming_content))
+        assert [event for event, _ in events] == ['token', 'token', 'done']
+
+    def test_get_for_event_source(self, api_client, monkeypatch):
+        monkeypatch.setattr(chatbot_service, 'use_groq', False)
+        monkeypatch.setattr(chatbot_service, 'use_gemini', False)
+
+        response = api_client.get(self.url, {'message': 'ሰላም', 'language': 'am'}, HTTP_ACCEPT='text/event-stream')
+
+        events = parse_events(b''.join(response.streaming_content))
+        assert events[0][0] == 'message' and events[0][1]['topic'] == 'greeting'
+
+    def test_missing_message(self, api_client):
+        assert api_client.post(self.url, {}, format='json').status_code == 400
+
+        response = api_client.get(self.url, HTTP_ACCEPT='text/event-stream')
+        assert response.status_code == 400
+        assert parse_events(response.content) == [('error', {'error': 'Message is required'})]
@@ -0,0 +1,119 @@
+"""
+Tests for the dashboard response cache and its invalidation
+"""
+import pytest
+from functools import partial
+from datetime import timedelta
+from django.utils import timezone
+from accounts.models import Campus, College, Department
+from complaints.models import Complaint
+from complaints.sla_service import check_and_update_sla_breaches
+
+
+@pytest.fixture(autouse=True)
+def cache_enabled(settings):
+    """Off by default with the per-process test cache"""
+    settings.DASHBOARD_CACHE_TIMEOUT = 300
+
+
+@pytest.fixture
+def dean(create_user, department):
+    return create_user(username='dean', email='dean@example.com', role='dean', department=department)
+
+
+@pytest.fixture
+def make_complaint(make_complaint, department, campus):
+    return partial(make_complaint, department=department, campus=campus)
+
+
+def served_from_cache(client, url, django_assert_max_num_queries):
+    """GET url; True if it ran no queries"""
+    with django_assert_max_num_queries(1000) as captured:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(captured.captured_queries) == 0
+
+
+@pytest.mark.django_db
+class TestDashboardCache:
+    """Hits, misses and precise invalidation"""
+
+    dean_url = '/api/complaints/dashboards/dean/stats/'
+    student_url = '/api/complaints/dashboards/student/stats/'
+
+    def test_second_request_is_a_hit(self, api_client, dean, make_complaint, django_assert_max_num_queries):
+        make_complaint()
+        api_client.force_authenticate(user=dean)
+        first = api_client.get(self.dean_url).data
+        assert served_from_cache(api_client, self.dean_url, django_assert_max_num_queries)
+        assert api_client.get(self.dean_url).data == first
+        assert not served_from_cache(api_client, f'{self.dean_url}?window=7', django_assert_max_num_queries)
+
+    def test_writes_invalidate_only_touched_scopes(self, api_client, dean, create_user, make_complaint,
+                                                   django_assert_max_num_queries):
+        far_college = College.objects.create(name='Far', campus=Campus.objects.create(name='Far Campus'))
+        far = Department.objects.create(name='Far Dept', college=far_college)
+        other_student = create_user(username='other', email='other@example.com', role='student')
+        complaint = make_complaint()
+        api_client.force_authenticate(user=dean)
+        assert api_client.get(self.dean_url).data['total_complaints'] == 1
+
+        # A complaint outside the college leaves the dean's entry alone
+        Complaint.objects.create(title='T', description='D', location='L', submitter=other_student, department=far)
+        assert served_from_cache(api_client, self.dean_url, django_assert_max_num_queries)
+
+        # A write inside the college invalidates it
+        complaint.status = 'resolved'
+        complaint.save()
+        assert api_client.get(self.dean_url).data['unresolved_complaints'] == 0
+
+        # Moving a complaint out of the college invalidates the old scope too
+        complaint.department = far
+        complaint.save()
+        assert api_client.get(self.dean_url).data['total_complaints'] == 0
+
+    def test_submitter_dashboard_follows_their_complaints(self, api_client, student_user, make_complaint):
+        api_client.force_authenticate(user=student_user)
+        assert api_client.get(self.student_url).data['total_complaints'] == 0
+        make_complaint()
+        assert api_client.get(self.student_url).data['total_complaints'] == 1
+
+    def test_bulk_sla_scan_invalidates(self, api_client, student_user, make_complaint):
+        complaint = make_complaint(sla_response_hours=1, sla_resolution_hours=2)
+        Complaint.objects.filter(pk=complaint.pk).update(created_at=timezone.now() - timedelta(hours=5))
+        api_client.force_authenticate(user=student_user)
+        assert api_client.get(self.student_url).data['sla_breaches'] == 0
+        check_and_update_sla_breaches()
+        assert api_client.get(self.student_url).data['sla_breaches'] == 1
+
+    def test_logins_keep_entries_but_placement_changes_drop_them(self, api_client, dean, make_complaint,
+                                                                 django_assert_max_num_queries):
+        make_complaint()
+        api_client.force_authenticate(user=dean)
+        api_client.get(self.dean_url)
+        dean.last_login = timezone.now()
+        dean.save()
+        assert served_from_cache(api_client, self.dean_url, django_assert_max_num_queries)
+
+        dean.first_name = 'Renamed'
+        dean.save()
+        assert not served_from_cache(api_client, self.dean_url, django_assert_max_num_queries)
+
+    def test_nested_expansions_and_errors_are_not_cached(self, api_client, student_user, create_user,
+                                                         make_complaint, django_assert_max_num_queries):
+        make_complaint()
+        api_client.force_authenticate(user=student_user)
+        url = '/api/complaints/dashboards/student/recent_complaints/?expand=comments'
+        api_client.get(url)
+        assert not served_from_cache(api_client, url, django_assert_max_num_queries)
+
+        lost = create_user(username='lost', email='lost@example.com', role='dean')
+        api_client.force_authenticate(user=lost)
+        assert api_client.get(self.dean_url).status_code == 400
+        assert api_client.get(self.dean_url).status_code == 400
+
+    def test_disabled(self, api_client, student_user, settings, django_assert_max_num_queries):
+        settings.DASHBOARD_CACHE_TIMEOUT = 0
+        api_client.force_authenticate(user=student_user)
+        api_client.get(self.student_url)
+        assert not served_from_cache(api_client, self.student_url, django_assert_max_num_queries)
@@ -0,0 +1,141 @@
+"""
+Tests for the aggregated role dashboards
+"""
+import pytest
+from django.utils import timezone
+from datetime import timedelta
+from rest_framework import status
+from complaints.models import Complaint, Category
+from accounts.models import Campus, Department
+
+# Queries per dashboard `stats` call, independent of how many rows exist
+DASHBOARD_QUERIES = {
+    'student': 1,
+    'dean': 3,
+    'proctor': 2,
+    'admin': 3,
+    'dept-head': 2,
+    'campus-director': 3,
+    'super-admin': 2,
+}
+
+STATUSES = ['new', 'assigned', 'in_progress', 'pending', 'resolved', 'closed']
+
+
+@pytest.fixture
+def dashboard_users(create_user, campus, department):
+    return {
+        'student': create_user(username='s@example.com', email='s@example.com', role='student'),
+        'dean': create_user(username='d@example.com', email='d@example.com', role='dean', department=department),
+        'proctor': create_user(username='p@example.com', email='p@example.com', role='proctor'),
+        'admin': create_user(username='a@example.com', email='a@example.com', role='admin'),
+        'dept-head': create_user(username='h@example.com', email='h@example.com', role='dept_head',
+                                 department=department),
+        'campus-director': create_user(username='c@example.com', email='c@example.com',
+                                       role='campus_director', campus=campus),
+        'super-admin': create_user(username='x@example.com', email='x@example.com', role='super_admin'),
+    }
+
+
+@pytest.fixture
+def populate(create_user, campus, college, department, dashboard_users):
+    """Add `size` campuses, departments, staff and complaints per status"""
+    security = Category.objects.create(name='Security')
+    state = {'batch': 0}
+
+    def add(size):
+        state['batch'] += 1
+        batch = state['batch']
+        for i in range(size):
+            other_campus = Campus.objects.create(name=f'Campus {batch}-{i}')
+            other_dept = Department.objects.create(name=f'Department {batch}-{i}', college=college)
+            staff = create_user(username=f'staff{batch}-{i}', email=f'staff{batch}-{i}@example.com',
+                                role='maintenance', department=department)
+            for j, complaint_status in enumerate(STATUSES):
+                Complaint.objects.create(
+                    title=f'Complaint {batch}-{i}-{j}', description='Something is broken', location='Block A',
+                    status=complaint_status, priority='high', campus=campus if j % 2 else other_campus,
+                    department=department if j % 2 else other_dept, category=security,
+                    submitter=dashboard_users['student'], assigned_to=staff,
+                    feedback_rating=(j % 5) + 1, sla_response_breached=(j == 0),
+                    first_response_at=timezone.now() + timedelta(hours=j),
+                    resolved_at=timezone.now() + timedelta(hours=2) if complaint_status == 'resolved' else None,
+                )
+    return add
+
+
+@pytest.mark.django_db
+class TestDashboardQueryCount:
+    """Each dashboard costs a fixed number of queries"""
+
+    @pytest.mark.parametrize('dashboard', sorted(DASHBOARD_QUERIES))
+    def test_query_count_does_not_grow_with_rows(self, dashboard, api_client, dashboard_users, populate,
+                                                 django_assert_num_queries):
+        api_client.force_authenticate(user=dashboard_users[dashboard])
+        url = f'/api/complaints/dashboards/{dashboard}/stats/'
+
+        populate(1)
+        with django_assert_num_queries(DASHBOARD_QUERIES[dashboard]):
+            small = api_client.get(url)
+
+        populate(5)
+        with django_assert_num_queries(DASHBOARD_QUERIES[dashboard]):
+            large = api_client.get(url)
+
+        assert small.status_code == status.HTTP_200_OK
+        assert large.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+class TestDashboardValues:
+    """Aggregated numbers match the data"""
+
+    def test_admin_stats(self, api_client, dashboard_users, populate, campus):
+        populate(2)
+        api_client.force_authenticate(user=dashboard_users['admin'])
+
+        data = api_client.get('/api/complaints/dashboards/admin/stats/').data
+
+        assert data['total_complaints'] == 12
+        assert data['new_complaints'] == 2
+        assert data['sla_breaches'] == 2
+        assert data['total_ratings'] == 12
+        campus_stats = {row['campus']: row for row in data['campus_stats']}
+        assert campus_stats[campus.name] == {'campus': campus.name, 'total': 6, 'open': 2}
+        assert campus_stats['Campus 1-0'] == {'campus': 'Campus 1-0', 'total': 3, 'open': 2}
+        assert data['category_stats'] == [{'category__name': 'Security', 'count': 12}]
+
+    def test_dean_stats(self, api_client, dashboard_users, populate, department):
+        populate(1)
+        api_client.force_authenticate(user=dashboard_users['dean'])
+
+        data = api_client.get('/api/complaints/dashboards/dean/stats/').data
+
+        assert data['total_complaints'] == 6
+        assert data['unresolved_complaints'] == 4
+        assert data['average_resolution_time_hours'] == pytest.approx(2, abs=0.01)
+        assert data['department_stats'][0] == {
+            'department': department.name, 'total': 3, 'open': 1, 'resolved': 0,
+        }
+
+    def test_dept_head_workload_counts_only_department(self, api_client, dashboard_users, populate):
+        populate(1)
+        api_client.force_authenticate(user=dashboard_users['dept-head'])
+
+        data = api_client.get('/api/complaints/dashboards/dept-head/stats/').data
+
+        assert data['total_complaints'] == 3
+        assert data['staff_workload'] == [
+            {'staff_name': 'Test User', 'total_assigned': 3, 'open_assigned': 1},
+        ]
+
+    def test_student_stats(self, api_client, dashboard_users, populate):
+        populate(1)
+        api_client.force_authenticate(user=dashboard_users['student'])
+
+        data = api_client.get('/api/complaints/dashboards/student/stats/').data
+
+        assert data['total_complaints'] == 6
+        assert data['open_complaints'] == 4
+        assert data['average_response_time_hours'] == pytest.approx(2.5, abs=0.01)
+        assert data['average_rating'] == 2.67
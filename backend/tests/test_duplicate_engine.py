@@ -0,0 +1,154 @@
+"""
+Tests for the indexed near-duplicate detection engine
+"""
+import pytest
+from functools import partial
+from django.core.management import call_command
+from rest_framework import status
+from complaints.models import ComplaintLSHBucket, ComplaintSignature
+from complaints.duplicate_engine import (
+    BANDS, index_complaint, find_similar, mark_duplicate, rank_candidates, jaccard_similarity,
+)
+from complaints.validators import ComplaintValidator
+
+PROJECTOR = 'The projector in lecture hall 12 is broken and shows no picture during classes'
+
+
+@pytest.fixture
+def make_complaint(make_complaint, campus):
+    return partial(make_complaint, campus=campus, location='Hall 12')
+
+
+@pytest.mark.django_db
+class TestDuplicateIndex:
+    """Signature storage and candidate lookup"""
+
+    def test_index_stores_signature_and_buckets(self, make_complaint):
+        complaint = make_complaint(title='Broken projector', description=PROJECTOR)
+
+        index_complaint(complaint)
+        index_complaint(complaint)
+
+        assert ComplaintSignature.objects.filter(complaint=complaint).count() == 1
+        assert ComplaintLSHBucket.objects.filter(complaint=complaint).count() == BANDS
+
+    def test_find_similar_ranks_near_duplicates_first(self, make_complaint):
+        original = make_complaint(title='Broken projector', description=PROJECTOR)
+        reworded = make_complaint(title='Broken projector', description=PROJECTOR + ' again today')
+        unrelated = make_complaint(title='Cafeteria food', description='The cafeteria served cold injera and the queue was very long')
+        for complaint in (original, reworded, unrelated):
+            index_complaint(complaint)
+
+        matches = find_similar('Broken projector', PROJECTOR, threshold=0.3)
+
+        assert [m.pk for m, _ in matches] == [original.pk, reworded.pk]
+        assert matches[0][1] == 1.0
+        assert matches[0][1] >= matches[1][1]
+
+    def test_edited_text_is_reindexed(self, make_complaint, django_assert_num_queries):
+        complaint = make_complaint(title='Broken projector', description=PROJECTOR)
+        index_complaint(complaint)
+        wifi = 'The wifi in the library disconnects every few minutes'
+
+        complaint.title, complaint.description = 'Library wifi', wifi
+        complaint.save()
+
+        assert find_similar('Broken projector', PROJECTOR) == []
+        assert [m.pk for m, _ in find_similar('Library wifi', wifi)] == [complaint.pk]
+
+        # Saves that leave the text alone don't touch the index
+        with django_assert_num_queries(1):
+            complaint.save(update_fields=['ai_summary'])
+
+    def test_unindexed_text_has_no_candidates(self, make_complaint):
+        index_complaint(make_complaint(title='Broken projector', description=PROJECTOR))
+
+        assert find_similar('Library wifi', 'The wifi in the library disconnects every few minutes') == []
+
+
+@pytest.mark.django_db
+class TestMarkDuplicate:
+    """Duplicate flagging during enrichment"""
+
+    def test_resubmission_points_at_original(self, make_complaint):
+        original = make_complaint(title='Broken projector', description=PROJECTOR)
+        mark_duplicate(original)
+        copy = make_complaint(title='Broken projector', description=PROJECTOR + '!')
+
+        assert mark_duplicate(copy) == original
+        copy.refresh_from_db()
+        assert copy.is_duplicate is True
+        assert copy.duplicate_of == original
+
+    def test_duplicate_of_duplicate_points_at_root(self, make_complaint):
+        original = make_complaint(title='Broken projector', description=PROJECTOR)
+        mark_duplicate(original)
+        first_copy = make_complaint(title='Broken projector', description=PROJECTOR)
+        mark_duplicate(first_copy)
+        second_copy = make_complaint(title='Broken projector', description=PROJECTOR)
+
+        assert mark_duplicate(second_copy) == original
+
+    def test_closed_complaints_are_not_targets(self, make_complaint):
+        original = make_complaint(title='Broken projector', description=PROJECTOR, status='closed')
+        index_complaint(original)
+        copy = make_complaint(title='Broken projector', description=PROJECTOR)
+
+        assert mark_duplicate(copy) is None
+        copy.refresh_from_db()
+        assert copy.is_duplicate is False
+
+    def test_rebuild_command_indexes_existing_complaints(self, make_complaint):
+        make_complaint(title='Broken projector', description=PROJECTOR)
+        copy = make_complaint(title='Broken projector', description=PROJECTOR)
+
+        call_command('rebuild_duplicate_index', '--mark')
+
+        assert ComplaintSignature.objects.count() == 2
+        copy.refresh_from_db()
+        assert copy.is_duplicate is True
+
+
+@pytest.mark.django_db
+class TestDuplicateChecks:
+    """Callers that used pairwise SequenceMatcher scans"""
+
+    def test_validator_blocks_resubmission(self, make_complaint, student_user):
+        index_complaint(make_complaint(title='Broken projector', description=PROJECTOR, submitter=student_user))
+
+        is_duplicate, original = ComplaintValidator._check_duplicate('Broken projector', PROJECTOR, student_user)
+
+        assert is_duplicate is True
+        assert original.title == 'Broken projector'
+
+    def test_validator_allows_different_complaint(self, make_complaint, student_user):
+        index_complaint(make_complaint(title='Broken projector', description=PROJECTOR, submitter=student_user))
+
+        is_duplicate, _ = ComplaintValidator._check_duplicate(
+            'Dorm water', 'There has been no running water in block 4 since Sunday', student_user
+        )
+
+        assert is_duplicate is False
+
+    def test_rank_candidates(self):
+        candidates = [
+            {'title': 'Cafeteria', 'description': 'Cold food again'},
+            {'title': 'Broken projector', 'description': PROJECTOR},
+        ]
+
+        ranked = rank_candidates(f'Broken projector {PROJECTOR}', candidates, threshold=0.5)
+
+        assert [c['title'] for c, _ in ranked] == ['Broken projector']
+        assert jaccard_similarity('abc def', 'abc def') == 1.0
+
+    def test_duplicates_endpoint(self, make_complaint, staff_user, api_client):
+        original = make_complaint(title='Broken projector', description=PROJECTOR)
+        copy = make_complaint(title='Broken projector', description=PROJECTOR)
+        index_complaint(original)
+        index_complaint(copy)
+        api_client.force_authenticate(user=staff_user)
+
+        response = api_client.get(f'/api/complaints/{copy.pk}/duplicates/')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['similar_complaints'][0]['id'] == original.pk
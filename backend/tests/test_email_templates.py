@@ -0,0 +1,71 @@
+"""
+Tests for the compiled email template registry
+"""
+import pytest
+from complaints import email_templates
+from complaints.models import Complaint, EmailTemplate, OutboundEmail
+from complaints.notifications import send_sla_breach_notifications
+
+
+@pytest.fixture
+def welcome_row():
+    return EmailTemplate.objects.create(
+        name='Welcome', template_type='welcome', subject='Hi {{user_name}}',
+        html_content='<p>{{user_name}}</p>', text_content='Hello {{user_name}}',
+    )
+
+
+@pytest.mark.django_db
+class TestRegistry:
+    """Database templates override the built-ins and are compiled once"""
+
+    def test_builtin_default(self):
+        subject, text, html = email_templates.render('password_reset', {
+            'user_name': "O'Brien", 'reset_url': 'http://x/?a=1&b=2', 'expires_in': '1 hour',
+        })
+        assert subject == 'Password Reset Request - UoG Complaint System'
+        assert "Dear O'Brien," in text and 'http://x/?a=1&b=2' in text
+        assert 'O&#x27;Brien' in html and 'a=1&amp;b=2' in html
+
+    def test_database_template_wins_and_is_compiled_once(self, welcome_row, django_assert_num_queries):
+        first = email_templates.get_template('welcome')
+        assert first.render({'user_name': 'Ann'}) == ('Hi Ann', 'Hello Ann', '<p>Ann</p>')
+        with django_assert_num_queries(0):
+            assert email_templates.get_template('welcome') is first
+
+    def test_edit_recompiles_and_deactivation_falls_back(self, welcome_row):
+        first = email_templates.get_template('welcome')
+        welcome_row.subject = 'Welcome {{user_name}}'
+        welcome_row.save()
+        edited = email_templates.get_template('welcome')
+        assert edited is not first
+        assert edited.render({'user_name': 'Ann'})[0] == 'Welcome Ann'
+
+        welcome_row.is_active = False
+        welcome_row.save()
+        assert 'UoG Complaint Management System' in email_templates.render('welcome', {'user_name': 'Ann'})[0]
+
+    def test_unknown_type(self):
+        with pytest.raises(KeyError):
+            email_templates.get_template('no_such_type')
+
+    def test_render_batch(self, welcome_row):
+        rendered = email_templates.render_batch('welcome', [{'user_name': name} for name in ('A', 'B', 'C')])
+        assert [subject for subject, _, _ in rendered] == ['Hi A', 'Hi B', 'Hi C']
+
+
+@pytest.mark.django_db
+def test_sla_breach_notifications_batch(student_user, department):
+    complaints = [
+        Complaint.objects.create(
+            title=f'T{i}', description='D', location='L', submitter=student_user, department=department,
+            tracking_id=f'CMP-SLA{i}', sla_response_breached=True, sla_response_hours=2, sla_resolution_hours=24,
+        )
+        for i in range(3)
+    ]
+
+    assert send_sla_breach_notifications(complaints) == 3
+    emails = list(OutboundEmail.objects.order_by('id'))
+    assert [email.subject for email in emails] == [f'SLA Breach Alert - CMP-SLA{i}' for i in range(3)]
+    assert 'Breach Type: Response' in emails[0].body
+    assert all(email.kind == 'sla_breach' for email in emails)
@@ -0,0 +1,170 @@
+"""
+Tests for the background AI enrichment pipeline
+"""
+import pytest
+from datetime import timedelta
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework import status
+from complaints.models import Complaint, EnrichmentJob
+from complaints.enrichment import _claim, process_pending_jobs, release_stale_jobs, run_job
+
+
+@pytest.fixture(autouse=True)
+def offline_language_detection(monkeypatch):
+    """Avoid the googletrans network call during enrichment"""
+    monkeypatch.setattr('complaints.ai_service.detect_language', lambda text: ('en', 0.9))
+
+
+@pytest.fixture
+def complaint_data(category, campus):
+    return {
+        'title': 'Broken projector',
+        'description': 'There is a fire near the projector in room 301',
+        'location': 'Room 301',
+        'category': category.id,
+        'campus': campus.id,
+    }
+
+
+@pytest.mark.django_db
+class TestQueuedEnrichment:
+    """Complaint creation with the default queue executor"""
+
+    def test_create_returns_pending_and_queues_job(self, authenticated_client, complaint_data, settings):
+        settings.COMPLAINT_ENRICHMENT_EXECUTOR = 'queue'
+
+        response = authenticated_client.post('/api/complaints/', complaint_data)
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['enrichment_status'] == 'pending'
+
+        complaint = Complaint.objects.get(tracking_id=response.data['tracking_id'])
+        assert complaint.ai_summary == ''
+        assert complaint.sla_response_hours is None
+        assert EnrichmentJob.objects.filter(complaint=complaint, status='pending').count() == 1
+
+    def test_worker_fills_ai_fields_and_sla(self, authenticated_client, complaint_data, settings):
+        settings.COMPLAINT_ENRICHMENT_EXECUTOR = 'queue'
+        response = authenticated_client.post('/api/complaints/', complaint_data)
+
+        succeeded, failed = process_pending_jobs()
+
+        assert (succeeded, failed) == (1, 0)
+        complaint = Complaint.objects.get(tracking_id=response.data['tracking_id'])
+        assert complaint.enrichment_status == 'completed'
+        assert complaint.enriched_at is not None
+        assert complaint.urgency == 'critical'
+        assert complaint.priority == 'critical'
+        assert complaint.ai_summary
+        assert complaint.sla_response_hours == 2
+        assert EnrichmentJob.objects.get(complaint=complaint).status == 'done'
+
+    def test_job_is_claimed_only_once(self, authenticated_client, complaint_data, settings):
+        settings.COMPLAINT_ENRICHMENT_EXECUTOR = 'queue'
+        authenticated_client.post('/api/complaints/', complaint_data)
+        job = EnrichmentJob.objects.get()
+
+        assert run_job(job.pk) is True
+        assert run_job(job.pk) is None
+
+    def test_failed_job_is_retried_then_dead(self, create_user, monkeypatch):
+        complaint = Complaint.objects.create(
+            title='Broken chair', description='The chair is broken', location='Hall',
+            submitter=create_user(), enrichment_status='pending'
+        )
+        job = EnrichmentJob.objects.create(complaint=complaint, max_attempts=2)
+
+        def explode(complaint):
+            raise RuntimeError('analyzer down')
+
+        monkeypatch.setattr('complaints.enrichment.enrich_complaint', explode)
+
+        assert run_job(job.pk) is False
+        job.refresh_from_db()
+        complaint.refresh_from_db()
+        assert (job.status, job.attempts) == ('pending', 1)
+        assert job.run_after > timezone.now()
+        assert complaint.enrichment_status == 'pending'
+        # Not due until the backoff has passed
+        assert run_job(job.pk) is None
+
+        EnrichmentJob.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        assert run_job(job.pk) is False
+        job.refresh_from_db()
+        complaint.refresh_from_db()
+        assert (job.status, job.attempts) == ('failed', 2)
+        assert 'analyzer down' in job.last_error
+        assert complaint.enrichment_status == 'failed'
+
+    def test_job_that_kills_the_worker_runs_out_of_attempts(self, create_user):
+        complaint = Complaint.objects.create(
+            title='Broken chair', description='The chair is broken', location='Hall',
+            submitter=create_user(), enrichment_status='pending'
+        )
+        job = EnrichmentJob.objects.create(complaint=complaint, max_attempts=2)
+
+        def crash_worker():
+            # Claimed, then the worker dies before recording anything
+            assert _claim(job.pk)
+            EnrichmentJob.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(hours=1))
+            return release_stale_jobs(lock_timeout=60)
+
+        assert crash_worker() == 1
+        job.refresh_from_db()
+        assert (job.status, job.attempts) == ('pending', 1)
+
+        assert crash_worker() == 0
+        job.refresh_from_db()
+        complaint.refresh_from_db()
+        assert (job.status, job.attempts) == ('failed', 2)
+        assert job.finished_at is not None
+        assert complaint.enrichment_status == 'failed'
+
+    def test_management_command_drains_queue(self, authenticated_client, complaint_data, settings):
+        settings.COMPLAINT_ENRICHMENT_EXECUTOR = 'queue'
+        authenticated_client.post('/api/complaints/', complaint_data)
+
+        call_command('run_enrichment_worker', '--once')
+
+        assert not EnrichmentJob.objects.filter(status='pending').exists()
+
+
+@pytest.mark.django_db
+class TestInlineEnrichment:
+    """Complaint creation with the in-process executor"""
+
+    def test_inline_executor_runs_after_commit(self, authenticated_client, complaint_data, settings,
+                                               django_capture_on_commit_callbacks):
+        settings.COMPLAINT_ENRICHMENT_EXECUTOR = 'inline'
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = authenticated_client.post('/api/complaints/', complaint_data)
+
+        complaint = Complaint.objects.get(tracking_id=response.data['tracking_id'])
+        assert complaint.enrichment_status == 'completed'
+
+        poll = authenticated_client.get(f'/api/complaints/{complaint.id}/enrichment/')
+        assert poll.status_code == status.HTTP_200_OK
+        assert poll.data['enrichment_status'] == 'completed'
+        assert poll.data['urgency'] == 'critical'
+
+
+@pytest.mark.django_db
+class TestEnrichmentStatusEndpoint:
+    """Polling is limited to complaints the user can see"""
+
+    def test_only_users_in_scope_can_poll(self, api_client, make_complaint, staff_user, create_user):
+        complaint = make_complaint(enrichment_status='pending')
+        url = f'/api/complaints/{complaint.id}/enrichment/'
+
+        other_student = create_user(username='other@example.com', email='other@example.com')
+        for user in (other_student, staff_user):
+            api_client.force_authenticate(user=user)
+            assert api_client.get(url).status_code == status.HTTP_404_NOT_FOUND
+
+        complaint.assigned_to = staff_user
+        complaint.save(update_fields=['assigned_to'])
+        response = api_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['enrichment_status'] == 'pending'
@@ -0,0 +1,73 @@
+"""
+Tests for the per-process index cache and its version stamps
+"""
+import pytest
+from django.core.cache import cache
+from complaints import index_cache
+from complaints.index_cache import ProcessIndex
+
+
+class Source:
+    """Stands in for the table an index is built from"""
+
+    def __init__(self):
+        self.value = 1
+        self.builds = 0
+
+    def build(self):
+        self.builds += 1
+        return self.value
+
+
+@pytest.fixture
+def source():
+    return Source()
+
+
+@pytest.fixture
+def make_index(source, settings):
+    settings.TEST_INDEX_CHECK_INTERVAL = 0
+    return lambda: ProcessIndex('test:index_version', source.build, 'TEST_INDEX_CHECK_INTERVAL')
+
+
+class TestProcessIndex:
+    def test_other_process_rebuilds_after_invalidate(self, source, make_index):
+        this_worker, other_worker = make_index(), make_index()
+        assert other_worker.get() == 1
+
+        source.value = 2
+        this_worker.invalidate()
+        assert other_worker.get() == 2
+
+    def test_copy_without_shared_stamp_expires(self, source, make_index, settings):
+        # The edit was made in a process whose cache this one can't see
+        settings.PROCESS_INDEX_MAX_AGE = 3600
+        index = make_index()
+        assert index.get() == 1
+        source.value = 2
+        assert index.get() == 1
+
+        settings.PROCESS_INDEX_MAX_AGE = 0
+        assert index.get() == 2
+
+    def test_per_process_cache_expires_even_with_a_stamp(self, source, make_index, settings):
+        settings.PROCESS_INDEX_MAX_AGE = 0
+        index = make_index()
+        index.invalidate()
+        assert index.get() == 1
+        source.value = 2
+        assert index.get() == 2
+
+    def test_shared_stamp_is_trusted(self, source, make_index, settings, monkeypatch):
+        monkeypatch.setattr(index_cache, 'shared_cache_configured', lambda: True)
+        settings.PROCESS_INDEX_MAX_AGE = 0
+        cache.set('test:index_version', 'v1', None)
+        index = make_index()
+        index.get()
+
+        source.value = 2
+        assert index.get() == 1
+        assert source.builds == 1
+
+    def test_default_cache_is_per_process(self):
+        assert not index_cache.shared_cache_configured()
@@ -0,0 +1,78 @@
+"""
+Tests for the precompiled keyword matcher and analyze_urgency
+"""
+from complaints.keyword_matcher import KeywordMatcher
+from complaints.ai_service import analyze_urgency
+
+
+class TestKeywordMatcher:
+    """Test multi-tier keyword matching"""
+
+    def setup_method(self):
+        self.matcher = KeywordMatcher({
+            'critical': ['fire', 'broken glass', 'gas leak', 'leak'],
+            'medium': ['broken', 'not working'],
+        })
+
+    def test_reports_terms_with_positions(self):
+        matches = self.matcher.find_all('The heater is NOT WORKING')
+
+        assert [(m.term, m.tier, m.start, m.end) for m in matches] == [
+            ('not working', 'medium', 14, 25),
+        ]
+
+    def test_finds_overlapping_and_nested_keywords(self):
+        tiers = self.matcher.match_tiers('broken glass and a gas leak')
+
+        assert [m.term for m in tiers['critical']] == ['broken glass', 'gas leak', 'leak']
+        assert [m.term for m in tiers['medium']] == ['broken']
+        assert tiers['critical'][2].start == 23
+
+    def test_repeated_terms_keep_keyword_order(self):
+        tiers = self.matcher.match_tiers('leak, fire, leak')
+
+        assert self.matcher.distinct_terms(tiers['critical']) == ['fire', 'leak']
+
+    def test_amharic_keywords(self):
+        matcher = KeywordMatcher({'critical': ['እሳት'], 'medium': ['አይሰራም']})
+
+        tiers = matcher.match_tiers('በቤተ-መጽሐፍቱ አካባቢ እሳት አለ፣ መብራቱ አይሰራም')
+
+        assert [m.term for m in tiers['critical']] == ['እሳት']
+        assert [m.term for m in tiers['medium']] == ['አይሰራም']
+
+    def test_empty_text(self):
+        assert self.matcher.find_all('') == []
+
+
+class TestAnalyzeUrgency:
+    """Test urgency tiers resolved by the matcher"""
+
+    def test_critical_keyword_wins(self):
+        urgency, confidence, reason = analyze_urgency('There is smoke and the door is broken')
+
+        assert (urgency, confidence) == ('critical', 0.9)
+        assert reason == "Critical keyword: 'smoke'"
+
+    def test_high_lists_every_keyword(self):
+        urgency, confidence, reason = analyze_urgency('This is urgent, please fix asap')
+
+        assert (urgency, confidence) == ('high', 0.85)
+        assert reason == "High urgency keyword: 'urgent'; High urgency keyword: 'asap'"
+
+    def test_medium_skips_sentiment(self, monkeypatch):
+        def fail(text):
+            raise AssertionError('sentiment should not run for keyword-decided results')
+
+        monkeypatch.setattr('complaints.ai_service.sentiment_analyzer.polarity_scores', fail)
+
+        urgency, confidence, reason = analyze_urgency('The wifi in the library is slow')
+
+        assert (urgency, confidence) == ('medium', 0.7)
+        assert reason == "Medium urgency keyword: 'slow'"
+
+    def test_low_keyword(self):
+        urgency, confidence, reason = analyze_urgency('A suggestion to add more benches outside')
+
+        assert (urgency, confidence) == ('low', 0.75)
+        assert reason.startswith("Low urgency keyword: 'suggestion'")
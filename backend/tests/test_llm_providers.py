@@ -0,0 +1,166 @@
+"""
+Tests for the AI provider clients, circuit breakers and hedging, against a
+local stub server
+"""
+import time
+import pytest
+from complaints.chatbot_service import ChatbotService
+from complaints.llm_providers import (
+    CLOSED, HALF_OPEN, OPEN, AdaptiveTimeout, CircuitBreaker, GeminiClient, GroqClient,
+    ProviderClient, ProviderUnavailable, hedged_call,
+)
+
+
+@pytest.fixture
+def service(llm_stub, settings):
+    """Service talking to both providers on the stub server"""
+    settings.LLM_HEDGE_DELAY = 0.2
+    llm_stub.groq_reply('/groq', 'groq says hi')
+    llm_stub.gemini_reply('/gemini', 'gemini says hi')
+    service = ChatbotService()
+    service.use_groq = service.use_gemini = True
+    service.groq_client = GroqClient('groq-key', url=llm_stub.url('/groq'))
+    service.gemini_client = GeminiClient('gemini-key', url=llm_stub.url('/gemini'))
+    return service
+
+
+class TestCircuitBreaker:
+    def test_opens_after_threshold_and_half_opens_after_timeout(self):
+        breaker = CircuitBreaker('test', failure_threshold=2, reset_timeout=0.05)
+        breaker.record_failure()
+        assert breaker.state == CLOSED and breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == OPEN and not breaker.allow()
+
+        time.sleep(0.06)
+        assert breaker.allow()
+        assert breaker.state == HALF_OPEN
+        # Only one trial call at a time
+        assert not breaker.allow()
+        breaker.record_success()
+        assert breaker.state == CLOSED and breaker.failures == 0
+
+    def test_failed_trial_reopens(self):
+        breaker = CircuitBreaker('test', failure_threshold=1, reset_timeout=0.01)
+        breaker.record_failure()
+        time.sleep(0.02)
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == OPEN
+        assert breaker.snapshot()['retry_in'] is not None
+
+
+class TestAdaptiveTimeout:
+    def test_follows_latency_within_bounds(self):
+        timeout = AdaptiveTimeout(minimum=1, maximum=30)
+        assert timeout.value == 30
+        for _ in range(20):
+            timeout.observe(0.5)
+        assert timeout.value == 1
+        for _ in range(20):
+            timeout.observe(4.0)
+        assert 4.0 < timeout.value < 30
+
+
+class TestProviderClients:
+    def test_groq_and_gemini_requests(self, llm_stub):
+        llm_stub.groq_reply('/groq', 'hello')
+        llm_stub.gemini_reply('/gemini', 'salam')
+        assert GroqClient('k', url=llm_stub.url('/groq')).complete('system', 'hi') == 'hello'
+        assert GeminiClient('g', url=llm_stub.url('/gemini')).complete('system', 'hi') == 'salam'
+
+        groq_request, gemini_request = llm_stub.requests
+        assert groq_request['json']['messages'][1] == {'role': 'user', 'content': 'hi'}
+        assert gemini_request['query'] == 'key=g'
+
+    def test_session_reuses_the_connection(self, llm_stub):
+        llm_stub.groq_reply('/groq', 'hello')
+        client = GroqClient('k', url=llm_stub.url('/groq'))
+        for _ in range(3):
+            client.complete('system', 'hi')
+        assert len({request['client_port'] for request in llm_stub.requests}) == 1
+
+    def test_open_breaker_skips_the_network(self, llm_stub, settings):
+        settings.LLM_BREAKER_FAILURE_THRESHOLD = 2
+        llm_stub.respond('/groq', {'error': 'overloaded'}, status=503)
+        client = GroqClient('k', url=llm_stub.url('/groq'))
+        for _ in range(2):
+            with pytest.raises(Exception):
+                client.complete('system', 'hi')
+
+        with pytest.raises(ProviderUnavailable):
+            client.complete('system', 'hi')
+        assert len(llm_stub.requests) == 2
+        assert client.health()['state'] == OPEN
+
+    def test_provider_must_implement_the_protocol(self):
+        class HalfClient(ProviderClient):
+            def build_request(self, system_prompt, message, max_tokens):
+                return 'http://example.invalid', {}, {}, {}
+
+        with pytest.raises(TypeError, match='parse'):
+            HalfClient('k', url='http://example.invalid')
+
+        class BlockingClient(HalfClient):
+            def parse(self, data):
+                return data['text']
+
+        with pytest.raises(TypeError, match='build_stream_request'):
+            BlockingClient('k', url='http://example.invalid')
+
+
+class TestHedging:
+    def test_first_success_wins(self):
+        assert hedged_call([lambda: 'a', lambda: 'b'], hedge_delay=1) == 'a'
+
+    def test_failure_starts_the_next_call_at_once(self):
+        def fail():
+            raise ConnectionError('down')
+
+        started = time.monotonic()
+        assert hedged_call([fail, lambda: 'b'], hedge_delay=5) == 'b'
+        assert time.monotonic() - started < 1
+
+    def test_all_fail(self):
+        def fail():
+            raise ConnectionError('down')
+
+        with pytest.raises(ConnectionError):
+            hedged_call([fail, fail], hedge_delay=0.01)
+        with pytest.raises(ProviderUnavailable):
+            hedged_call([])
+
+
+class TestChatbotFailover:
+    """The chatbot answers from whichever provider is healthy"""
+
+    def test_groq_preferred(self, service):
+        result = service.get_response('library hours')
+        assert (result['source'], result['response']) == ('groq_ai', 'groq says hi')
+
+    def test_slow_groq_is_hedged_with_gemini(self, service, llm_stub):
+        llm_stub.groq_reply('/groq', 'late', delay=2)
+        started = time.monotonic()
+        result = service.get_response('library hours')
+        assert result['source'] == 'gemini_rest_api'
+        assert time.monotonic() - started < 1.5
+
+    def test_both_down_falls_back_to_knowledge_base(self, service, llm_stub):
+        llm_stub.respond('/groq', {}, status=500)
+        llm_stub.respond('/gemini', {}, status=429)
+        result = service.get_response('How much is tuition?')
+        assert result['source'] == 'knowledge_base'
+
+
+@pytest.mark.django_db
+def test_health_endpoint(api_client, monkeypatch, service):
+    monkeypatch.setattr('complaints.chatbot_views.chatbot_service', service)
+    response = api_client.get('/api/complaints/chatbot/health/')
+    assert response.status_code == 200
+    assert response.data['status'] == 'ok'
+    assert [p['provider'] for p in response.data['providers']] == ['groq', 'gemini']
+
+    for client in (service.groq_client, service.gemini_client):
+        for _ in range(client.breaker.failure_threshold):
+            client.breaker.record_failure()
+    assert api_client.get('/api/complaints/chatbot/health/').data['status'] == 'degraded'
@@ -0,0 +1,155 @@
+"""
+Tests for the transactional email outbox and its delivery worker
+"""
+import pytest
+from datetime import timedelta
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.db import transaction
+from django.utils import timezone
+from complaints import outbox
+from complaints.models import Complaint, OutboundEmail
+from complaints.notifications import notify_complaint_resolved
+
+
+class CountingBackend(EmailBackend):
+    """locmem backend recording connection opens and rejecting some recipients"""
+    opened = 0
+    rejected = set()
+
+    def open(self):
+        CountingBackend.opened += 1
+        return True
+
+    def send_messages(self, messages):
+        for message in messages:
+            if set(message.to) & self.rejected:
+                raise ConnectionError('recipient refused')
+        return super().send_messages(messages)
+
+
+@pytest.fixture(autouse=True)
+def locmem_mail(settings):
+    settings.EMAIL_BACKEND = 'tests.test_outbox.CountingBackend'
+    settings.EMAIL_OUTBOX_EXECUTOR = 'queue'
+    CountingBackend.opened = 0
+    CountingBackend.rejected = set()
+
+
+@pytest.fixture
+def complaint(student_user, department, campus):
+    return Complaint.objects.create(
+        title='Leaking roof', description='D', location='L', submitter=student_user,
+        department=department, campus=campus, tracking_id='CMP-OUTBOX1',
+    )
+
+
+@pytest.mark.django_db
+class TestEnqueue:
+    """Emails are rows written with the change that causes them"""
+
+    def test_notification_is_queued_not_sent(self, complaint, student_user):
+        notify_complaint_resolved(complaint)
+
+        assert mail.outbox == []
+        email = OutboundEmail.objects.get()
+        assert email.status == 'pending'
+        assert email.to == [student_user.email]
+        assert email.kind == 'resolved'
+        assert email.complaint == complaint
+
+    def test_rolled_back_change_leaves_no_email(self, complaint):
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                complaint.status = 'resolved'
+                complaint.save()
+                notify_complaint_resolved(complaint)
+                raise RuntimeError('update failed')
+
+        assert not OutboundEmail.objects.exists()
+
+    def test_status_update_queues_email(self, api_client, admin_user, complaint):
+        api_client.force_authenticate(user=admin_user)
+        response = api_client.patch(f'/api/complaints/{complaint.id}/', {'status': 'resolved'})
+
+        assert response.status_code == 200
+        assert OutboundEmail.objects.filter(complaint=complaint, kind='resolved').count() == 1
+
+    def test_failed_status_update_rolls_back(self, api_client, admin_user, complaint, monkeypatch):
+        def enqueue_fails(**kwargs):
+            raise RuntimeError('outbox insert failed')
+
+        monkeypatch.setattr('accounts.utils.send_email', enqueue_fails)
+        api_client.force_authenticate(user=admin_user)
+        with pytest.raises(RuntimeError):
+            api_client.post(f'/api/complaints/{complaint.id}/status/', {'status': 'resolved'})
+
+        complaint.refresh_from_db()
+        assert complaint.status != 'resolved'
+        assert not complaint.events.filter(event_type='status_changed').exists()
+
+    def test_inline_executor_delivers_after_commit(self, complaint, settings, django_capture_on_commit_callbacks):
+        settings.EMAIL_OUTBOX_EXECUTOR = 'inline'
+        with django_capture_on_commit_callbacks(execute=True):
+            notify_complaint_resolved(complaint)
+
+        assert len(mail.outbox) == 1
+        assert OutboundEmail.objects.get().status == 'sent'
+
+
+@pytest.mark.django_db
+class TestDelivery:
+    """The worker drains the outbox over one connection per batch"""
+
+    def test_batch_shares_one_connection(self):
+        for i in range(5):
+            outbox.enqueue_email(f'Subject {i}', 'Body', f'user{i}@example.com', html_body='<p>Body</p>')
+
+        assert outbox.process_outbox(batch_size=50) == (5, 0)
+        assert CountingBackend.opened == 1
+        assert len(mail.outbox) == 5
+        assert mail.outbox[0].alternatives[0][1] == 'text/html'
+        assert OutboundEmail.objects.filter(status='sent', attempts=1, sent_at__isnull=False).count() == 5
+        assert outbox.process_outbox() == (0, 0)
+
+    def test_failed_message_backs_off_without_blocking_others(self):
+        CountingBackend.rejected = {'bad@example.com'}
+        outbox.enqueue_email('Hi', 'Body', 'good@example.com')
+        bad = outbox.enqueue_email('Hi', 'Body', 'bad@example.com')
+
+        assert outbox.deliver_emails() == (1, 1)
+        assert [message.to for message in mail.outbox] == [['good@example.com']]
+        bad.refresh_from_db()
+        assert bad.status == 'pending'
+        assert bad.attempts == 1
+        assert 'recipient refused' in bad.last_error
+        assert bad.run_after > timezone.now() + timedelta(seconds=outbox.RETRY_BASE_DELAY - 5)
+        # Not due yet
+        assert outbox.deliver_emails() == (0, 0)
+
+    def test_dead_letter_and_requeue(self):
+        CountingBackend.rejected = {'bad@example.com'}
+        bad = outbox.enqueue_email('Hi', 'Body', 'bad@example.com')
+        OutboundEmail.objects.filter(pk=bad.pk).update(attempts=bad.max_attempts - 1)
+
+        assert outbox.deliver_emails() == (0, 1)
+        bad.refresh_from_db()
+        assert bad.status == 'dead'
+
+        CountingBackend.rejected = set()
+        assert outbox.requeue_dead() == 1
+        assert outbox.deliver_emails() == (1, 0)
+
+    def test_stale_sending_rows_are_released(self):
+        email = outbox.enqueue_email('Hi', 'Body', 'user@example.com')
+        OutboundEmail.objects.filter(pk=email.pk).update(
+            status='sending', locked_at=timezone.now() - timedelta(hours=1)
+        )
+
+        assert outbox.process_outbox() == (1, 0)
+
+    def test_worker_command_once(self):
+        outbox.enqueue_email('Hi', 'Body', 'user@example.com')
+        call_command('run_email_worker', '--once')
+        assert len(mail.outbox) == 1
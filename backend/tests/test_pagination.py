@@ -0,0 +1,137 @@
+"""
+Tests for keyset pagination of complaint, event and activity-log feeds
+"""
+import pytest
+from datetime import timedelta
+from django.utils import timezone
+from accounts.models import ActivityLog
+from complaints.models import Complaint, ComplaintEvent
+
+
+@pytest.fixture
+def make_complaints(make_complaint):
+    def make(count, same_time=False):
+        now = timezone.now()
+        created = []
+        for i in range(count):
+            # Several rows sharing a created_at exercise the id tie-break
+            stamp = now if same_time else now - timedelta(minutes=count - i)
+            created.append(make_complaint(title=f'Complaint {i}', created_at=stamp).pk)
+        return created
+    return make
+
+
+def walk(client, url, direction='next'):
+    ids, pages = [], 0
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        ids.extend(item['id'] for item in response.data['results'])
+        url = response.data[direction]
+        pages += 1
+    return ids, pages, response
+
+
+@pytest.mark.django_db
+class TestComplaintFeed:
+    """GET /api/complaints/ with ?cursor="""
+
+    url = '/api/complaints/'
+
+    @pytest.mark.parametrize('same_time', [False, True])
+    def test_walks_every_row_once_newest_first(self, api_client, student_user, make_complaints, same_time):
+        created = make_complaints(7, same_time=same_time)
+        api_client.force_authenticate(user=student_user)
+        ids, pages, _ = walk(api_client, f'{self.url}?page_size=3')
+        assert pages == 3
+        expected = sorted(created, reverse=True) if same_time else created[::-1]
+        assert ids == expected
+
+    def test_previous_links_walk_back(self, api_client, student_user, make_complaints):
+        make_complaints(7)
+        api_client.force_authenticate(user=student_user)
+        first = api_client.get(f'{self.url}?page_size=3').data
+        assert first['previous'] is None
+        second = api_client.get(first['next']).data
+        third = api_client.get(second['next']).data
+        assert third['next'] is None
+
+        back = api_client.get(third['previous']).data
+        assert [item['id'] for item in back['results']] == [item['id'] for item in second['results']]
+        back = api_client.get(back['previous']).data
+        assert [item['id'] for item in back['results']] == [item['id'] for item in first['results']]
+        assert back['previous'] is None
+
+    def test_new_rows_do_not_shift_pages(self, api_client, student_user, make_complaints):
+        created = make_complaints(4)
+        api_client.force_authenticate(user=student_user)
+        first = api_client.get(f'{self.url}?page_size=2').data
+        for _ in range(3):
+            Complaint.objects.create(title='Newer', description='D', location='L', submitter=student_user)
+        second = api_client.get(first['next']).data
+        assert [item['id'] for item in second['results']] == created[1::-1]
+
+    def test_page_queries_do_not_depend_on_depth(self, api_client, student_user, make_complaints,
+                                                 django_assert_max_num_queries):
+        make_complaints(12)
+        api_client.force_authenticate(user=student_user)
+        with django_assert_max_num_queries(50) as first:
+            response = api_client.get(f'{self.url}?page_size=2')
+        # Read the counts right away: each request resets connection.queries
+        first_count = len(first.captured_queries)
+        for _ in range(4):
+            response = api_client.get(response.data['next'])
+        with django_assert_max_num_queries(first_count) as deep:
+            api_client.get(response.data['next'])
+        assert not any('OFFSET' in query['sql'] for query in deep.captured_queries)
+
+    def test_count_modes(self, api_client, student_user, make_complaints, settings):
+        make_complaints(5)
+        api_client.force_authenticate(user=student_user)
+        data = api_client.get(self.url).data
+        assert data['count'] == 5 and data['count_is_exact'] is True
+
+        assert 'count' not in api_client.get(f'{self.url}?count=none').data
+
+        settings.FEED_APPROXIMATE_COUNT_THRESHOLD = 10
+        data = api_client.get(f'{self.url}?count=approximate').data
+        assert data['count'] == 5 and data['count_is_exact'] is True
+        settings.FEED_APPROXIMATE_COUNT_THRESHOLD = 3
+        data = api_client.get(f'{self.url}?count=approximate').data
+        assert data['count'] >= 4 and data['count_is_exact'] is False
+
+    def test_invalid_cursor(self, api_client, student_user):
+        api_client.force_authenticate(user=student_user)
+        assert api_client.get(f'{self.url}?cursor=not-a-cursor').status_code == 404
+
+
+@pytest.mark.django_db
+class TestTimestampFeeds:
+    """Event timeline and activity logs"""
+
+    def test_event_timeline(self, api_client, staff_user, make_complaints):
+        complaint_id = make_complaints(1)[0]
+        for i in range(15):
+            ComplaintEvent.objects.create(complaint_id=complaint_id, event_type='comment_added', notes=f'event {i}')
+        api_client.force_authenticate(user=staff_user)
+        url = f'/api/complaints/{complaint_id}/events/?page_size=4'
+        notes = []
+        while url:
+            data = api_client.get(url).data
+            notes.extend(event['notes'] for event in data['results'])
+            url = data['next']
+        assert notes == [f'event {i}' for i in range(14, -1, -1)]
+        assert api_client.get('/api/complaints/999999/events/').status_code == 404
+
+    def test_activity_logs(self, api_client, student_user, admin_user):
+        for i in range(5):
+            ActivityLog.objects.create(user=student_user, action='login', description=f'login {i}')
+        ActivityLog.objects.create(user=admin_user, action='login', description='admin login')
+
+        api_client.force_authenticate(user=student_user)
+        ids, pages, response = walk(api_client, '/api/auth/activity-logs/?page_size=2')
+        assert pages == 3 and len(ids) == 5
+        assert ids == sorted(ids, reverse=True)
+
+        api_client.force_authenticate(user=admin_user)
+        assert api_client.get('/api/auth/activity-logs/').data['count'] == 6
@@ -0,0 +1,134 @@
+"""
+Tests for complaint report exports
+"""
+import json
+import pytest
+from io import BytesIO
+from openpyxl import load_workbook
+from rest_framework import status
+from complaints.models import Complaint
+from complaints.reporting import (
+    DEFAULT_EXPORT_COLUMNS, EXCEL_HEADERS, EXPORT_COLUMNS, iter_export_rows, stream_csv_report, write_excel_report,
+)
+
+
+@pytest.fixture
+def complaints(student_user, staff_user, category):
+    return [
+        Complaint.objects.create(
+            title=f'Broken light {i}', description='The light is broken', location=f'Room {i}',
+            submitter=student_user, assigned_to=staff_user if i % 2 else None, category=category,
+        )
+        for i in range(5)
+    ]
+
+
+@pytest.mark.django_db
+class TestExcelExport:
+    """Write-only, single-pass Excel export"""
+
+    def test_workbook_contents(self, complaints):
+        output = write_excel_report(Complaint.objects.order_by('id'), BytesIO())
+
+        ws = load_workbook(output).active
+        rows = list(ws.values)
+        assert list(rows[0]) == EXCEL_HEADERS
+        assert len(rows) == 6
+        assert rows[1][0] == str(complaints[0].tracking_id)
+        assert rows[1][4] == 'Test Category'
+        assert rows[1][6] == 'Unassigned'
+        assert rows[2][6] == 'Test User'
+        assert ws.column_dimensions['B'].width == len('Broken light 0') + 2
+
+    def test_query_count_is_constant(self, complaints, django_assert_num_queries):
+        # One joined query, however many rows and related objects there are
+        with django_assert_num_queries(1):
+            write_excel_report(Complaint.objects.all(), BytesIO())
+
+    def test_export_endpoint_streams(self, complaints, admin_user, api_client):
+        api_client.force_authenticate(user=admin_user)
+
+        response = api_client.get('/api/complaints/reports/export/?format=excel')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.streaming
+        assert response['Content-Disposition'].endswith('.xlsx"')
+        ws = load_workbook(BytesIO(b''.join(response.streaming_content))).active
+        assert ws.max_row == 6
+
+    def test_export_endpoint_scopes_by_role(self, complaints, create_user, api_client, category):
+        other = create_user(username='other', email='other@example.com')
+        api_client.force_authenticate(user=other)
+
+        response = api_client.get('/api/complaints/reports/export/?format=excel')
+
+        ws = load_workbook(BytesIO(b''.join(response.streaming_content))).active
+        assert ws.max_row == 1
+
+    def test_pdf_export(self, complaints, admin_user, api_client):
+        api_client.force_authenticate(user=admin_user)
+
+        response = api_client.get('/api/complaints/reports/export/?format=pdf')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Type'] == 'application/pdf'
+
+
+@pytest.mark.django_db
+class TestStreamingExports:
+    """Row-streaming CSV and NDJSON exports"""
+
+    def test_csv_with_selected_columns(self, complaints, admin_user, api_client):
+        api_client.force_authenticate(user=admin_user)
+
+        response = api_client.get('/api/complaints/reports/export/?format=csv&columns=tracking_id,title,assigned_to')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.streaming
+        assert response['Content-Type'].startswith('text/csv')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        assert lines[0] == 'tracking_id,title,assigned_to'
+        assert lines[1] == f'{complaints[0].tracking_id},Broken light 0,'
+        assert lines[2].endswith(',Test User')
+        assert len(lines) == 6
+
+    def test_ndjson_rows(self, complaints, admin_user, api_client):
+        api_client.force_authenticate(user=admin_user)
+
+        response = api_client.get('/api/complaints/reports/export/?format=ndjson&status=new')
+
+        assert response['Content-Type'] == 'application/x-ndjson'
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        assert len(rows) == 5
+        assert set(rows[0]) == set(DEFAULT_EXPORT_COLUMNS)
+        assert rows[0]['category'] == 'Test Category'
+        assert rows[0]['submitter'] == 'Test User'
+
+    def test_anonymous_submitter_is_hidden(self, student_user):
+        Complaint.objects.create(title='Harassment', description='Details', location='Hall',
+                                 submitter=student_user, is_anonymous=True)
+
+        rows = list(iter_export_rows(Complaint.objects.all(), ['submitter']))
+
+        assert rows == [['Anonymous']]
+
+    def test_student_only_exports_own_complaints(self, complaints, create_user, api_client):
+        other = create_user(username='other', email='other@example.com')
+        Complaint.objects.create(title='Mine', description='Mine', location='Hall', submitter=other)
+        api_client.force_authenticate(user=other)
+
+        response = api_client.get('/api/complaints/reports/export/?format=ndjson&columns=title')
+
+        assert b''.join(response.streaming_content) == b'{"title": "Mine"}\n'
+
+    def test_unknown_column(self, admin_user, api_client):
+        api_client.force_authenticate(user=admin_user)
+
+        response = api_client.get('/api/complaints/reports/export/?format=csv&columns=title,password')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'password' in response.data['error']
+
+    def test_query_count_is_constant(self, complaints, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            b''.join(stream_csv_report(Complaint.objects.all(), list(EXPORT_COLUMNS)))
@@ -0,0 +1,233 @@
+"""
+Tests for background report jobs and cached artifacts
+"""
+import os
+import time
+import pytest
+from datetime import timedelta
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework import status
+from complaints.models import Complaint, ReportJob
+from complaints.report_jobs import (
+    _claim, delete_expired_artifacts, process_pending_jobs, release_stale_jobs, submit_report,
+)
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def age_artifact(job, media_root, days=2):
+    """Pretend the job finished, and its file was written, `days` ago"""
+    then = timezone.now() - timedelta(days=days)
+    ReportJob.objects.filter(pk=job.pk).update(finished_at=then)
+    os.utime(media_root / job.file.name, (then.timestamp(), then.timestamp()))
+
+
+@pytest.fixture
+def complaints(student_user, category):
+    return [
+        Complaint.objects.create(
+            title=f'No water {i}', description='No water in the dorm', location='Dorm 3',
+            submitter=student_user, category=category, priority='high' if i % 2 else 'low',
+        )
+        for i in range(4)
+    ]
+
+
+@pytest.mark.django_db
+class TestReportJobs:
+    """Queueing, generation and artifact reuse"""
+
+    def test_submit_queues_and_worker_generates(self, complaints, admin_user, api_client):
+        api_client.force_authenticate(user=admin_user)
+
+        response = api_client.post('/api/complaints/reports/jobs/', {'format': 'csv', 'priority': 'high'})
+
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert response.data['status'] == 'pending'
+        assert process_pending_jobs() == (1, 0)
+
+        poll = api_client.get(f"/api/complaints/reports/jobs/{response.data['id']}/")
+        assert poll.data['status'] == 'done'
+        assert poll.data['row_count'] == 2
+
+        download = api_client.get(f"/api/complaints/reports/jobs/{response.data['id']}/download/")
+        assert download.status_code == status.HTTP_200_OK
+        lines = b''.join(download.streaming_content).decode().splitlines()
+        assert len(lines) == 3
+
+    def test_identical_request_served_from_cache(self, complaints, admin_user, monkeypatch):
+        first, cached = submit_report(admin_user, 'excel', {})
+        assert cached is False
+        process_pending_jobs()
+
+        def fail(*args, **kwargs):
+            raise AssertionError('cached reports must not be regenerated')
+
+        monkeypatch.setattr('complaints.report_jobs._write_report', fail)
+        second, cached = submit_report(admin_user, 'excel', {})
+
+        first.refresh_from_db()
+        assert cached is True
+        assert second.status == 'done'
+        assert second.file.name == first.file.name
+        assert second.file.name.startswith('reports/') and second.file.name.endswith('.xlsx')
+
+    def test_data_change_invalidates_cache(self, complaints, admin_user):
+        first, _ = submit_report(admin_user, 'ndjson', {})
+        process_pending_jobs()
+
+        complaints[0].status = 'resolved'
+        complaints[0].save()
+        second, cached = submit_report(admin_user, 'ndjson', {})
+
+        first.refresh_from_db()
+        assert cached is False
+        assert second.cache_key != first.cache_key
+
+    def test_cache_is_per_scope(self, complaints, admin_user, create_user):
+        submit_report(admin_user, 'pdf', {})
+        process_pending_jobs()
+        director = create_user(username='director', email='director@example.com', role='campus_director')
+
+        job, cached = submit_report(director, 'pdf', {})
+
+        assert cached is False
+        assert job.scope == 'campus:-'
+
+    def test_duplicate_submission_reuses_pending_job(self, complaints, admin_user):
+        first, _ = submit_report(admin_user, 'csv', {'status': 'new'})
+        second, _ = submit_report(admin_user, 'csv', {'status': 'new'})
+
+        assert first.pk == second.pk
+        assert ReportJob.objects.count() == 1
+
+    def test_failed_job_is_retried_then_failed(self, complaints, admin_user, monkeypatch):
+        job, _ = submit_report(admin_user, 'csv', {})
+
+        def explode(*args, **kwargs):
+            raise RuntimeError('disk full')
+
+        monkeypatch.setattr('complaints.report_jobs._write_report', explode)
+        call_command('run_report_worker', '--once')
+
+        job.refresh_from_db()
+        assert (job.status, job.attempts) == ('pending', 1)
+        assert job.run_after > timezone.now()
+        # Backing off: the next poll leaves it alone
+        call_command('run_report_worker', '--once')
+        job.refresh_from_db()
+        assert job.attempts == 1
+
+        ReportJob.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        call_command('run_report_worker', '--once')
+
+        job.refresh_from_db()
+        assert job.status == 'failed'
+        assert job.attempts == 2
+        assert 'disk full' in job.last_error
+
+    def test_job_that_kills_the_worker_runs_out_of_attempts(self, complaints, admin_user):
+        job, _ = submit_report(admin_user, 'csv', {})
+
+        def crash_worker():
+            # Claimed, then the worker dies (out of memory) before recording anything
+            assert _claim(job.pk)
+            ReportJob.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(hours=1))
+            return release_stale_jobs(lock_timeout=60)
+
+        assert crash_worker() == 1
+        job.refresh_from_db()
+        assert (job.status, job.attempts) == ('pending', 1)
+
+        assert crash_worker() == 0
+        job.refresh_from_db()
+        assert (job.status, job.attempts) == ('failed', 2)
+        assert job.finished_at is not None
+
+
+@pytest.mark.django_db
+class TestArtifactExpiry:
+    """Report files not used for REPORT_ARTIFACT_MAX_AGE are deleted"""
+
+    def test_expired_file_is_deleted(self, complaints, admin_user, api_client, media_root):
+        job, _ = submit_report(admin_user, 'csv', {})
+        process_pending_jobs()
+        job.refresh_from_db()
+        age_artifact(job, media_root)
+        (media_root / 'reports' / 'orphan.csv').write_text('left by a deleted job')
+        os.utime(media_root / 'reports' / 'orphan.csv', (time.time() - 3 * 86400,) * 2)
+
+        assert delete_expired_artifacts() == 2
+        assert list((media_root / 'reports').iterdir()) == []
+
+        job.refresh_from_db()
+        assert not job.file
+        api_client.force_authenticate(user=admin_user)
+        assert api_client.get(f'/api/complaints/reports/jobs/{job.pk}/download/').status_code == status.HTTP_410_GONE
+        assert submit_report(admin_user, 'csv', {})[1] is False
+
+    def test_recently_reused_file_is_kept(self, complaints, admin_user, media_root):
+        first, _ = submit_report(admin_user, 'csv', {})
+        process_pending_jobs()
+        first.refresh_from_db()
+        age_artifact(first, media_root)
+        submit_report(admin_user, 'csv', {})
+        process_pending_jobs()
+
+        assert delete_expired_artifacts() == 0
+        assert (media_root / first.file.name).exists()
+
+    def test_worker_runs_cleanup(self, complaints, admin_user, media_root):
+        job, _ = submit_report(admin_user, 'csv', {})
+        process_pending_jobs()
+        job.refresh_from_db()
+        age_artifact(job, media_root)
+
+        call_command('run_report_worker', '--once')
+
+        assert not (media_root / job.file.name).exists()
+
+
+@pytest.mark.django_db
+class TestReportJobEndpoints:
+    """Access rules and validation"""
+
+    def test_download_before_ready(self, complaints, admin_user, api_client):
+        api_client.force_authenticate(user=admin_user)
+        job = api_client.post('/api/complaints/reports/jobs/', {'format': 'excel'}).data
+
+        response = api_client.get(f"/api/complaints/reports/jobs/{job['id']}/download/")
+
+        assert response.status_code == status.HTTP_409_CONFLICT
+
+    def test_other_users_cannot_see_job(self, complaints, admin_user, student_user, api_client):
+        job, _ = submit_report(admin_user, 'excel', {})
+        api_client.force_authenticate(user=student_user)
+
+        response = api_client.get(f'/api/complaints/reports/jobs/{job.pk}/')
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_inline_executor(self, complaints, student_user, api_client, settings,
+                             django_capture_on_commit_callbacks):
+        settings.REPORT_JOB_EXECUTOR = 'inline'
+        api_client.force_authenticate(user=student_user)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = api_client.post('/api/complaints/reports/jobs/', {'format': 'ndjson', 'columns': 'title'})
+
+        job = ReportJob.objects.get(pk=response.data['id'])
+        assert job.status == 'done'
+        assert job.row_count == 4
+
+    def test_invalid_format(self, admin_user, api_client):
+        api_client.force_authenticate(user=admin_user)
+
+        response = api_client.post('/api/complaints/reports/jobs/', {'format': 'docx'})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
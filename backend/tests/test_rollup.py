@@ -0,0 +1,136 @@
+"""
+Tests for the materialized daily statistics rollup
+"""
+import importlib
+from functools import partial
+import pytest
+from datetime import timedelta
+from django.core.management import call_command
+from django.db.models import Sum
+from django.utils import timezone
+from complaints.models import Complaint, ComplaintDailyRollup
+from complaints.rollup import rollup_statistics
+from complaints.reporting import get_dashboard_statistics
+
+
+def rollup_totals(**filters):
+    return ComplaintDailyRollup.objects.filter(**filters).aggregate(
+        count=Sum('complaint_count'), resolved=Sum('resolved_count'), ratings=Sum('rating_sum'),
+    )
+
+
+@pytest.fixture
+def make_complaint(make_complaint, campus, department, category):
+    return partial(make_complaint, campus=campus, department=department, category=category)
+
+
+@pytest.mark.django_db
+class TestIncrementalMaintenance:
+    """Complaint save/delete hooks keep the rollup current"""
+
+    def test_create_adds_to_rollup(self, make_complaint):
+        make_complaint(priority='high')
+        make_complaint(priority='high')
+
+        row = ComplaintDailyRollup.objects.get()
+        assert row.date == timezone.localdate()
+        assert (row.status, row.priority, row.complaint_count) == ('new', 'high', 2)
+
+    def test_status_transition_moves_count(self, make_complaint):
+        complaint = make_complaint()
+
+        complaint.status = 'resolved'
+        complaint.resolved_at = complaint.created_at + timedelta(hours=5)
+        complaint.save()
+
+        assert rollup_totals(status='new')['count'] == 0
+        assert rollup_totals(status='resolved') == {'count': 1, 'resolved': 1, 'ratings': 0}
+
+    def test_same_key_change_updates_measures(self, make_complaint):
+        complaint = make_complaint()
+
+        complaint.feedback_rating = 4
+        complaint.save(update_fields=['feedback_rating'])
+
+        assert ComplaintDailyRollup.objects.count() == 1
+        assert rollup_totals() == {'count': 1, 'resolved': 0, 'ratings': 4}
+
+    def test_untracked_update_skips_rollup(self, make_complaint, django_assert_num_queries):
+        complaint = make_complaint()
+
+        with django_assert_num_queries(1):
+            complaint.save(update_fields=['ai_summary'])
+
+    def test_delete_removes_contribution(self, make_complaint):
+        complaint = make_complaint()
+
+        complaint.delete()
+
+        assert rollup_totals()['count'] == 0
+
+    def test_rebuild_matches_incremental(self, make_complaint):
+        for status in ['new', 'assigned', 'resolved']:
+            make_complaint(status=status, resolved_at=timezone.now() if status == 'resolved' else None)
+        incremental = rollup_totals()
+        # Bulk edits bypass the hooks until the rollup is rebuilt
+        Complaint.objects.update(feedback_rating=5)
+
+        call_command('rebuild_complaint_rollup')
+
+        assert rollup_totals()['count'] == incremental['count'] == 3
+        assert rollup_totals()['ratings'] == 15
+
+    def test_migration_backfills_existing_complaints(self, make_complaint):
+        from django.apps import apps
+        backfill = importlib.import_module('complaints.migrations.0013_backfill_daily_rollup')
+        make_complaint()
+        make_complaint(status='resolved', resolved_at=timezone.now())
+        # Complaints that existed before the rollup table
+        ComplaintDailyRollup.objects.all().delete()
+
+        backfill.build_rollup(apps, None)
+
+        assert rollup_totals() == {'count': 2, 'resolved': 1, 'ratings': 0}
+
+
+@pytest.mark.django_db
+class TestRollupStatistics:
+    """Statistics endpoints read the rollup"""
+
+    def test_statistics_endpoint_for_admin(self, make_complaint, admin_user, api_client):
+        make_complaint(priority='critical', feedback_rating=2)
+        make_complaint(priority='low', feedback_rating=4, sla_response_breached=True)
+        make_complaint(category=None)
+        api_client.force_authenticate(user=admin_user)
+
+        data = api_client.get('/api/complaints/reports/statistics/?days=30').data
+
+        assert data['total'] == 3
+        assert data['new'] == 3
+        assert data['by_priority'] == {'critical': 1, 'high': 0, 'medium': 1, 'low': 1}
+        assert data['by_category'] == {'Test Category': 2, 'Uncategorized': 1}
+        assert data['sla_breaches'] == 1
+        assert data['average_rating'] == 3
+
+    def test_scope_and_date_range(self, make_complaint, create_user, campus):
+        make_complaint()
+        make_complaint(campus=None)
+        old = make_complaint()
+        Complaint.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=60))
+        call_command('rebuild_complaint_rollup')
+
+        stats = rollup_statistics(
+            start_date=timezone.localdate() - timedelta(days=30), end_date=timezone.localdate()
+        )
+        assert stats['total'] == 2
+
+        director = create_user(username='director', email='director@example.com',
+                               role='campus_director', campus=campus)
+        assert get_dashboard_statistics(director, 'campus_director')['total'] == 1
+
+    def test_query_count_independent_of_complaints(self, make_complaint, django_assert_num_queries):
+        for _ in range(20):
+            make_complaint()
+
+        with django_assert_num_queries(2):
+            rollup_statistics()
@@ -0,0 +1,221 @@
+"""
+Tests for the compiled routing table and dry-run routing
+"""
+import random
+import pytest
+from accounts.models import Campus, Department
+from complaints.models import Complaint, Category, SubCategory, RoutingRule, ComplaintEvent
+from complaints.routing_engine import (
+    RoutingTable, auto_route_complaint, find_matching_rule, route_by_category, route_complaint, rule_order,
+)
+from complaints.views import apply_routing_rules
+
+
+def brute_force_match(rules, complaint):
+    """Rule matching as done before the table: test every rule in order"""
+    for rule in sorted(rules, key=rule_order):
+        if rule.category_id and complaint.category_id != rule.category_id:
+            continue
+        if rule.sub_category_id and complaint.sub_category_id != rule.sub_category_id:
+            continue
+        if rule.campus_id and complaint.campus_id != rule.campus_id:
+            continue
+        return rule
+    return None
+
+
+@pytest.fixture
+def other_campus(db):
+    return Campus.objects.create(name='Other Campus')
+
+
+@pytest.fixture
+def maintenance(college):
+    return Department.objects.create(name='Maintenance', college=college)
+
+
+@pytest.mark.django_db
+class TestRoutingTable:
+    """Rule selection and fallbacks"""
+
+    def test_priority_wins_over_specificity(self, category, campus, department, maintenance):
+        RoutingRule.objects.create(name='Specific', priority=1, category=category, campus=campus,
+                                   assign_to_department=department)
+        generic = RoutingRule.objects.create(name='Generic', priority=5, assign_to_department=maintenance)
+        complaint = Complaint(category=category, campus=campus, priority='medium')
+        assert find_matching_rule(complaint) == generic
+
+    def test_conditions_must_all_hold(self, category, sub_category, campus, other_campus, department):
+        rule = RoutingRule.objects.create(name='Sub', priority=3, category=category, sub_category=sub_category,
+                                          campus=campus, assign_to_department=department)
+        assert find_matching_rule(Complaint(category=category, sub_category=sub_category, campus=campus)) == rule
+        assert find_matching_rule(Complaint(category=category, sub_category=sub_category, campus=other_campus)) is None
+        assert find_matching_rule(Complaint(category=category, campus=campus)) is None
+        assert find_matching_rule(Complaint(campus=campus)) is None
+
+    def test_inactive_rules_are_ignored(self, category, department):
+        RoutingRule.objects.create(name='Off', category=category, assign_to_department=department, is_active=False)
+        assert find_matching_rule(Complaint(category=category)) is None
+
+    def test_matches_brute_force_on_random_rules(self, campus, other_campus, college):
+        rng = random.Random(7)
+        categories = [Category.objects.create(name=f'Category {i}') for i in range(3)]
+        sub_categories = [SubCategory.objects.create(name=f'Sub {i}', category=categories[i % 3]) for i in range(4)]
+        campuses = [campus, other_campus]
+        for i in range(40):
+            RoutingRule.objects.create(
+                name=f'Rule {i:02d}', priority=rng.randint(0, 5),
+                category=rng.choice(categories + [None, None]),
+                sub_category=rng.choice(sub_categories + [None, None, None]),
+                campus=rng.choice(campuses + [None]),
+                is_active=rng.random() > 0.2,
+            )
+        active = list(RoutingRule.objects.filter(is_active=True))
+        for _ in range(200):
+            complaint = Complaint(
+                category=rng.choice(categories + [None]),
+                sub_category=rng.choice(sub_categories + [None]),
+                campus=rng.choice(campuses + [None]),
+            )
+            assert find_matching_rule(complaint) == brute_force_match(active, complaint)
+
+    def test_category_fallback_uses_name_mapping(self, college, maintenance):
+        Department.objects.create(name='Building Maintenance', college=college)
+        facilities = Category.objects.create(name='Facilities')
+        dorm_facilities = Category.objects.create(name='Dorm facility issues')
+        assert route_by_category(Complaint(category=facilities)) == maintenance
+        assert route_by_category(Complaint(category=dorm_facilities)) == maintenance
+        assert route_by_category(Complaint(category=Category.objects.create(name='Food'))) is None
+
+    def test_routing_is_query_free_once_compiled(self, category, campus, department, maintenance,
+                                                 student_user, django_assert_num_queries):
+        RoutingRule.objects.create(name='Rule', category=category, campus=campus,
+                                   assign_to_department=department, assign_to_user=student_user)
+        facilities = Category.objects.create(name='Facilities')
+        complaints = [
+            Complaint.objects.get(pk=Complaint.objects.create(
+                title='T', description='D', location='L', submitter=student_user, category=cat, campus=campus,
+            ).pk)
+            for cat in (category, facilities)
+        ]
+        auto_route_complaint(complaints[0])
+        with django_assert_num_queries(0):
+            department_routed, user, _, notes = auto_route_complaint(complaints[0])
+            fallback, _, _, _ = auto_route_complaint(complaints[1])
+        assert department_routed == department and user == student_user
+        assert 'Matched rule: Rule' in notes
+        assert fallback == maintenance
+
+    def test_rule_changes_invalidate_table(self, category, department, maintenance):
+        complaint = Complaint(category=category)
+        assert find_matching_rule(complaint) is None
+        rule = RoutingRule.objects.create(name='New', category=category, assign_to_department=department)
+        assert find_matching_rule(complaint) == rule
+        rule.assign_to_department = maintenance
+        rule.save()
+        assert find_matching_rule(complaint).assign_to_department == maintenance
+        rule.delete()
+        assert find_matching_rule(complaint) is None
+
+    def test_new_department_reaches_fallback(self, college):
+        health = Category.objects.create(name='Health')
+        assert route_by_category(Complaint(category=health)) is None
+        clinic = Department.objects.create(name='Student Health Services', college=college)
+        assert route_by_category(Complaint(category=health)) == clinic
+
+    def test_explicit_table_routes_without_the_cache(self, category, department, maintenance,
+                                                      django_assert_num_queries):
+        RoutingRule.objects.create(name='Saved', category=category, assign_to_department=department)
+        draft = RoutingRule(name='Draft', priority=9, category=category,
+                            assign_to_department=maintenance, set_priority='critical')
+        table = RoutingTable([draft], [department, maintenance])
+        complaint = Complaint(category=category, priority='low')
+
+        with django_assert_num_queries(0):
+            rule, routed_department, user, priority, notes = route_complaint(complaint, table)
+        assert rule is draft
+        assert (routed_department, user, priority) == (maintenance, None, 'critical')
+        assert notes.startswith('Matched rule: Draft (Category: Test Category)')
+        # The cached table still holds the saved rules only
+        assert find_matching_rule(complaint).name == 'Saved'
+
+    def test_explicit_table_category_fallback(self, maintenance, django_assert_num_queries):
+        facilities = Category.objects.create(name='Facilities')
+        table = RoutingTable([], [maintenance], [facilities])
+        complaint = Complaint(category_id=facilities.pk, priority='low')
+
+        with django_assert_num_queries(0):
+            rule, routed_department, user, priority, notes = route_complaint(complaint, table)
+        assert (rule, routed_department, user, priority) == (None, maintenance, None, 'low')
+        assert notes == 'Fallback routing by category to: Maintenance'
+
+    def test_apply_routing_rules_assigns(self, category, department, staff_user, student_user):
+        RoutingRule.objects.create(name='Assign', category=category, assign_to_department=department,
+                                   assign_to_user=staff_user, set_priority='high')
+        complaint = Complaint.objects.create(title='T', description='D', location='L',
+                                             submitter=student_user, category=category)
+        assert apply_routing_rules(complaint) is True
+        complaint.refresh_from_db()
+        assert complaint.assigned_to == staff_user
+        assert complaint.department == department
+        assert complaint.priority == 'high'
+        assert ComplaintEvent.objects.filter(complaint=complaint, notes='Auto-assigned by rule: Assign').exists()
+
+
+@pytest.mark.django_db
+class TestRoutingDryRun:
+    """POST /api/complaints/routing/dry-run/"""
+
+    url = '/api/complaints/routing/dry-run/'
+
+    def test_requires_admin(self, api_client, student_user):
+        api_client.force_authenticate(user=student_user)
+        response = api_client.post(self.url, {'complaints': [{}]}, format='json')
+        assert response.status_code == 403
+
+    def test_routes_with_active_rules(self, api_client, admin_user, category, campus, department):
+        rule = RoutingRule.objects.create(name='Active', category=category, assign_to_department=department,
+                                          set_priority='critical')
+        api_client.force_authenticate(user=admin_user)
+        response = api_client.post(self.url, {'complaints': [
+            {'category': category.id, 'campus': campus.id},
+            {'priority': 'low'},
+            {'department': department.id},
+        ]}, format='json')
+
+        assert response.status_code == 200
+        assert response.data['rules_source'] == 'active'
+        assert response.data['summary'] == {'rule': 1, 'fallback': 1, 'unrouted': 1}
+        first, second, third = response.data['results']
+        assert first['matched_rule'] == {'id': rule.id, 'name': 'Active'}
+        assert first['department']['id'] == department.id
+        assert first['priority'] == 'critical'
+        assert second['matched_rule'] is None and second['department'] is None
+        assert second['notes'] == 'No routing rules matched'
+        assert third['department']['id'] == department.id
+        assert Complaint.objects.count() == 0
+
+    def test_routes_with_hypothetical_rules(self, api_client, admin_user, category, department, maintenance):
+        RoutingRule.objects.create(name='Live', category=category, assign_to_department=department)
+        api_client.force_authenticate(user=admin_user)
+        response = api_client.post(self.url, {
+            'complaints': [{'category': category.id}],
+            'rules': [{'name': 'Draft', 'priority': 2, 'category': category.id,
+                       'assign_to_department': maintenance.id}],
+        }, format='json')
+
+        assert response.status_code == 200
+        assert response.data['rules_source'] == 'request'
+        assert response.data['results'][0]['matched_rule'] == {'id': None, 'name': 'Draft'}
+        assert response.data['results'][0]['department']['id'] == maintenance.id
+        assert RoutingRule.objects.count() == 1
+
+    def test_rejects_invalid_payloads(self, api_client, admin_user, settings):
+        settings.ROUTING_DRY_RUN_MAX_ITEMS = 2
+        api_client.force_authenticate(user=admin_user)
+        assert api_client.post(self.url, {'complaints': []}, format='json').status_code == 400
+        assert api_client.post(self.url, {'complaints': [{}, {}, {}]}, format='json').status_code == 400
+        assert api_client.post(self.url, {'complaints': [{'priority': 'urgent'}]}, format='json').status_code == 400
+        response = api_client.post(self.url, {'complaints': [{}], 'rules': [{'priority': 1}]}, format='json')
+        assert response.status_code == 400
+        assert response.data['error'] == 'Invalid rules'
@@ -0,0 +1,138 @@
+"""
+Tests for the compiled role scopes
+"""
+import pytest
+from django.contrib.auth import get_user_model
+from accounts.models import Campus, College, Department
+from complaints.models import Complaint
+from complaints.reporting import get_dashboard_statistics, get_report_queryset
+from complaints.scoping import APPROVE, REPORT, VIEW, complaint_scope, scoped_complaints
+
+User = get_user_model()
+
+
+@pytest.fixture
+def world(create_user, student_user, college, department, campus):
+    """Two colleges on two campuses, one complaint per department/kind"""
+    other_campus = Campus.objects.create(name='Other Campus')
+    other_college = College.objects.create(name='Other College', campus=other_campus)
+    sibling = Department.objects.create(name='Sibling', college=college)
+    elsewhere = Department.objects.create(name='Elsewhere', college=other_college)
+    worker = create_user(username='worker', email='w@example.com', role='maintenance')
+
+    complaints = {}
+    for dept, dept_campus in ((department, campus), (sibling, campus), (elsewhere, other_campus)):
+        for kind in ('academic', 'facility'):
+            complaints[(dept.name, kind)] = Complaint.objects.create(
+                title='T', description='D', location='L', submitter=student_user,
+                department=dept, campus=dept_campus, is_academic=kind == 'academic',
+                is_facility=kind == 'facility', requires_approval=True,
+                assigned_to=worker if dept == elsewhere else None,
+            )
+    return {'complaints': complaints, 'worker': worker, 'sibling': sibling, 'elsewhere': elsewhere,
+            'other_college': other_college}
+
+
+def names(queryset):
+    return {(c.department.name, 'academic' if c.is_academic else 'facility') for c in queryset}
+
+
+@pytest.mark.django_db
+class TestScopes:
+    """Each role's complaints per purpose"""
+
+    def test_view_scopes(self, world, create_user, student_user, department, campus):
+        dean = create_user(username='dean', email='d@example.com', role='dean', department=department)
+        head = create_user(username='head2', email='h2@example.com', role='dept_head', department=department)
+        director = create_user(username='dir', email='c@example.com', role='campus_director', campus=campus)
+        proctor = create_user(username='proctor', email='p@example.com', role='proctor')
+        admin = create_user(username='root', email='r@example.com', role='admin')
+
+        assert scoped_complaints(student_user).count() == 6
+        assert names(scoped_complaints(head)) == {(department.name, 'academic')}
+        assert names(scoped_complaints(dean)) == {
+            (department.name, 'academic'), (department.name, 'facility'), ('Sibling', 'academic'), ('Sibling', 'facility'),
+        }
+        assert scoped_complaints(director).count() == 4
+        assert {kind for _, kind in names(scoped_complaints(proctor))} == {'facility'}
+        assert scoped_complaints(admin).count() == 6
+        assert names(scoped_complaints(world['worker'])) == {('Elsewhere', 'academic'), ('Elsewhere', 'facility')}
+
+    def test_report_and_approve_differ_from_view(self, world, create_user, department):
+        head = create_user(username='head2', email='h2@example.com', role='dept_head', department=department)
+        proctor = create_user(username='proctor', email='p@example.com', role='proctor')
+        homeless_head = create_user(username='head3', email='h3@example.com', role='dept_head')
+
+        assert names(get_report_queryset(head)) == {(department.name, 'academic'), (department.name, 'facility')}
+        assert scoped_complaints(head, APPROVE).count() == 2
+        assert scoped_complaints(proctor, REPORT).count() == 0
+        assert scoped_complaints(proctor, APPROVE).count() == 0
+        assert scoped_complaints(homeless_head, APPROVE).count() == 0
+        assert get_dashboard_statistics(head, 'student')['total'] == 0
+
+    def test_dean_scope_needs_no_department_query(self, world, create_user, department,
+                                                  django_assert_num_queries):
+        dean = create_user(username='dean', email='d@example.com', role='dean', department=department)
+        complaint_scope(dean)
+        with django_assert_num_queries(1):
+            assert scoped_complaints(dean, VIEW).count() == 4
+
+    def test_department_move_is_seen_without_signals(self, world, create_user, department):
+        dean = create_user(username='dean', email='d@example.com', role='dean', department=department)
+        # update() sends no signals, so nothing could invalidate a cached mapping
+        Department.objects.filter(pk=department.pk).update(college=world['other_college'])
+
+        dean = User.objects.select_related('department').get(pk=dean.pk)
+        assert names(scoped_complaints(dean)) == {
+            (department.name, 'academic'), (department.name, 'facility'), ('Elsewhere', 'academic'), ('Elsewhere', 'facility'),
+        }
+
+    def test_token_auth_loads_the_department(self, world, create_user, department, api_client,
+                                              django_assert_num_queries):
+        from rest_framework.authtoken.models import Token
+        from accounts.authentication import TokenAuthentication
+        dean = create_user(username='dean', email='d@example.com', role='dean', department=department)
+        key = Token.objects.create(user=dean).key
+
+        with django_assert_num_queries(1):
+            user, _ = TokenAuthentication().authenticate_credentials(key)
+            complaint_scope(user)
+
+    def test_memoized_per_user_version(self, world, create_user, department):
+        dean = create_user(username='dean', email='d@example.com', role='dean', department=department)
+        assert complaint_scope(dean) is complaint_scope(dean)
+
+        dean.department = world['elsewhere']
+        assert names(scoped_complaints(dean)) == {('Elsewhere', 'academic'), ('Elsewhere', 'facility')}
+        dean.role = 'student'
+        assert scoped_complaints(dean).count() == 0
+
+    def test_department_moving_college_is_picked_up(self, world, create_user, department):
+        dean = create_user(username='dean', email='d@example.com', role='dean', department=department)
+        assert scoped_complaints(dean).count() == 4
+        sibling = world['sibling']
+        sibling.college = world['other_college']
+        sibling.save()
+        assert scoped_complaints(dean).count() == 2
+
+
+@pytest.mark.django_db
+class TestScopedEndpoints:
+    """Views filter through the compiled scope"""
+
+    def test_approval_queue(self, api_client, world, create_user, department):
+        dean = create_user(username='dean', email='d@example.com', role='dean', department=department)
+        api_client.force_authenticate(user=dean)
+        response = api_client.get('/api/complaints/approvals/pending/')
+        assert response.status_code == 200 and len(response.data) == 4
+
+        api_client.force_authenticate(user=world['worker'])
+        assert api_client.get('/api/complaints/approvals/pending/').data == []
+
+    def test_list(self, api_client, world, create_user, department):
+        head = create_user(username='head2', email='h2@example.com', role='dept_head', department=department)
+        api_client.force_authenticate(user=head)
+        response = api_client.get('/api/complaints/')
+        assert [item['id'] for item in response.data['results']] == [
+            world['complaints'][(department.name, 'academic')].id
+        ]
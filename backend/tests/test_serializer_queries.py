@@ -0,0 +1,154 @@
+"""
+Query-count regression tests for complaint serialization
+"""
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from complaints.models import Complaint, ComplaintComment, ComplaintEvent, ComplaintFile
+from complaints.serializers import LIST_FIELDS, ComplaintSerializer
+
+
+@pytest.fixture
+def populate(student_user, staff_user, department, category, campus, settings, tmp_path):
+    """Create complaints with files, threaded comments and events"""
+    settings.MEDIA_ROOT = tmp_path
+    def make(count, **kwargs):
+        kwargs.setdefault('submitter', student_user)
+        complaints = []
+        for i in range(count):
+            complaint = Complaint.objects.create(
+                title=f'Complaint {i}', description='Broken projector', location='Hall 2',
+                category=category, campus=campus, department=department, assigned_to=staff_user,
+                status='assigned', **kwargs
+            )
+            ComplaintFile.objects.create(
+                complaint=complaint, uploaded_by=student_user, filename='photo.jpg', file_size=3,
+                file=SimpleUploadedFile('photo.jpg', b'abc'), mime_type='image/jpeg'
+            )
+            top = ComplaintComment.objects.create(complaint=complaint, author=staff_user, content='Looking into it')
+            reply = ComplaintComment.objects.create(complaint=complaint, author=student_user, parent=top, content='Thanks')
+            ComplaintComment.objects.create(complaint=complaint, author=staff_user, parent=reply, content='Welcome')
+            for j in range(12):
+                ComplaintEvent.objects.create(complaint=complaint, event_type='comment_added', actor=staff_user,
+                                              notes=f'event {j}')
+            complaints.append(complaint)
+        return complaints
+    return make
+
+
+def query_count(django_assert_max_num_queries, client, url):
+    with django_assert_max_num_queries(1000) as captured:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(captured.captured_queries), response
+
+
+@pytest.mark.django_db
+class TestComplaintQueryCounts:
+    """Query count must not grow with the number of complaints serialized"""
+
+    def test_list_endpoint(self, api_client, admin_user, populate, django_assert_max_num_queries):
+        api_client.force_authenticate(user=admin_user)
+        populate(2)
+        small, _ = query_count(django_assert_max_num_queries, api_client, '/api/complaints/')
+        populate(13)
+        large, response = query_count(django_assert_max_num_queries, api_client, '/api/complaints/')
+        assert len(response.data['results']) == 15
+        assert large == small
+
+    def test_maintenance_tasks(self, api_client, staff_user, populate, django_assert_max_num_queries):
+        api_client.force_authenticate(user=staff_user)
+        url = '/api/complaints/dashboards/maintenance/tasks/'
+        populate(1)
+        small, _ = query_count(django_assert_max_num_queries, api_client, url)
+        populate(8)
+        large, response = query_count(django_assert_max_num_queries, api_client, url)
+        assert response.data['total_open'] == 9
+        assert large == small
+
+    def test_pending_approvals(self, api_client, admin_user, populate, django_assert_max_num_queries):
+        api_client.force_authenticate(user=admin_user)
+        url = '/api/complaints/approvals/pending/'
+        populate(1, requires_approval=True)
+        small, _ = query_count(django_assert_max_num_queries, api_client, url)
+        populate(8, requires_approval=True)
+        large, response = query_count(django_assert_max_num_queries, api_client, url)
+        assert len(response.data) == 9
+        assert large == small
+
+    def test_comment_thread_endpoint(self, api_client, staff_user, populate, django_assert_max_num_queries):
+        complaint = populate(1)[0]
+        api_client.force_authenticate(user=staff_user)
+        url = f'/api/complaints/{complaint.id}/comments/'
+        small, _ = query_count(django_assert_max_num_queries, api_client, url)
+        top = complaint.comments.get(parent__isnull=True)
+        for i in range(6):
+            ComplaintComment.objects.create(complaint=complaint, author=staff_user, parent=top, content=f'More {i}')
+        large, response = query_count(django_assert_max_num_queries, api_client, url)
+        assert len(response.data['results'][0]['replies']) == 7
+        assert large == small
+
+
+@pytest.mark.django_db
+class TestComplaintSerializerOutput:
+    """Prefetched serialization matches the unprefetched one"""
+
+    def test_same_output_with_and_without_prefetch(self, populate):
+        complaint = populate(1)[0]
+        plain = ComplaintSerializer(Complaint.objects.get(pk=complaint.pk)).data
+        eager = ComplaintSerializer(ComplaintSerializer.eager_load(Complaint.objects.filter(pk=complaint.pk))[0]).data
+        assert plain == eager
+
+    def test_comment_tree_and_recent_events(self, populate):
+        complaint = populate(1)[0]
+        data = ComplaintSerializer(ComplaintSerializer.eager_load(Complaint.objects.filter(pk=complaint.pk))[0]).data
+
+        assert len(data['comments']) == 1
+        thread = data['comments'][0]
+        assert thread['content'] == 'Looking into it'
+        assert thread['replies'][0]['content'] == 'Thanks'
+        assert thread['replies'][0]['replies'][0]['content'] == 'Welcome'
+        assert thread['replies'][0]['replies'][0]['replies'] == []
+
+        assert len(data['events']) == 10
+        assert data['events'][0]['notes'] == 'event 11'
+        assert data['files'][0]['uploaded_by_username'] == 'student@example.com'
+
+
+@pytest.mark.django_db
+class TestSparseFieldsets:
+    """Compact listings with ?fields= and ?expand="""
+
+    url = '/api/complaints/'
+
+    def test_default_list_is_compact(self, api_client, admin_user, populate):
+        api_client.force_authenticate(user=admin_user)
+        populate(1)
+        item = api_client.get(self.url).data['results'][0]
+        assert set(item) == set(LIST_FIELDS)
+        assert item['campus_name'] and item['assigned_to_name'] == 'Test User'
+
+    def test_fields_replaces_and_expand_adds(self, api_client, admin_user, populate):
+        api_client.force_authenticate(user=admin_user)
+        populate(1)
+        item = api_client.get(self.url, {'fields': 'id,title,bogus', 'expand': 'description'}).data['results'][0]
+        assert set(item) == {'id', 'title', 'description'}
+
+        item = api_client.get(self.url, {'expand': 'comments,events,files'}).data['results'][0]
+        assert set(item) == set(LIST_FIELDS) | {'comments', 'events', 'files'}
+        assert len(item['events']) == 10
+        assert item['comments'][0]['replies'][0]['content'] == 'Thanks'
+
+    def test_nested_lists_only_queried_when_expanded(self, api_client, admin_user, populate,
+                                                     django_assert_max_num_queries):
+        api_client.force_authenticate(user=admin_user)
+        populate(3)
+        compact, _ = query_count(django_assert_max_num_queries, api_client, self.url)
+        full, _ = query_count(django_assert_max_num_queries, api_client, f'{self.url}?expand=comments,events,files')
+        assert full == compact + 3
+
+    def test_dashboards_honour_expand(self, api_client, student_user, populate):
+        populate(1)
+        api_client.force_authenticate(user=student_user)
+        url = '/api/complaints/dashboards/student/recent_complaints/'
+        assert 'description' not in api_client.get(url).data[0]
+        assert api_client.get(url, {'expand': 'description'}).data[0]['description'] == 'Broken projector'
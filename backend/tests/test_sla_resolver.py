@@ -0,0 +1,103 @@
+"""
+Tests for the in-memory SLA configuration resolver
+"""
+import pytest
+from django.core.cache import cache
+from complaints.models import SLAConfiguration
+from complaints import sla_resolver
+from complaints.sla_resolver import SLAResolver
+from complaints.sla_service import resolve_sla_hours
+
+
+@pytest.fixture
+def configs(category, campus):
+    return {
+        'generic': SLAConfiguration.objects.create(
+            name='Generic', priority='high', response_time_hours=8, resolution_time_hours=72),
+        'campus': SLAConfiguration.objects.create(
+            name='Campus', priority='high', campus=campus, response_time_hours=6, resolution_time_hours=60),
+        'category': SLAConfiguration.objects.create(
+            name='Category', priority='high', category=category, response_time_hours=4, resolution_time_hours=48),
+        'both': SLAConfiguration.objects.create(
+            name='Both', priority='high', category=category, campus=campus,
+            response_time_hours=2, resolution_time_hours=24),
+    }
+
+
+@pytest.mark.django_db
+class TestSLAResolver:
+    """Most-specific-wins lookup"""
+
+    def test_most_specific_configuration_wins(self, configs, category, campus):
+        assert sla_resolver.resolve('high', category.id, campus.id) == configs['both']
+        assert sla_resolver.resolve('high', category.id, None) == configs['category']
+        assert sla_resolver.resolve('high', None, campus.id) == configs['campus']
+        assert sla_resolver.resolve('high') == configs['generic']
+        assert sla_resolver.resolve('low') is None
+
+    def test_category_match_beats_campus_match(self, configs, category, campus):
+        configs['both'].delete()
+        assert sla_resolver.resolve('high', category.id, campus.id) == configs['category']
+
+    def test_other_category_falls_back(self, configs, campus):
+        assert sla_resolver.resolve('high', 999999, campus.id) == configs['campus']
+
+    def test_inactive_configurations_are_ignored(self, configs):
+        configs['generic'].is_active = False
+        configs['generic'].save()
+        assert sla_resolver.resolve('high') is None
+
+    def test_lookups_after_load_do_not_query(self, configs, category, campus, django_assert_num_queries):
+        sla_resolver.resolve('high')
+        with django_assert_num_queries(0):
+            for _ in range(100):
+                resolve_sla_hours('high', category.id, campus.id)
+                resolve_sla_hours('medium')
+
+    def test_save_and_delete_invalidate(self, configs):
+        assert resolve_sla_hours('high')[:2] == (8, 72)
+        configs['generic'].response_time_hours = 10
+        configs['generic'].save()
+        assert resolve_sla_hours('high')[:2] == (10, 72)
+        configs['generic'].delete()
+        assert resolve_sla_hours('high')[:2] == (8, 72)  # DEFAULT_SLAS
+        assert resolve_sla_hours('high')[2] is None
+
+    def test_queryset_update_needs_explicit_invalidate(self, configs):
+        sla_resolver.resolve('high')
+        SLAConfiguration.objects.filter(pk=configs['generic'].pk).update(response_time_hours=12)
+        assert sla_resolver.resolve('high').response_time_hours == 8
+        sla_resolver.invalidate()
+        assert sla_resolver.resolve('high').response_time_hours == 12
+
+
+@pytest.mark.django_db
+class TestSharedVersion:
+    """Other workers reload through the version stamp in the shared cache"""
+
+    def test_other_worker_reloads_after_version_change(self, configs, settings):
+        settings.SLA_RESOLVER_CHECK_INTERVAL = 0
+        other_worker = SLAResolver()
+        assert other_worker.resolve('high').response_time_hours == 8
+
+        configs['generic'].response_time_hours = 9
+        configs['generic'].save()
+        assert other_worker.resolve('high').response_time_hours == 9
+
+    def test_version_is_only_checked_every_interval(self, configs, settings, django_assert_num_queries):
+        settings.SLA_RESOLVER_CHECK_INTERVAL = 3600
+        other_worker = SLAResolver()
+        other_worker.resolve('high')
+
+        cache.set(sla_resolver.VERSION_CACHE_KEY, 'changed-elsewhere', None)
+        with django_assert_num_queries(0):
+            assert other_worker.resolve('high') == configs['generic']
+
+    def test_reload_when_shared_cache_lost_stamp(self, configs, settings):
+        settings.SLA_RESOLVER_CHECK_INTERVAL = 0
+        other_worker = SLAResolver()
+        other_worker.resolve('high')
+        SLAConfiguration.objects.filter(pk=configs['generic'].pk).update(response_time_hours=11)
+        sla_resolver.invalidate()
+        cache.delete(sla_resolver.VERSION_CACHE_KEY)
+        assert other_worker.resolve('high').response_time_hours == 11
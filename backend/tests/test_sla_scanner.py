@@ -0,0 +1,117 @@
+"""
+Tests for the set-based SLA breach scanner
+"""
+import pytest
+from datetime import timedelta
+from django.core.management import call_command
+from django.db.models import Sum
+from django.utils import timezone
+from complaints.models import ComplaintEvent, ComplaintDailyRollup, SLAConfiguration
+from complaints.sla_service import check_and_update_sla_breaches, apply_sla_to_complaint
+
+
+@pytest.fixture
+def make_complaint(make_complaint):
+    """High-priority complaint with an 8h/72h SLA, created hours_ago"""
+    def make(hours_ago, **kwargs):
+        kwargs.setdefault('priority', 'high')
+        kwargs.setdefault('sla_response_hours', 8)
+        kwargs.setdefault('sla_resolution_hours', 72)
+        return make_complaint(created_at=timezone.now() - timedelta(hours=hours_ago), **kwargs)
+    return make
+
+
+@pytest.mark.django_db
+class TestBreachScanner:
+    """Breach detection, flags and events"""
+
+    def test_flags_response_and_resolution_breaches(self, make_complaint):
+        on_time = make_complaint(2)
+        late_response = make_complaint(10)
+        late_both = make_complaint(100)
+        answered = make_complaint(10, first_response_at=timezone.now())
+
+        breached = check_and_update_sla_breaches()
+
+        assert {c.pk for c in breached} == {late_response.pk, late_both.pk}
+        for complaint in (on_time, late_response, late_both, answered):
+            complaint.refresh_from_db()
+        assert not on_time.sla_response_breached
+        assert late_response.sla_response_breached and not late_response.sla_resolution_breached
+        assert late_both.sla_response_breached and late_both.sla_resolution_breached
+        assert late_both.sla_breach_notified_at is not None
+        assert not answered.sla_response_breached
+        assert sorted(ComplaintEvent.objects.filter(event_type='sla_breached').values_list('notes', flat=True)) == [
+            'Resolution SLA breached (72h)', 'Response SLA breached (8h)', 'Response SLA breached (8h)',
+        ]
+
+    def test_breaches_are_recorded_once(self, make_complaint):
+        make_complaint(100)
+
+        check_and_update_sla_breaches()
+        assert check_and_update_sla_breaches() == []
+
+        assert ComplaintEvent.objects.filter(event_type='sla_breached').count() == 2
+
+    def test_closed_complaints_are_ignored(self, make_complaint):
+        make_complaint(100, status='resolved')
+
+        assert check_and_update_sla_breaches() == []
+
+    def test_missing_sla_is_filled_from_configuration(self, make_complaint, category):
+        SLAConfiguration.objects.create(name='Fast', priority='high', category=category,
+                                        response_time_hours=1, resolution_time_hours=4)
+        configured = make_complaint(2, category=category, sla_response_hours=None, sla_resolution_hours=None)
+        default = make_complaint(2, sla_response_hours=None, sla_resolution_hours=None)
+
+        breached = check_and_update_sla_breaches()
+
+        configured.refresh_from_db()
+        default.refresh_from_db()
+        assert (configured.sla_response_hours, configured.sla_resolution_hours) == (1, 4)
+        assert (default.sla_response_hours, default.sla_resolution_hours) == (8, 72)
+        assert [c.pk for c in breached] == [configured.pk]
+
+    def test_chunks_report_progress(self, make_complaint):
+        for _ in range(5):
+            make_complaint(10)
+        calls = []
+
+        breached = check_and_update_sla_breaches(chunk_size=2, progress=lambda done, total: calls.append((done, total)))
+
+        assert len(breached) == 5
+        assert calls == [(2, 5), (4, 5), (5, 5)]
+
+    def test_query_count_does_not_grow_with_breaches(self, make_complaint, django_assert_max_num_queries):
+        for _ in range(30):
+            make_complaint(100)
+
+        with django_assert_max_num_queries(12):
+            check_and_update_sla_breaches()
+
+    def test_rollup_counts_breaches(self, make_complaint):
+        make_complaint(100)
+        make_complaint(1)
+
+        check_and_update_sla_breaches()
+
+        assert ComplaintDailyRollup.objects.aggregate(total=Sum('sla_breached_count'))['total'] == 1
+
+    def test_apply_sla_uses_defaults(self, make_complaint):
+        complaint = make_complaint(1, priority='critical', sla_response_hours=None, sla_resolution_hours=None)
+
+        assert apply_sla_to_complaint(complaint) is None
+        complaint.refresh_from_db()
+        assert (complaint.sla_response_hours, complaint.sla_resolution_hours) == (2, 24)
+
+    def test_command_escalates_breached(self, make_complaint, department, create_user):
+        head = create_user(username='head', email='head@example.com', role='dept_head', department=department)
+        department.head = head
+        department.save()
+        complaint = make_complaint(100, department=department)
+
+        call_command('check_sla', '--escalate')
+
+        complaint.refresh_from_db()
+        assert complaint.escalated
+        assert complaint.escalated_to == head
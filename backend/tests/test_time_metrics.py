@@ -0,0 +1,125 @@
+"""
+Tests for database-side response/resolution time metrics
+"""
+import pytest
+from datetime import timedelta
+from django.db.models import DurationField, F
+from django.utils import timezone
+from rest_framework import status
+from complaints.models import Complaint
+from complaints.reporting import PercentileCont, duration_stats, get_time_metrics, time_metric_aggregates
+
+RESOLUTION_HOURS = [1, 2, 3, 4, 10]
+
+
+def percentile(values, p):
+    """Linear interpolation between closest ranks, like PERCENTILE_CONT"""
+    values = sorted(values)
+    position = p * (len(values) - 1)
+    lower = int(position)
+    if lower + 1 == len(values):
+        return values[lower]
+    return values[lower] + (values[lower + 1] - values[lower]) * (position - lower)
+
+
+@pytest.fixture
+def resolved_complaints(student_user, category):
+    now = timezone.now()
+    complaints = []
+    for i, hours in enumerate(RESOLUTION_HOURS):
+        complaint = Complaint.objects.create(
+            title=f'Complaint {i}', description='Broken window', location='Block C', submitter=student_user,
+            category=category, priority='high' if i % 2 else 'low', status='resolved',
+        )
+        Complaint.objects.filter(pk=complaint.pk).update(
+            resolved_at=complaint.created_at + timedelta(hours=hours),
+            first_response_at=complaint.created_at + timedelta(minutes=30 * (i + 1)),
+        )
+        complaints.append(complaint)
+    # Unresolved complaints don't count towards resolution time
+    Complaint.objects.create(title='Open', description='Still open', location='Block C',
+                             submitter=student_user, resolved_at=now)
+    return complaints
+
+
+@pytest.mark.django_db
+class TestDurationStats:
+    """Mean and percentiles computed in the database"""
+
+    def test_resolution_time_distribution(self, resolved_complaints):
+        stats = duration_stats(Complaint.objects.all(), 'resolution_time')
+
+        assert stats['count'] == 5
+        assert stats['mean_hours'] == 4
+        assert stats['median_hours'] == 3
+        assert stats['p90_hours'] == pytest.approx(percentile(RESOLUTION_HOURS, 0.9), abs=0.01)
+        assert stats['p95_hours'] == pytest.approx(percentile(RESOLUTION_HOURS, 0.95), abs=0.01)
+
+    def test_response_time_distribution(self, resolved_complaints):
+        stats = duration_stats(Complaint.objects.all(), 'response_time')
+
+        assert stats['count'] == 5
+        assert stats['median_hours'] == 1.5
+
+    def test_empty_queryset(self, db):
+        stats = duration_stats(Complaint.objects.none(), 'resolution_time')
+
+        assert stats == {'count': 0, 'mean_hours': None, 'median_hours': None, 'p90_hours': None, 'p95_hours': None}
+
+    def test_breakdown_by_priority(self, resolved_complaints):
+        metrics = get_time_metrics(Complaint.objects.filter(status='resolved'), group_by='priority')
+
+        breakdown = {entry['group']: entry for entry in metrics['breakdown']}
+        assert breakdown['high']['resolution_time']['median_hours'] == 3
+        assert breakdown['low']['resolution_time']['count'] == 3
+
+    def test_breakdown_aggregates_in_one_grouped_query(self, resolved_complaints, monkeypatch,
+                                                       django_assert_num_queries):
+        # Only the SQLite percentile fallback queries per group
+        monkeypatch.setattr('complaints.reporting._ordered_percentile', lambda queryset, percentile, count: None)
+
+        with django_assert_num_queries(2):
+            metrics = get_time_metrics(Complaint.objects.all(), group_by='priority')
+
+        breakdown = {entry['group']: entry for entry in metrics['breakdown']}
+        assert breakdown['medium']['resolution_time']['count'] == 0
+        assert breakdown['low']['response_time']['mean_hours'] == 1.5
+
+    def test_postgres_breakdown_sql(self):
+        queryset = Complaint.objects.values('priority').annotate(**time_metric_aggregates(native=True))
+        sql = str(queryset.query)
+
+        assert sql.count('PERCENTILE_CONT(') == 6
+        assert 'GROUP BY' in sql
+
+    def test_postgres_percentile_sql(self):
+        queryset = Complaint.objects.annotate(
+            p90=PercentileCont(F('resolved_at') - F('created_at'), 0.9, output_field=DurationField())
+        )
+
+        assert 'PERCENTILE_CONT(0.9) WITHIN GROUP (ORDER BY' in str(queryset.query)
+
+    def test_invalid_percentile(self):
+        with pytest.raises(ValueError):
+            PercentileCont('resolved_at', 95)
+
+
+@pytest.mark.django_db
+class TestPercentilesEndpoint:
+    """ReportingViewSet percentile breakdown API"""
+
+    def test_percentiles_grouped_by_category(self, resolved_complaints, admin_user, api_client):
+        api_client.force_authenticate(user=admin_user)
+
+        response = api_client.get('/api/complaints/reports/percentiles/?days=7&group_by=category')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['resolution_time']['p95_hours'] is not None
+        assert [entry['group'] for entry in response.data['breakdown']] == ['Test Category', 'Unspecified']
+
+    def test_invalid_group_by(self, admin_user, api_client):
+        api_client.force_authenticate(user=admin_user)
+
+        response = api_client.get('/api/complaints/reports/percentiles/?group_by=submitter')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -25,7 +25,7 @@ function Dashboard({ onLogout }) {
 
   const fetchComplaints = async () => {
     try {
-      const res = await api.get('complaints/');
+      const res = await api.get('complaints/', { params: { expand: 'description' } });
       setComplaints(res.data);
     } catch (err) { console.error(err); }
   };
@@ -44,24 +44,41 @@ const Chatbot = () => {
     }
   };
 
-  const sendMessage = async (messageText = null) => {
-    const textToSend = messageText || inputMessage.trim();
-    if (!textToSend) return;
+  // Reads the server-sent events from chatbot/stream/, calling onEvent(event, data) as each one arrives
+  const streamChat = async (message, onEvent) => {
+    const response = await fetch(`${api.defaults.baseURL}complaints/chatbot/stream/`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json', Accept: 'text/event-stream' },
+      body: JSON.stringify({ message, language: i18n.language })
+    });
+    if (!response.ok || !response.body) {
+      throw new Error(`Chatbot stream failed with status ${response.status}`);
+    }
 
-    // Add user message
-    const userMsg = {
-      type: 'user',
-      text: textToSend,
-      timestamp: new Date()
-    };
-    setMessages(prev => [...prev, userMsg]);
-    setInputMessage('');
-    setIsTyping(true);
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      const frames = buffer.split('\n\n');
+      buffer = frames.pop();
+      frames.forEach(frame => {
+        let event = 'message';
+        let data = '';
+        frame.split('\n').forEach(line => {
+          if (line.startsWith('event: ')) event = line.slice(7);
+          else if (line.startsWith('data: ')) data += line.slice(6);
+        });
+        if (data) onEvent(event, JSON.parse(data));
+      });
+    }
+  };
 
+  // Whole reply in one request (used when streaming is not available)
+  const requestReply = async (textToSend) => {
     try {
-      console.log('🤖 Sending message to chatbot:', textToSend);
-      console.log('🌐 API URL:', api.defaults.baseURL);
-      
       const response = await api.post('complaints/chatbot/message/', {
         message: textToSend,
         language: i18n.language
@@ -99,6 +116,62 @@ const Chatbot = () => {
     }
   };
 
+  const sendMessage = async (messageText = null) => {
+    const textToSend = messageText || inputMessage.trim();
+    if (!textToSend) return;
+
+    // Add user message
+    const userMsg = {
+      type: 'user',
+      text: textToSend,
+      timestamp: new Date()
+    };
+    setMessages(prev => [...prev, userMsg]);
+    setInputMessage('');
+    setIsTyping(true);
+
+    console.log('🤖 Sending message to chatbot:', textToSend);
+    console.log('🌐 API URL:', api.defaults.baseURL);
+
+    // The bot message appears with the first event and grows as tokens arrive
+    const botId = `bot-${Date.now()}`;
+    let text = '';
+    let shown = false;
+    const showBotMsg = (changes) => {
+      if (!shown) {
+        shown = true;
+        setIsTyping(false);
+        setMessages(prev => [...prev, { id: botId, type: 'bot', timestamp: new Date(), ...changes }]);
+      } else {
+        setMessages(prev => prev.map(msg => (msg.id === botId ? { ...msg, ...changes } : msg)));
+      }
+    };
+
+    try {
+      await streamChat(textToSend, (event, data) => {
+        if (event === 'token') {
+          text += data.text;
+          showBotMsg({ text });
+        } else if (event === 'message') {
+          // A whole answer; replaces any tokens shown before it
+          text = data.response;
+          showBotMsg({ text, confidence: data.confidence, topic: data.topic });
+        } else if (event === 'done') {
+          showBotMsg({ text, confidence: data.confidence, topic: data.topic });
+        }
+      });
+      if (!shown) throw new Error('Empty chatbot stream');
+    } catch (error) {
+      if (shown) {
+        // Keep the part of the answer that arrived
+        console.error('❌ Chatbot stream interrupted:', error);
+        return;
+      }
+      console.warn('⚠️ Chatbot streaming unavailable, requesting the whole reply:', error);
+      await requestReply(textToSend);
+    }
+  };
+
   const handleSuggestionClick = (suggestion) => {
     sendMessage(suggestion);
   };
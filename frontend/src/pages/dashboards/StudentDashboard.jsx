@@ -23,7 +23,9 @@ function StudentDashboard() {
     try {
       const [statsRes, complaintsRes] = await Promise.all([
         api.get('complaints/dashboards/student/stats/'),
-        api.get('complaints/dashboards/student/recent_complaints/')
+        api.get('complaints/dashboards/student/recent_complaints/', {
+          params: { expand: 'description,feedback_comment,feedback_submitted_at' }
+        })
       ]);
       setStats(statsRes.data);
       setComplaints(complaintsRes.data);